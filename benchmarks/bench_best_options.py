@@ -0,0 +1,81 @@
+"""Benchmark RolledPool.best_options against the previous pairwise scan.
+
+Rolls random pools of each size and reports the mean time per call for the
+O(n^3) brute force that used to live in services/roller.py and for the
+counts-based ``RolledPool`` (including building it from the results).
+
+    uv run python benchmarks/bench_best_options.py --sizes 2 5 10 20 40 80 100
+"""
+
+import argparse
+import random
+import time
+from itertools import combinations
+
+from cortex_bot.models.dice import VALID_SIZES, DicePool, RolledPool
+
+
+def brute_force_best_options(results: list[tuple[int, int]]) -> list[dict]:
+    """Previous behavior: try every pair and rebuild the leftover dice each time."""
+    non_hitch = [(size, val) for size, val in results if val != 1]
+    if len(non_hitch) < 2:
+        return []
+    best_total = None
+    best_effect = None
+    for combo in combinations(range(len(non_hitch)), 2):
+        total = non_hitch[combo[0]][1] + non_hitch[combo[1]][1]
+        remaining = [non_hitch[i] for i in range(len(non_hitch)) if i not in combo]
+        effect = max(remaining, key=lambda x: x[0]) if remaining else (4, 0)
+        option = {
+            "dice": [non_hitch[combo[0]], non_hitch[combo[1]]],
+            "total": total,
+            "effect_size": effect[0],
+            "effect_value": effect[1],
+        }
+        if best_total is None or total > best_total["total"]:
+            best_total = option
+        if best_effect is None or effect[0] > best_effect["effect_size"]:
+            best_effect = option
+        elif effect[0] == best_effect["effect_size"] and total > best_effect["total"]:
+            best_effect = option
+    options = [{**best_total, "label": "Best total"}]
+    if best_effect is not best_total:
+        options.append({**best_effect, "label": "Best effect"})
+    return options
+
+
+def counts_best_options(results: list[tuple[int, int]]) -> list[dict]:
+    return RolledPool.from_results(results).best_options()
+
+
+def time_per_call(fn, pools: list[list[tuple[int, int]]]) -> float:
+    start = time.perf_counter()
+    for results in pools:
+        fn(results)
+    return (time.perf_counter() - start) / len(pools)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10, 20, 40, 80, 100])
+    parser.add_argument("--pools", type=int, default=20, help="random pools per size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{'dice':>5} {'brute force':>14} {'counts':>12} {'speedup':>9}")
+    for size in args.sizes:
+        pools = [
+            DicePool.from_sizes([random.choice(VALID_SIZES) for _ in range(size)]).roll().results()
+            for _ in range(args.pools)
+        ]
+        before = time_per_call(brute_force_best_options, pools)
+        after = time_per_call(counts_best_options, pools)
+        print(
+            f"{size:>5} {before * 1000:11.3f} ms {after * 1000:9.3f} ms "
+            f"{before / after:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
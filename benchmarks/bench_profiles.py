@@ -0,0 +1,124 @@
+"""Benchmark the SQLite performance profiles on a mixed command workload.
+
+Each command looks up the campaign and player the way a cog does, then runs
+one StateManager mutation (add/step/remove an asset, step stress, PP/XP)
+or a /roll-style read. The same seeded workload runs once per preset in
+DB_PROFILES against a fresh temporary database, and the script reports
+throughput and p50/p99 command latency for each.
+
+    uv run python benchmarks/bench_profiles.py --commands 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from cortex_bot.config import DB_PROFILES, SQLiteProfile
+from cortex_bot.models.database import Database
+from cortex_bot.services.state_manager import StateManager
+
+# Share of writes in the workload; the rest are /roll-style reads.
+WRITE_RATIO = 0.5
+
+
+async def seed(db: Database, players: int) -> tuple[int, int]:
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('srv', 'ch', 'Bench')"
+        )
+        campaign_id = cursor.lastrowid
+        cursor = await conn.execute(
+            "INSERT INTO stress_types (campaign_id, name) VALUES (?, 'Physical')",
+            (campaign_id,),
+        )
+        stress_type_id = cursor.lastrowid
+        for i in range(players):
+            await conn.execute(
+                "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (?, ?, ?)",
+                (campaign_id, f"user{i}", f"Player {i}"),
+            )
+    return campaign_id, stress_type_id
+
+
+async def command(db: Database, sm: StateManager, user: str, stress_type_id: int, rng: random.Random) -> None:
+    campaign = await db.get_campaign_by_channel("srv", "ch")
+    player = await db.get_player(campaign["id"], user)
+    cid, pid = campaign["id"], player["id"]
+    if rng.random() >= WRITE_RATIO:
+        await db.get_player_assets(cid, pid)
+        await db.get_player_stress(cid, pid)
+        await db.get_player_complications(cid, pid)
+        return
+
+    kind = rng.randrange(4)
+    if kind == 0:
+        await sm.add_asset(cid, user, f"Asset {rng.randrange(1000)}", 6, player_id=pid)
+    elif kind == 1:
+        assets = await db.get_player_assets(cid, pid)
+        if assets:
+            asset = rng.choice(assets)
+            if rng.random() < 0.5:
+                await sm.step_up_asset(cid, user, asset["id"])
+            else:
+                await sm.remove_asset(cid, user, asset["id"])
+    elif kind == 2:
+        await sm.add_stress(cid, user, pid, stress_type_id, rng.choice([4, 6, 8, 10]))
+    else:
+        await sm.update_pp(cid, user, pid, rng.choice([-1, 1]))
+
+
+async def run(path: str, profile: SQLiteProfile, args: argparse.Namespace) -> tuple[float, list[float]]:
+    db = Database(path, pool_size=args.pool_size, profile=profile)
+    await db.initialize()
+    sm = StateManager(db)
+    _, stress_type_id = await seed(db, args.players)
+    # Same sequence of commands for every profile.
+    rng = random.Random(args.seed)
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            start = time.perf_counter()
+            await command(db, sm, f"user{i % args.players}", stress_type_id, rng)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.commands)))
+    elapsed = time.perf_counter() - start
+    await db.close()
+    return elapsed, latencies
+
+
+def report(label: str, elapsed: float, latencies: list[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p50 = statistics.median(ms)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(
+        f"{label:<10} commands={len(ms):<6} {len(ms) / elapsed:8.0f}/s  "
+        f"p50={p50:7.3f} ms  p99={p99:7.3f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dir", help="Directory for the databases (default: a temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        for name, profile in DB_PROFILES.items():
+            elapsed, latencies = await run(str(Path(tmp) / f"{name}.db"), profile, args)
+            report(name, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""Benchmark the database work behind a /roll, pooled vs per-call connections.
+
+Replays the queries RollingCog.roll issues (campaign lookup, player, assets,
+stress, complications) against a seeded temporary database and reports
+p50/p99 latency per roll.
+
+    uv run python benchmarks/bench_roll.py --rolls 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiosqlite
+
+from cortex_bot.models.database import Database
+
+
+class UnpooledDatabase(Database):
+    """Previous behavior: open, configure and close a connection per call."""
+
+    @asynccontextmanager
+    async def connect(self):
+        conn = await aiosqlite.connect(self.path)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute("PRAGMA foreign_keys=ON")
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    read = connect
+
+
+async def seed(db: Database, players: int) -> None:
+    async with db.connect() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES (?, ?, ?, ?)",
+            ("srv", "ch", "Bench", json.dumps({"best_mode": True})),
+        )
+        campaign_id = cursor.lastrowid
+        cursor = await conn.execute(
+            "INSERT INTO stress_types (campaign_id, name) VALUES (?, ?)",
+            (campaign_id, "Physical"),
+        )
+        stress_type_id = cursor.lastrowid
+        for i in range(players):
+            cursor = await conn.execute(
+                "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (?, ?, ?)",
+                (campaign_id, f"user{i}", f"Player {i}"),
+            )
+            pid = cursor.lastrowid
+            for a in range(3):
+                await conn.execute(
+                    "INSERT INTO assets (campaign_id, player_id, name, die_size) VALUES (?, ?, ?, ?)",
+                    (campaign_id, pid, f"Asset {a}", 6),
+                )
+            await conn.execute(
+                "INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, ?)",
+                (campaign_id, pid, stress_type_id, 8),
+            )
+            await conn.execute(
+                "INSERT INTO complications (campaign_id, player_id, name, die_size) VALUES (?, ?, ?, ?)",
+                (campaign_id, pid, "Winded", 6),
+            )
+        await conn.commit()
+
+
+async def roll_queries(db: Database, user: str) -> float:
+    start = time.perf_counter()
+    campaign = await db.get_campaign_by_channel("srv", "ch")
+    player = await db.get_player(campaign["id"], user)
+    await db.get_player_assets(campaign["id"], player["id"])
+    await db.get_player_stress(campaign["id"], player["id"])
+    await db.get_player_complications(campaign["id"], player["id"])
+    return time.perf_counter() - start
+
+
+async def run(db: Database, rolls: int, concurrency: int, players: int) -> list[float]:
+    await db.initialize()
+    await seed(db, players)
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            latencies.append(await roll_queries(db, f"user{i % players}"))
+
+    await asyncio.gather(*(one(i) for i in range(rolls)))
+    await db.close()
+    return latencies
+
+
+def report(label: str, latencies: list[float]) -> None:
+    ms = sorted(x * 1000 for x in latencies)
+    p50 = statistics.median(ms)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    print(f"{label:<10} rolls={len(ms):<6} p50={p50:7.3f} ms  p99={p99:7.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rolls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = await run(
+            UnpooledDatabase(str(Path(tmp) / "before.db")),
+            args.rolls, args.concurrency, args.players,
+        )
+        after = await run(
+            Database(str(Path(tmp) / "after.db"), pool_size=args.pool_size),
+            args.rolls, args.concurrency, args.players,
+        )
+    report("per-call", before)
+    report("pooled", after)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+"""Compare dict rows with the slotted row models on a /campaign info workload.
+
+Seeds a campaign with players, stress, assets and complications, then
+builds every per-player row both ways: ``dict(row)`` as the getters used
+to, and ``Model.from_row`` as they do now. For each it reports the
+memory retained by the built rows (tracemalloc) and the build time. A
+final line times the real ``get_campaign_snapshot`` + ``format_campaign_info``
+path end to end.
+
+    uv run python benchmarks/bench_rows.py --players 50 --items 20
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from cortex_bot.models.database import Database
+from cortex_bot.models.rows import Asset, Complication, Stress
+from cortex_bot.services.formatter import format_campaign_info
+
+QUERIES = [
+    (Stress, f"""SELECT {Stress.columns("s")}, st.name FROM stress s
+                JOIN stress_types st ON s.stress_type_id = st.id WHERE s.campaign_id = ?"""),
+    (Asset, f"SELECT {Asset.columns()} FROM assets WHERE campaign_id = ?"),
+    (Complication, f"SELECT {Complication.columns()} FROM complications WHERE campaign_id = ?"),
+]
+
+
+async def seed(db: Database, players: int, items: int) -> int:
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('srv', 'ch', 'Bench')"
+        )
+        campaign_id = cursor.lastrowid
+        type_ids = []
+        for i in range(items):
+            cursor = await conn.execute(
+                "INSERT INTO stress_types (campaign_id, name) VALUES (?, ?)", (campaign_id, f"Type {i}")
+            )
+            type_ids.append(cursor.lastrowid)
+        for p in range(players):
+            cursor = await conn.execute(
+                "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (?, ?, ?)",
+                (campaign_id, f"user{p}", f"Player {p}"),
+            )
+            player_id = cursor.lastrowid
+            for i, type_id in enumerate(type_ids):
+                await conn.execute(
+                    "INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, 6)",
+                    (campaign_id, player_id, type_id),
+                )
+                for table in ("assets", "complications"):
+                    await conn.execute(
+                        f"INSERT INTO {table} (campaign_id, player_id, name, die_size) VALUES (?, ?, ?, 8)",
+                        (campaign_id, player_id, f"{table} {i}"),
+                    )
+    return campaign_id
+
+
+def measure(label: str, build, repeat: int) -> None:
+    tracemalloc.start()
+    rows = build()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    per_call = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<8} rows={len(rows):<7} retained={retained / 1024:9.1f} KiB  build={per_call:7.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=20)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "rows.db"))
+        await db.initialize()
+        campaign_id = await seed(db, args.players, args.items)
+
+        fetched = []
+        async with db.read() as conn:
+            for model, sql in QUERIES:
+                cursor = await conn.execute(sql, (campaign_id,))
+                fetched += [(model, row) for row in await cursor.fetchall()]
+
+        measure("dict", lambda: [dict(row) for _, row in fetched], args.repeat)
+        measure("slots", lambda: [model.from_row(row) for model, row in fetched], args.repeat)
+
+        campaign = await db.get_campaign_by_channel("srv", "ch")
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            snapshot = await db.get_campaign_snapshot(campaign_id)
+            format_campaign_info(
+                campaign, snapshot["players"], snapshot["player_states"],
+                snapshot["scene"], snapshot["doom_pool"],
+            )
+        per_call = (time.perf_counter() - start) / args.repeat * 1000
+        print(f"snapshot + format_campaign_info: {per_call:.3f} ms")
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
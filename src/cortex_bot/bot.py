@@ -1,5 +1,10 @@
+import argparse
 import asyncio
+import hashlib
+import json
 import logging
+import time
+from pathlib import Path
 
 import discord
 from discord.ext import commands
@@ -7,6 +12,7 @@ from discord.ext import commands
 from cortex_bot.config import settings
 from cortex_bot.models.database import Database
 from cortex_bot.views import register_persistent_views
+from cortex_bot.views.base import ephemeral_views
 
 log = logging.getLogger("cortex_bot")
 
@@ -23,23 +29,98 @@ COGS = [
 
 
 class CortexBot(commands.Bot):
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, force_sync: bool = False) -> None:
         intents = discord.Intents.default()
         super().__init__(command_prefix="!", intents=intents)
         self.db = db
+        self.force_sync = force_sync
+        self._stats_task: asyncio.Task | None = None
 
     async def setup_hook(self) -> None:
+        started = time.perf_counter()
         await self.db.initialize()
+        self.db.compactor.start()
+        if settings.stats_interval:
+            self._stats_task = asyncio.get_running_loop().create_task(
+                self._log_stats_every(settings.stats_interval), name="cortex-stats-log"
+            )
+        db_done = time.perf_counter()
         register_persistent_views(self)
         for cog in COGS:
             await self.load_extension(cog)
+        cogs_done = time.perf_counter()
+        synced = await self.sync_commands()
+        sync_done = time.perf_counter()
+        log.info(
+            "Startup: db %.0f ms, cogs %.0f ms, sync %.0f ms (%s)",
+            (db_done - started) * 1000,
+            (cogs_done - db_done) * 1000,
+            (sync_done - cogs_done) * 1000,
+            "synced" if synced else "unchanged, skipped",
+        )
+
+    def command_tree_hash(self) -> str:
+        """SHA-256 of the serialized global command tree."""
+        payload = sorted(
+            (cmd.to_dict(self.tree) for cmd in self.tree.get_commands()),
+            key=lambda c: c["name"],
+        )
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def command_hash_path(self) -> Path | None:
+        """Where the last synced tree hash is stored, next to the database."""
+        if self.db.path == ":memory:":
+            return None
+        db_path = Path(self.db.path)
+        return db_path.with_name(db_path.name + ".commands.sha256")
+
+    async def sync_commands(self) -> bool:
+        """Sync the command tree with Discord only if it changed since the last sync."""
+        current = self.command_tree_hash()
+        path = self.command_hash_path
+        if not self.force_sync and path is not None and path.exists():
+            if path.read_text().strip() == current:
+                return False
         await self.tree.sync()
+        if path is not None:
+            path.write_text(current + "\n")
+        return True
+
+    def log_stats(self) -> None:
+        """Log the database, cache and view counters, one line per component."""
+        stats = self.db.stats()
+        stats["views"] = ephemeral_views.stats()
+        for name, values in stats.items():
+            log.info("Stats %s: %s", name, json.dumps(values, sort_keys=True, default=str))
+
+    async def _log_stats_every(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.log_stats()
+            except Exception:
+                log.exception("Logging stats failed")
+
+    async def close(self) -> None:
+        if self._stats_task is not None:
+            self._stats_task.cancel()
+            self._stats_task = None
+        await super().close()
+        await self.db.close()
 
     async def on_ready(self) -> None:
         log.info("Bot ready as %s", self.user)
 
 
 async def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the Cortex Prime Discord bot.")
+    parser.add_argument(
+        "--force-sync",
+        action="store_true",
+        help="sync slash commands with Discord even if the command tree is unchanged",
+    )
+    args = parser.parse_args()
     logging.basicConfig(level=logging.INFO)
 
     token = settings.token.get_secret_value()
@@ -47,7 +128,7 @@ async def main() -> None:
         raise RuntimeError("CORTEX_BOT_TOKEN environment variable not set")
 
     db = Database()
-    bot = CortexBot(db)
+    bot = CortexBot(db, force_sync=args.force_sync)
     async with bot:
         await bot.start(token)
 
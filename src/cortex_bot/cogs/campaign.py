@@ -8,6 +8,7 @@ import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
 
+from cortex_bot.context import clear_context, get_actor, get_context
 from cortex_bot.services.formatter import format_campaign_info
 from cortex_bot.models.dice import die_label
 from cortex_bot.utils import NO_CAMPAIGN_MSG
@@ -21,10 +22,7 @@ MENTION_PATTERN = re.compile(r"<@!?(\d+)>")
 
 async def get_campaign_or_error(interaction: Interaction) -> dict | None:
     """Fetch the campaign for this channel. Sends an error and returns None if absent."""
-    db = interaction.client.db
-    server_id = str(interaction.guild_id)
-    channel_id = str(interaction.channel_id)
-    campaign = await db.get_campaign_by_channel(server_id, channel_id)
+    campaign = (await get_context(interaction)).campaign
     if campaign is None:
         await interaction.response.send_message(NO_CAMPAIGN_MSG)
     return campaign
@@ -32,8 +30,7 @@ async def get_campaign_or_error(interaction: Interaction) -> dict | None:
 
 async def is_gm_check(interaction: Interaction, campaign: dict) -> bool:
     """Return True if the user is the GM. Sends an error message and returns False otherwise."""
-    db = interaction.client.db
-    player = await db.get_player(campaign["id"], str(interaction.user.id))
+    player = await get_actor(interaction, campaign["id"])
     if player is None or not player["is_gm"]:
         await interaction.response.send_message(
             "Only the GM can execute this command."
@@ -60,6 +57,8 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
         hero_dice="Enable Hero Dice (default: no)",
         trauma="Enable Trauma (default: no)",
         best_mode="Enable Best Mode with pre-calculated options (default: yes)",
+        undo_keep="How many recent actions stay undoable (default: server setting)",
+        undo_days="Also keep actions younger than this many days undoable",
     )
     async def setup(
         self,
@@ -72,11 +71,13 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
         hero_dice: bool = False,
         trauma: bool = False,
         best_mode: bool = True,
+        undo_keep: app_commands.Range[int, 1, 100000] | None = None,
+        undo_days: app_commands.Range[int, 1, 3650] | None = None,
     ) -> None:
         server_id = str(interaction.guild_id)
         channel_id = str(interaction.channel_id)
 
-        existing = await self.db.get_campaign_by_channel(server_id, channel_id)
+        existing = (await get_context(interaction)).campaign
         if existing is not None:
             await interaction.response.send_message(
                 "A campaign already exists in this channel. "
@@ -99,17 +100,34 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
             )
             return
 
-        config = {
+        modules = {
             "doom_pool": doom_pool,
             "hero_dice": hero_dice,
             "trauma": trauma,
             "best_mode": best_mode,
         }
+        config = dict(modules)
+        if undo_keep is not None:
+            config["undo_keep"] = undo_keep
+        if undo_days is not None:
+            config["undo_days"] = undo_days
 
         gm_member = gm or interaction.user
         gm_discord_id = str(gm_member.id)
 
-        async with self.db.connect() as conn:
+        # Resolve display names before taking the writer: fetch_member is
+        # a Discord HTTP call per player.
+        member_names: dict[str, str] = {}
+        for uid in player_ids:
+            if uid == gm_discord_id or uid in member_names:
+                continue
+            try:
+                member = await interaction.guild.fetch_member(int(uid))
+                member_names[uid] = member.display_name
+            except discord.NotFound:
+                member_names[uid] = f"User#{uid}"
+
+        async with self.db.transaction() as conn:
             cursor = await conn.execute(
                 "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES (?, ?, ?, ?)",
                 (server_id, channel_id, name, json.dumps(config)),
@@ -122,31 +140,23 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
                 (campaign_id, gm_discord_id, gm_member.display_name),
             )
 
-            # Register mentioned players. Skip the GM if mentioned.
-            for uid in player_ids:
-                if uid == gm_discord_id:
-                    continue
-                try:
-                    member = await interaction.guild.fetch_member(int(uid))
-                    member_name = member.display_name
-                except discord.NotFound:
-                    member_name = f"User#{uid}"
-                await conn.execute(
-                    "INSERT OR IGNORE INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, 0)",
-                    (campaign_id, uid, member_name),
-                )
-
-            for sname in stress_names:
-                await conn.execute(
-                    "INSERT INTO stress_types (campaign_id, name) VALUES (?, ?)",
-                    (campaign_id, sname),
-                )
-
-            await conn.commit()
+            # Register mentioned players. The GM was skipped above.
+            await conn.executemany(
+                "INSERT OR IGNORE INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, 0)",
+                [(campaign_id, uid, member_name) for uid, member_name in member_names.items()],
+            )
+
+            await conn.executemany(
+                "INSERT OR IGNORE INTO stress_types (campaign_id, name) VALUES (?, ?)",
+                [(campaign_id, sname) for sname in stress_names],
+            )
+        self.db.invalidate_campaign_cache(server_id, channel_id)
+        self.db.invalidate_campaign_state(campaign_id)
+        clear_context()
 
         registered = await self.db.get_players(campaign_id)
         player_names = [p["name"] for p in registered]
-        modules_on = [k for k, v in config.items() if v]
+        modules_on = [k for k, v in modules.items() if v]
         modules_str = ", ".join(modules_on) if modules_on else "no extra modules"
 
         from cortex_bot.views.scene_views import PostSetupView
@@ -173,48 +183,27 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
 
         campaign_id = campaign["id"]
         config = campaign["config"]
-        players = await self.db.get_players(campaign_id)
-        scene = await self.db.get_active_scene(campaign_id)
-
-        player_states: dict[int, dict] = {}
-        for p in players:
-            pid = p["id"]
-            state: dict = {}
-            state["stress"] = await self.db.get_player_stress(campaign_id, pid)
-            state["assets"] = await self.db.get_player_assets(campaign_id, pid)
-            state["complications"] = await self.db.get_player_complications(campaign_id, pid)
-            if config.get("trauma"):
-                state["trauma"] = await self.db.get_player_trauma(campaign_id, pid)
-            if config.get("hero_dice"):
-                state["hero_dice"] = await self.db.get_hero_dice(campaign_id, pid)
-            player_states[pid] = state
-
-        doom_pool = None
-        if config.get("doom_pool"):
-            doom_pool = await self.db.get_doom_pool(campaign_id)
-
-        scene_assets = None
-        scene_complications = None
-        crisis_pools = None
-        if scene is not None:
-            scene_assets = await self.db.get_scene_assets(scene["id"])
-            scene_complications = await self.db.get_scene_complications(scene["id"])
-            crisis_pools = await self.db.get_crisis_pools(scene["id"])
-
-        text = format_campaign_info(
-            campaign=campaign,
-            players=players,
-            player_states=player_states,
-            scene=scene,
-            doom_pool=doom_pool,
-            scene_assets=scene_assets,
-            scene_complications=scene_complications,
-            crisis_pools=crisis_pools,
-            config=config,
-        )
+
+        async def render() -> tuple[str, bool]:
+            snapshot = await self.db.get_campaign_snapshot(campaign_id, config)
+            scene = snapshot["scene"]
+            text = format_campaign_info(
+                campaign=campaign,
+                players=snapshot["players"],
+                player_states=snapshot["player_states"],
+                scene=scene,
+                doom_pool=snapshot["doom_pool"],
+                scene_assets=snapshot["scene_assets"],
+                scene_complications=snapshot["scene_complications"],
+                crisis_pools=snapshot["crisis_pools"],
+                config=config,
+            )
+            return text, scene is not None
+
+        text, has_scene = await self.db.render(campaign_id, "campaign_info", render)
         from cortex_bot.views.common import PostInfoView
 
-        view = PostInfoView(campaign_id, has_active_scene=scene is not None)
+        view = PostInfoView(campaign_id, has_active_scene=has_scene)
         await interaction.response.send_message(text, view=view)
 
     @app_commands.command(name="delegate", description="Promote a player to delegate (GM only).")
@@ -243,18 +232,18 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
             )
             return
 
-        if target["is_delegate"]:
+        async with self.db.transaction(campaign["id"]) as conn:
+            cursor = await conn.execute(
+                "UPDATE players SET is_delegate = 1 WHERE id = ? AND is_delegate = 0 RETURNING id",
+                (target["id"],),
+            )
+            promoted = await cursor.fetchone() is not None
+        if not promoted:
             await interaction.response.send_message(
                 f"{target['name']} is already a delegate."
             )
             return
-
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "UPDATE players SET is_delegate = 1 WHERE id = ?",
-                (target["id"],),
-            )
-            await conn.commit()
+        self.db.invalidate_campaign_state(campaign["id"])
 
         await interaction.response.send_message(
             f"{target['name']} is now a delegate. Has access to GM commands.",
@@ -279,18 +268,18 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
             )
             return
 
-        if not target["is_delegate"]:
+        async with self.db.transaction(campaign["id"]) as conn:
+            cursor = await conn.execute(
+                "UPDATE players SET is_delegate = 0 WHERE id = ? AND is_delegate = 1 RETURNING id",
+                (target["id"],),
+            )
+            revoked = await cursor.fetchone() is not None
+        if not revoked:
             await interaction.response.send_message(
                 f"{target['name']} is not a delegate."
             )
             return
-
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "UPDATE players SET is_delegate = 0 WHERE id = ?",
-                (target["id"],),
-            )
-            await conn.commit()
+        self.db.invalidate_campaign_state(campaign["id"])
 
         await interaction.response.send_message(
             f"{target['name']}'s delegate status revoked.",
@@ -324,11 +313,14 @@ class CampaignCog(commands.GroupCog, group_name="campaign"):
             )
             return
 
-        async with self.db.connect() as conn:
+        async with self.db.transaction(campaign["id"]) as conn:
             await conn.execute(
                 "DELETE FROM campaigns WHERE id = ?", (campaign["id"],)
             )
-            await conn.commit()
+        self.db.invalidate_campaign_cache(campaign["server_id"], campaign["channel_id"])
+        self.db.autocomplete.invalidate(campaign["id"])
+        self.db.invalidate_campaign_state(campaign["id"])
+        clear_context()
 
         await interaction.response.send_message(
             f"Campaign '{campaign['name']}' ended. All data has been removed."
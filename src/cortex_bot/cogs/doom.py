@@ -7,14 +7,17 @@ import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
 
+from cortex_bot.context import get_actor, get_context
 from cortex_bot.models.dice import (
+    MAX_POOL_DICE,
+    DicePool,
     parse_single_die,
     parse_dice_notation,
     die_label,
     step_up,
     step_down,
 )
-from cortex_bot.services.roller import roll_pool, calculate_best_options
+from cortex_bot.models.rows import CrisisDie, DoomDie
 from cortex_bot.utils import has_gm_permission, NO_CAMPAIGN_MSG
 from cortex_bot.views.common import MenuOnlyView
 
@@ -56,9 +59,7 @@ class DoomCog(commands.Cog):
     # ── helpers ──────────────────────────────────────────────────────
 
     async def _resolve_campaign(self, interaction: Interaction) -> dict | None:
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        campaign = await self.db.get_campaign_by_channel(server_id, channel_id)
+        campaign = (await get_context(interaction)).campaign
         if campaign is None:
             await interaction.response.send_message(NO_CAMPAIGN_MSG)
         return campaign
@@ -66,7 +67,7 @@ class DoomCog(commands.Cog):
     async def _require_gm(
         self, interaction: Interaction, campaign_id: int
     ) -> dict | None:
-        player = await self.db.get_player(campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, campaign_id)
         if player is None or not has_gm_permission(player):
             await interaction.response.send_message(
                 "Only the GM or delegates can use this command."
@@ -90,6 +91,11 @@ class DoomCog(commands.Cog):
         labels = [die_label(d["die_size"]) for d in doom_dice]
         return f"Doom Pool: {', '.join(labels)}."
 
+    async def _find_doom_die(self, campaign_id: int, size: int) -> DoomDie | None:
+        """First die of ``size`` in the pool; call inside the campaign's lane."""
+        pool = await self.db.get_doom_pool(campaign_id)
+        return next((d for d in pool if d.die_size == size), None)
+
     # ── doom commands ────────────────────────────────────────────────
 
     def _register_doom_commands(self) -> None:
@@ -144,19 +150,25 @@ class DoomCog(commands.Cog):
         campaign_id = campaign["id"]
         actor_id = str(interaction.user.id)
 
-        async with self.db.connect() as conn:
-            cursor = await conn.execute(
-                "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
-                (campaign_id, size),
+        async with self.db.transaction(campaign_id) as conn:
+            full = await self.db.doom_pool_space(conn, campaign_id) < 1
+            if not full:
+                cursor = await conn.execute(
+                    "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
+                    (campaign_id, size),
+                )
+                doom_die_id = cursor.lastrowid
+                await self.db.log_action(
+                    campaign_id, actor_id, "doom_add",
+                    {"die_size": size},
+                    {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
+                    conn=conn,
+                )
+        if full:
+            await interaction.response.send_message(
+                f"The Doom Pool can have at most {MAX_POOL_DICE} dice."
             )
-            doom_die_id = cursor.lastrowid
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "doom_add",
-            {"die_size": size},
-            {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
-        )
+            return
 
         pool = await self.db.get_doom_pool(campaign_id)
         from cortex_bot.views.doom_views import PostDoomActionView
@@ -185,13 +197,22 @@ class DoomCog(commands.Cog):
 
         campaign_id = campaign["id"]
         actor_id = str(interaction.user.id)
-        pool = await self.db.get_doom_pool(campaign_id)
-
-        target = None
-        for d in pool:
-            if d["die_size"] == size:
-                target = d
-                break
+        async with self.db.lane(campaign_id):
+            target = await self._find_doom_die(campaign_id, size)
+            if target is not None:
+                async with self.db.transaction() as conn:
+                    await conn.execute(
+                        "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
+                    )
+                    await self.db.log_action(
+                        campaign_id, actor_id, "doom_remove",
+                        {"die_size": size},
+                        {
+                            "action": "insert", "table": "doom_pool_dice",
+                            "data": {"id": target["id"], "campaign_id": campaign_id, "die_size": size},
+                        },
+                        conn=conn,
+                    )
 
         if target is None:
             await interaction.response.send_message(
@@ -199,21 +220,6 @@ class DoomCog(commands.Cog):
             )
             return
 
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
-            )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "doom_remove",
-            {"die_size": size},
-            {
-                "action": "insert", "table": "doom_pool_dice",
-                "data": {"campaign_id": campaign_id, "die_size": size},
-            },
-        )
-
         pool = await self.db.get_doom_pool(campaign_id)
         from cortex_bot.views.doom_views import PostDoomActionView
 
@@ -241,40 +247,33 @@ class DoomCog(commands.Cog):
 
         campaign_id = campaign["id"]
         actor_id = str(interaction.user.id)
-        pool = await self.db.get_doom_pool(campaign_id)
-
-        target = None
-        for d in pool:
-            if d["die_size"] == size:
-                target = d
-                break
+        new_size = step_up(size)
+        async with self.db.lane(campaign_id):
+            target = await self._find_doom_die(campaign_id, size)
+            if target is not None and new_size is not None:
+                async with self.db.transaction() as conn:
+                    await conn.execute(
+                        "UPDATE doom_pool_dice SET die_size = ? WHERE id = ?",
+                        (new_size, target["id"]),
+                    )
+                    await self.db.log_action(
+                        campaign_id, actor_id, "doom_stepup",
+                        {"from": size, "to": new_size},
+                        {"action": "update", "table": "doom_pool_dice", "id": target["id"], "field": "die_size", "value": size},
+                        conn=conn,
+                    )
 
         if target is None:
             await interaction.response.send_message(
                 f"No {die_label(size)} in the Doom Pool."
             )
             return
-
-        new_size = step_up(size)
         if new_size is None:
             await interaction.response.send_message(
                 f"{die_label(size)} is already at maximum. Cannot step up."
             )
             return
 
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "UPDATE doom_pool_dice SET die_size = ? WHERE id = ?",
-                (new_size, target["id"]),
-            )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "doom_stepup",
-            {"from": size, "to": new_size},
-            {"action": "update", "table": "doom_pool_dice", "id": target["id"], "field": "die_size", "value": size},
-        )
-
         pool = await self.db.get_doom_pool(campaign_id)
         from cortex_bot.views.doom_views import PostDoomActionView
 
@@ -302,13 +301,36 @@ class DoomCog(commands.Cog):
 
         campaign_id = campaign["id"]
         actor_id = str(interaction.user.id)
-        pool = await self.db.get_doom_pool(campaign_id)
-
-        target = None
-        for d in pool:
-            if d["die_size"] == size:
-                target = d
-                break
+        new_size = step_down(size)
+        async with self.db.lane(campaign_id):
+            target = await self._find_doom_die(campaign_id, size)
+            if target is not None:
+                async with self.db.transaction() as conn:
+                    if new_size is None:
+                        # d4 stepped down is eliminated
+                        await conn.execute(
+                            "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
+                        )
+                        await self.db.log_action(
+                            campaign_id, actor_id, "doom_stepdown_eliminated",
+                            {"was": size},
+                            {
+                                "action": "insert", "table": "doom_pool_dice",
+                                "data": {"id": target["id"], "campaign_id": campaign_id, "die_size": size},
+                            },
+                            conn=conn,
+                        )
+                    else:
+                        await conn.execute(
+                            "UPDATE doom_pool_dice SET die_size = ? WHERE id = ?",
+                            (new_size, target["id"]),
+                        )
+                        await self.db.log_action(
+                            campaign_id, actor_id, "doom_stepdown",
+                            {"from": size, "to": new_size},
+                            {"action": "update", "table": "doom_pool_dice", "id": target["id"], "field": "die_size", "value": size},
+                            conn=conn,
+                        )
 
         if target is None:
             await interaction.response.send_message(
@@ -316,24 +338,7 @@ class DoomCog(commands.Cog):
             )
             return
 
-        new_size = step_down(size)
         if new_size is None:
-            # d4 stepped down is eliminated
-            async with self.db.connect() as conn:
-                await conn.execute(
-                    "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
-                )
-                await conn.commit()
-
-            await self.db.log_action(
-                campaign_id, actor_id, "doom_stepdown_eliminated",
-                {"was": size},
-                {
-                    "action": "insert", "table": "doom_pool_dice",
-                    "data": {"campaign_id": campaign_id, "die_size": size},
-                },
-            )
-
             pool = await self.db.get_doom_pool(campaign_id)
             from cortex_bot.views.doom_views import PostDoomActionView
 
@@ -344,19 +349,6 @@ class DoomCog(commands.Cog):
             )
             return
 
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "UPDATE doom_pool_dice SET die_size = ? WHERE id = ?",
-                (new_size, target["id"]),
-            )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "doom_stepdown",
-            {"from": size, "to": new_size},
-            {"action": "update", "table": "doom_pool_dice", "id": target["id"], "field": "die_size", "value": size},
-        )
-
         pool = await self.db.get_doom_pool(campaign_id)
         from cortex_bot.views.doom_views import PostDoomActionView
 
@@ -383,17 +375,17 @@ class DoomCog(commands.Cog):
             await interaction.response.send_message("Doom Pool is empty.")
             return
 
-        if dice is not None:
-            try:
-                requested_sizes = parse_dice_notation(dice)
-            except ValueError as exc:
-                await interaction.response.send_message(str(exc))
-                return
-            roll_sizes = requested_sizes
-        else:
-            roll_sizes = [d["die_size"] for d in pool]
+        try:
+            if dice is not None:
+                dice_pool = DicePool.parse(dice)
+            else:
+                dice_pool = DicePool.from_sizes([d["die_size"] for d in pool])
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc))
+            return
 
-        results = roll_pool(roll_sizes)
+        rolled = dice_pool.roll()
+        results = rolled.results()
 
         lines: list[str] = []
         lines.append(f"Doom Pool rolled: {len(results)} dice.")
@@ -403,7 +395,7 @@ class DoomCog(commands.Cog):
             dice_parts.append(f"{die_label(size)}: {value}")
         lines.append(", ".join(dice_parts) + ".")
 
-        best_options = calculate_best_options(results)
+        best_options = rolled.best_options()
         if best_options:
             for opt in best_options:
                 lines.append(
@@ -447,13 +439,14 @@ class DoomCog(commands.Cog):
             return
 
         campaign_id = campaign["id"]
-        pool = await self.db.get_doom_pool(campaign_id)
-
-        target = None
-        for d in pool:
-            if d["die_size"] == size:
-                target = d
-                break
+        async with self.db.lane(campaign_id):
+            target = await self._find_doom_die(campaign_id, size)
+            if target is not None:
+                async with self.db.transaction() as conn:
+                    await conn.execute(
+                        "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
+                    )
+                self.db.invalidate_campaign_state(campaign_id)
 
         if target is None:
             await interaction.response.send_message(
@@ -461,12 +454,6 @@ class DoomCog(commands.Cog):
             )
             return
 
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
-            )
-            await conn.commit()
-
         pool = await self.db.get_doom_pool(campaign_id)
         from cortex_bot.views.doom_views import PostDoomActionView
 
@@ -513,31 +500,35 @@ class DoomCog(commands.Cog):
             return
 
         campaign_id = campaign["id"]
-        scene = await self.db.get_active_scene(campaign_id)
-        if scene is None:
-            await interaction.response.send_message(
-                "No active scene. Start a scene before creating crisis pools."
-            )
-            return
-
         try:
             die_sizes = parse_dice_notation(dice)
         except ValueError as exc:
             await interaction.response.send_message(str(exc))
             return
 
-        async with self.db.connect() as conn:
+        async with self.db.transaction(campaign_id) as conn:
+            # Checked in the lane so the scene cannot end under the insert.
             cursor = await conn.execute(
-                "INSERT INTO crisis_pools (campaign_id, scene_id, name) VALUES (?, ?, ?)",
-                (campaign_id, scene["id"], name),
+                "SELECT id FROM scenes WHERE campaign_id = ? AND is_active = 1",
+                (campaign_id,),
             )
-            pool_id = cursor.lastrowid
-            for size in die_sizes:
-                await conn.execute(
+            scene = await cursor.fetchone()
+            if scene is not None:
+                cursor = await conn.execute(
+                    "INSERT INTO crisis_pools (campaign_id, scene_id, name) VALUES (?, ?, ?)",
+                    (campaign_id, scene["id"], name),
+                )
+                pool_id = cursor.lastrowid
+                await conn.executemany(
                     "INSERT INTO crisis_pool_dice (crisis_pool_id, die_size) VALUES (?, ?)",
-                    (pool_id, size),
+                    [(pool_id, size) for size in die_sizes],
                 )
-            await conn.commit()
+        if scene is None:
+            await interaction.response.send_message(
+                "No active scene. Start a scene before creating crisis pools."
+            )
+            return
+        self.db.invalidate_campaign_state(campaign_id)
 
         dice_labels = [die_label(s) for s in die_sizes]
         await interaction.response.send_message(
@@ -555,23 +546,35 @@ class DoomCog(commands.Cog):
             return
 
         campaign_id = campaign["id"]
-        scene = await self.db.get_active_scene(campaign_id)
-        if scene is None:
-            await interaction.response.send_message("No active scene.")
-            return
-
         try:
             size = parse_single_die(die)
         except ValueError as exc:
             await interaction.response.send_message(str(exc))
             return
 
-        pools = await self.db.get_crisis_pools(scene["id"])
-        target_pool = None
-        for p in pools:
-            if p["name"].lower() == name.lower():
-                target_pool = p
-                break
+        target_pool = target_die = None
+        remaining: list[CrisisDie] = []
+        async with self.db.lane(campaign_id):
+            scene = await self.db.get_active_scene(campaign_id)
+            pools = await self.db.get_crisis_pools(scene["id"]) if scene is not None else []
+            target_pool = next((p for p in pools if p.name.lower() == name.lower()), None)
+            if target_pool is not None:
+                target_die = next((d for d in target_pool.dice if d.die_size == size), None)
+            if target_die is not None:
+                remaining = [d for d in target_pool.dice if d.id != target_die.id]
+                async with self.db.transaction() as conn:
+                    await conn.execute(
+                        "DELETE FROM crisis_pool_dice WHERE id = ?", (target_die.id,)
+                    )
+                    if not remaining:
+                        await conn.execute(
+                            "DELETE FROM crisis_pools WHERE id = ?", (target_pool.id,)
+                        )
+                self.db.invalidate_campaign_state(campaign_id)
+
+        if scene is None:
+            await interaction.response.send_message("No active scene.")
+            return
 
         if target_pool is None:
             await interaction.response.send_message(
@@ -579,37 +582,18 @@ class DoomCog(commands.Cog):
             )
             return
 
-        target_die = None
-        for d in target_pool["dice"]:
-            if d["die_size"] == size:
-                target_die = d
-                break
-
         if target_die is None:
             await interaction.response.send_message(
                 f"No {die_label(size)} in Crisis Pool '{name}'."
             )
             return
 
-        async with self.db.connect() as conn:
-            await conn.execute(
-                "DELETE FROM crisis_pool_dice WHERE id = ?", (target_die["id"],)
-            )
-            await conn.commit()
-
-        remaining = [d for d in target_pool["dice"] if d["id"] != target_die["id"]]
-
         if not remaining:
-            async with self.db.connect() as conn:
-                await conn.execute(
-                    "DELETE FROM crisis_pools WHERE id = ?", (target_pool["id"],)
-                )
-                await conn.commit()
             await interaction.response.send_message(
                 f"Removed {die_label(size)} from Crisis Pool '{name}'. Pool empty, crisis resolved."
             )
         else:
-            remaining_labels = [die_label(d["die_size"]) for d in remaining]
+            remaining_labels = [die_label(d.die_size) for d in remaining]
             await interaction.response.send_message(
                 f"Removed {die_label(size)} from Crisis Pool '{name}'. "
                 f"Remaining: {', '.join(remaining_labels)}."
@@ -648,8 +632,13 @@ class DoomCog(commands.Cog):
             )
             return
 
-        roll_sizes = [d["die_size"] for d in target_pool["dice"]]
-        results = roll_pool(roll_sizes)
+        try:
+            dice_pool = DicePool.from_sizes([d["die_size"] for d in target_pool["dice"]])
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc))
+            return
+        rolled = dice_pool.roll()
+        results = rolled.results()
 
         lines: list[str] = []
         lines.append(f"Crisis Pool '{name}' rolled: {len(results)} dice.")
@@ -659,7 +648,7 @@ class DoomCog(commands.Cog):
             dice_parts.append(f"{die_label(size)}: {value}")
         lines.append(", ".join(dice_parts) + ".")
 
-        best_options = calculate_best_options(results)
+        best_options = rolled.best_options()
         if best_options:
             for opt in best_options:
                 lines.append(
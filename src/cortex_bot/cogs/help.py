@@ -18,6 +18,7 @@ HELP_GENERAL = (
     "- /scene: start, end, view scene info\n"
     "- /roll: roll dice with assets and extras\n"
     "- /gmroll: GM/NPC roll without personal state\n"
+    "- /odds: chance of beating a difficulty with a pool\n"
     "- /asset: add, step up, step down, remove assets\n"
     "- /stress: add, step up, step down, remove stress\n"
     "- /complication: add, step up, step down, remove complications\n"
@@ -27,7 +28,7 @@ HELP_GENERAL = (
     "- /crisis: crisis pools (if enabled)\n"
     "- /hero: hero dice (if enabled)\n"
     "- /trauma: trauma (if enabled)\n"
-    "- /undo: undo last action\n"
+    "- /undo: undo last action (count: several at once), /redo: redo it\n"
     "\n"
     "Use /help topic:gm for GM commands, "
     "/help topic:player for player commands, "
@@ -51,6 +52,7 @@ HELP_GM = (
     "- /doom add die:d6 - add die to doom pool (if Doom Pool is enabled)\n"
     "- /doom roll - roll the doom pool\n"
     "- /gmroll dice:2d8 1d10 - roll as GM/NPC\n"
+    "- /gmroll dice:2d8 name:Goon count:10 - roll the same pool for 10 NPCs\n"
     "\n"
     "Between scenes:\n"
     "- /scene start name:\"Tavern Fight\" - start a new scene\n"
@@ -60,7 +62,8 @@ HELP_GM = (
     "Administration:\n"
     "- /campaign end confirm:yes - end campaign permanently\n"
     "- /campaign info - view full state\n"
-    "- /undo - undo last action (GM can undo any player's action)"
+    "- /undo [count] - undo the last action(s) (GM can undo any player's action)\n"
+    "- /redo [count] - redo what was just undone"
 )
 
 HELP_PLAYER = (
@@ -71,6 +74,7 @@ HELP_PLAYER = (
     "- /roll dice:1d8 1d10 include:\"Big Wrench\" - include an asset in the pool\n"
     "- /roll dice:1d8 1d10 extra:1d6 - buy extra dice with PP (costs 1 PP per die)\n"
     "- /roll dice:1d8 1d10 difficulty:12 - roll against a difficulty\n"
+    "- /odds dice:1d8 1d10 1d6 difficulty:11 - check the odds before rolling\n"
     "\n"
     "Assets:\n"
     "- /asset add name:\"Big Wrench\" die:d6 - create an asset for yourself\n"
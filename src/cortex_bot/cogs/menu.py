@@ -4,6 +4,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+from cortex_bot.context import get_context
 from cortex_bot.utils import NO_CAMPAIGN_MSG
 from cortex_bot.views.base import CortexView
 
@@ -59,9 +60,7 @@ class MenuCog(commands.Cog):
     @app_commands.checks.cooldown(1, 10.0)
     async def menu(self, interaction: discord.Interaction) -> None:
         db = self.bot.db
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        campaign = await db.get_campaign_by_channel(server_id, channel_id)
+        campaign = (await get_context(interaction)).campaign
 
         if campaign is None:
             await interaction.response.send_message(
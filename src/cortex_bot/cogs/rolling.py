@@ -7,19 +7,22 @@ import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
 
-from cortex_bot.models.dice import parse_dice_notation, die_label
-from cortex_bot.services.roller import (
-    roll_pool,
-    find_hitches,
-    is_botch,
-    calculate_best_options,
+from cortex_bot.context import get_campaign, get_context
+from cortex_bot.models.dice import MAX_POOL_DICE, DicePool, parse_dice_notation, die_label
+from cortex_bot.services.formatter import (
+    format_batch_roll_result,
+    format_odds,
+    format_roll_result,
 )
-from cortex_bot.services.formatter import format_roll_result
+from cortex_bot.services.roller import MAX_BATCH_ROLLS, roll_pools_batch
+from cortex_bot.services.probability import calculate_odds
 from cortex_bot.services.state_manager import StateManager
-from cortex_bot.utils import has_gm_permission, NO_CAMPAIGN_MSG
+from cortex_bot.utils import NO_CAMPAIGN_MSG
 
 log = logging.getLogger(__name__)
 
+MAX_ODDS_DICE = 30
+
 
 class RollingCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
@@ -34,19 +37,9 @@ class RollingCog(commands.Cog):
     ) -> list[app_commands.Choice[str]]:
         """Autocomplete for the include parameter: suggests the player's assets."""
         try:
-            server_id = str(interaction.guild_id)
-            channel_id = str(interaction.channel_id)
-            campaign = await self.db.get_campaign_by_channel(server_id, channel_id)
+            campaign = await get_campaign(interaction)
             if campaign is None:
                 return []
-            player = await self.db.get_player(
-                campaign["id"], str(interaction.user.id)
-            )
-            if player is None:
-                return []
-            assets = await self.db.get_player_assets(campaign["id"], player["id"])
-            if not assets:
-                return []
 
             # Parse what the user already typed to know which assets are already selected.
             already_selected = set()
@@ -62,14 +55,16 @@ class RollingCog(commands.Cog):
             if "," in current:
                 prefix = current.rsplit(",", 1)[0] + ", "
 
-            search = current.rsplit(",", 1)[-1].strip().lower()
+            search = current.rsplit(",", 1)[-1].strip()
+            user_id = str(interaction.user.id)
+            assets = await self.db.autocomplete.search(
+                campaign["id"], user_id, "assets", search,
+                lambda: self.db.get_user_assets(campaign["id"], user_id),
+            )
 
             choices: list[app_commands.Choice[str]] = []
             for asset in assets:
-                name_lower = asset["name"].lower()
-                if name_lower in already_selected:
-                    continue
-                if search and search not in name_lower:
+                if asset["name"].lower() in already_selected:
                     continue
                 label = f"{asset['name']} {die_label(asset['die_size'])}"
                 value = prefix + asset["name"]
@@ -100,19 +95,18 @@ class RollingCog(commands.Cog):
         difficulty: Optional[int] = None,
         extra: Optional[str] = None,
     ) -> None:
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
         actor_id = str(interaction.user.id)
 
-        campaign = await self.db.get_campaign_by_channel(server_id, channel_id)
+        ctx = await get_context(interaction)
+        campaign = ctx.campaign
         if campaign is None:
             await interaction.response.send_message(NO_CAMPAIGN_MSG)
             return
 
-        campaign_id = campaign["id"]
-        config = campaign["config"]
+        campaign_id = ctx.campaign_id
+        config = ctx.config
 
-        player = await self.db.get_player(campaign_id, actor_id)
+        player = ctx.actor
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Ask the GM to add you via /campaign setup."
@@ -124,7 +118,7 @@ class RollingCog(commands.Cog):
 
         # 1. Parse base dice notation.
         try:
-            pool = parse_dice_notation(dice)
+            pool = DicePool.parse(dice)
         except ValueError as exc:
             await interaction.response.send_message(str(exc))
             return
@@ -145,7 +139,11 @@ class RollingCog(commands.Cog):
                 if asset is None:
                     not_found.append(req)
                 else:
-                    pool.append(asset["die_size"])
+                    try:
+                        pool.add(asset["die_size"])
+                    except ValueError as exc:
+                        await interaction.response.send_message(str(exc))
+                        return
                     included_assets.append(
                         f"{asset['name']} {die_label(asset['die_size'])}"
                     )
@@ -165,10 +163,15 @@ class RollingCog(commands.Cog):
         # 3. Handle extra dice bought with PP.
         if extra:
             try:
-                extra_dice = parse_dice_notation(extra)
+                extra_dice = DicePool.parse(extra)
             except ValueError as exc:
                 await interaction.response.send_message(f"Invalid extra dice: {exc}")
                 return
+            if len(pool) + len(extra_dice) > MAX_POOL_DICE:
+                await interaction.response.send_message(
+                    f"A pool can have at most {MAX_POOL_DICE} dice."
+                )
+                return
 
             pp_cost = len(extra_dice)
             state_mgr = StateManager(self.db)
@@ -185,16 +188,17 @@ class RollingCog(commands.Cog):
             pool.extend(extra_dice)
 
         # 4. Roll.
-        results = roll_pool(pool)
+        rolled = pool.roll()
+        results = rolled.results()
 
         # 5. Hitches and botch.
-        hitches = find_hitches(results)
-        botch = is_botch(results)
+        hitches = rolled.hitches()
+        botch = rolled.is_botch()
 
         # 6. Best options (if campaign has best_mode enabled).
         best_options: list[dict] | None = None
         if config.get("best_mode") and not botch:
-            best_options = calculate_best_options(results)
+            best_options = rolled.best_options()
 
         # 7. Opposition elements: stress and complications on this player.
         stress_list = await self.db.get_player_stress(campaign_id, player_id)
@@ -242,6 +246,7 @@ class RollingCog(commands.Cog):
         dice="Dice notation separated by space, e.g. 2d8 1d10",
         name="NPC name (default: GM)",
         difficulty="Target number to compare the total against",
+        count="Roll the same pool for this many NPCs at once",
     )
     async def gmroll(
         self,
@@ -249,38 +254,48 @@ class RollingCog(commands.Cog):
         dice: str,
         name: Optional[str] = None,
         difficulty: Optional[int] = None,
+        count: Optional[app_commands.Range[int, 1, MAX_BATCH_ROLLS]] = None,
     ) -> None:
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-
-        campaign = await self.db.get_campaign_by_channel(server_id, channel_id)
+        ctx = await get_context(interaction)
+        campaign = ctx.campaign
         if campaign is None:
             await interaction.response.send_message(NO_CAMPAIGN_MSG)
             return
 
-        player = await self.db.get_player(campaign["id"], str(interaction.user.id))
-        if player is None or not has_gm_permission(player):
+        if not ctx.has_gm_permission:
             await interaction.response.send_message(
                 "Only the GM or delegates can use this command."
             )
             return
 
         try:
-            pool = parse_dice_notation(dice)
+            pool = DicePool.parse(dice)
         except ValueError as exc:
             await interaction.response.send_message(str(exc))
             return
 
-        results = roll_pool(pool)
-        hitches = find_hitches(results)
-        botch = is_botch(results)
+        player_name = name or "GM"
+        doom_enabled = campaign["config"].get("doom_pool", False)
+
+        if count is not None and count > 1:
+            from cortex_bot.views.rolling_views import PostRollView
+
+            dice_sizes = pool.sizes()
+            rolls = roll_pools_batch(dice_sizes, count)
+            text = format_batch_roll_result(player_name, dice_sizes, rolls, difficulty)
+            view = PostRollView(campaign["id"], doom_enabled=doom_enabled)
+            await interaction.response.send_message(text, view=view)
+            return
+
+        rolled = pool.roll()
+        results = rolled.results()
+        hitches = rolled.hitches()
+        botch = rolled.is_botch()
 
         best_options: list[dict] | None = None
         if campaign["config"].get("best_mode") and not botch:
-            best_options = calculate_best_options(results)
+            best_options = rolled.best_options()
 
-        player_name = name or "GM"
-        doom_enabled = campaign["config"].get("doom_pool", False)
         text = format_roll_result(
             player_name=player_name,
             results=results,
@@ -300,6 +315,34 @@ class RollingCog(commands.Cog):
         )
         await interaction.response.send_message(text, view=view)
 
+    @app_commands.command(
+        name="odds",
+        description="Chance of beating a difficulty with a dice pool.",
+    )
+    @app_commands.describe(
+        dice="Dice notation separated by space, e.g. 1d8 1d10 2d6",
+        difficulty="Target number the total must beat",
+    )
+    async def odds(
+        self,
+        interaction: Interaction,
+        dice: str,
+        difficulty: int,
+    ) -> None:
+        try:
+            pool = parse_dice_notation(dice)
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc))
+            return
+        if len(pool) > MAX_ODDS_DICE:
+            await interaction.response.send_message(
+                f"Odds are limited to {MAX_ODDS_DICE} dice, got {len(pool)}."
+            )
+            return
+
+        result = calculate_odds(pool, difficulty)
+        await interaction.response.send_message(format_odds(pool, result))
+
 
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(RollingCog(bot))
@@ -4,8 +4,10 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from cortex_bot.models.dice import die_label, step_down
+from cortex_bot.context import get_actor, get_context
+from cortex_bot.models.dice import die_label
 from cortex_bot.services.formatter import format_scene_end, format_campaign_info
+from cortex_bot.services.state_manager import StateManager
 from cortex_bot.utils import has_gm_permission, NO_CAMPAIGN_MSG
 
 log = logging.getLogger(__name__)
@@ -48,9 +50,7 @@ class SceneCog(commands.Cog):
     async def _resolve_campaign(
         self, interaction: discord.Interaction
     ) -> dict | None:
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        campaign = await self.bot.db.get_campaign_by_channel(server_id, channel_id)
+        campaign = (await get_context(interaction)).campaign
         if campaign is None:
             await interaction.response.send_message(NO_CAMPAIGN_MSG)
         return campaign
@@ -58,9 +58,7 @@ class SceneCog(commands.Cog):
     async def _require_gm(
         self, interaction: discord.Interaction, campaign_id: int
     ) -> dict | None:
-        player = await self.bot.db.get_player(
-            campaign_id, str(interaction.user.id)
-        )
+        player = await get_actor(interaction, campaign_id)
         if player is None or not has_gm_permission(player):
             await interaction.response.send_message(
                 "Only the GM or delegates can use this command."
@@ -79,21 +77,14 @@ class SceneCog(commands.Cog):
         if gm is None:
             return
 
-        active = await self.bot.db.get_active_scene(campaign["id"])
-        if active is not None:
-            label = active["name"] or "unnamed"
+        started = await StateManager(self.bot.db).start_scene(campaign["id"], name)
+        if "error" in started:
+            label = started["active"]["name"] or "unnamed"
             await interaction.response.send_message(
                 f"A scene is already active: {label}. End it before starting another."
             )
             return
 
-        async with self.bot.db.connect() as conn:
-            cursor = await conn.execute(
-                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1)",
-                (campaign["id"], name),
-            )
-            await conn.commit()
-
         label = name or "unnamed"
 
         doom_enabled = campaign["config"].get("doom_pool", False)
@@ -132,91 +123,25 @@ class SceneCog(commands.Cog):
 
         await interaction.response.defer()
 
-        scene_id = scene["id"]
-        campaign_id = campaign["id"]
-
-        removed_assets = await self.bot.db.get_scene_assets(scene_id)
-        removed_complications = await self.bot.db.get_scene_complications(scene_id)
-        removed_crisis_pools = await self.bot.db.get_crisis_pools(scene_id)
-
-        stress_changes: list[dict] = []
-        if bridge:
-            players = await self.bot.db.get_players(campaign_id)
-            for p in players:
-                if p["is_gm"]:
-                    continue
-                stress_list = await self.bot.db.get_player_stress(
-                    campaign_id, p["id"]
-                )
-                for s in stress_list:
-                    new_size = step_down(s["die_size"])
-                    if new_size is None:
-                        async with self.bot.db.connect() as conn:
-                            await conn.execute(
-                                "DELETE FROM stress WHERE id = ?", (s["id"],)
-                            )
-                            await conn.commit()
-                        stress_changes.append({
-                            "player": p["name"],
-                            "type": s["stress_type_name"],
-                            "eliminated": True,
-                            "from": s["die_size"],
-                        })
-                    else:
-                        async with self.bot.db.connect() as conn:
-                            await conn.execute(
-                                "UPDATE stress SET die_size = ? WHERE id = ?",
-                                (new_size, s["id"]),
-                            )
-                            await conn.commit()
-                        stress_changes.append({
-                            "player": p["name"],
-                            "type": s["stress_type_name"],
-                            "from": s["die_size"],
-                            "to": new_size,
-                        })
-
-        async with self.bot.db.connect() as conn:
-            await conn.execute(
-                "DELETE FROM assets WHERE scene_id = ? AND duration = 'scene'",
-                (scene_id,),
-            )
-            await conn.execute(
-                "DELETE FROM complications WHERE scene_id = ? AND scope = 'scene'",
-                (scene_id,),
-            )
-            for cp in removed_crisis_pools:
-                await conn.execute(
-                    "DELETE FROM crisis_pool_dice WHERE crisis_pool_id = ?",
-                    (cp["id"],),
-                )
-            await conn.execute(
-                "DELETE FROM crisis_pools WHERE scene_id = ?",
-                (scene_id,),
-            )
-            await conn.execute(
-                "UPDATE scenes SET is_active = 0 WHERE id = ?",
-                (scene_id,),
-            )
-            await conn.commit()
+        ended = await StateManager(self.bot.db).end_scene(
+            campaign["id"], str(interaction.user.id), scene, bridge=bridge
+        )
+        if ended.get("error") == "no_active_scene":
+            await interaction.followup.send("No active scene.")
+            return
 
-        doom_pool = await self.bot.db.get_doom_pool(campaign_id)
-        players = await self.bot.db.get_players(campaign_id)
         persistent_parts: list[str] = []
-
-        for p in players:
-            remaining_stress = await self.bot.db.get_player_stress(
-                campaign_id, p["id"]
-            )
+        for name, remaining_stress in ended["remaining_stress"]:
             if remaining_stress:
                 stress_strs = [
                     f"{rs['stress_type_name']} {die_label(rs['die_size'])}"
                     for rs in remaining_stress
                 ]
                 persistent_parts.append(
-                    f"{p['name']}: stress {', '.join(stress_strs)}."
+                    f"{name}: stress {', '.join(stress_strs)}."
                 )
 
+        doom_pool = ended["doom_pool"]
         if doom_pool:
             doom_strs = [die_label(d["die_size"]) for d in doom_pool]
             persistent_parts.append(f"Doom Pool: {', '.join(doom_strs)}.")
@@ -225,10 +150,10 @@ class SceneCog(commands.Cog):
 
         summary = format_scene_end(
             scene["name"],
-            removed_assets,
-            removed_complications,
-            removed_crisis_pools,
-            stress_changes=stress_changes or None,
+            ended["removed_assets"],
+            ended["removed_complications"],
+            ended["removed_crisis_pools"],
+            stress_changes=ended["stress_changes"] or None,
             persistent_state=persistent_state,
         )
         summary += (
@@ -245,49 +170,28 @@ class SceneCog(commands.Cog):
         if campaign is None:
             return
 
-        scene = await self.bot.db.get_active_scene(campaign["id"])
-        if scene is None:
+        async def render() -> str | None:
+            snapshot = await self.bot.db.get_campaign_snapshot(campaign["id"])
+            scene = snapshot["scene"]
+            if scene is None:
+                return None
+            return format_campaign_info(
+                campaign,
+                snapshot["players"],
+                snapshot["player_states"],
+                scene,
+                snapshot["doom_pool"],
+                scene_assets=snapshot["scene_assets"],
+                scene_complications=snapshot["scene_complications"],
+                crisis_pools=snapshot["crisis_pools"],
+                config=campaign["config"],
+            )
+
+        msg = await self.bot.db.render(campaign["id"], "scene_info", render)
+        if msg is None:
             await interaction.response.send_message("No active scene.")
             return
 
-        campaign_id = campaign["id"]
-        scene_id = scene["id"]
-
-        players = await self.bot.db.get_players(campaign_id)
-        player_states: dict[int, dict] = {}
-        for p in players:
-            pid = p["id"]
-            stress = await self.bot.db.get_player_stress(campaign_id, pid)
-            trauma = await self.bot.db.get_player_trauma(campaign_id, pid)
-            assets = await self.bot.db.get_player_assets(campaign_id, pid)
-            complications = await self.bot.db.get_player_complications(
-                campaign_id, pid
-            )
-            hero_dice = await self.bot.db.get_hero_dice(campaign_id, pid)
-            player_states[pid] = {
-                "stress": stress,
-                "trauma": trauma,
-                "assets": assets,
-                "complications": complications,
-                "hero_dice": hero_dice,
-            }
-
-        doom_pool = await self.bot.db.get_doom_pool(campaign_id)
-        scene_assets = await self.bot.db.get_scene_assets(scene_id)
-        scene_complications = await self.bot.db.get_scene_complications(scene_id)
-        crisis_pools = await self.bot.db.get_crisis_pools(scene_id)
-
-        msg = format_campaign_info(
-            campaign,
-            players,
-            player_states,
-            scene,
-            doom_pool,
-            scene_assets=scene_assets,
-            scene_complications=scene_complications,
-            crisis_pools=crisis_pools,
-            config=campaign["config"],
-        )
         from cortex_bot.views.common import PostInfoView
 
         view = PostInfoView(campaign["id"], has_active_scene=True)
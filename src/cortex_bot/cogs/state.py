@@ -7,6 +7,7 @@ import discord
 from discord import app_commands, Interaction, Member
 from discord.ext import commands
 
+from cortex_bot.context import get_actor, get_campaign, get_context
 from cortex_bot.models.dice import parse_single_die, die_label, is_valid_die, step_up, step_down
 from cortex_bot.services.state_manager import StateManager
 from cortex_bot.services.formatter import format_action_confirm
@@ -30,18 +31,14 @@ DURATION_CHOICES = [
 
 
 async def _get_campaign(interaction: Interaction) -> dict | None:
-    db = interaction.client.db
-    campaign = await db.get_campaign_by_channel(
-        str(interaction.guild_id), str(interaction.channel_id)
-    )
+    campaign = (await get_context(interaction)).campaign
     if campaign is None:
         await interaction.response.send_message(NO_CAMPAIGN_MSG)
     return campaign
 
 
 async def _get_player(interaction: Interaction, campaign_id: int) -> dict | None:
-    db = interaction.client.db
-    player = await db.get_player(campaign_id, str(interaction.user.id))
+    player = await get_actor(interaction, campaign_id)
     if player is None:
         await interaction.response.send_message(
             "You are not registered in this campaign. Ask the GM to add you via /campaign setup."
@@ -84,15 +81,15 @@ async def _find_asset_by_name(
     db, campaign_id: int, player_id: int | None, name: str
 ) -> dict | None:
     """Find an asset by name (case-insensitive) for a player or scene."""
-    async with db.connect() as conn:
+    async with db.read() as conn:
         if player_id is not None:
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE campaign_id = ? AND player_id = ? AND LOWER(name) = LOWER(?)",
+                "SELECT * FROM assets WHERE campaign_id = ? AND player_id = ? AND name = ? COLLATE NOCASE",
                 (campaign_id, player_id, name),
             )
         else:
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE campaign_id = ? AND player_id IS NULL AND LOWER(name) = LOWER(?)",
+                "SELECT * FROM assets WHERE campaign_id = ? AND player_id IS NULL AND name = ? COLLATE NOCASE",
                 (campaign_id, name),
             )
         row = await cursor.fetchone()
@@ -102,15 +99,15 @@ async def _find_asset_by_name(
 async def _find_complication_by_name(
     db, campaign_id: int, player_id: int | None, name: str
 ) -> dict | None:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         if player_id is not None:
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE campaign_id = ? AND player_id = ? AND LOWER(name) = LOWER(?)",
+                "SELECT * FROM complications WHERE campaign_id = ? AND player_id = ? AND name = ? COLLATE NOCASE",
                 (campaign_id, player_id, name),
             )
         else:
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE campaign_id = ? AND player_id IS NULL AND LOWER(name) = LOWER(?)",
+                "SELECT * FROM complications WHERE campaign_id = ? AND player_id IS NULL AND name = ? COLLATE NOCASE",
                 (campaign_id, name),
             )
         row = await cursor.fetchone()
@@ -118,9 +115,9 @@ async def _find_complication_by_name(
 
 
 async def _find_stress_type_by_name(db, campaign_id: int, name: str) -> dict | None:
-    async with db.connect() as conn:
+    async with db.read() as conn:
         cursor = await conn.execute(
-            "SELECT * FROM stress_types WHERE campaign_id = ? AND LOWER(name) = LOWER(?)",
+            "SELECT * FROM stress_types WHERE campaign_id = ? AND name = ? COLLATE NOCASE",
             (campaign_id, name),
         )
         row = await cursor.fetchone()
@@ -141,84 +138,67 @@ async def _autocomplete_player(
     interaction: Interaction, current: str
 ) -> list[app_commands.Choice[str]]:
     db = interaction.client.db
-    campaign = await db.get_campaign_by_channel(
-        str(interaction.guild_id), str(interaction.channel_id)
-    )
+    campaign = await get_campaign(interaction)
     if campaign is None:
         return []
-    players = await db.get_players(campaign["id"])
-    choices = []
-    for p in players:
-        if current.lower() in p["name"].lower():
-            choices.append(app_commands.Choice(name=p["name"], value=p["discord_user_id"]))
-        if len(choices) >= 25:
-            break
-    return choices
+    players = await db.autocomplete.search(
+        campaign["id"], "", "players", current,
+        lambda: db.get_players(campaign["id"]),
+    )
+    return [
+        app_commands.Choice(name=p["name"], value=p["discord_user_id"])
+        for p in players[:25]
+    ]
 
 
 async def _autocomplete_asset(
     interaction: Interaction, current: str
 ) -> list[app_commands.Choice[str]]:
     db = interaction.client.db
-    campaign = await db.get_campaign_by_channel(
-        str(interaction.guild_id), str(interaction.channel_id)
-    )
+    campaign = await get_campaign(interaction)
     if campaign is None:
         return []
-    player = await db.get_player(campaign["id"], str(interaction.user.id))
-    if player is None:
-        return []
-    assets = await db.get_player_assets(campaign["id"], player["id"])
-    choices = []
-    for a in assets:
-        label = f"{a['name']} ({die_label(a['die_size'])})"
-        if current.lower() in a["name"].lower():
-            choices.append(app_commands.Choice(name=label, value=a["name"]))
-        if len(choices) >= 25:
-            break
-    return choices
+    user_id = str(interaction.user.id)
+    assets = await db.autocomplete.search(
+        campaign["id"], user_id, "assets", current,
+        lambda: db.get_user_assets(campaign["id"], user_id),
+    )
+    return [
+        app_commands.Choice(name=f"{a['name']} ({die_label(a['die_size'])})", value=a["name"])
+        for a in assets[:25]
+    ]
 
 
 async def _autocomplete_stress_type(
     interaction: Interaction, current: str
 ) -> list[app_commands.Choice[str]]:
     db = interaction.client.db
-    campaign = await db.get_campaign_by_channel(
-        str(interaction.guild_id), str(interaction.channel_id)
-    )
+    campaign = await get_campaign(interaction)
     if campaign is None:
         return []
-    types = await db.get_stress_types(campaign["id"])
-    choices = []
-    for t in types:
-        if current.lower() in t["name"].lower():
-            choices.append(app_commands.Choice(name=t["name"], value=t["name"]))
-        if len(choices) >= 25:
-            break
-    return choices
+    types = await db.autocomplete.search(
+        campaign["id"], "", "stress_types", current,
+        lambda: db.get_stress_types(campaign["id"]),
+    )
+    return [app_commands.Choice(name=t["name"], value=t["name"]) for t in types[:25]]
 
 
 async def _autocomplete_complication(
     interaction: Interaction, current: str
 ) -> list[app_commands.Choice[str]]:
     db = interaction.client.db
-    campaign = await db.get_campaign_by_channel(
-        str(interaction.guild_id), str(interaction.channel_id)
-    )
+    campaign = await get_campaign(interaction)
     if campaign is None:
         return []
-    player = await db.get_player(campaign["id"], str(interaction.user.id))
-    if player is None:
-        return []
-    comps = await db.get_player_complications(campaign["id"], player["id"])
-    choices = []
-    for c in comps:
-        label = f"{c['name']} ({die_label(c['die_size'])})"
-        if current.lower() in c["name"].lower():
-            choices.append(app_commands.Choice(name=label, value=c["name"]))
-        if len(choices) >= 25:
-            break
-    return choices
+    user_id = str(interaction.user.id)
+    comps = await db.autocomplete.search(
+        campaign["id"], user_id, "complications", current,
+        lambda: db.get_user_complications(campaign["id"], user_id),
+    )
+    return [
+        app_commands.Choice(name=f"{c['name']} ({die_label(c['die_size'])})", value=c["name"])
+        for c in comps[:25]
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -617,52 +597,54 @@ class StressGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        existing = new_size = None
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
             )
-            existing = await cursor.fetchone()
-            if not existing:
-                await interaction.response.send_message(
-                    f"{target['name']} has no {stress_type['name']} stress to step up."
+            row = await cursor.fetchone()
+            if row is not None:
+                existing = dict(row)
+                new_size = step_up(existing["die_size"])
+            if new_size is not None:
+                await conn.execute(
+                    "UPDATE stress SET die_size = ? WHERE id = ?",
+                    (new_size, existing["id"]),
                 )
-                return
-            existing = dict(existing)
-            new_size = step_up(existing["die_size"])
-            if new_size is None:
-                stressed_msg = (
-                    f"{target['name']} stressed out on {stress_type['name']}. "
-                    f"Stress was already d12, cannot step up."
+                await db.log_action(
+                    campaign["id"], str(interaction.user.id), "step_up_stress",
+                    {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                     "from": existing["die_size"], "to": new_size},
+                    {"action": "update", "table": "stress", "id": existing["id"],
+                     "field": "die_size", "value": existing["die_size"]},
+                    conn=conn,
                 )
-                if campaign["config"].get("trauma"):
-                    trauma_result = await _create_trauma_from_stress_out(
-                        db, campaign["id"],
-                        str(interaction.user.id), target["id"], stress_type["id"],
-                        target["name"], stress_type["name"],
-                    )
-                    if trauma_result:
-                        stressed_msg += (
-                            f" Trauma {stress_type['name']} {die_label(trauma_result['die_size'])} created."
-                        )
-                await interaction.response.send_message(
-                    format_action_confirm("Stressed out", stressed_msg)
+        if existing is None:
+            await interaction.response.send_message(
+                f"{target['name']} has no {stress_type['name']} stress to step up."
+            )
+            return
+        if new_size is None:
+            stressed_msg = (
+                f"{target['name']} stressed out on {stress_type['name']}. "
+                f"Stress was already d12, cannot step up."
+            )
+            if campaign["config"].get("trauma"):
+                trauma_result = await _create_trauma_from_stress_out(
+                    db, campaign["id"],
+                    str(interaction.user.id), target["id"], stress_type["id"],
+                    target["name"], stress_type["name"],
                 )
-                return
-
-            await conn.execute(
-                "UPDATE stress SET die_size = ? WHERE id = ?",
-                (new_size, existing["id"]),
+                if trauma_result:
+                    stressed_msg += (
+                        f" Trauma {stress_type['name']} {die_label(trauma_result['die_size'])} created."
+                    )
+            await interaction.response.send_message(
+                format_action_confirm("Stressed out", stressed_msg)
             )
-            await conn.commit()
+            return
 
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "step_up_stress",
-            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-             "from": existing["die_size"], "to": new_size},
-            {"action": "update", "table": "stress", "id": existing["id"],
-             "field": "die_size", "value": existing["die_size"]},
-        )
         msg = format_action_confirm(
             "Stress stepped up",
             f"{target['name']} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
@@ -714,61 +696,56 @@ class StressGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        existing = new_size = None
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
             )
-            existing = await cursor.fetchone()
-            if not existing:
-                label = _player_label(target, is_self)
-                await interaction.response.send_message(
-                    f"{label} has no {stress_type['name']} stress to step down."
-                )
-                return
-            existing = dict(existing)
-            new_size = step_down(existing["die_size"])
-
-            if new_size is None:
-                await conn.execute("DELETE FROM stress WHERE id = ?", (existing["id"],))
-                await conn.commit()
-                await db.log_action(
-                    campaign["id"], str(interaction.user.id), "step_down_stress_eliminated",
-                    {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-                     "was": existing["die_size"]},
-                    {"action": "insert", "table": "stress",
-                     "data": {"campaign_id": campaign["id"], "player_id": target["id"],
-                              "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
-                )
-                label = _player_label(target, is_self)
-                msg = format_action_confirm(
-                    "Stress eliminated",
-                    f"{stress_type['name']} for {label} was d4, step down removes the stress.",
-                )
-                from cortex_bot.views.state_views import PostStressView
-
-                view = PostStressView(campaign["id"])
-                await interaction.response.send_message(msg, view=view)
-                return
-
-            await conn.execute(
-                "UPDATE stress SET die_size = ? WHERE id = ?",
-                (new_size, existing["id"]),
-            )
-            await conn.commit()
-
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "step_down_stress",
-            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-             "from": existing["die_size"], "to": new_size},
-            {"action": "update", "table": "stress", "id": existing["id"],
-             "field": "die_size", "value": existing["die_size"]},
-        )
+            row = await cursor.fetchone()
+            if row is not None:
+                existing = dict(row)
+                new_size = step_down(existing["die_size"])
+                if new_size is None:
+                    await conn.execute("DELETE FROM stress WHERE id = ?", (existing["id"],))
+                    await db.log_action(
+                        campaign["id"], str(interaction.user.id), "step_down_stress_eliminated",
+                        {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                         "was": existing["die_size"]},
+                        {"action": "insert", "table": "stress",
+                         "data": {"id": existing["id"], "campaign_id": campaign["id"], "player_id": target["id"],
+                                  "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
+                        conn=conn,
+                    )
+                else:
+                    await conn.execute(
+                        "UPDATE stress SET die_size = ? WHERE id = ?",
+                        (new_size, existing["id"]),
+                    )
+                    await db.log_action(
+                        campaign["id"], str(interaction.user.id), "step_down_stress",
+                        {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                         "from": existing["die_size"], "to": new_size},
+                        {"action": "update", "table": "stress", "id": existing["id"],
+                         "field": "die_size", "value": existing["die_size"]},
+                        conn=conn,
+                    )
         label = _player_label(target, is_self)
-        msg = format_action_confirm(
-            "Stress stepped down",
-            f"{label} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
-        )
+        if existing is None:
+            await interaction.response.send_message(
+                f"{label} has no {stress_type['name']} stress to step down."
+            )
+            return
+        if new_size is None:
+            msg = format_action_confirm(
+                "Stress eliminated",
+                f"{stress_type['name']} for {label} was d4, step down removes the stress.",
+            )
+        else:
+            msg = format_action_confirm(
+                "Stress stepped down",
+                f"{label} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
+            )
         from cortex_bot.views.state_views import PostStressView
 
         view = PostStressView(campaign["id"])
@@ -849,7 +826,7 @@ async def _create_trauma_from_stress_out(
     player_name: str, type_name: str,
 ) -> dict | None:
     """Create a d6 trauma when a player is stressed out. Returns result dict or None."""
-    async with db.connect() as conn:
+    async with db.transaction(campaign_id) as conn:
         cursor = await conn.execute(
             "SELECT * FROM trauma WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
             (campaign_id, player_id, stress_type_id),
@@ -864,13 +841,13 @@ async def _create_trauma_from_stress_out(
                 "UPDATE trauma SET die_size = ? WHERE id = ?",
                 (new_size, existing["id"]),
             )
-            await conn.commit()
             await db.log_action(
                 campaign_id, actor_id, "step_up_trauma_from_stress_out",
                 {"id": existing["id"], "player": player_name, "type": type_name,
                  "from": existing["die_size"], "to": new_size},
                 {"action": "update", "table": "trauma", "id": existing["id"],
                  "field": "die_size", "value": existing["die_size"]},
+                conn=conn,
             )
             return {"die_size": new_size, "player": player_name, "type": type_name}
         else:
@@ -880,11 +857,11 @@ async def _create_trauma_from_stress_out(
                 (campaign_id, player_id, stress_type_id, die_size),
             )
             trauma_id = cursor.lastrowid
-            await conn.commit()
             await db.log_action(
                 campaign_id, actor_id, "add_trauma_from_stress_out",
                 {"id": trauma_id, "player": player_name, "type": type_name, "die_size": die_size},
                 {"action": "delete", "table": "trauma", "id": trauma_id},
+                conn=conn,
             )
             return {"die_size": die_size, "player": player_name, "type": type_name}
 
@@ -955,7 +932,7 @@ class TraumaGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM trauma WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
@@ -969,13 +946,13 @@ class TraumaGroup(app_commands.Group):
                         "UPDATE trauma SET die_size = ? WHERE id = ?",
                         (die_size, existing["id"]),
                     )
-                    await conn.commit()
                     await db.log_action(
                         campaign["id"], str(interaction.user.id), "replace_trauma",
                         {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
                          "from": old_size, "to": die_size},
                         {"action": "update", "table": "trauma", "id": existing["id"],
                          "field": "die_size", "value": old_size},
+                        conn=conn,
                     )
                     msg = format_action_confirm(
                         "Trauma replaced",
@@ -989,37 +966,36 @@ class TraumaGroup(app_commands.Group):
                             f"{target['name']} trauma {stress_type['name']} was already d12 and received step up. "
                             f"Character suffers permanent removal.",
                         )
-                        await interaction.response.send_message(msg, view=MenuOnlyView(campaign["id"]))
-                        return
-                    await conn.execute(
-                        "UPDATE trauma SET die_size = ? WHERE id = ?",
-                        (new_size, existing["id"]),
-                    )
-                    await conn.commit()
-                    await db.log_action(
-                        campaign["id"], str(interaction.user.id), "step_up_trauma",
-                        {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-                         "from": existing["die_size"], "to": new_size},
-                        {"action": "update", "table": "trauma", "id": existing["id"],
-                         "field": "die_size", "value": existing["die_size"]},
-                    )
-                    msg = format_action_confirm(
-                        "Trauma stepped up",
-                        f"{target['name']} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}. "
-                        f"Incoming die ({die_label(die_size)}) was equal or smaller, step up applied.",
-                    )
+                    else:
+                        await conn.execute(
+                            "UPDATE trauma SET die_size = ? WHERE id = ?",
+                            (new_size, existing["id"]),
+                        )
+                        await db.log_action(
+                            campaign["id"], str(interaction.user.id), "step_up_trauma",
+                            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                             "from": existing["die_size"], "to": new_size},
+                            {"action": "update", "table": "trauma", "id": existing["id"],
+                             "field": "die_size", "value": existing["die_size"]},
+                            conn=conn,
+                        )
+                        msg = format_action_confirm(
+                            "Trauma stepped up",
+                            f"{target['name']} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}. "
+                            f"Incoming die ({die_label(die_size)}) was equal or smaller, step up applied.",
+                        )
             else:
                 cursor = await conn.execute(
                     "INSERT INTO trauma (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, ?)",
                     (campaign["id"], target["id"], stress_type["id"], die_size),
                 )
                 trauma_id = cursor.lastrowid
-                await conn.commit()
                 await db.log_action(
                     campaign["id"], str(interaction.user.id), "add_trauma",
                     {"id": trauma_id, "player": target["name"], "type": stress_type["name"],
                      "die_size": die_size},
                     {"action": "delete", "table": "trauma", "id": trauma_id},
+                    conn=conn,
                 )
                 msg = format_action_confirm(
                     "Trauma added",
@@ -1058,40 +1034,42 @@ class TraumaGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        existing = new_size = None
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM trauma WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
             )
-            existing = await cursor.fetchone()
-            if not existing:
-                await interaction.response.send_message(
-                    f"{target['name']} has no {stress_type['name']} trauma."
+            row = await cursor.fetchone()
+            if row is not None:
+                existing = dict(row)
+                new_size = step_up(existing["die_size"])
+            if new_size is not None:
+                await conn.execute(
+                    "UPDATE trauma SET die_size = ? WHERE id = ?",
+                    (new_size, existing["id"]),
                 )
-                return
-            existing = dict(existing)
-            new_size = step_up(existing["die_size"])
-            if new_size is None:
-                msg = format_action_confirm(
-                    "Permanent removal",
-                    f"{target['name']} trauma {stress_type['name']} was already d12, step up indicates permanent character removal.",
+                await db.log_action(
+                    campaign["id"], str(interaction.user.id), "step_up_trauma",
+                    {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                     "from": existing["die_size"], "to": new_size},
+                    {"action": "update", "table": "trauma", "id": existing["id"],
+                     "field": "die_size", "value": existing["die_size"]},
+                    conn=conn,
                 )
-                await interaction.response.send_message(msg, view=MenuOnlyView(campaign["id"]))
-                return
-
-            await conn.execute(
-                "UPDATE trauma SET die_size = ? WHERE id = ?",
-                (new_size, existing["id"]),
+        if existing is None:
+            await interaction.response.send_message(
+                f"{target['name']} has no {stress_type['name']} trauma."
+            )
+            return
+        if new_size is None:
+            msg = format_action_confirm(
+                "Permanent removal",
+                f"{target['name']} trauma {stress_type['name']} was already d12, step up indicates permanent character removal.",
             )
-            await conn.commit()
+            await interaction.response.send_message(msg, view=MenuOnlyView(campaign["id"]))
+            return
 
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "step_up_trauma",
-            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-             "from": existing["die_size"], "to": new_size},
-            {"action": "update", "table": "trauma", "id": existing["id"],
-             "field": "die_size", "value": existing["die_size"]},
-        )
         msg = format_action_confirm(
             "Trauma stepped up",
             f"{target['name']} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
@@ -1132,58 +1110,56 @@ class TraumaGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        existing = new_size = None
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM trauma WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
             )
-            existing = await cursor.fetchone()
-            if not existing:
-                label = _player_label(target, is_self)
-                await interaction.response.send_message(
-                    f"{label} has no {stress_type['name']} trauma."
-                )
-                return
-            existing = dict(existing)
-            new_size = step_down(existing["die_size"])
-
-            if new_size is None:
-                await conn.execute("DELETE FROM trauma WHERE id = ?", (existing["id"],))
-                await conn.commit()
-                await db.log_action(
-                    campaign["id"], str(interaction.user.id), "step_down_trauma_eliminated",
-                    {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-                     "was": existing["die_size"]},
-                    {"action": "insert", "table": "trauma",
-                     "data": {"campaign_id": campaign["id"], "player_id": target["id"],
-                              "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
-                )
-                label = _player_label(target, is_self)
-                msg = format_action_confirm(
-                    "Trauma eliminated",
-                    f"{stress_type['name']} for {label} was d4, step down removes the trauma.",
-                )
-                await interaction.response.send_message(msg, view=MenuOnlyView(campaign["id"]))
-                return
-
-            await conn.execute(
-                "UPDATE trauma SET die_size = ? WHERE id = ?",
-                (new_size, existing["id"]),
-            )
-            await conn.commit()
-
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "step_down_trauma",
-            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-             "from": existing["die_size"], "to": new_size},
-            {"action": "update", "table": "trauma", "id": existing["id"],
-             "field": "die_size", "value": existing["die_size"]},
-        )
+            row = await cursor.fetchone()
+            if row is not None:
+                existing = dict(row)
+                new_size = step_down(existing["die_size"])
+                if new_size is None:
+                    await conn.execute("DELETE FROM trauma WHERE id = ?", (existing["id"],))
+                    await db.log_action(
+                        campaign["id"], str(interaction.user.id), "step_down_trauma_eliminated",
+                        {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                         "was": existing["die_size"]},
+                        {"action": "insert", "table": "trauma",
+                         "data": {"id": existing["id"], "campaign_id": campaign["id"], "player_id": target["id"],
+                                  "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
+                        conn=conn,
+                    )
+                else:
+                    await conn.execute(
+                        "UPDATE trauma SET die_size = ? WHERE id = ?",
+                        (new_size, existing["id"]),
+                    )
+                    await db.log_action(
+                        campaign["id"], str(interaction.user.id), "step_down_trauma",
+                        {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                         "from": existing["die_size"], "to": new_size},
+                        {"action": "update", "table": "trauma", "id": existing["id"],
+                         "field": "die_size", "value": existing["die_size"]},
+                        conn=conn,
+                    )
         label = _player_label(target, is_self)
-        msg = format_action_confirm(
-            "Trauma stepped down",
-            f"{label} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
-        )
+        if existing is None:
+            await interaction.response.send_message(
+                f"{label} has no {stress_type['name']} trauma."
+            )
+            return
+        if new_size is None:
+            msg = format_action_confirm(
+                "Trauma eliminated",
+                f"{stress_type['name']} for {label} was d4, step down removes the trauma.",
+            )
+        else:
+            msg = format_action_confirm(
+                "Trauma stepped down",
+                f"{label} {stress_type['name']} from {die_label(existing['die_size'])} to {die_label(new_size)}.",
+            )
         await interaction.response.send_message(msg, view=MenuOnlyView(campaign["id"]))
 
     @app_commands.command(name="remove", description="Remove trauma from a player.")
@@ -1220,31 +1196,31 @@ class TraumaGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        existing = None
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM trauma WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
                 (campaign["id"], target["id"], stress_type["id"]),
             )
-            existing = await cursor.fetchone()
-            if not existing:
-                label = _player_label(target, is_self)
-                await interaction.response.send_message(
-                    f"{label} has no {stress_type['name']} trauma to remove."
+            row = await cursor.fetchone()
+            if row is not None:
+                existing = dict(row)
+                await conn.execute("DELETE FROM trauma WHERE id = ?", (existing["id"],))
+                await db.log_action(
+                    campaign["id"], str(interaction.user.id), "remove_trauma",
+                    {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
+                     "die_size": existing["die_size"]},
+                    {"action": "insert", "table": "trauma",
+                     "data": {"id": existing["id"], "campaign_id": campaign["id"], "player_id": target["id"],
+                              "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
+                    conn=conn,
                 )
-                return
-            existing = dict(existing)
-            await conn.execute("DELETE FROM trauma WHERE id = ?", (existing["id"],))
-            await conn.commit()
-
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "remove_trauma",
-            {"id": existing["id"], "player": target["name"], "type": stress_type["name"],
-             "die_size": existing["die_size"]},
-            {"action": "insert", "table": "trauma",
-             "data": {"campaign_id": campaign["id"], "player_id": target["id"],
-                      "stress_type_id": stress_type["id"], "die_size": existing["die_size"]}},
-        )
         label = _player_label(target, is_self)
+        if existing is None:
+            await interaction.response.send_message(
+                f"{label} has no {stress_type['name']} trauma to remove."
+            )
+            return
         msg = format_action_confirm(
             "Trauma removed",
             f"{stress_type['name']} {die_label(existing['die_size'])} from {label}.",
@@ -1747,19 +1723,18 @@ class HeroGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "INSERT INTO hero_dice (campaign_id, player_id, die_size) VALUES (?, ?, ?)",
                 (campaign["id"], actor["id"], die_size),
             )
             hero_id = cursor.lastrowid
-            await conn.commit()
-
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "bank_hero_die",
-            {"id": hero_id, "player": actor["name"], "die_size": die_size},
-            {"action": "delete", "table": "hero_dice", "id": hero_id},
-        )
+            await db.log_action(
+                campaign["id"], str(interaction.user.id), "bank_hero_die",
+                {"id": hero_id, "player": actor["name"], "die_size": die_size},
+                {"action": "delete", "table": "hero_dice", "id": hero_id},
+                conn=conn,
+            )
 
         hero_dice = await db.get_hero_dice(campaign["id"], actor["id"])
         bank_strs = [die_label(h["die_size"]) for h in hero_dice]
@@ -1790,27 +1765,28 @@ class HeroGroup(app_commands.Group):
             return
 
         db = interaction.client.db
-        async with db.connect() as conn:
+        async with db.transaction(campaign["id"]) as conn:
             cursor = await conn.execute(
                 "SELECT * FROM hero_dice WHERE campaign_id = ? AND player_id = ? AND die_size = ? LIMIT 1",
                 (campaign["id"], actor["id"], die_size),
             )
             hero = await cursor.fetchone()
-            if not hero:
-                await interaction.response.send_message(
-                    f"You don't have a hero die {die_label(die_size)} in the bank."
+            if hero is not None:
+                hero = dict(hero)
+                await conn.execute("DELETE FROM hero_dice WHERE id = ?", (hero["id"],))
+                await db.log_action(
+                    campaign["id"], str(interaction.user.id), "use_hero_die",
+                    {"id": hero["id"], "player": actor["name"], "die_size": die_size},
+                    {"action": "insert", "table": "hero_dice",
+                     "data": {"id": hero["id"], "campaign_id": campaign["id"],
+                              "player_id": actor["id"], "die_size": die_size}},
+                    conn=conn,
                 )
-                return
-            hero = dict(hero)
-            await conn.execute("DELETE FROM hero_dice WHERE id = ?", (hero["id"],))
-            await conn.commit()
-
-        await db.log_action(
-            campaign["id"], str(interaction.user.id), "use_hero_die",
-            {"id": hero["id"], "player": actor["name"], "die_size": die_size},
-            {"action": "insert", "table": "hero_dice",
-             "data": {"campaign_id": campaign["id"], "player_id": actor["id"], "die_size": die_size}},
-        )
+        if hero is None:
+            await interaction.response.send_message(
+                f"You don't have a hero die {die_label(die_size)} in the bank."
+            )
+            return
 
         hero_dice = await db.get_hero_dice(campaign["id"], actor["id"])
         if hero_dice:
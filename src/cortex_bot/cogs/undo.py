@@ -1,4 +1,4 @@
-"""Undo command for reversing the last logged action."""
+"""Undo and redo commands for reversing logged actions."""
 
 import logging
 
@@ -6,9 +6,9 @@ import discord
 from discord import app_commands, Interaction
 from discord.ext import commands
 
+from cortex_bot.context import get_context
 from cortex_bot.models.dice import die_label
 from cortex_bot.services.state_manager import StateManager
-from cortex_bot.utils import has_gm_permission
 
 log = logging.getLogger(__name__)
 
@@ -48,6 +48,7 @@ ACTION_LABELS = {
     "step_down_trauma": "Trauma {type} stepped down ({from_label} to {to_label}) on {player}",
     "step_down_trauma_eliminated": "Trauma {type} eliminated from {player} (was {was_label})",
     "remove_trauma": "Trauma {type} removed from {player}",
+    "end_scene": "Scene '{scene}' ended",
 }
 
 
@@ -77,6 +78,14 @@ def _format_undo_message(action_type: str, action_data: dict) -> str:
         return f"{action_type} - {', '.join(parts)}" if parts else action_type
 
 
+def format_undo_result(verb: str, actions: list[dict]) -> str:
+    """"Undone: ..." for one action, or a bulleted list for several."""
+    msgs = [_format_undo_message(a["action_type"], a["action_data"]) for a in actions]
+    if len(msgs) == 1:
+        return f"{verb}: {msgs[0]}"
+    return f"{verb} {len(msgs)} actions:\n" + "\n".join(f"- {m}" for m in msgs)
+
+
 class UndoCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
@@ -85,11 +94,23 @@ class UndoCog(commands.Cog):
     def db(self):
         return self.bot.db
 
-    @app_commands.command(name="undo", description="Undo the last action.")
-    async def undo(self, interaction: Interaction) -> None:
-        server_id = str(interaction.guild_id)
-        channel_id = str(interaction.channel_id)
-        campaign = await self.db.get_campaign_by_channel(server_id, channel_id)
+    @app_commands.command(name="undo", description="Undo the last action(s).")
+    @app_commands.describe(count="How many actions to undo (default: 1)")
+    async def undo(
+        self, interaction: Interaction, count: app_commands.Range[int, 1, 25] = 1
+    ) -> None:
+        await self._run(interaction, count, redo=False)
+
+    @app_commands.command(name="redo", description="Redo the last undone action(s).")
+    @app_commands.describe(count="How many actions to redo (default: 1)")
+    async def redo(
+        self, interaction: Interaction, count: app_commands.Range[int, 1, 25] = 1
+    ) -> None:
+        await self._run(interaction, count, redo=True)
+
+    async def _run(self, interaction: Interaction, count: int, redo: bool) -> None:
+        ctx = await get_context(interaction)
+        campaign = ctx.campaign
         if campaign is None:
             await interaction.response.send_message(
                 "No active campaign in this channel. Use /campaign setup to create one."
@@ -97,31 +118,31 @@ class UndoCog(commands.Cog):
             return
 
         campaign_id = campaign["id"]
-        user_id = str(interaction.user.id)
-        player = await self.db.get_player(campaign_id, user_id)
+        # GMs undo and redo anyone's actions; players only their own.
+        actor = None if ctx.has_gm_permission else str(interaction.user.id)
 
-        can_undo_all = player is not None and has_gm_permission(player)
+        state_manager = StateManager(self.db)
+        try:
+            if redo:
+                actions = await state_manager.redo(campaign_id, count, actor)
+            else:
+                actions = await state_manager.undo(campaign_id, count, actor)
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc))
+            return
 
-        if can_undo_all:
-            action = await self.db.get_last_undoable_action(campaign_id)
-        else:
-            action = await self.db.get_last_undoable_action(
-                campaign_id, actor_discord_id=user_id
+        if not actions:
+            await interaction.response.send_message(
+                "Nothing to redo." if redo else "Nothing to undo."
             )
-
-        if action is None:
-            await interaction.response.send_message("Nothing to undo.")
             return
 
-        state_manager = StateManager(self.db)
-        await state_manager.execute_undo(action["inverse_data"])
-        await self.db.mark_action_undone(action["id"])
-
-        msg = _format_undo_message(action["action_type"], action["action_data"])
         from cortex_bot.views.common import PostUndoView
 
         view = PostUndoView(campaign_id)
-        await interaction.response.send_message(f"Undone: {msg}", view=view)
+        await interaction.response.send_message(
+            format_undo_result("Redone" if redo else "Undone", actions), view=view
+        )
 
 
 async def setup(bot: commands.Bot) -> None:
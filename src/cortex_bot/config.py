@@ -1,6 +1,44 @@
-from pydantic import SecretStr
+from typing import Literal
+
+from pydantic import BaseModel, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+Synchronous = Literal["OFF", "NORMAL", "FULL", "EXTRA"]
+TempStore = Literal["DEFAULT", "FILE", "MEMORY"]
+
+
+class SQLiteProfile(BaseModel):
+    """PRAGMAs applied to every connection the database pool opens."""
+
+    synchronous: Synchronous = "NORMAL"
+    # Negative values are KiB, positive values are pages.
+    cache_size: int = -16000
+    mmap_size: int = Field(default=64 * 1024 * 1024, ge=0)
+    temp_store: TempStore = "MEMORY"
+    busy_timeout: int = Field(default=5000, ge=0)
+    wal_autocheckpoint: int = Field(default=1000, ge=0)
+
+    def pragmas(self) -> tuple[str, ...]:
+        return tuple(f"PRAGMA {name}={value}" for name, value in self.model_dump().items())
+
+
+# durable (default): fsync on every commit, SQLite's default caches; the
+#   same settings the bot always ran with.
+# balanced: WAL with synchronous=NORMAL only risks the last commits on power
+#   loss, never corruption; larger cache and mmap for reads.
+# fast: no fsync at all; an OS crash can lose recent commits.
+DB_PROFILES: dict[str, SQLiteProfile] = {
+    "durable": SQLiteProfile(
+        synchronous="FULL", cache_size=-2000, mmap_size=0,
+        temp_store="DEFAULT", busy_timeout=5000, wal_autocheckpoint=1000,
+    ),
+    "balanced": SQLiteProfile(),
+    "fast": SQLiteProfile(
+        synchronous="OFF", cache_size=-64000, mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY", busy_timeout=5000, wal_autocheckpoint=4000,
+    ),
+}
+
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -11,6 +49,49 @@ class Settings(BaseSettings):
 
     token: SecretStr = SecretStr("")
     db: str = "cortex_bot.db"
+    db_pool_size: int = Field(default=4, ge=0)
+    db_group_commit_ms: float = Field(default=2.0, ge=0)
+    db_max_batch: int = Field(default=64, ge=1)
+    autocomplete_ttl: float = Field(default=30.0, ge=0)
+    # Ephemeral pickers expire after this many idle seconds; at most
+    # view_max of them are kept alive, least recently used go first.
+    view_ttl: float = Field(default=600.0, gt=0)
+    view_max: int = Field(default=1000, ge=1)
+    # Serve campaign reads from memory (see models/campaign_state.py);
+    # campaigns unread for campaign_state_idle seconds are dropped.
+    campaign_state: bool = False
+    campaign_state_idle: float = Field(default=900.0, gt=0)
+
+    # action_log retention defaults; campaigns can override them with the
+    # undo_keep / undo_days keys of their config.
+    action_log_keep: int = Field(default=500, ge=1)
+    action_log_days: float | None = Field(default=None, gt=0)
+    action_log_compact_interval: float = Field(default=3600.0, ge=0)
+    action_log_batch: int = Field(default=500, ge=1)
+    # Separate SQLite file for archived actions; unset keeps them in the main database.
+    action_log_archive: str | None = None
+
+    # Seconds between log lines with the cache, writer and view counters; 0 disables.
+    stats_interval: float = Field(default=0.0, ge=0)
+
+    # A named preset from DB_PROFILES; the db_* fields below override it.
+    # balanced and fast give up some durability and must be chosen explicitly.
+    db_profile: Literal["durable", "balanced", "fast"] = "durable"
+    db_synchronous: Synchronous | None = None
+    db_cache_size: int | None = None
+    db_mmap_size: int | None = Field(default=None, ge=0)
+    db_temp_store: TempStore | None = None
+    db_busy_timeout: int | None = Field(default=None, ge=0)
+    db_wal_autocheckpoint: int | None = Field(default=None, ge=0)
+
+    def sqlite_profile(self) -> SQLiteProfile:
+        """The selected preset with any individual overrides applied."""
+        overrides = {
+            name: value
+            for name in SQLiteProfile.model_fields
+            if (value := getattr(self, f"db_{name}")) is not None
+        }
+        return DB_PROFILES[self.db_profile].model_copy(update=overrides)
 
 
 settings = Settings()
@@ -0,0 +1,102 @@
+"""Per-interaction context: the channel's campaign and the acting player.
+
+Commands, buttons and autocomplete callbacks all start by resolving the
+same campaign and player rows, often more than once through nested
+helpers. ``get_context`` resolves them once per interaction and memoizes
+the result in a context variable. discord.py runs each interaction in its
+own task, so the value never leaks between interactions.
+"""
+
+from contextvars import ContextVar
+
+import discord
+
+from cortex_bot.models.rows import Campaign, Player
+from cortex_bot.utils import has_gm_permission
+
+
+class InteractionContext:
+    """Campaign, config and actor for one interaction, plus permission flags."""
+
+    __slots__ = ("interaction_id", "campaign", "actor")
+
+    def __init__(
+        self, interaction_id: int, campaign: Campaign | None, actor: Player | None
+    ) -> None:
+        self.interaction_id = interaction_id
+        self.campaign = campaign
+        self.actor = actor
+
+    @property
+    def campaign_id(self) -> int | None:
+        return self.campaign["id"] if self.campaign else None
+
+    @property
+    def config(self) -> dict:
+        return self.campaign["config"] if self.campaign else {}
+
+    @property
+    def is_gm(self) -> bool:
+        return bool(self.actor and self.actor["is_gm"])
+
+    @property
+    def is_delegate(self) -> bool:
+        return bool(self.actor and self.actor.get("is_delegate"))
+
+    @property
+    def has_gm_permission(self) -> bool:
+        return bool(self.actor and has_gm_permission(self.actor))
+
+
+_current: ContextVar[InteractionContext | None] = ContextVar(
+    "interaction_context", default=None
+)
+
+
+async def get_context(interaction: discord.Interaction) -> InteractionContext:
+    """Resolve (or reuse) the context for ``interaction``."""
+    ctx = _current.get()
+    if ctx is not None and ctx.interaction_id == interaction.id:
+        return ctx
+
+    db = interaction.client.db
+    campaign = await db.get_campaign_by_channel(
+        str(interaction.guild_id), str(interaction.channel_id)
+    )
+    actor = None
+    if campaign is not None:
+        actor = await db.get_player(campaign["id"], str(interaction.user.id))
+    ctx = InteractionContext(interaction.id, campaign, actor)
+    _current.set(ctx)
+    return ctx
+
+
+async def get_campaign(interaction: discord.Interaction) -> Campaign | None:
+    """The channel's campaign, without resolving the actor.
+
+    Autocomplete callbacks use this so a keystroke served from the
+    autocomplete cache costs no query at all.
+    """
+    ctx = _current.get()
+    if ctx is not None and ctx.interaction_id == interaction.id:
+        return ctx.campaign
+    return await interaction.client.db.get_campaign_by_channel(
+        str(interaction.guild_id), str(interaction.channel_id)
+    )
+
+
+async def get_actor(interaction: discord.Interaction, campaign_id: int) -> Player | None:
+    """The interacting user's player row in ``campaign_id``.
+
+    Served from the context when ``campaign_id`` is the channel's campaign;
+    buttons can carry a different campaign id, which is looked up directly.
+    """
+    ctx = await get_context(interaction)
+    if ctx.campaign_id == campaign_id:
+        return ctx.actor
+    return await interaction.client.db.get_player(campaign_id, str(interaction.user.id))
+
+
+def clear_context() -> None:
+    """Forget the memoized context, e.g. after the command changed the campaign or actor."""
+    _current.set(None)
@@ -0,0 +1,103 @@
+"""Candidate lists for autocomplete callbacks, cached per (campaign, user, table).
+
+Discord fires an autocomplete request for every character typed, and each
+one used to re-query the same handful of rows. Entries are dropped when the
+table they were read from changes (see ``Database.log_action``) and expire
+after ``ttl`` seconds as a backstop for writes that bypass the action log.
+Expired entries are swept at most once per ``ttl`` when a new one is stored,
+so keys that are never asked for again don't accumulate.
+
+Each entry keeps the lowercased names next to the rows, plus the indexes
+that matched the previous search, so narrowing "sw" -> "swo" -> "swor" only
+rescans the rows that already matched.
+"""
+
+import time
+from collections.abc import Awaitable, Callable
+
+Key = tuple[int, str, str]
+
+
+class _Entry:
+    __slots__ = ("rows", "names", "expires", "last_search", "last_matches")
+
+    def __init__(self, rows: list[dict], expires: float) -> None:
+        self.rows = rows
+        self.names = [row["name"].lower() for row in rows]
+        self.expires = expires
+        self.last_search = ""
+        self.last_matches = list(range(len(rows)))
+
+
+class AutocompleteCache:
+    """TTL cache of autocomplete rows with a lowercase name index."""
+
+    def __init__(
+        self, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: dict[Key, _Entry] = {}
+        self._next_prune = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    async def search(
+        self,
+        campaign_id: int,
+        user_id: str,
+        table: str,
+        search: str,
+        loader: Callable[[], Awaitable[list[dict]]],
+    ) -> list[dict]:
+        """Rows whose name contains ``search`` (case-insensitive), in load order.
+
+        ``loader`` runs only when there is no live entry for the key. Pass an
+        empty ``user_id`` for lists that are the same for every user.
+        """
+        key = (campaign_id, user_id, table)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is None or entry.expires <= now:
+            self.misses += 1
+            entry = _Entry(await loader(), now + self.ttl)
+            self._prune(now)
+            self._entries[key] = entry
+        else:
+            self.hits += 1
+
+        search = search.lower()
+        # A longer search can only match a subset of what the shorter one did.
+        if search.startswith(entry.last_search):
+            pool = entry.last_matches
+        else:
+            pool = range(len(entry.rows))
+        matches = [i for i in pool if search in entry.names[i]]
+        entry.last_search = search
+        entry.last_matches = matches
+        return [entry.rows[i] for i in matches]
+
+    def _prune(self, now: float) -> None:
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.ttl
+        for key in [key for key, entry in self._entries.items() if entry.expires <= now]:
+            del self._entries[key]
+
+    def invalidate(self, campaign_id: int | None = None, table: str | None = None) -> None:
+        """Drop entries for a campaign and/or table; everything if neither is given."""
+        for key in list(self._entries):
+            if campaign_id is not None and key[0] != campaign_id:
+                continue
+            if table is not None and key[2] != table:
+                continue
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,354 @@
+"""In-memory campaign state, kept in step with SQLite.
+
+With ``CORTEX_BOT_CAMPAIGN_STATE`` on, the first read that touches a
+campaign loads every row the bot renders for it (players, stress, trauma,
+assets, complications, hero dice, the doom pool and the active scene with
+its crisis pools) into a ``CampaignState``, and the Database getters answer
+from it instead of querying. SQLite stays the durable log: writes still
+commit there before the interaction replies.
+
+After the commit, a write either patches the cached rows or marks the
+campaign stale:
+
+* StateManager mutations run in ``Database.mutation()``, which records the
+  rows they wrote (``put``/``drop``) and applies them once the commit is
+  durable. Patches carry whole rows, so applying one twice is harmless.
+* Every other ``log_action`` counts as an unpatched write for its campaign
+  when the batch commits; a patch cancels its own write. A campaign with
+  writes left over is rebuilt from SQLite on its next read.
+* Writes that bypass the action log call ``invalidate()``.
+
+Campaigns not read for ``idle`` seconds are dropped and rebuilt on their
+next access. ``diff()`` compares a cached campaign with a fresh load, which
+is what ``Database.check_campaign_states()`` uses.
+"""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import replace
+
+from cortex_bot.models.rows import (
+    Asset,
+    Complication,
+    CrisisPool,
+    DoomDie,
+    HeroDie,
+    Player,
+    Stress,
+    Trauma,
+)
+
+log = logging.getLogger(__name__)
+
+# Tables held as id -> row in CampaignState.tables.
+TABLES = ("players", "stress", "trauma", "assets", "complications", "hero_dice", "doom_pool_dice")
+
+
+def _copy(rows):
+    return [replace(row) for row in rows]
+
+
+class CampaignState:
+    """Every row of one campaign, keyed by table and id."""
+
+    __slots__ = (
+        "campaign_id", "tables", "stress_types", "scene", "crisis_pools",
+        "last_used", "unpatched", "writes",
+    )
+
+    def __init__(
+        self,
+        campaign_id: int,
+        tables: dict[str, dict[int, object]],
+        stress_types: list[dict],
+        scene: dict | None,
+        crisis_pools: list[CrisisPool],
+    ) -> None:
+        self.campaign_id = campaign_id
+        self.tables = tables
+        self.stress_types = stress_types
+        self.scene = scene
+        self.crisis_pools = crisis_pools
+        self.last_used = 0.0
+        # Committed writes to this campaign that no patch has accounted for.
+        self.unpatched = 0
+        # Committed writes seen since the state was loaded.
+        self.writes = 0
+
+    def put(self, table: str, row) -> None:
+        if isinstance(row, Stress) and not row.stress_type_name:
+            row.stress_type_name = next(
+                (t["name"] for t in self.stress_types if t["id"] == row.stress_type_id), ""
+            )
+        self.tables[table][row.id] = row
+
+    def drop(self, table: str, row_id: int) -> None:
+        self.tables[table].pop(row_id, None)
+
+    # -- reads, shaped like the Database getters --------------------------------
+
+    def players(self) -> list[Player]:
+        return sorted(_copy(self.tables["players"].values()), key=lambda p: p.name)
+
+    def player(self, discord_user_id: str) -> Player | None:
+        for player in self.tables["players"].values():
+            if player.discord_user_id == discord_user_id:
+                return replace(player)
+        return None
+
+    def _player_id(self, discord_user_id: str) -> int | None:
+        player = self.player(discord_user_id)
+        return player.id if player else None
+
+    def player_rows(self, table: str, player_id: int | None) -> list:
+        rows = _copy(r for r in self.tables[table].values() if r.player_id == player_id)
+        if table in ("stress", "trauma"):
+            rows.sort(key=lambda r: r.stress_type_name)
+        elif table == "hero_dice":
+            rows.sort(key=lambda r: (r.die_size, r.id))
+        else:
+            rows.sort(key=lambda r: r.name)
+        return rows
+
+    def user_rows(self, table: str, discord_user_id: str) -> list:
+        player_id = self._player_id(discord_user_id)
+        return [] if player_id is None else self.player_rows(table, player_id)
+
+    def scene_rows(self, table: str, scene_id: int) -> list:
+        """Scene-scoped assets or complications, with their owner's name."""
+        field, value = ("duration", "scene") if table == "assets" else ("scope", "scene")
+        names = {p.id: p.name for p in self.tables["players"].values()}
+        rows = [
+            replace(r, player_name=names.get(r.player_id))
+            for r in self.tables[table].values()
+            if r.scene_id == scene_id and getattr(r, field) == value
+        ]
+        return sorted(rows, key=lambda r: r.name)
+
+    def doom_pool(self) -> list[DoomDie]:
+        return sorted(_copy(self.tables["doom_pool_dice"].values()), key=lambda d: (d.die_size, d.id))
+
+    def active_scene(self) -> dict | None:
+        return dict(self.scene) if self.scene is not None else None
+
+    def scene_crisis_pools(self) -> list[CrisisPool]:
+        return [replace(pool, dice=_copy(pool.dice)) for pool in self.crisis_pools]
+
+    def snapshot(self, config: dict | None = None) -> dict:
+        """The same dict ``Database.get_campaign_snapshot`` builds from SQLite."""
+        load_trauma = config is None or bool(config.get("trauma"))
+        load_hero = config is None or bool(config.get("hero_dice"))
+        load_doom = config is None or bool(config.get("doom_pool"))
+        players = self.players()
+        player_states: dict[int, dict] = {}
+        for p in players:
+            state = {
+                "stress": self.player_rows("stress", p.id),
+                "assets": self.player_rows("assets", p.id),
+                "complications": self.player_rows("complications", p.id),
+            }
+            if load_trauma:
+                state["trauma"] = self.player_rows("trauma", p.id)
+            if load_hero:
+                state["hero_dice"] = self.player_rows("hero_dice", p.id)
+            player_states[p.id] = state
+        scene = self.active_scene()
+        return {
+            "players": players,
+            "player_states": player_states,
+            "scene": scene,
+            "doom_pool": self.doom_pool() if load_doom else None,
+            "scene_assets": self.scene_rows("assets", scene["id"]) if scene else None,
+            "scene_complications": self.scene_rows("complications", scene["id"]) if scene else None,
+            "crisis_pools": self.scene_crisis_pools() if scene else None,
+        }
+
+    def diff(self, fresh: "CampaignState") -> list[str]:
+        """Describe every way this state differs from ``fresh``."""
+        problems = []
+        for table in TABLES:
+            mine, theirs = self.tables[table], fresh.tables[table]
+            for row_id in sorted(mine.keys() | theirs.keys()):
+                if row_id not in theirs:
+                    problems.append(f"{table} {row_id}: only in memory")
+                elif row_id not in mine:
+                    problems.append(f"{table} {row_id}: missing from memory")
+                elif mine[row_id] != theirs[row_id]:
+                    problems.append(f"{table} {row_id}: memory {mine[row_id]!r} != sqlite {theirs[row_id]!r}")
+        if self.stress_types != fresh.stress_types:
+            problems.append("stress_types differ")
+        if self.scene != fresh.scene:
+            problems.append(f"active scene: memory {self.scene!r} != sqlite {fresh.scene!r}")
+        if self.crisis_pools != fresh.crisis_pools:
+            problems.append("crisis_pools differ")
+        return problems
+
+
+class StatePatch:
+    """Rows a mutation wrote, applied to the cached campaign after commit."""
+
+    __slots__ = ("store", "state", "ops")
+
+    def __init__(self, store: "CampaignStateStore | None", state: CampaignState | None) -> None:
+        self.store = store
+        self.state = state
+        self.ops: list[tuple[str, str, object]] = []
+
+    def put(self, table: str, row) -> None:
+        self.ops.append(("put", table, row))
+
+    def drop(self, table: str, row_id: int) -> None:
+        self.ops.append(("drop", table, row_id))
+
+    def apply(self) -> None:
+        if self.store is not None and self.ops:
+            self.store.apply(self.state, self.ops)
+
+
+class CampaignStateStore:
+    """Cached ``CampaignState`` per campaign with idle eviction."""
+
+    def __init__(
+        self,
+        loader: Callable[[int], Awaitable[CampaignState]],
+        idle: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._loader = loader
+        self.idle = idle
+        self._clock = clock
+        self._states: dict[int, CampaignState] = {}
+        # campaign_id -> [loads in flight, writes seen while loading].
+        self._loading: dict[int, list[int]] = {}
+        self._last_sweep = clock()
+        self.hits = 0
+        self.misses = 0
+        self.patched = 0
+        self.rebuilt = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def peek(self, campaign_id: int) -> CampaignState | None:
+        """The cached state, without loading or refreshing it."""
+        return self._states.get(campaign_id)
+
+    async def get(self, campaign_id: int) -> CampaignState:
+        """The campaign's state, loaded from SQLite when missing or stale."""
+        now = self._clock()
+        if now - self._last_sweep >= self.idle / 4:
+            self.evict_idle(now)
+        state = self._states.get(campaign_id)
+        if state is not None and state.unpatched == 0:
+            self.hits += 1
+            state.last_used = now
+            return state
+        self.misses += 1
+        if state is not None:
+            self.rebuilt += 1
+        return await self._load(campaign_id, now)
+
+    def by_scene(self, scene_id: int) -> CampaignState | None:
+        """The cached, up-to-date campaign whose active scene is ``scene_id``."""
+        for state in self._states.values():
+            if state.scene is not None and state.scene["id"] == scene_id:
+                return state if state.unpatched == 0 else None
+        return None
+
+    async def _load(self, campaign_id: int, now: float) -> CampaignState:
+        loading = self._loading.setdefault(campaign_id, [0, 0])
+        loading[0] += 1
+        start = loading[1]
+        try:
+            state = await self._loader(campaign_id)
+        finally:
+            loading[0] -= 1
+            if loading[0] == 0:
+                del self._loading[campaign_id]
+        state.last_used = now
+        if loading[1] == start:
+            self._states[campaign_id] = state
+        else:
+            # A write committed while we were reading; serve this load once
+            # but leave caching to the next read.
+            self._states.pop(campaign_id, None)
+        return state
+
+    def apply(self, state: CampaignState | None, ops: list[tuple[str, str, object]]) -> None:
+        """Apply a committed mutation's rows to ``state`` if it is still the cached one."""
+        if state is None or self._states.get(state.campaign_id) is not state:
+            return
+        for op, table, value in ops:
+            if op == "put":
+                state.put(table, value)
+            else:
+                state.drop(table, value)
+        state.unpatched = max(state.unpatched - 1, 0)
+        self.patched += 1
+
+    def written(self, campaign_id: int, count: int = 1) -> None:
+        """Record ``count`` committed writes to ``campaign_id``."""
+        state = self._states.get(campaign_id)
+        if state is not None:
+            state.unpatched += count
+            state.writes += count
+        if campaign_id in self._loading:
+            self._loading[campaign_id][1] += count
+
+    def invalidate(self, campaign_id: int | None = None) -> None:
+        """Drop one campaign, or every campaign if none is given."""
+        if campaign_id is None:
+            self._states.clear()
+            for loading in self._loading.values():
+                loading[1] += 1
+            return
+        self._states.pop(campaign_id, None)
+        if campaign_id in self._loading:
+            self._loading[campaign_id][1] += 1
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop campaigns that have not been read for ``idle`` seconds."""
+        now = self._clock() if now is None else now
+        self._last_sweep = now
+        idle = [cid for cid, state in self._states.items() if now - state.last_used >= self.idle]
+        for campaign_id in idle:
+            del self._states[campaign_id]
+        if idle:
+            self.evicted += len(idle)
+            log.debug("Evicted %d idle campaign state(s), %d cached", len(idle), len(self._states))
+        return len(idle)
+
+    def campaigns(self) -> list[int]:
+        return list(self._states)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "campaigns": len(self._states),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "patched": self.patched,
+            "rebuilt": self.rebuilt,
+            "evicted": self.evicted,
+        }
+
+
+def build_state(
+    campaign_id: int,
+    players: list[Player],
+    stress: list[Stress],
+    trauma: list[Trauma],
+    assets: list[Asset],
+    complications: list[Complication],
+    hero_dice: list[HeroDie],
+    doom_pool: list[DoomDie],
+    stress_types: list[dict],
+    scene: dict | None,
+    crisis_pools: list[CrisisPool],
+) -> CampaignState:
+    rows = (players, stress, trauma, assets, complications, hero_dice, doom_pool)
+    tables = {table: {row.id: row for row in items} for table, items in zip(TABLES, rows)}
+    return CampaignState(campaign_id, tables, stress_types, scene, crisis_pools)
@@ -1,224 +1,337 @@
 import json
 import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable
 from contextlib import asynccontextmanager
+from dataclasses import replace
 from pathlib import Path
+from typing import TypeVar
 
 import aiosqlite
 
-from cortex_bot.config import settings
+from cortex_bot.config import SQLiteProfile, settings
+from cortex_bot.models.autocomplete import AutocompleteCache
+from cortex_bot.models.campaign_state import (
+    CampaignState,
+    CampaignStateStore,
+    StatePatch,
+    build_state,
+)
+from cortex_bot.models.dice import MAX_POOL_DICE
+from cortex_bot.models.lanes import CampaignLanes
+from cortex_bot.models.migrations import migrate
+from cortex_bot.models.pool import ConnectionPool
+from cortex_bot.models.render_cache import RenderCache
+from cortex_bot.models.retention import ActionLogCompactor, RetentionPolicy
+from cortex_bot.models.rows import (
+    Asset,
+    Campaign,
+    Complication,
+    CrisisDie,
+    CrisisPool,
+    DoomDie,
+    HeroDie,
+    Player,
+    Stress,
+    Trauma,
+)
+from cortex_bot.models.writer import GroupCommitWriter
 
 log = logging.getLogger(__name__)
 
-SCHEMA = """
-CREATE TABLE IF NOT EXISTS campaigns (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    server_id TEXT NOT NULL,
-    channel_id TEXT NOT NULL,
-    name TEXT NOT NULL,
-    config TEXT NOT NULL DEFAULT '{}',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(server_id, channel_id)
-);
-
-CREATE TABLE IF NOT EXISTS players (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    discord_user_id TEXT NOT NULL,
-    name TEXT NOT NULL,
-    is_gm INTEGER NOT NULL DEFAULT 0,
-    is_delegate INTEGER NOT NULL DEFAULT 0,
-    pp INTEGER NOT NULL DEFAULT 1,
-    xp INTEGER NOT NULL DEFAULT 0,
-    UNIQUE(campaign_id, discord_user_id)
-);
-
-CREATE TABLE IF NOT EXISTS stress_types (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    name TEXT NOT NULL,
-    UNIQUE(campaign_id, name)
-);
-
-CREATE TABLE IF NOT EXISTS scenes (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    name TEXT,
-    is_active INTEGER NOT NULL DEFAULT 1,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
-CREATE TABLE IF NOT EXISTS assets (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    player_id INTEGER REFERENCES players(id) ON DELETE CASCADE,
-    scene_id INTEGER REFERENCES scenes(id) ON DELETE CASCADE,
-    name TEXT NOT NULL,
-    die_size INTEGER NOT NULL,
-    duration TEXT NOT NULL DEFAULT 'scene'
-);
-
-CREATE TABLE IF NOT EXISTS stress (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
-    stress_type_id INTEGER NOT NULL REFERENCES stress_types(id) ON DELETE CASCADE,
-    die_size INTEGER NOT NULL,
-    UNIQUE(campaign_id, player_id, stress_type_id)
-);
-
-CREATE TABLE IF NOT EXISTS trauma (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
-    stress_type_id INTEGER NOT NULL REFERENCES stress_types(id) ON DELETE CASCADE,
-    die_size INTEGER NOT NULL,
-    UNIQUE(campaign_id, player_id, stress_type_id)
-);
-
-CREATE TABLE IF NOT EXISTS complications (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    player_id INTEGER REFERENCES players(id) ON DELETE CASCADE,
-    scene_id INTEGER REFERENCES scenes(id) ON DELETE CASCADE,
-    name TEXT NOT NULL,
-    die_size INTEGER NOT NULL,
-    scope TEXT NOT NULL DEFAULT 'scene'
-);
-
-CREATE TABLE IF NOT EXISTS hero_dice (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
-    die_size INTEGER NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS doom_pool_dice (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    die_size INTEGER NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS crisis_pools (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    scene_id INTEGER NOT NULL REFERENCES scenes(id) ON DELETE CASCADE,
-    name TEXT NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS crisis_pool_dice (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    crisis_pool_id INTEGER NOT NULL REFERENCES crisis_pools(id) ON DELETE CASCADE,
-    die_size INTEGER NOT NULL
-);
-
-CREATE TABLE IF NOT EXISTS action_log (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
-    actor_discord_id TEXT NOT NULL,
-    action_type TEXT NOT NULL,
-    action_data TEXT NOT NULL DEFAULT '{}',
-    inverse_data TEXT NOT NULL DEFAULT '{}',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    undone INTEGER NOT NULL DEFAULT 0
-);
-
-CREATE INDEX IF NOT EXISTS idx_players_campaign ON players(campaign_id);
-CREATE INDEX IF NOT EXISTS idx_assets_campaign ON assets(campaign_id);
-CREATE INDEX IF NOT EXISTS idx_assets_scene ON assets(scene_id);
-CREATE INDEX IF NOT EXISTS idx_stress_player ON stress(campaign_id, player_id);
-CREATE INDEX IF NOT EXISTS idx_complications_campaign ON complications(campaign_id);
-CREATE INDEX IF NOT EXISTS idx_complications_scene ON complications(scene_id);
-CREATE INDEX IF NOT EXISTS idx_doom_pool_campaign ON doom_pool_dice(campaign_id);
-CREATE INDEX IF NOT EXISTS idx_action_log_campaign ON action_log(campaign_id, undone);
-CREATE INDEX IF NOT EXISTS idx_scenes_active ON scenes(campaign_id, is_active);
-"""
+T = TypeVar("T")
 
 
 class Database:
-    def __init__(self, path: str | None = None) -> None:
+    def __init__(
+        self,
+        path: str | None = None,
+        pool_size: int | None = None,
+        profile: SQLiteProfile | None = None,
+        campaign_state: bool | None = None,
+    ) -> None:
         self.path = path or settings.db
+        readers = settings.db_pool_size if pool_size is None else pool_size
+        self.profile = profile or settings.sqlite_profile()
+        self.pool = ConnectionPool(self.path, readers=readers, pragmas=self.profile.pragmas())
+        self.writer = GroupCommitWriter(
+            self.pool,
+            window=settings.db_group_commit_ms / 1000,
+            max_batch=settings.db_max_batch,
+            on_commit=self._flush_invalidations,
+        )
+        # (server_id, channel_id) -> campaign row, or None for channels
+        # without a campaign. Only this process writes the campaigns table,
+        # so entries stay valid until invalidate_campaign_cache() is called.
+        self._campaign_cache: dict[tuple[str, str], Campaign | None] = {}
+        # Bumped by invalidate_campaign_cache() so a lookup that was already
+        # reading when the entry was dropped doesn't store its stale row.
+        self._campaign_generations: Counter[tuple[str, str]] = Counter()
+        self._campaign_epoch = 0
+        self.campaign_cache_hits = 0
+        self.campaign_cache_misses = 0
+        self.autocomplete = AutocompleteCache(ttl=settings.autocomplete_ttl)
+        self.compactor = ActionLogCompactor(
+            self,
+            RetentionPolicy(settings.action_log_keep, settings.action_log_days),
+            interval=settings.action_log_compact_interval,
+            batch_size=settings.action_log_batch,
+            archive_path=settings.action_log_archive,
+        )
+        # (campaign_id, table) pairs written by the open write batch; their
+        # autocomplete entries are dropped again once it commits.
+        self._pending_invalidations: set[tuple[int, str | None]] = set()
+        # Per-campaign locks for read-modify-write paths.
+        self.lanes = CampaignLanes()
+        # In-memory campaign state serving the getters, when enabled.
+        if campaign_state is None:
+            campaign_state = settings.campaign_state
+        self.states = (
+            CampaignStateStore(self._load_campaign_state, idle=settings.campaign_state_idle)
+            if campaign_state else None
+        )
+        # Logged writes per campaign in the open write batch.
+        self._pending_writes: Counter[int] = Counter()
+        # Per-campaign state_version, plus an epoch for "every campaign".
+        self._state_versions: Counter[int] = Counter()
+        self._state_epoch = 0
+        self.renders = RenderCache()
 
     async def initialize(self) -> None:
-        async with aiosqlite.connect(self.path) as conn:
-            await conn.execute("PRAGMA journal_mode=WAL")
-            await conn.execute("PRAGMA foreign_keys=ON")
-            await conn.executescript(SCHEMA)
-            try:
-                await conn.execute(
-                    "ALTER TABLE players ADD COLUMN is_delegate INTEGER NOT NULL DEFAULT 0"
-                )
-            except Exception:
-                pass  # Column already exists
-            await conn.commit()
-        log.info("Database initialized at %s", self.path)
+        async with self.connect() as conn:
+            version = await migrate(conn)
+        log.info(
+            "Database initialized at %s (schema version %d, synchronous=%s)",
+            self.path, version, self.profile.synchronous,
+        )
+
+    async def close(self) -> None:
+        await self.compactor.close()
+        await self.writer.close()
+        await self.pool.close()
 
     @asynccontextmanager
     async def connect(self):
-        conn = await aiosqlite.connect(self.path)
-        conn.row_factory = aiosqlite.Row
-        await conn.execute("PRAGMA foreign_keys=ON")
-        try:
+        """Borrow the pooled writer connection.
+
+        Callers commit their own work; anything left uncommitted is rolled
+        back when the block exits.
+        """
+        async with self.pool.writer() as conn:
+            yield conn
+
+    def lane(self, campaign_id: int):
+        """Serialize a read-modify-write with other mutations of ``campaign_id``."""
+        return self.lanes.lane(campaign_id)
+
+    @asynccontextmanager
+    async def transaction(self, campaign_id: int | None = None):
+        """Unit of work on the writer connection with a single commit.
+
+        Mutations and their ``action_log`` rows (``log_action(..., conn=conn)``)
+        issued inside the block are committed together when it exits cleanly,
+        and rolled back if it raises. A transaction opened inside another one
+        joins the outer transaction instead of committing early.
+
+        Outermost transactions are queued with the group-commit writer, so
+        concurrent ones share a commit; the block exits once it is durable.
+        With ``campaign_id`` the campaign's lane is taken first.
+        """
+        if campaign_id is not None:
+            async with self.lane(campaign_id), self.transaction() as conn:
+                yield conn
+            return
+        if self.pool.owns_writer():
+            async with self.connect() as conn:
+                yield conn
+            return
+        async with self.writer.turn() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def mutation(self, campaign_id: int):
+        """A ``transaction()`` that also updates the cached campaign state.
+
+        Yields ``(conn, patch)``. Record the rows the mutation wrote with
+        ``patch.put(table, row)`` / ``patch.drop(table, id)``; they are applied
+        to the in-memory state once the commit is durable. A mutation that
+        joins an outer transaction leaves its campaign to be rebuilt instead,
+        since the outer block may still roll back.
+        """
+        state = None
+        if self.states is not None and not self.pool.owns_writer():
+            state = self.states.peek(campaign_id)
+        patch = StatePatch(self.states, state)
+        async with self.transaction() as conn:
+            yield conn, patch
+        patch.apply()
+
+    async def write(self, fn: Callable[[aiosqlite.Connection], Awaitable[T]]) -> T:
+        """Run ``fn(conn)`` in a transaction and return its result once committed."""
+        async with self.transaction() as conn:
+            result = await fn(conn)
+        return result
+
+    def writer_stats(self) -> dict:
+        """Group-commit counters: commit latency, batch size and queue depth."""
+        return self.writer.stats()
+
+    def stats(self) -> dict[str, dict]:
+        """Counters of the writer, every cache and the compactor, by component."""
+        stats = {
+            "writer": self.writer_stats(),
+            "campaign_cache": self.campaign_cache_stats(),
+            "autocomplete": self.autocomplete.stats(),
+            "renders": self.renders.stats(),
+            "lanes": self.lanes.stats(),
+            "action_log": self.compactor.stats(),
+        }
+        if self.states is not None:
+            stats["campaign_state"] = self.states.stats()
+        return stats
+
+    @asynccontextmanager
+    async def read(self):
+        """Borrow a pooled read-only connection."""
+        async with self.pool.reader() as conn:
             yield conn
-        finally:
-            await conn.close()
 
     async def get_campaign_by_channel(
         self, server_id: str, channel_id: str
-    ) -> dict | None:
-        async with self.connect() as conn:
+    ) -> Campaign | None:
+        """Resolve the campaign for a channel, served from cache when possible."""
+        key = (server_id, channel_id)
+        if key in self._campaign_cache:
+            self.campaign_cache_hits += 1
+            cached = self._campaign_cache[key]
+        else:
+            self.campaign_cache_misses += 1
+            generation = self._campaign_generation(key)
+            async with self.read() as conn:
+                cursor = await conn.execute(
+                    f"SELECT {Campaign.columns()} FROM campaigns WHERE server_id = ? AND channel_id = ?",
+                    (server_id, channel_id),
+                )
+                row = await cursor.fetchone()
+            cached = Campaign.from_row(row) if row else None
+            if self._campaign_generation(key) == generation:
+                self._campaign_cache[key] = cached
+        if cached is None:
+            return None
+        # Hand out copies so callers can't mutate the cached entry.
+        return replace(cached, config=dict(cached.config))
+
+    def invalidate_campaign_cache(
+        self, server_id: str | None = None, channel_id: str | None = None
+    ) -> None:
+        """Drop the cached lookup for one channel, or every entry if none is given."""
+        if server_id is None or channel_id is None:
+            self._campaign_cache.clear()
+            self._campaign_epoch += 1
+        else:
+            self._campaign_cache.pop((server_id, channel_id), None)
+            self._campaign_generations[(server_id, channel_id)] += 1
+
+    def _campaign_generation(self, key: tuple[str, str]) -> int:
+        return self._campaign_epoch + self._campaign_generations[key]
+
+    def invalidate_campaign_state(self, campaign_id: int | None = None) -> None:
+        """Rebuild a campaign's in-memory state on its next read (all if none given).
+
+        Call after writes that bypass ``log_action``. Also bumps the
+        campaign's ``state_version``.
+        """
+        if self.states is not None:
+            self.states.invalidate(campaign_id)
+        self.bump_state_version(campaign_id)
+
+    def state_version(self, campaign_id: int) -> int:
+        """Counter that goes up on every committed write to the campaign.
+
+        Logged writes bump it when their batch commits, before the caller's
+        transaction returns; ``invalidate_campaign_state()`` bumps it for
+        the rest. It never goes back, so equal versions mean equal state.
+        """
+        return self._state_epoch + self._state_versions[campaign_id]
+
+    def bump_state_version(self, campaign_id: int | None = None, count: int = 1) -> None:
+        """Advance one campaign's ``state_version``, or every campaign's if none given."""
+        if campaign_id is None:
+            self._state_epoch += 1
+        else:
+            self._state_versions[campaign_id] += count
+        self.renders.invalidate(campaign_id)
+
+    async def render(self, campaign_id: int, kind: str, build: Callable[[], Awaitable[T]]) -> T:
+        """``build()``'s result for the campaign's current state, memoized by version."""
+        return await self.renders.get(campaign_id, kind, self.state_version(campaign_id), build)
+
+    def campaign_cache_stats(self) -> dict:
+        """Hit/miss counters for the channel->campaign cache."""
+        total = self.campaign_cache_hits + self.campaign_cache_misses
+        return {
+            "hits": self.campaign_cache_hits,
+            "misses": self.campaign_cache_misses,
+            "entries": len(self._campaign_cache),
+            "hit_ratio": self.campaign_cache_hits / total if total else 0.0,
+        }
+
+    async def update_campaign_config(self, campaign_id: int, config: dict) -> None:
+        """Replace a campaign's module config and drop its cached lookup."""
+        async with self.transaction() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM campaigns WHERE server_id = ? AND channel_id = ?",
-                (server_id, channel_id),
+                "UPDATE campaigns SET config = ? WHERE id = ? RETURNING server_id, channel_id",
+                (json.dumps(config), campaign_id),
             )
             row = await cursor.fetchone()
-            if row is None:
-                return None
-            result = dict(row)
-            result["config"] = json.loads(result["config"])
-            return result
+        if row is not None:
+            self.invalidate_campaign_cache(row["server_id"], row["channel_id"])
+        self.bump_state_version(campaign_id)
 
-    async def get_campaign_by_id(self, campaign_id: int) -> dict | None:
-        async with self.connect() as conn:
+    async def get_campaign_by_id(self, campaign_id: int) -> Campaign | None:
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM campaigns WHERE id = ?",
+                f"SELECT {Campaign.columns()} FROM campaigns WHERE id = ?",
                 (campaign_id,),
             )
             row = await cursor.fetchone()
-            if row is None:
-                return None
-            result = dict(row)
-            result["config"] = json.loads(result["config"])
-            return result
+            return Campaign.from_row(row) if row else None
 
     async def get_player(
         self, campaign_id: int, discord_user_id: str
-    ) -> dict | None:
-        async with self.connect() as conn:
+    ) -> Player | None:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player(discord_user_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM players WHERE campaign_id = ? AND discord_user_id = ?",
+                f"SELECT {Player.columns()} FROM players WHERE campaign_id = ? AND discord_user_id = ?",
                 (campaign_id, discord_user_id),
             )
             row = await cursor.fetchone()
-            return dict(row) if row else None
+            return Player.from_row(row) if row else None
 
-    async def get_player_by_id(self, player_id: int) -> dict | None:
-        async with self.connect() as conn:
+    async def get_player_by_id(self, player_id: int) -> Player | None:
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM players WHERE id = ?", (player_id,)
+                f"SELECT {Player.columns()} FROM players WHERE id = ?", (player_id,)
             )
             row = await cursor.fetchone()
-            return dict(row) if row else None
+            return Player.from_row(row) if row else None
 
-    async def get_players(self, campaign_id: int) -> list[dict]:
-        async with self.connect() as conn:
+    async def get_players(self, campaign_id: int) -> list[Player]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).players()
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM players WHERE campaign_id = ? ORDER BY name",
+                f"SELECT {Player.columns()} FROM players WHERE campaign_id = ? ORDER BY name",
                 (campaign_id,),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Player.from_row(r) for r in await cursor.fetchall()]
 
     async def get_active_scene(self, campaign_id: int) -> dict | None:
-        async with self.connect() as conn:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).active_scene()
+        async with self.read() as conn:
             cursor = await conn.execute(
                 "SELECT * FROM scenes WHERE campaign_id = ? AND is_active = 1",
                 (campaign_id,),
@@ -227,7 +340,9 @@ class Database:
             return dict(row) if row else None
 
     async def get_stress_types(self, campaign_id: int) -> list[dict]:
-        async with self.connect() as conn:
+        if self.states is not None:
+            return [dict(t) for t in (await self.states.get(campaign_id)).stress_types]
+        async with self.read() as conn:
             cursor = await conn.execute(
                 "SELECT * FROM stress_types WHERE campaign_id = ? ORDER BY name",
                 (campaign_id,),
@@ -236,108 +351,344 @@ class Database:
 
     async def get_player_assets(
         self, campaign_id: int, player_id: int
-    ) -> list[dict]:
-        async with self.connect() as conn:
+    ) -> list[Asset]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player_rows("assets", player_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE campaign_id = ? AND player_id = ? ORDER BY name",
+                f"SELECT {Asset.columns()} FROM assets WHERE campaign_id = ? AND player_id = ? ORDER BY name",
                 (campaign_id, player_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Asset.from_row(r) for r in await cursor.fetchall()]
 
     async def get_player_stress(
         self, campaign_id: int, player_id: int
-    ) -> list[dict]:
-        async with self.connect() as conn:
+    ) -> list[Stress]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player_rows("stress", player_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                """SELECT s.*, st.name as stress_type_name
+                f"""SELECT {Stress.columns("s")}, st.name
                    FROM stress s
                    JOIN stress_types st ON s.stress_type_id = st.id
                    WHERE s.campaign_id = ? AND s.player_id = ?
                    ORDER BY st.name""",
                 (campaign_id, player_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Stress.from_row(r) for r in await cursor.fetchall()]
 
     async def get_player_trauma(
         self, campaign_id: int, player_id: int
-    ) -> list[dict]:
-        async with self.connect() as conn:
+    ) -> list[Trauma]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player_rows("trauma", player_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                """SELECT t.*, st.name as stress_type_name
+                f"""SELECT {Trauma.columns("t")}, st.name
                    FROM trauma t
                    JOIN stress_types st ON t.stress_type_id = st.id
                    WHERE t.campaign_id = ? AND t.player_id = ?
                    ORDER BY st.name""",
                 (campaign_id, player_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Trauma.from_row(r) for r in await cursor.fetchall()]
 
     async def get_player_complications(
         self, campaign_id: int, player_id: int
-    ) -> list[dict]:
-        async with self.connect() as conn:
+    ) -> list[Complication]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player_rows("complications", player_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE campaign_id = ? AND player_id = ? ORDER BY name",
+                f"SELECT {Complication.columns()} FROM complications WHERE campaign_id = ? AND player_id = ? ORDER BY name",
                 (campaign_id, player_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Complication.from_row(r) for r in await cursor.fetchall()]
 
-    async def get_scene_assets(self, scene_id: int) -> list[dict]:
-        async with self.connect() as conn:
+    async def get_user_assets(
+        self, campaign_id: int, discord_user_id: str
+    ) -> list[Asset]:
+        """A user's assets by Discord id, without resolving the player first."""
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).user_rows("assets", discord_user_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                """SELECT a.*, p.name as player_name
-                   FROM assets a
-                   LEFT JOIN players p ON a.player_id = p.id
-                   WHERE a.scene_id = ? AND a.duration = 'scene'
+                f"""SELECT {Asset.columns("a")} FROM assets a
+                   JOIN players p ON a.player_id = p.id
+                   WHERE a.campaign_id = ? AND p.discord_user_id = ?
                    ORDER BY a.name""",
-                (scene_id,),
+                (campaign_id, discord_user_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Asset.from_row(r) for r in await cursor.fetchall()]
 
-    async def get_scene_complications(self, scene_id: int) -> list[dict]:
-        async with self.connect() as conn:
+    async def get_user_complications(
+        self, campaign_id: int, discord_user_id: str
+    ) -> list[Complication]:
+        """A user's complications by Discord id, without resolving the player first."""
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).user_rows("complications", discord_user_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                """SELECT c.*, p.name as player_name
-                   FROM complications c
-                   LEFT JOIN players p ON c.player_id = p.id
-                   WHERE c.scene_id = ? AND c.scope = 'scene'
+                f"""SELECT {Complication.columns("c")} FROM complications c
+                   JOIN players p ON c.player_id = p.id
+                   WHERE c.campaign_id = ? AND p.discord_user_id = ?
                    ORDER BY c.name""",
-                (scene_id,),
+                (campaign_id, discord_user_id),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            return [Complication.from_row(r) for r in await cursor.fetchall()]
+
+    async def get_scene_assets(self, scene_id: int) -> list[Asset]:
+        if self.states is not None and (state := self.states.by_scene(scene_id)) is not None:
+            return state.scene_rows("assets", scene_id)
+        async with self.read() as conn:
+            return await self._fetch_scene_assets(conn, scene_id)
+
+    @staticmethod
+    async def _fetch_scene_assets(conn, scene_id: int) -> list[Asset]:
+        cursor = await conn.execute(
+            f"""SELECT {Asset.columns("a")}, p.name
+               FROM assets a
+               LEFT JOIN players p ON a.player_id = p.id
+               WHERE a.scene_id = ? AND a.duration = 'scene'
+               ORDER BY a.name""",
+            (scene_id,),
+        )
+        return [Asset.from_row(r) for r in await cursor.fetchall()]
+
+    async def get_scene_complications(self, scene_id: int) -> list[Complication]:
+        if self.states is not None and (state := self.states.by_scene(scene_id)) is not None:
+            return state.scene_rows("complications", scene_id)
+        async with self.read() as conn:
+            return await self._fetch_scene_complications(conn, scene_id)
+
+    @staticmethod
+    async def _fetch_scene_complications(conn, scene_id: int) -> list[Complication]:
+        cursor = await conn.execute(
+            f"""SELECT {Complication.columns("c")}, p.name
+               FROM complications c
+               LEFT JOIN players p ON c.player_id = p.id
+               WHERE c.scene_id = ? AND c.scope = 'scene'
+               ORDER BY c.name""",
+            (scene_id,),
+        )
+        return [Complication.from_row(r) for r in await cursor.fetchall()]
+
+    async def get_doom_pool(self, campaign_id: int) -> list[DoomDie]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).doom_pool()
+        async with self.read() as conn:
+            cursor = await conn.execute(
+                f"SELECT {DoomDie.columns()} FROM doom_pool_dice WHERE campaign_id = ? ORDER BY die_size",
+                (campaign_id,),
+            )
+            return [DoomDie.from_row(r) for r in await cursor.fetchall()]
+
+    async def doom_pool_space(self, conn: aiosqlite.Connection, campaign_id: int) -> int:
+        """How many more dice fit in the doom pool before ``MAX_POOL_DICE``.
+
+        Takes the caller's transaction so the count and the insert agree.
+        """
+        cursor = await conn.execute(
+            "SELECT COUNT(*) FROM doom_pool_dice WHERE campaign_id = ?", (campaign_id,)
+        )
+        return MAX_POOL_DICE - (await cursor.fetchone())[0]
+
+    async def get_crisis_pools(self, scene_id: int) -> list[CrisisPool]:
+        if self.states is not None and (state := self.states.by_scene(scene_id)) is not None:
+            return state.scene_crisis_pools()
+        async with self.read() as conn:
+            return await self._fetch_crisis_pools(conn, scene_id)
+
+    @staticmethod
+    async def _fetch_crisis_pools(conn, scene_id: int) -> list[CrisisPool]:
+        """Crisis pools of a scene with their dice, in a single joined query."""
+        cursor = await conn.execute(
+            f"""SELECT {CrisisPool.columns("cp")}, d.id, d.die_size
+               FROM crisis_pools cp
+               LEFT JOIN crisis_pool_dice d ON d.crisis_pool_id = cp.id
+               WHERE cp.scene_id = ?
+               ORDER BY cp.id, d.die_size, d.id""",
+            (scene_id,),
+        )
+        pools: dict[int, CrisisPool] = {}
+        for *pool_row, die_id, die_size in await cursor.fetchall():
+            pool = pools.get(pool_row[0])
+            if pool is None:
+                pool = pools[pool_row[0]] = CrisisPool.from_row(pool_row)
+            if die_id is not None:
+                pool.dice.append(CrisisDie(die_id, pool.id, die_size))
+        return list(pools.values())
 
-    async def get_doom_pool(self, campaign_id: int) -> list[dict]:
-        async with self.connect() as conn:
+    async def get_hero_dice(
+        self, campaign_id: int, player_id: int
+    ) -> list[HeroDie]:
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).player_rows("hero_dice", player_id)
+        async with self.read() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM doom_pool_dice WHERE campaign_id = ? ORDER BY die_size",
+                f"SELECT {HeroDie.columns()} FROM hero_dice WHERE campaign_id = ? AND player_id = ? ORDER BY die_size",
+                (campaign_id, player_id),
+            )
+            return [HeroDie.from_row(r) for r in await cursor.fetchall()]
+
+    async def get_campaign_snapshot(
+        self, campaign_id: int, config: dict | None = None
+    ) -> dict:
+        """Load everything format_campaign_info needs in a fixed number of queries.
+
+        Per-player rows are fetched with one set-based query per table and
+        grouped by player id, instead of one query per player per table.
+        When ``config`` is given, trauma, hero dice and the doom pool are only
+        loaded for enabled modules (the doom pool is None when disabled).
+        With campaign state enabled the snapshot is built from memory.
+        """
+        if self.states is not None:
+            return (await self.states.get(campaign_id)).snapshot(config)
+        load_trauma = config is None or bool(config.get("trauma"))
+        load_hero = config is None or bool(config.get("hero_dice"))
+        load_doom = config is None or bool(config.get("doom_pool"))
+
+        async with self.read() as conn:
+            cursor = await conn.execute(
+                f"SELECT {Player.columns()} FROM players WHERE campaign_id = ? ORDER BY name",
                 (campaign_id,),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            players = [Player.from_row(r) for r in await cursor.fetchall()]
+            player_states: dict[int, dict] = {
+                p.id: {"stress": [], "assets": [], "complications": []}
+                for p in players
+            }
+            for p in players:
+                if load_trauma:
+                    player_states[p.id]["trauma"] = []
+                if load_hero:
+                    player_states[p.id]["hero_dice"] = []
+
+            per_player_queries = [
+                ("stress", Stress, f"""SELECT {Stress.columns("s")}, st.name
+                   FROM stress s
+                   JOIN stress_types st ON s.stress_type_id = st.id
+                   WHERE s.campaign_id = ?
+                   ORDER BY s.player_id, st.name"""),
+                ("assets", Asset, f"""SELECT {Asset.columns()} FROM assets
+                   WHERE campaign_id = ? AND player_id IS NOT NULL
+                   ORDER BY player_id, name"""),
+                ("complications", Complication, f"""SELECT {Complication.columns()} FROM complications
+                   WHERE campaign_id = ? AND player_id IS NOT NULL
+                   ORDER BY player_id, name"""),
+            ]
+            if load_trauma:
+                per_player_queries.append(("trauma", Trauma, f"""SELECT {Trauma.columns("t")}, st.name
+                   FROM trauma t
+                   JOIN stress_types st ON t.stress_type_id = st.id
+                   WHERE t.campaign_id = ?
+                   ORDER BY t.player_id, st.name"""))
+            if load_hero:
+                per_player_queries.append(("hero_dice", HeroDie, f"""SELECT {HeroDie.columns()} FROM hero_dice
+                   WHERE campaign_id = ?
+                   ORDER BY player_id, die_size"""))
+
+            for key, model, sql in per_player_queries:
+                cursor = await conn.execute(sql, (campaign_id,))
+                for row in await cursor.fetchall():
+                    item = model.from_row(row)
+                    state = player_states.get(item.player_id)
+                    if state is not None:
+                        state[key].append(item)
 
-    async def get_crisis_pools(self, scene_id: int) -> list[dict]:
-        async with self.connect() as conn:
             cursor = await conn.execute(
-                "SELECT * FROM crisis_pools WHERE scene_id = ?",
-                (scene_id,),
+                "SELECT * FROM scenes WHERE campaign_id = ? AND is_active = 1",
+                (campaign_id,),
             )
-            pools = [dict(r) for r in await cursor.fetchall()]
-            for pool in pools:
-                dice_cursor = await conn.execute(
-                    "SELECT * FROM crisis_pool_dice WHERE crisis_pool_id = ? ORDER BY die_size",
-                    (pool["id"],),
-                )
-                pool["dice"] = [dict(r) for r in await dice_cursor.fetchall()]
-            return pools
+            row = await cursor.fetchone()
+            scene = dict(row) if row else None
 
-    async def get_hero_dice(
-        self, campaign_id: int, player_id: int
-    ) -> list[dict]:
-        async with self.connect() as conn:
+            doom_pool = None
+            if load_doom:
+                cursor = await conn.execute(
+                    f"SELECT {DoomDie.columns()} FROM doom_pool_dice WHERE campaign_id = ? ORDER BY die_size",
+                    (campaign_id,),
+                )
+                doom_pool = [DoomDie.from_row(r) for r in await cursor.fetchall()]
+
+            scene_assets = None
+            scene_complications = None
+            crisis_pools = None
+            if scene is not None:
+                scene_assets = await self._fetch_scene_assets(conn, scene["id"])
+                scene_complications = await self._fetch_scene_complications(conn, scene["id"])
+                crisis_pools = await self._fetch_crisis_pools(conn, scene["id"])
+
+        return {
+            "players": players,
+            "player_states": player_states,
+            "scene": scene,
+            "doom_pool": doom_pool,
+            "scene_assets": scene_assets,
+            "scene_complications": scene_complications,
+            "crisis_pools": crisis_pools,
+        }
+
+    async def _load_campaign_state(self, campaign_id: int) -> CampaignState:
+        """Read every cached row of a campaign from SQLite."""
+        queries = [
+            (Player, f"SELECT {Player.columns()} FROM players WHERE campaign_id = ?"),
+            (Stress, f"""SELECT {Stress.columns("s")}, st.name FROM stress s
+               JOIN stress_types st ON s.stress_type_id = st.id WHERE s.campaign_id = ?"""),
+            (Trauma, f"""SELECT {Trauma.columns("t")}, st.name FROM trauma t
+               JOIN stress_types st ON t.stress_type_id = st.id WHERE t.campaign_id = ?"""),
+            (Asset, f"SELECT {Asset.columns()} FROM assets WHERE campaign_id = ?"),
+            (Complication, f"SELECT {Complication.columns()} FROM complications WHERE campaign_id = ?"),
+            (HeroDie, f"SELECT {HeroDie.columns()} FROM hero_dice WHERE campaign_id = ?"),
+            (DoomDie, f"SELECT {DoomDie.columns()} FROM doom_pool_dice WHERE campaign_id = ?"),
+        ]
+        async with self.read() as conn:
+            tables = []
+            for model, sql in queries:
+                cursor = await conn.execute(sql, (campaign_id,))
+                tables.append([model.from_row(r) for r in await cursor.fetchall()])
             cursor = await conn.execute(
-                "SELECT * FROM hero_dice WHERE campaign_id = ? AND player_id = ? ORDER BY die_size",
-                (campaign_id, player_id),
+                "SELECT * FROM stress_types WHERE campaign_id = ? ORDER BY name",
+                (campaign_id,),
             )
-            return [dict(r) for r in await cursor.fetchall()]
+            stress_types = [dict(r) for r in await cursor.fetchall()]
+            cursor = await conn.execute(
+                "SELECT * FROM scenes WHERE campaign_id = ? AND is_active = 1",
+                (campaign_id,),
+            )
+            row = await cursor.fetchone()
+            scene = dict(row) if row else None
+            crisis_pools = await self._fetch_crisis_pools(conn, scene["id"]) if scene else []
+        return build_state(campaign_id, *tables, stress_types, scene, crisis_pools)
+
+    async def check_campaign_states(self, repair: bool = True) -> dict[int, list[str]]:
+        """Diff every cached campaign against SQLite.
+
+        Returns the differences per campaign that has any. Campaigns already
+        waiting to be rebuilt are skipped. With ``repair`` a divergent
+        campaign is dropped so its next read reloads it.
+        """
+        if self.states is None:
+            return {}
+        report = {}
+        for campaign_id in self.states.campaigns():
+            state = self.states.peek(campaign_id)
+            if state is None or state.unpatched:
+                continue
+            writes = state.writes
+            fresh = await self._load_campaign_state(campaign_id)
+            # Skip campaigns that were written or dropped while we read.
+            if self.states.peek(campaign_id) is not state or state.writes != writes:
+                continue
+            problems = state.diff(fresh)
+            if problems:
+                log.warning(
+                    "Campaign %d state diverged from SQLite: %s", campaign_id, "; ".join(problems)
+                )
+                report[campaign_id] = problems
+                if repair:
+                    self.states.invalidate(campaign_id)
+        return report
 
     async def log_action(
         self,
@@ -346,53 +697,125 @@ class Database:
         action_type: str,
         action_data: dict,
         inverse_data: dict,
+        conn: aiosqlite.Connection | None = None,
     ) -> int:
-        async with self.connect() as conn:
-            cursor = await conn.execute(
-                """INSERT INTO action_log
-                   (campaign_id, actor_discord_id, action_type, action_data, inverse_data)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (
-                    campaign_id,
-                    actor_discord_id,
-                    action_type,
-                    json.dumps(action_data),
-                    json.dumps(inverse_data),
-                ),
+        """Append an undoable action.
+
+        Pass the ``conn`` of an open ``transaction()`` so the row commits
+        atomically with the mutation it describes.
+        """
+        if conn is None:
+            return await self.write(
+                lambda conn: self.log_action(
+                    campaign_id, actor_discord_id, action_type,
+                    action_data, inverse_data, conn=conn,
+                )
             )
-            await conn.commit()
-            return cursor.lastrowid
+        # Drop now so this task sees its own write, and again after commit in
+        # case another task refilled the entry from a reader in between.
+        table = inverse_data.get("table")
+        self.autocomplete.invalidate(campaign_id, table)
+        self._pending_invalidations.add((campaign_id, table))
+        self._pending_writes[campaign_id] += 1
+        cursor = await conn.execute(
+            """INSERT INTO action_log
+               (campaign_id, actor_discord_id, action_type, action_data, inverse_data)
+               VALUES (?, ?, ?, ?, ?)""",
+            (
+                campaign_id,
+                actor_discord_id,
+                action_type,
+                json.dumps(action_data),
+                json.dumps(inverse_data),
+            ),
+        )
+        return cursor.lastrowid
+
+    def _flush_invalidations(self) -> None:
+        for campaign_id, table in self._pending_invalidations:
+            self.autocomplete.invalidate(campaign_id, table)
+        self._pending_invalidations.clear()
+        for campaign_id, count in self._pending_writes.items():
+            self.bump_state_version(campaign_id, count)
+            if self.states is not None:
+                self.states.written(campaign_id, count)
+        self._pending_writes.clear()
 
     async def get_last_undoable_action(
         self, campaign_id: int, actor_discord_id: str | None = None
     ) -> dict | None:
-        async with self.connect() as conn:
-            if actor_discord_id:
-                cursor = await conn.execute(
-                    """SELECT * FROM action_log
-                       WHERE campaign_id = ? AND actor_discord_id = ? AND undone = 0
-                       ORDER BY id DESC LIMIT 1""",
-                    (campaign_id, actor_discord_id),
-                )
-            else:
-                cursor = await conn.execute(
-                    """SELECT * FROM action_log
-                       WHERE campaign_id = ? AND undone = 0
-                       ORDER BY id DESC LIMIT 1""",
-                    (campaign_id,),
-                )
-            row = await cursor.fetchone()
-            if row is None:
-                return None
-            result = dict(row)
-            result["action_data"] = json.loads(result["action_data"])
-            result["inverse_data"] = json.loads(result["inverse_data"])
-            return result
+        actions = await self.get_undo_actions(campaign_id, 1, actor_discord_id)
+        return actions[0] if actions else None
+
+    async def get_undo_actions(
+        self,
+        campaign_id: int,
+        count: int,
+        actor_discord_id: str | None = None,
+        before_id: int | None = None,
+        conn: aiosqlite.Connection | None = None,
+    ) -> list[dict]:
+        """The ``count`` newest undoable actions, newest first.
+
+        ``before_id`` continues from the last id of a previous page.
+        """
+        where = "campaign_id = ? AND undone = 0"
+        params: list = [campaign_id]
+        if actor_discord_id:
+            where += " AND actor_discord_id = ?"
+            params.append(actor_discord_id)
+        if before_id is not None:
+            where += " AND id < ?"
+            params.append(before_id)
+        return await self._fetch_actions(
+            f"SELECT * FROM action_log WHERE {where} ORDER BY id DESC LIMIT ?",
+            (*params, count), conn,
+        )
+
+    async def get_redo_actions(
+        self,
+        campaign_id: int,
+        count: int,
+        actor_discord_id: str | None = None,
+        conn: aiosqlite.Connection | None = None,
+    ) -> list[dict]:
+        """The ``count`` actions to redo next, in the order to redo them.
+
+        Redo walks forward through undone actions newer than the newest one
+        still in effect, so any new action clears what could be redone.
+        """
+        actor = " AND actor_discord_id = ?" if actor_discord_id else ""
+        scope = (campaign_id, actor_discord_id) if actor_discord_id else (campaign_id,)
+        return await self._fetch_actions(
+            f"""SELECT * FROM action_log
+                WHERE campaign_id = ?{actor} AND undone = 1 AND redo_data IS NOT NULL
+                  AND id > (SELECT COALESCE(MAX(id), 0) FROM action_log
+                            WHERE campaign_id = ?{actor} AND undone = 0)
+                ORDER BY id LIMIT ?""",
+            (*scope, *scope, count), conn,
+        )
+
+    async def _fetch_actions(
+        self, sql: str, params: tuple, conn: aiosqlite.Connection | None
+    ) -> list[dict]:
+        if conn is None:
+            async with self.read() as reader:
+                rows = await (await reader.execute(sql, params)).fetchall()
+        else:
+            rows = await (await conn.execute(sql, params)).fetchall()
+        actions = []
+        for row in rows:
+            action = dict(row)
+            action["action_data"] = json.loads(action["action_data"])
+            action["inverse_data"] = json.loads(action["inverse_data"])
+            if action["redo_data"] is not None:
+                action["redo_data"] = json.loads(action["redo_data"])
+            actions.append(action)
+        return actions
 
     async def mark_action_undone(self, action_id: int) -> None:
-        async with self.connect() as conn:
+        async with self.transaction() as conn:
             await conn.execute(
                 "UPDATE action_log SET undone = 1 WHERE id = ?",
                 (action_id,),
             )
-            await conn.commit()
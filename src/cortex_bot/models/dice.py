@@ -1,6 +1,8 @@
+import random
 import re
 
 VALID_SIZES = (4, 6, 8, 10, 12)
+MAX_POOL_DICE = 100
 DICE_PATTERN = re.compile(r"(\d+)?\s*d(\d+)", re.IGNORECASE)
 
 
@@ -31,24 +33,17 @@ def die_label(size: int) -> str:
 def parse_dice_notation(text: str) -> list[int]:
     """Parse notation like '1d8 2d6 1d10' into a flat list of die sizes.
 
-    Returns list of individual die sizes, e.g. [8, 6, 6, 10].
+    Returns list of individual die sizes in the order written, e.g.
+    [8, 6, 6, 10]. The notation is validated by ``DicePool.parse`` first,
+    so oversized counts are rejected before being expanded. Use
+    ``DicePool.parse`` to keep the compact form.
     """
-    dice: list[int] = []
-    for match in DICE_PATTERN.finditer(text):
-        count = int(match.group(1)) if match.group(1) else 1
-        if count < 1:
-            raise ValueError(
-                f"Quantidade de dados precisa ser pelo menos 1, recebido {count}."
-            )
-        size = int(match.group(2))
-        if not is_valid_die(size):
-            raise ValueError(f"d{size} nao e um dado Cortex valido. Use d4, d6, d8, d10 ou d12.")
-        dice.extend([size] * count)
-    if not dice:
-        raise ValueError(
-            "Notacao de dado invalida: " + text.strip()
-        )
-    return dice
+    DicePool.parse(text)
+    return [
+        int(match.group(2))
+        for match in DICE_PATTERN.finditer(text)
+        for _ in range(int(match.group(1) or 1))
+    ]
 
 
 def parse_single_die(text: str) -> int:
@@ -60,3 +55,186 @@ def parse_single_die(text: str) -> int:
     if not is_valid_die(size):
         raise ValueError(f"d{size} nao e um dado Cortex valido. Use d4, d6, d8, d10 ou d12.")
     return size
+
+
+class DicePool:
+    """Dice pool stored as one count per die size, d4 through d12.
+
+    Counts are checked against ``MAX_POOL_DICE`` as they are added, so
+    notation like ``999999d12`` is rejected without ever being expanded.
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(VALID_SIZES)
+
+    @classmethod
+    def from_sizes(cls, sizes: list[int]) -> "DicePool":
+        pool = cls()
+        for size in sizes:
+            pool.add(size)
+        return pool
+
+    @classmethod
+    def parse(cls, text: str) -> "DicePool":
+        """Parse dice notation such as '1d8 2d6 1d10'."""
+        pool = cls()
+        for match in DICE_PATTERN.finditer(text):
+            count = int(match.group(1)) if match.group(1) else 1
+            if count < 1:
+                raise ValueError(
+                    f"Quantidade de dados precisa ser pelo menos 1, recebido {count}."
+                )
+            size = int(match.group(2))
+            if not is_valid_die(size):
+                raise ValueError(f"d{size} nao e um dado Cortex valido. Use d4, d6, d8, d10 ou d12.")
+            pool.add(size, count)
+        if not pool:
+            raise ValueError(
+                "Notacao de dado invalida: " + text.strip()
+            )
+        return pool
+
+    def add(self, size: int, count: int = 1) -> None:
+        if len(self) + count > MAX_POOL_DICE:
+            raise ValueError(
+                f"Pool pode ter no maximo {MAX_POOL_DICE} dados."
+            )
+        self.counts[VALID_SIZES.index(size)] += count
+
+    def extend(self, other: "DicePool") -> None:
+        if len(self) + len(other) > MAX_POOL_DICE:
+            raise ValueError(
+                f"Pool pode ter no maximo {MAX_POOL_DICE} dados."
+            )
+        for idx, count in enumerate(other.counts):
+            self.counts[idx] += count
+
+    def sizes(self) -> list[int]:
+        """Die sizes, largest first."""
+        return [
+            size
+            for size, count in zip(reversed(VALID_SIZES), reversed(self.counts))
+            for _ in range(count)
+        ]
+
+    def roll(self, rng: random.Random | None = None) -> "RolledPool":
+        rng = rng or random
+        rolled = RolledPool()
+        for idx, count in enumerate(self.counts):
+            faces = rolled.faces[idx]
+            for _ in range(count):
+                faces[rng.randint(1, VALID_SIZES[idx])] += 1
+        return rolled
+
+    def __len__(self) -> int:
+        return sum(self.counts)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, DicePool) and self.counts == other.counts
+
+    def __repr__(self) -> str:
+        parts = [
+            f"{count}d{size}" for size, count in zip(VALID_SIZES, self.counts) if count
+        ]
+        return f"DicePool({' '.join(parts)})"
+
+
+class RolledPool:
+    """Result of rolling a ``DicePool``: how many dice of each size showed each face."""
+
+    __slots__ = ("faces",)
+
+    def __init__(self) -> None:
+        # faces[i][v] is how many d{VALID_SIZES[i]} rolled v; index 0 is unused.
+        self.faces = [[0] * (size + 1) for size in VALID_SIZES]
+
+    @classmethod
+    def from_results(cls, results: list[tuple[int, int]]) -> "RolledPool":
+        rolled = cls()
+        for size, value in results:
+            rolled.faces[VALID_SIZES.index(size)][value] += 1
+        return rolled
+
+    def __len__(self) -> int:
+        return sum(sum(faces) for faces in self.faces)
+
+    def results(self) -> list[tuple[int, int]]:
+        """(die_size, result) pairs, largest die first and highest result first."""
+        return [
+            (size, value)
+            for size, faces in zip(reversed(VALID_SIZES), reversed(self.faces))
+            for value in range(size, 0, -1)
+            for _ in range(faces[value])
+        ]
+
+    def hitch_count(self) -> int:
+        return sum(faces[1] for faces in self.faces)
+
+    def hitches(self) -> list[tuple[int, int]]:
+        """Dice that rolled 1, largest first."""
+        return [
+            (size, 1)
+            for size, faces in zip(reversed(VALID_SIZES), reversed(self.faces))
+            for _ in range(faces[1])
+        ]
+
+    def is_botch(self) -> bool:
+        return self.hitch_count() == len(self)
+
+    def _top_two(self, skip: tuple[int, int] | None = None) -> list[tuple[int, int]]:
+        """The two highest non-hitch dice, preferring smaller dice on equal results."""
+        picked: list[tuple[int, int]] = []
+        for value in range(max(VALID_SIZES), 1, -1):
+            for idx, size in enumerate(VALID_SIZES):
+                if value > size:
+                    continue
+                available = self.faces[idx][value] - ((size, value) == skip)
+                for _ in range(min(available, 2 - len(picked))):
+                    picked.append((size, value))
+                if len(picked) == 2:
+                    return picked
+        return picked
+
+    def _effect_die(self, used: list[tuple[int, int]]) -> tuple[int, int]:
+        """Largest non-hitch die not in ``used`` (its best result), or a d4 of 0."""
+        for idx in range(len(VALID_SIZES) - 1, -1, -1):
+            size = VALID_SIZES[idx]
+            for value in range(size, 1, -1):
+                if self.faces[idx][value] > used.count((size, value)):
+                    return size, value
+        return 4, 0
+
+    def _option(self, dice: list[tuple[int, int]], label: str, effect: tuple[int, int]) -> dict:
+        return {
+            "dice": dice,
+            "total": dice[0][1] + dice[1][1],
+            "effect_size": effect[0],
+            "effect_value": effect[1],
+            "label": label,
+        }
+
+    def best_options(self) -> list[dict]:
+        """Best total and, when it differs, best effect.
+
+        Equal results go to the smaller dice so the biggest die stays free
+        for effect. The best effect option holds back the lowest-rolling die
+        of the largest size and takes the best total from the rest.
+        """
+        total_dice = self._top_two()
+        if len(total_dice) < 2:
+            return []
+        best_total = self._option(total_dice, "Best total", self._effect_die(total_dice))
+        options = [best_total]
+
+        largest = self._effect_die([])
+        if best_total["effect_size"] < largest[0]:
+            idx = VALID_SIZES.index(largest[0])
+            lowest = next(v for v in range(2, largest[0] + 1) if self.faces[idx][v])
+            effect_dice = self._top_two(skip=(largest[0], lowest))
+            if len(effect_dice) == 2:
+                options.append(
+                    self._option(effect_dice, "Best effect", (largest[0], lowest))
+                )
+        return options
@@ -0,0 +1,90 @@
+"""Per-campaign mutation lanes.
+
+A read-modify-write that reads before its transaction (resolve a die,
+then delete it; load the undo tail, then apply it) can interleave with
+another interaction on the same campaign between the read and the write.
+A lane is an asyncio lock per campaign that such paths hold from the
+first read to the commit. Campaigns never share a lane, so guilds stay
+fully concurrent.
+
+Lanes are created on first use and dropped as soon as nobody holds or
+waits for them. They are reentrant within one task, so a command that
+holds its campaign's lane can call StateManager methods that take it
+again. A task spawned inside a lane is not its owner and must not take
+the same lane.
+
+Always take the lane before the writer turn (``Database.transaction``
+does this when given a campaign id), never inside a transaction that
+did not already hold it.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class _Lane:
+    __slots__ = ("lock", "owner", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.owner: asyncio.Task | None = None
+        # Holder plus waiters; the lane is dropped when this reaches zero.
+        self.users = 0
+
+
+class CampaignLanes:
+    """Lazily created, idle-evicted lock per campaign id."""
+
+    def __init__(self) -> None:
+        self._lanes: dict[int, _Lane] = {}
+        self.created = 0
+        self.contended = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._lanes)
+
+    @asynccontextmanager
+    async def lane(self, campaign_id: int):
+        """Hold ``campaign_id``'s lane for the duration of the block."""
+        task = asyncio.current_task()
+        lane = self._lanes.get(campaign_id)
+        if lane is not None and lane.owner is task:
+            yield
+            return
+        if lane is None:
+            lane = self._lanes[campaign_id] = _Lane()
+            self.created += 1
+
+        lane.users += 1
+        try:
+            if lane.lock.locked():
+                self.contended += 1
+                start = time.perf_counter()
+                await lane.lock.acquire()
+                waited = time.perf_counter() - start
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            else:
+                await lane.lock.acquire()
+            lane.owner = task
+            try:
+                yield
+            finally:
+                lane.owner = None
+                lane.lock.release()
+        finally:
+            lane.users -= 1
+            if lane.users == 0 and self._lanes.get(campaign_id) is lane:
+                del self._lanes[campaign_id]
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._lanes),
+            "created": self.created,
+            "contended": self.contended,
+            "wait_ms": self.wait_seconds * 1000,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
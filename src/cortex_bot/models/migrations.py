@@ -0,0 +1,283 @@
+"""Schema migrations keyed on ``PRAGMA user_version``.
+
+Each step runs in its own transaction together with the ``user_version``
+bump, so a failed step leaves the database at the previous version and the
+next start retries it. A database that is already current costs a single
+``PRAGMA user_version`` read.
+
+Add new index or layout changes as a new entry at the end of
+``MIGRATIONS``; never edit a step that has shipped.
+"""
+
+import logging
+import sqlite3
+import time
+from collections.abc import Awaitable, Callable
+from typing import NamedTuple
+
+import aiosqlite
+
+log = logging.getLogger(__name__)
+
+# Baseline schema (version 1). Every statement is IF NOT EXISTS so databases
+# created before versioning existed, which report user_version 0, adopt it.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    config TEXT NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(server_id, channel_id)
+);
+
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    discord_user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_gm INTEGER NOT NULL DEFAULT 0,
+    is_delegate INTEGER NOT NULL DEFAULT 0,
+    pp INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    UNIQUE(campaign_id, discord_user_id)
+);
+
+CREATE TABLE IF NOT EXISTS stress_types (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    name TEXT NOT NULL COLLATE NOCASE,
+    UNIQUE(campaign_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS scenes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    name TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    player_id INTEGER REFERENCES players(id) ON DELETE CASCADE,
+    scene_id INTEGER REFERENCES scenes(id) ON DELETE CASCADE,
+    name TEXT NOT NULL COLLATE NOCASE,
+    die_size INTEGER NOT NULL,
+    duration TEXT NOT NULL DEFAULT 'scene'
+);
+
+CREATE TABLE IF NOT EXISTS stress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    stress_type_id INTEGER NOT NULL REFERENCES stress_types(id) ON DELETE CASCADE,
+    die_size INTEGER NOT NULL,
+    UNIQUE(campaign_id, player_id, stress_type_id)
+);
+
+CREATE TABLE IF NOT EXISTS trauma (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    stress_type_id INTEGER NOT NULL REFERENCES stress_types(id) ON DELETE CASCADE,
+    die_size INTEGER NOT NULL,
+    UNIQUE(campaign_id, player_id, stress_type_id)
+);
+
+CREATE TABLE IF NOT EXISTS complications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    player_id INTEGER REFERENCES players(id) ON DELETE CASCADE,
+    scene_id INTEGER REFERENCES scenes(id) ON DELETE CASCADE,
+    name TEXT NOT NULL COLLATE NOCASE,
+    die_size INTEGER NOT NULL,
+    scope TEXT NOT NULL DEFAULT 'scene'
+);
+
+CREATE TABLE IF NOT EXISTS hero_dice (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    player_id INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    die_size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS doom_pool_dice (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    die_size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crisis_pools (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    scene_id INTEGER NOT NULL REFERENCES scenes(id) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS crisis_pool_dice (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    crisis_pool_id INTEGER NOT NULL REFERENCES crisis_pools(id) ON DELETE CASCADE,
+    die_size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS action_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    actor_discord_id TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    action_data TEXT NOT NULL DEFAULT '{}',
+    inverse_data TEXT NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    undone INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_players_campaign ON players(campaign_id);
+CREATE INDEX IF NOT EXISTS idx_assets_campaign ON assets(campaign_id);
+CREATE INDEX IF NOT EXISTS idx_assets_scene ON assets(scene_id);
+CREATE INDEX IF NOT EXISTS idx_stress_player ON stress(campaign_id, player_id);
+CREATE INDEX IF NOT EXISTS idx_complications_campaign ON complications(campaign_id);
+CREATE INDEX IF NOT EXISTS idx_complications_scene ON complications(scene_id);
+CREATE INDEX IF NOT EXISTS idx_doom_pool_campaign ON doom_pool_dice(campaign_id);
+CREATE INDEX IF NOT EXISTS idx_action_log_campaign ON action_log(campaign_id, undone);
+CREATE INDEX IF NOT EXISTS idx_scenes_active ON scenes(campaign_id, is_active);
+"""
+
+# Name lookups are case-insensitive. The collation is spelled out on the
+# index so databases created before the columns were NOCASE get it too.
+NAME_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_assets_owner_name
+    ON assets(campaign_id, player_id, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_complications_owner_name
+    ON complications(campaign_id, player_id, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_stress_types_name
+    ON stress_types(campaign_id, name COLLATE NOCASE);
+"""
+
+# Old action_log rows are moved here by the retention compactor
+# (models/retention.py), keeping /undo's table small.
+ACTION_LOG_ARCHIVE = """
+CREATE TABLE IF NOT EXISTS action_log_archive (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    actor_discord_id TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    action_data TEXT NOT NULL,
+    inverse_data TEXT NOT NULL,
+    created_at TIMESTAMP,
+    undone INTEGER NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_action_log_archive_campaign
+    ON action_log_archive(campaign_id, id);
+CREATE INDEX IF NOT EXISTS idx_action_log_campaign_id ON action_log(campaign_id, id);
+"""
+
+
+def split_statements(script: str) -> list[str]:
+    """Split a SQL script into complete statements.
+
+    ``executescript`` commits before running, so steps execute statements
+    one by one to stay inside their transaction.
+    """
+    statements: list[str] = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        raise ValueError(f"Incomplete SQL statement: {current.strip()!r}")
+    return statements
+
+
+def _script(sql: str) -> Callable[[aiosqlite.Connection], Awaitable[None]]:
+    async def apply(conn: aiosqlite.Connection) -> None:
+        for statement in split_statements(sql):
+            await conn.execute(statement)
+    return apply
+
+
+async def _add_is_delegate(conn: aiosqlite.Connection) -> None:
+    cursor = await conn.execute("PRAGMA table_info(players)")
+    columns = {row[1] for row in await cursor.fetchall()}
+    if "is_delegate" not in columns:
+        await conn.execute(
+            "ALTER TABLE players ADD COLUMN is_delegate INTEGER NOT NULL DEFAULT 0"
+        )
+
+
+async def _add_redo_data(conn: aiosqlite.Connection) -> None:
+    cursor = await conn.execute("PRAGMA table_info(action_log)")
+    columns = {row[1] for row in await cursor.fetchall()}
+    if "redo_data" not in columns:
+        await conn.execute("ALTER TABLE action_log ADD COLUMN redo_data TEXT")
+    # Undo/redo for a player's own actions.
+    await conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_action_log_actor
+           ON action_log(campaign_id, actor_discord_id, undone)"""
+    )
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline schema", _script(SCHEMA)),
+    Migration(2, "players.is_delegate", _add_is_delegate),
+    Migration(3, "case-insensitive name indexes", _script(NAME_INDEXES)),
+    Migration(4, "action_log archive", _script(ACTION_LOG_ARCHIVE)),
+    Migration(5, "action_log.redo_data", _add_redo_data),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+async def get_version(conn: aiosqlite.Connection) -> int:
+    cursor = await conn.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    return row[0]
+
+
+async def migrate(
+    conn: aiosqlite.Connection, migrations: list[Migration] = MIGRATIONS
+) -> int:
+    """Apply pending migrations in order and return the resulting version."""
+    version = await get_version(conn)
+    pending = [m for m in migrations if m.version > version]
+    if not pending:
+        return version
+
+    if version == 0:
+        # Only takes effect before the first table is created; existing
+        # databases need a one-off VACUUM to switch.
+        await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    await conn.execute("PRAGMA journal_mode=WAL")
+    for migration in pending:
+        start = time.perf_counter()
+        await conn.execute("BEGIN")
+        try:
+            await migration.apply(conn)
+            # PRAGMA arguments can't be bound; the version is an int we control.
+            await conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            log.error(
+                "Migration %d (%s) failed; database left at version %d",
+                migration.version, migration.description, version,
+            )
+            raise
+        version = migration.version
+        log.info(
+            "Migration %d (%s) applied in %.1f ms",
+            migration.version, migration.description,
+            (time.perf_counter() - start) * 1000,
+        )
+    return version
@@ -0,0 +1,152 @@
+"""Long-lived aiosqlite connections: one dedicated writer plus N readers.
+
+Opening an aiosqlite connection spins up a worker thread and re-applies
+pragmas, which dominated per-query latency when every call opened and
+closed its own connection. The pool keeps connections open for the life
+of the process and hands them out on demand.
+"""
+
+import asyncio
+import logging
+from collections.abc import Sequence
+from contextlib import asynccontextmanager, contextmanager
+
+import aiosqlite
+
+log = logging.getLogger(__name__)
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+class ConnectionPool:
+    """Pool with a single writer connection and ``readers`` read-only connections.
+
+    The writer is serialized with a lock but is re-entrant within the same
+    task, so a block holding the writer can call helpers that borrow it
+    again (e.g. ``log_action`` inside a mutation). Readers are opened lazily
+    up to ``readers`` and returned to an idle queue on release.
+
+    ``pragmas`` run on every new connection after ``CONNECTION_PRAGMAS``, so
+    they can override its defaults.
+
+    With ``readers=0`` (or an in-memory database, where each connection
+    would see a different database) reads go through the writer.
+    """
+
+    def __init__(self, path: str, readers: int = 4, pragmas: Sequence[str] = ()) -> None:
+        self.path = path
+        self.pragmas = (*CONNECTION_PRAGMAS, *pragmas)
+        self.readers = 0 if path == ":memory:" else max(readers, 0)
+        self._writer: aiosqlite.Connection | None = None
+        self._writer_lock = asyncio.Lock()
+        self._writer_owner: asyncio.Task | None = None
+        self._writer_depth = 0
+        self._idle: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._reader_conns: list[aiosqlite.Connection] = []
+        self._open_lock = asyncio.Lock()
+
+    async def _open(self, readonly: bool) -> aiosqlite.Connection:
+        conn = await aiosqlite.connect(self.path)
+        conn.row_factory = aiosqlite.Row
+        for pragma in self.pragmas:
+            await conn.execute(pragma)
+        if readonly:
+            await conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    @property
+    def writer_depth(self) -> int:
+        """How many nested ``writer()`` blocks the current owner has open."""
+        return self._writer_depth
+
+    def owns_writer(self) -> bool:
+        """True when the current task is holding (or has been lent) the writer."""
+        return self._writer_owner is not None and self._writer_owner is asyncio.current_task()
+
+    @contextmanager
+    def lend_writer(self, task: asyncio.Task):
+        """Let ``task`` use the writer the current task holds, as if it were its own.
+
+        ``writer()`` calls made by ``task`` while lent are re-entrant. The
+        current task gets the writer back when the block exits.
+        """
+        owner, depth = self._writer_owner, self._writer_depth
+        self._writer_owner, self._writer_depth = task, 1
+        try:
+            yield
+        finally:
+            self._writer_owner, self._writer_depth = owner, depth
+
+    def end_loan(self, task: asyncio.Task) -> None:
+        """Stop treating ``task`` as the owner ahead of its ``lend_writer`` block exiting.
+
+        The lending task only gets to exit the block once it is scheduled
+        again; until then ``task`` could carry on and open what it thinks is
+        a nested writer block on work that is already being finished.
+        """
+        if self._writer_owner is task:
+            self._writer_owner = None
+
+    @asynccontextmanager
+    async def writer(self):
+        """Borrow the writer connection. Uncommitted work is rolled back on release."""
+        task = asyncio.current_task()
+        if self._writer_owner is not None and self._writer_owner is task:
+            self._writer_depth += 1
+            try:
+                yield self._writer
+            finally:
+                self._writer_depth -= 1
+            return
+
+        async with self._writer_lock:
+            if self._writer is None:
+                self._writer = await self._open(readonly=False)
+            self._writer_owner = task
+            self._writer_depth = 1
+            try:
+                yield self._writer
+            finally:
+                self._writer_owner = None
+                self._writer_depth = 0
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+
+    @asynccontextmanager
+    async def reader(self):
+        """Borrow a read-only connection, opening one if the pool is not full."""
+        if self.readers == 0:
+            async with self.writer() as conn:
+                yield conn
+            return
+
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        conn = None
+        if self._idle.empty():
+            async with self._open_lock:
+                if len(self._reader_conns) < self.readers:
+                    conn = await self._open(readonly=True)
+                    self._reader_conns.append(conn)
+        if conn is None:
+            conn = await self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        """Close every pooled connection. The pool may be reused afterwards."""
+        for conn in self._reader_conns:
+            await conn.close()
+        self._reader_conns.clear()
+        self._idle = None
+        if self._writer is not None:
+            async with self._writer_lock:
+                await self._writer.close()
+                self._writer = None
@@ -0,0 +1,67 @@
+"""Rendered campaign views, memoized per (campaign, state_version, view kind).
+
+Players press Campaign Info far more often than the campaign changes, and
+every press used to reload the snapshot and rebuild the whole text. Each
+campaign has a ``state_version`` (see ``Database.state_version``) that goes
+up on every committed write, so a render stored under the current version
+is still exact and the next request is a dict lookup.
+
+Only the newest version is kept per (campaign, kind); older renders can
+never be asked for again.
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+Key = tuple[int, str]
+
+
+class RenderCache:
+    """Latest render per (campaign, kind), tagged with the version it shows."""
+
+    def __init__(self) -> None:
+        self._entries: dict[Key, tuple[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        campaign_id: int,
+        kind: str,
+        version: int,
+        build: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """The render of ``kind`` at ``version``; ``build`` runs on a miss.
+
+        Read ``version`` before ``build`` loads anything: the render may then
+        show a newer state than its tag, which only costs a rebuild later.
+        """
+        key = (campaign_id, kind)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = await build()
+        # A slower build for an older version must not replace a newer one.
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= version:
+            self._entries[key] = (version, value)
+        return value
+
+    def invalidate(self, campaign_id: int | None = None) -> None:
+        """Drop a campaign's renders, or every render if none is given."""
+        if campaign_id is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == campaign_id]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,253 @@
+"""action_log retention: move old actions into action_log_archive.
+
+Every mutation appends an action_log row with two JSON blobs, but /undo
+only ever reads the recent tail. The compactor runs in the background and,
+per campaign, moves rows that fall outside the retention policy into
+``action_log_archive``. Each batch is its own short write transaction on
+the group-commit writer, so interactions queue between batches rather
+than behind the whole pass. Afterwards it runs ``PRAGMA incremental_vacuum``
+to hand the freed pages back to the filesystem.
+
+By default the archive is a table in the same database. Given an
+``archive_path`` it is a separate SQLite file instead, which is what
+actually shrinks the main database. Rows are then committed to the
+archive before they are deleted from action_log, so a crash in between
+only leaves a copy that the next pass skips.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, NamedTuple
+
+import aiosqlite
+
+if TYPE_CHECKING:
+    from cortex_bot.models.database import Database
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = (
+    "id, campaign_id, actor_discord_id, action_type, action_data, "
+    "inverse_data, created_at, undone"
+)
+
+# action_log_archive in a standalone file, where campaigns does not exist.
+ARCHIVE_FILE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS action_log_archive (
+    id INTEGER PRIMARY KEY,
+    campaign_id INTEGER NOT NULL,
+    actor_discord_id TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    action_data TEXT NOT NULL,
+    inverse_data TEXT NOT NULL,
+    created_at TIMESTAMP,
+    undone INTEGER NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class RetentionPolicy(NamedTuple):
+    """Keep the newest ``keep`` actions, plus anything younger than ``days``."""
+
+    keep: int
+    days: float | None = None
+
+
+def campaign_policy(config: dict, default: RetentionPolicy) -> RetentionPolicy:
+    """The policy in a campaign's config (``undo_keep``/``undo_days``), else ``default``."""
+    return RetentionPolicy(
+        keep=int(config.get("undo_keep", default.keep)),
+        days=config.get("undo_days", default.days),
+    )
+
+
+class ActionLogCompactor:
+    """Background task that archives action_log rows past their campaign's policy.
+
+    ``interval`` is the pause in seconds between passes; 0 disables the
+    background task, though ``compact()`` can still be called directly.
+    """
+
+    def __init__(
+        self,
+        db: "Database",
+        policy: RetentionPolicy,
+        interval: float = 3600.0,
+        batch_size: int = 500,
+        archive_path: str | None = None,
+    ) -> None:
+        self.db = db
+        self.policy = policy
+        self.interval = interval
+        self.batch_size = max(batch_size, 1)
+        self.archive_path = archive_path
+        self._archive: aiosqlite.Connection | None = None
+        self._task: asyncio.Task | None = None
+        self.passes = 0
+        self.archived = 0
+        self.bytes_reclaimed = 0
+        self.last_pass: dict | None = None
+
+    def start(self) -> None:
+        if self.interval and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name="cortex-action-log-compactor"
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.compact()
+            except Exception:
+                log.exception("action_log compaction failed")
+            await asyncio.sleep(self.interval)
+
+    async def compact(self) -> dict:
+        """Run one pass over every campaign and return what it did."""
+        start = time.perf_counter()
+        async with self.db.read() as conn:
+            cursor = await conn.execute("SELECT id, config FROM campaigns")
+            campaigns = [
+                (row["id"], campaign_policy(json.loads(row["config"]), self.policy))
+                for row in await cursor.fetchall()
+            ]
+        archived = 0
+        for campaign_id, policy in campaigns:
+            archived += await self.compact_campaign(campaign_id, policy)
+        reclaimed, free = await self.db.write(self._vacuum)
+
+        self.passes += 1
+        self.archived += archived
+        self.bytes_reclaimed += reclaimed
+        self.last_pass = {
+            "archived": archived,
+            "bytes_reclaimed": reclaimed,
+            "free_bytes": free,
+            "ms": (time.perf_counter() - start) * 1000,
+        }
+        if archived or reclaimed:
+            log.info(
+                "Archived %d action_log row(s), reclaimed %d bytes in %.1f ms",
+                archived, reclaimed, self.last_pass["ms"],
+            )
+        return self.last_pass
+
+    async def compact_campaign(self, campaign_id: int, policy: RetentionPolicy) -> int:
+        """Archive one campaign's rows outside ``policy``, a batch at a time."""
+        async with self.db.read() as conn:
+            # Rows only ever get newer ids, so everything up to the newest
+            # row past ``keep`` stays outside the policy while we work.
+            cursor = await conn.execute(
+                "SELECT id FROM action_log WHERE campaign_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?",
+                (campaign_id, policy.keep),
+            )
+            row = await cursor.fetchone()
+        if row is None:
+            return 0
+
+        where = "campaign_id = ? AND id <= ?"
+        params: tuple = (campaign_id, row["id"])
+        if policy.days is not None:
+            # Fixed once so every batch selects and deletes the same rows.
+            cutoff = datetime.now(timezone.utc) - timedelta(days=policy.days)
+            where += " AND created_at < ?"
+            params += (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)
+
+        total = 0
+        while True:
+            if self.archive_path is None:
+                moved = await self.db.write(lambda conn: self._move_batch(conn, where, params))
+            else:
+                moved = await self._move_batch_to_file(where, params)
+            total += moved
+            if moved < self.batch_size:
+                return total
+            # Let queued interactions through before the next batch.
+            await asyncio.sleep(0)
+
+    async def _move_batch(self, conn: aiosqlite.Connection, where: str, params: tuple) -> int:
+        cursor = await conn.execute(
+            f"""SELECT COUNT(*), MAX(id) FROM
+                (SELECT id FROM action_log WHERE {where} ORDER BY id LIMIT ?)""",
+            (*params, self.batch_size),
+        )
+        count, last_id = await cursor.fetchone()
+        if not count:
+            return 0
+        await conn.execute(
+            f"""INSERT INTO action_log_archive ({ARCHIVE_COLUMNS})
+                SELECT {ARCHIVE_COLUMNS} FROM action_log WHERE {where} AND id <= ?""",
+            (*params, last_id),
+        )
+        await conn.execute(f"DELETE FROM action_log WHERE {where} AND id <= ?", (*params, last_id))
+        return count
+
+    async def _move_batch_to_file(self, where: str, params: tuple) -> int:
+        async with self.db.read() as conn:
+            cursor = await conn.execute(
+                f"SELECT {ARCHIVE_COLUMNS} FROM action_log WHERE {where} ORDER BY id LIMIT ?",
+                (*params, self.batch_size),
+            )
+            rows = [tuple(r) for r in await cursor.fetchall()]
+        if not rows:
+            return 0
+        if self._archive is None:
+            self._archive = await aiosqlite.connect(self.archive_path)
+            await self._archive.execute(ARCHIVE_FILE_SCHEMA)
+        await self._archive.executemany(
+            f"""INSERT OR IGNORE INTO action_log_archive ({ARCHIVE_COLUMNS})
+                VALUES ({", ".join("?" * len(rows[0]))})""",
+            rows,
+        )
+        await self._archive.commit()
+
+        async def delete(conn: aiosqlite.Connection) -> None:
+            await conn.execute(
+                f"DELETE FROM action_log WHERE {where} AND id <= ?", (*params, rows[-1][0])
+            )
+
+        await self.db.write(delete)
+        return len(rows)
+
+    @staticmethod
+    async def _vacuum(conn: aiosqlite.Connection) -> tuple[int, int]:
+        """Release free pages; return (bytes reclaimed, bytes still free)."""
+        values = {}
+        for pragma in ("page_size", "freelist_count", "auto_vacuum"):
+            cursor = await conn.execute(f"PRAGMA {pragma}")
+            values[pragma] = (await cursor.fetchone())[0]
+        if values["auto_vacuum"] != 2:
+            # Free pages are still reused by later inserts.
+            return 0, values["freelist_count"] * values["page_size"]
+        cursor = await conn.execute("PRAGMA incremental_vacuum")
+        await cursor.fetchall()
+        cursor = await conn.execute("PRAGMA freelist_count")
+        remaining = (await cursor.fetchone())[0]
+        return (
+            (values["freelist_count"] - remaining) * values["page_size"],
+            remaining * values["page_size"],
+        )
+
+    def stats(self) -> dict:
+        return {
+            "passes": self.passes,
+            "archived": self.archived,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "last_pass": self.last_pass,
+        }
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._archive is not None:
+            await self._archive.close()
+            self._archive = None
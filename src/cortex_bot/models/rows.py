@@ -0,0 +1,162 @@
+"""Slotted row models returned by the Database getters.
+
+Each model lists its columns in SELECT order, so a fetched row becomes an
+instance with one positional call instead of a ``dict(row)`` copy. Slots
+keep instances smaller than the equivalent dict, and formatters read
+attributes instead of hashing string keys.
+
+``row["name"]``, ``row.get("name")`` and ``dict(row)`` keep working for
+code that still treats rows as mappings.
+"""
+
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Self
+
+
+class _Row:
+    __slots__ = ()
+
+    # Columns selected for the model, in field order.
+    COLUMNS: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def columns(cls, alias: str | None = None) -> str:
+        """The SELECT list for this model, optionally qualified with ``alias``."""
+        prefix = f"{alias}." if alias else ""
+        return ", ".join(prefix + col for col in cls.COLUMNS)
+
+    @classmethod
+    def from_row(cls, row) -> Self:
+        return cls(*row)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and hasattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def keys(self) -> list[str]:
+        return [f.name for f in fields(self)]
+
+
+@dataclass(slots=True)
+class Campaign(_Row):
+    COLUMNS: ClassVar = ("id", "server_id", "channel_id", "name", "config", "created_at")
+
+    id: int
+    server_id: str
+    channel_id: str
+    name: str
+    config: dict = field(default_factory=dict)
+    created_at: str | None = None
+
+    @classmethod
+    def from_row(cls, row) -> "Campaign":
+        id, server_id, channel_id, name, config, created_at = row
+        return cls(id, server_id, channel_id, name, json.loads(config), created_at)
+
+
+@dataclass(slots=True)
+class Player(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "discord_user_id", "name", "is_gm", "pp", "xp", "is_delegate")
+
+    id: int
+    campaign_id: int
+    discord_user_id: str
+    name: str
+    is_gm: int = 0
+    pp: int = 1
+    xp: int = 0
+    is_delegate: int = 0
+
+
+@dataclass(slots=True)
+class Asset(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "player_id", "scene_id", "name", "die_size", "duration")
+
+    id: int
+    campaign_id: int
+    player_id: int | None
+    scene_id: int | None
+    name: str
+    die_size: int
+    duration: str = "scene"
+    # Owner's name, only selected by scene listings.
+    player_name: str | None = None
+
+
+@dataclass(slots=True)
+class Stress(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "player_id", "stress_type_id", "die_size")
+
+    id: int
+    campaign_id: int
+    player_id: int
+    stress_type_id: int
+    die_size: int
+    stress_type_name: str = ""
+
+
+@dataclass(slots=True)
+class Trauma(Stress):
+    pass
+
+
+@dataclass(slots=True)
+class Complication(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "player_id", "scene_id", "name", "die_size", "scope")
+
+    id: int
+    campaign_id: int
+    player_id: int | None
+    scene_id: int | None
+    name: str
+    die_size: int
+    scope: str = "scene"
+    player_name: str | None = None
+
+
+@dataclass(slots=True)
+class DoomDie(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "die_size")
+
+    id: int
+    campaign_id: int
+    die_size: int
+
+
+@dataclass(slots=True)
+class HeroDie(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "player_id", "die_size")
+
+    id: int
+    campaign_id: int
+    player_id: int
+    die_size: int
+
+
+@dataclass(slots=True)
+class CrisisDie(_Row):
+    COLUMNS: ClassVar = ("id", "crisis_pool_id", "die_size")
+
+    id: int
+    crisis_pool_id: int
+    die_size: int
+
+
+@dataclass(slots=True)
+class CrisisPool(_Row):
+    COLUMNS: ClassVar = ("id", "campaign_id", "scene_id", "name")
+
+    id: int
+    campaign_id: int
+    scene_id: int
+    name: str
+    dice: list[CrisisDie] = field(default_factory=list)
@@ -0,0 +1,199 @@
+"""Group commit for write transactions on the pooled writer connection.
+
+Every ``Database.transaction()`` queues a turn with one long-lived writer
+task. The writer takes every turn that is waiting, opens one transaction
+for the whole batch and hands the connection to each caller in order
+inside its own savepoint. A caller that raises only rolls back its own
+savepoint. The batch then commits once, so concurrent mutations share a
+single fsync, and each caller's ``transaction()`` block exits only after
+that commit.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+from cortex_bot.models.pool import ConnectionPool
+
+log = logging.getLogger(__name__)
+
+
+class _Turn:
+    __slots__ = ("task", "granted", "finished", "committed")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.task = asyncio.current_task()
+        self.granted: asyncio.Future[aiosqlite.Connection] = loop.create_future()
+        self.finished: asyncio.Future[bool] = loop.create_future()
+        self.committed: asyncio.Future[None] = loop.create_future()
+
+
+def _resolve(future: asyncio.Future, exc: BaseException | None = None) -> None:
+    if future.done():
+        return
+    if exc is None:
+        future.set_result(None)
+    else:
+        future.set_exception(exc)
+
+
+class GroupCommitWriter:
+    """Single writer task that batches queued transactions into one commit.
+
+    When more than one turn is waiting, the writer waits ``window`` seconds
+    for stragglers before starting the batch, and takes at most
+    ``max_batch`` turns per commit. A lone transaction is never delayed.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        window: float = 0.002,
+        max_batch: int = 64,
+        on_commit: Callable[[], None] | None = None,
+    ) -> None:
+        self.pool = pool
+        self.window = window
+        self.max_batch = max(max_batch, 1)
+        self.on_commit = on_commit
+        self._queue: asyncio.Queue[_Turn] | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.transactions = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self.commit_seconds = 0.0
+        self.last_commit_seconds = 0.0
+        self.max_commit_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(
+                self._run(), name="cortex-db-writer"
+            )
+
+    @asynccontextmanager
+    async def turn(self):
+        """Wait for this task's slot in a batch and yield the writer connection."""
+        self._ensure_running()
+        turn = _Turn(asyncio.get_running_loop())
+        self._queue.put_nowait(turn)
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        try:
+            conn = await turn.granted
+        except BaseException:
+            if turn.granted.cancel() is False and turn.granted.exception() is None:
+                # Cancelled just after our turn came up: hand it straight back.
+                turn.finished.set_result(False)
+            raise
+        ok = False
+        try:
+            yield conn
+            ok = True
+        finally:
+            self.pool.end_loan(asyncio.current_task())
+            turn.finished.set_result(ok)
+        await turn.committed
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Let tasks that are already runnable queue up before deciding.
+            await asyncio.sleep(0)
+            if self.window and not self._queue.empty():
+                await asyncio.sleep(self.window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: list[_Turn]) -> None:
+        applied: list[_Turn] = []
+        try:
+            async with self.pool.writer() as conn:
+                await conn.execute("BEGIN")
+                for turn in batch:
+                    if turn.granted.cancelled():
+                        continue
+                    await conn.execute("SAVEPOINT turn")
+                    with self.pool.lend_writer(turn.task):
+                        turn.granted.set_result(conn)
+                        ok = await asyncio.shield(turn.finished)
+                    if not conn.in_transaction:
+                        # A COMMIT or ROLLBACK inside a turn ends the whole
+                        # batch's transaction, not just the caller's work.
+                        raise RuntimeError("a write turn ended the batch transaction")
+                    if ok:
+                        await conn.execute("RELEASE turn")
+                    else:
+                        await conn.execute("ROLLBACK TO turn")
+                        await conn.execute("RELEASE turn")
+                    if ok:
+                        applied.append(turn)
+                    else:
+                        _resolve(turn.committed)
+                start = time.perf_counter()
+                await conn.commit()
+                elapsed = time.perf_counter() - start
+        except BaseException as exc:
+            cancelled = isinstance(exc, asyncio.CancelledError)
+            for turn in batch:
+                pending = turn.committed if turn.granted.done() else turn.granted
+                if cancelled:
+                    pending.cancel()
+                else:
+                    _resolve(pending, exc)
+            if cancelled:
+                raise
+            log.exception("Write batch of %d failed", len(batch))
+            return
+
+        self.batches += 1
+        self.transactions += len(applied)
+        self.max_batch_size = max(self.max_batch_size, len(applied))
+        self.commit_seconds += elapsed
+        self.last_commit_seconds = elapsed
+        self.max_commit_seconds = max(self.max_commit_seconds, elapsed)
+        log.debug(
+            "Committed %d transaction(s) in %.2f ms, %d queued",
+            len(applied), elapsed * 1000, self.queue_depth,
+        )
+        if self.on_commit is not None:
+            self.on_commit()
+        for turn in applied:
+            _resolve(turn.committed)
+
+    def stats(self) -> dict:
+        """Commit latency, batch size and queue depth counters."""
+        return {
+            "batches": self.batches,
+            "transactions": self.transactions,
+            "mean_batch_size": self.transactions / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "mean_commit_ms": self.commit_seconds / self.batches * 1000 if self.batches else 0.0,
+            "last_commit_ms": self.last_commit_seconds * 1000,
+            "max_commit_ms": self.max_commit_seconds * 1000,
+        }
+
+    async def close(self) -> None:
+        """Stop the writer task. Queued turns that never started are cancelled."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait().granted.cancel()
+        self._task = None
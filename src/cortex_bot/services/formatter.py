@@ -5,6 +5,14 @@ Screen reader friendly.
 """
 
 from cortex_bot.models.dice import die_label
+from cortex_bot.models.rows import (
+    Asset,
+    Campaign,
+    Complication,
+    CrisisPool,
+    DoomDie,
+    Player,
+)
 
 
 HITCH_DIE_SCALE = {1: 6, 2: 8, 3: 10}
@@ -34,7 +42,7 @@ def format_roll_result(
     is_botch: bool = False,
     best_options: list[dict] | None = None,
     difficulty: int | None = None,
-    available_assets: list[dict] | None = None,
+    available_assets: list[Asset] | None = None,
     opposition_elements: list[str] | None = None,
     doom_enabled: bool = False,
 ) -> str:
@@ -126,7 +134,7 @@ def format_roll_result(
             )
 
     if available_assets:
-        asset_strs = [f"{a['name']} {die_label(a['die_size'])}" for a in available_assets]
+        asset_strs = [f"{a.name} {die_label(a.die_size)}" for a in available_assets]
         lines.append(f"Available assets: {', '.join(asset_strs)}.")
 
     if opposition_elements:
@@ -137,41 +145,98 @@ def format_roll_result(
     return "\n".join(lines)
 
 
+def format_batch_roll_result(
+    name: str,
+    dice: list[int],
+    rolls: list[dict],
+    difficulty: int | None = None,
+) -> str:
+    """Condensed summary of the same pool rolled for several NPCs."""
+    pool = " ".join(die_label(s) for s in sorted(dice, reverse=True))
+    lines = [f"{name} x{len(rolls)} rolled {pool} each."]
+
+    botches = sum(1 for r in rolls if r["botch"])
+    hitch_rolls = sum(1 for r in rolls if r["hitches"] and not r["botch"])
+    hitches = sum(r["hitches"] for r in rolls if not r["botch"])
+    summary = []
+    if difficulty is not None:
+        successes = [r for r in rolls if not r["botch"] and r["total"] > difficulty]
+        heroic = sum(1 for r in successes if r["total"] - difficulty >= 5)
+        summary.append(
+            f"Difficulty {difficulty}: {len(successes)} of {len(rolls)} succeed"
+            + (f", {heroic} heroic" if heroic else "")
+            + "."
+        )
+    summary.append(f"Botches: {botches}.")
+    summary.append(f"Hitches: {hitches} across {hitch_rolls} rolls.")
+    lines.append(" ".join(summary))
+
+    for i, r in enumerate(rolls, 1):
+        if r["botch"]:
+            lines.append(f"#{i}: botch.")
+            continue
+        line = f"#{i}: {r['total']}, effect {die_label(r['effect_size'])}"
+        if difficulty is not None:
+            line += ", success" if r["total"] > difficulty else ", failure"
+        if r["hitches"]:
+            line += f", {r['hitches']} hitch" + ("es" if r["hitches"] > 1 else "")
+        lines.append(line + ".")
+    return "\n".join(lines)
+
+
+def _percent(p: float) -> str:
+    return f"{p * 100:.1f}%"
+
+
+def format_odds(dice: list[int], odds: dict) -> str:
+    """Format exact roll odds from ``probability.calculate_odds``."""
+    pool = ", ".join(die_label(s) for s in sorted(dice, reverse=True))
+    effect = ", ".join(
+        f"{die_label(size)} {_percent(p)}" for size, p in odds["effect"].items()
+    )
+    return "\n".join([
+        f"Odds for {pool} against difficulty {odds['difficulty']}.",
+        f"Success: {_percent(odds['success'])}. Heroic success: {_percent(odds['heroic'])}.",
+        f"Expected margin: {odds['expected_margin']:+.1f}.",
+        f"Effect die: {effect}.",
+        f"Botch: {_percent(odds['botch'])}. Expected hitches: {odds['expected_hitches']:.2f}.",
+    ])
+
+
 def format_campaign_info(
-    campaign: dict,
-    players: list[dict],
+    campaign: Campaign,
+    players: list[Player],
     player_states: dict,
     scene: dict | None,
-    doom_pool: list[dict] | None,
-    scene_assets: list[dict] | None = None,
-    scene_complications: list[dict] | None = None,
-    crisis_pools: list[dict] | None = None,
+    doom_pool: list[DoomDie] | None,
+    scene_assets: list[Asset] | None = None,
+    scene_complications: list[Complication] | None = None,
+    crisis_pools: list[CrisisPool] | None = None,
     config: dict | None = None,
 ) -> str:
     lines: list[str] = []
 
     scene_name = scene["name"] if scene else "none"
-    lines.append(f"CAMPAIGN: {campaign['name']}")
+    lines.append(f"CAMPAIGN: {campaign.name}")
     lines.append(f"Active scene: {scene_name}")
     lines.append("")
 
     for i, p in enumerate(players):
         if i > 0:
             lines.append("")
-        pid = p["id"]
-        state = player_states.get(pid, {})
+        state = player_states.get(p.id, {})
 
-        name_line = p["name"].upper()
-        if p["is_gm"]:
+        name_line = p.name.upper()
+        if p.is_gm:
             name_line += " (GM)"
-        elif p.get("is_delegate"):
+        elif p.is_delegate:
             name_line += " (delegate)"
         lines.append(name_line)
 
         stress_list = state.get("stress", [])
         if stress_list:
             stress_strs = [
-                f"{s['stress_type_name']} {die_label(s['die_size'])}"
+                f"{s.stress_type_name} {die_label(s.die_size)}"
                 for s in stress_list
             ]
             lines.append(f"Stress: {', '.join(stress_strs)}")
@@ -181,7 +246,7 @@ def format_campaign_info(
         trauma_list = state.get("trauma", [])
         if trauma_list:
             trauma_strs = [
-                f"{t['stress_type_name']} {die_label(t['die_size'])}"
+                f"{t.stress_type_name} {die_label(t.die_size)}"
                 for t in trauma_list
             ]
             lines.append(f"Trauma: {', '.join(trauma_strs)}")
@@ -189,7 +254,7 @@ def format_campaign_info(
         assets_list = state.get("assets", [])
         if assets_list:
             asset_strs = [
-                f"{a['name']} {die_label(a['die_size'])} ({a['duration']})"
+                f"{a.name} {die_label(a.die_size)} ({a.duration})"
                 for a in assets_list
             ]
             lines.append(f"Assets: {', '.join(asset_strs)}")
@@ -199,7 +264,7 @@ def format_campaign_info(
         complications_list = state.get("complications", [])
         if complications_list:
             comp_strs = [
-                f"{c['name']} {die_label(c['die_size'])}"
+                f"{c.name} {die_label(c.die_size)}"
                 for c in complications_list
             ]
             lines.append(f"Complications: {', '.join(comp_strs)}")
@@ -208,11 +273,11 @@ def format_campaign_info(
 
         hero_list = state.get("hero_dice", [])
         if hero_list:
-            hero_strs = [die_label(h["die_size"]) for h in hero_list]
+            hero_strs = [die_label(h.die_size) for h in hero_list]
             lines.append(f"Hero dice: {', '.join(hero_strs)}")
 
-        if not p["is_gm"]:
-            lines.append(f"PP {p['pp']}, XP {p['xp']}")
+        if not p.is_gm:
+            lines.append(f"PP {p.pp}, XP {p.xp}")
 
     has_scene_elements = scene_assets or scene_complications or crisis_pools
     if has_scene_elements:
@@ -220,26 +285,26 @@ def format_campaign_info(
         lines.append("SCENE ELEMENTS")
         if scene_assets:
             asset_strs = [
-                f"{a['name']} {die_label(a['die_size'])}"
+                f"{a.name} {die_label(a.die_size)}"
                 for a in scene_assets
             ]
             lines.append(f"Scene assets: {', '.join(asset_strs)}")
         if scene_complications:
             comp_strs = [
-                f"{c['name']} {die_label(c['die_size'])}"
+                f"{c.name} {die_label(c.die_size)}"
                 for c in scene_complications
             ]
             lines.append(f"Scene complications: {', '.join(comp_strs)}")
         if crisis_pools:
             for cp in crisis_pools:
-                dice_strs = [die_label(d["die_size"]) for d in cp.get("dice", [])]
-                lines.append(f"Crisis Pool '{cp['name']}': {', '.join(dice_strs)}")
+                dice_strs = [die_label(d.die_size) for d in cp.dice]
+                lines.append(f"Crisis Pool '{cp.name}': {', '.join(dice_strs)}")
 
     if doom_pool is not None:
         lines.append("")
         lines.append("DOOM POOL")
         if doom_pool:
-            doom_strs = [die_label(d["die_size"]) for d in doom_pool]
+            doom_strs = [die_label(d.die_size) for d in doom_pool]
             lines.append(", ".join(doom_strs))
         else:
             lines.append("empty")
@@ -0,0 +1,210 @@
+"""Exact outcome probabilities for Cortex Prime dice pools.
+
+A roll keeps the two highest non-hitch dice as the total and the largest
+remaining non-hitch die as the effect die (d4 when none is left). Among
+equal values the smaller dice go to the total, which keeps the biggest die
+free for effect. Dice that roll 1 are hitches; a pool of only hitches is a
+botch with total zero.
+
+The distribution is built by dynamic programming over the dice, tracking
+only the two kept dice and the effect die size so far. Results are memoized
+on the sorted pool, so the same multiset of dice is only ever computed once
+per process, and ``IncrementalPool`` keeps the intermediate states so a pool
+built one die at a time never starts over.
+"""
+
+from collections import Counter
+from functools import lru_cache
+
+HEROIC_MARGIN = 5
+# Common Cortex difficulties: very easy, easy, challenging, hard.
+DIFFICULTY_LADDER = (3, 7, 11, 15)
+
+
+State = tuple[int, int, int, int, int]
+EMPTY_STATE: State = (0, 0, 0, 0, 0)
+
+
+def _kept_size(size: int, effect: int) -> int:
+    """Sizes at or below the current effect die can no longer change it."""
+    return size if size > effect else 0
+
+
+def _step(states: dict[State, float], size: int) -> dict[State, float]:
+    """Fold one more die into a DP state distribution.
+
+    A state is (top value, its size, second value, its size, effect size);
+    a value of 0 marks an empty slot. Kept dice are ranked by value, then
+    by smaller size, so the order dice are added in does not matter.
+    """
+    face = 1.0 / size
+    nxt: dict[State, float] = {}
+    for state, p in states.items():
+        # Rolling a 1 is a hitch and leaves the kept dice alone.
+        nxt[state] = nxt.get(state, 0.0) + p * face
+        av, asz, bv, bsz, effect = state
+        pf = p * face
+        for value in range(2, size + 1):
+            if value > bv or (value == bv and size < bsz):
+                new_effect = max(effect, bsz) if bv else effect
+                if value > av or (value == av and size < asz):
+                    av2, as2, bv2, bs2 = value, size, av, asz
+                else:
+                    av2, as2, bv2, bs2 = av, asz, value, size
+            else:
+                new_effect = max(effect, size)
+                av2, as2, bv2, bs2 = av, asz, bv, bsz
+            key = (
+                av2, _kept_size(as2, new_effect),
+                bv2, _kept_size(bs2, new_effect),
+                new_effect,
+            )
+            nxt[key] = nxt.get(key, 0.0) + pf
+    return nxt
+
+
+def _collapse(states: dict[State, float]) -> dict[tuple[int, int], float]:
+    """Reduce DP states to (total, effect_size) probabilities."""
+    result: dict[tuple[int, int], float] = {}
+    for (av, _, bv, _, effect), p in states.items():
+        outcome = (av + bv, effect or 4)
+        result[outcome] = result.get(outcome, 0.0) + p
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _outcomes(pool: tuple[int, ...]) -> tuple[tuple[tuple[int, int], float], ...]:
+    """Joint distribution of (total, effect_size) for a sorted pool."""
+    states: dict[State, float] = {EMPTY_STATE: 1.0}
+    for size in pool:
+        states = _step(states, size)
+    return tuple(sorted(_collapse(states).items()))
+
+
+@lru_cache(maxsize=1024)
+def _hitch_counts(pool: tuple[int, ...]) -> tuple[float, ...]:
+    """Probability of exactly k hitches, indexed by k."""
+    counts = [1.0]
+    for size in pool:
+        hitch = 1.0 / size
+        nxt = [0.0] * (len(counts) + 1)
+        for k, p in enumerate(counts):
+            nxt[k] += p * (1.0 - hitch)
+            nxt[k + 1] += p * hitch
+        counts = nxt
+    return tuple(counts)
+
+
+def _key(dice: list[int]) -> tuple[int, ...]:
+    return tuple(sorted(dice, reverse=True))
+
+
+def pool_distribution(dice: list[int]) -> dict:
+    """Exact outcome distribution for a pool of die sizes.
+
+    Returns ``outcomes`` mapping (total, effect_size) to probability,
+    ``hitches`` mapping hitch count to probability, and ``botch``, the
+    probability that every die rolls 1. A botch counts as total 0.
+    """
+    key = _key(dice)
+    hitches = _hitch_counts(key)
+    return {
+        "outcomes": dict(_outcomes(key)),
+        "hitches": {k: p for k, p in enumerate(hitches) if p > 0},
+        "botch": hitches[-1] if key else 1.0,
+    }
+
+
+def _summarize(outcomes: dict[tuple[int, int], float], difficulty: int) -> dict:
+    success = heroic = margin = 0.0
+    for (total, _), p in outcomes.items():
+        diff = total - difficulty
+        margin += p * diff
+        if diff > 0:
+            success += p
+        if diff >= HEROIC_MARGIN:
+            heroic += p
+    return {
+        "difficulty": difficulty,
+        "success": success,
+        "heroic": heroic,
+        "expected_margin": margin,
+    }
+
+
+def _effect_sizes(outcomes: dict[tuple[int, int], float]) -> dict[int, float]:
+    effect: dict[int, float] = {}
+    for (_, effect_size), p in outcomes.items():
+        effect[effect_size] = effect.get(effect_size, 0.0) + p
+    return dict(sorted(effect.items()))
+
+
+def calculate_odds(dice: list[int], difficulty: int) -> dict:
+    """Chance of beating ``difficulty`` with a pool, plus expected margin and effect.
+
+    Success and heroic success follow ``roller.evaluate_difficulty``: the
+    total must exceed the difficulty, by 5 or more for a heroic success.
+    """
+    dist = pool_distribution(dice)
+    result = _summarize(dist["outcomes"], difficulty)
+    result["effect"] = _effect_sizes(dist["outcomes"])
+    result["expected_hitches"] = sum(k * p for k, p in dist["hitches"].items())
+    result["botch"] = dist["botch"]
+    return result
+
+
+class IncrementalPool:
+    """Outcome distribution for a pool edited one die at a time.
+
+    Keeps the DP states after each die, so adding a die is a single DP
+    step and removing the most recent die is free. Removing an older die
+    replays only the dice added after it.
+    """
+
+    def __init__(self, dice: list[int] | None = None) -> None:
+        self._dice: list[int] = []
+        self._states: list[dict[State, float]] = [{EMPTY_STATE: 1.0}]
+        for size in dice or ():
+            self.add(size)
+
+    @property
+    def dice(self) -> list[int]:
+        return list(self._dice)
+
+    def add(self, size: int) -> None:
+        self._dice.append(size)
+        self._states.append(_step(self._states[-1], size))
+
+    def remove(self, size: int) -> None:
+        """Remove one die of ``size``, replaying only the dice added after it."""
+        idx = len(self._dice) - 1 - self._dice[::-1].index(size)
+        later = self._dice[idx + 1:]
+        del self._dice[idx:]
+        del self._states[idx + 1:]
+        for other in later:
+            self.add(other)
+
+    def clear(self) -> None:
+        del self._dice[:]
+        del self._states[1:]
+
+    def sync(self, dice: list[int]) -> None:
+        """Add and remove dice until this pool holds the same multiset as ``dice``."""
+        target = Counter(dice)
+        current = Counter(self._dice)
+        for size in (current - target).elements():
+            self.remove(size)
+        for size in (target - current).elements():
+            self.add(size)
+
+    def outcomes(self) -> dict[tuple[int, int], float]:
+        """(total, effect_size) probabilities for the current pool."""
+        return _collapse(self._states[-1])
+
+    def odds(self, difficulties: tuple[int, ...] = DIFFICULTY_LADDER) -> dict:
+        """P(success) per difficulty and the expected effect die size."""
+        outcomes = self.outcomes()
+        return {
+            "success": {d: _summarize(outcomes, d)["success"] for d in difficulties},
+            "expected_effect": sum(size * p for size, p in _effect_sizes(outcomes).items()),
+        }
@@ -1,73 +1,56 @@
 """Dice rolling engine with Cortex Prime mechanics."""
 
 import random
-from itertools import combinations
 
-from cortex_bot.models.dice import die_label
+from cortex_bot.models.dice import RolledPool
 
+# One summary line per roll has to fit Discord's 2000-character message limit.
+MAX_BATCH_ROLLS = 30
 
-def roll_pool(dice: list[int]) -> list[tuple[int, int]]:
-    """Roll a pool of dice. Returns list of (die_size, result)."""
-    return [(size, random.randint(1, size)) for size in dice]
 
-
-def find_hitches(results: list[tuple[int, int]]) -> list[tuple[int, int]]:
-    """Find all dice that rolled 1 (hitches)."""
-    return [(size, val) for size, val in results if val == 1]
-
-
-def is_botch(results: list[tuple[int, int]]) -> bool:
-    """Check if all dice rolled 1."""
-    return all(val == 1 for _, val in results)
-
-
-def calculate_best_options(
-    results: list[tuple[int, int]],
+def roll_pools_batch(
+    dice: list[int], count: int, rng: random.Random | None = None
 ) -> list[dict]:
-    """Calculate best total and best effect die combinations.
+    """Roll the same pool ``count`` times and score every roll.
 
-    Excludes hitches from consideration. Returns list of options
-    with label, total, dice used for total, and effect die.
+    All faces for a die size are drawn in one ``choices`` call for the whole
+    batch, then dealt out to the rolls. Each entry has ``results``,
+    ``hitches``, ``botch``, ``total`` and ``effect_size`` (``total`` and
+    ``effect_size`` follow the best-total option; both are 0 on a botch).
     """
-    non_hitch = [(size, val) for size, val in results if val != 1]
-    if len(non_hitch) < 2:
-        return []
-
-    options = []
-    best_total_option = None
-    best_effect_option = None
+    rng = rng or random
+    per_roll: dict[int, int] = {}
+    for size in dice:
+        per_roll[size] = per_roll.get(size, 0) + 1
+    faces = {
+        size: rng.choices(range(1, size + 1), k=n * count)
+        for size, n in per_roll.items()
+    }
 
-    for combo in combinations(range(len(non_hitch)), 2):
-        total = non_hitch[combo[0]][1] + non_hitch[combo[1]][1]
-        remaining = [non_hitch[i] for i in range(len(non_hitch)) if i not in combo]
-        if remaining:
-            effect = max(remaining, key=lambda x: x[0])
+    batch = []
+    for i in range(count):
+        results = [
+            (size, value)
+            for size, n in per_roll.items()
+            for value in faces[size][i * n:(i + 1) * n]
+        ]
+        rolled = RolledPool.from_results(results)
+        botch = rolled.is_botch()
+        best = rolled.best_options()
+        if best:
+            total, effect_size = best[0]["total"], best[0]["effect_size"]
         else:
-            effect = (4, 0)
-
-        option = {
-            "dice": [non_hitch[combo[0]], non_hitch[combo[1]]],
+            # Fewer than two non-hitch dice: the lone die (if any) is the total.
+            total = max((v for _, v in results if v != 1), default=0)
+            effect_size = 0 if botch else 4
+        batch.append({
+            "results": results,
+            "hitches": rolled.hitch_count(),
+            "botch": botch,
             "total": total,
-            "effect_size": effect[0],
-            "effect_value": effect[1],
-        }
-
-        if best_total_option is None or total > best_total_option["total"]:
-            best_total_option = option
-        if best_effect_option is None or effect[0] > best_effect_option["effect_size"]:
-            best_effect_option = option
-        elif effect[0] == best_effect_option["effect_size"] and total > best_effect_option["total"]:
-            best_effect_option = option
-
-    if best_total_option:
-        best_total_option["label"] = "Best total"
-        options.append(best_total_option)
-
-    if best_effect_option and best_effect_option != best_total_option:
-        best_effect_option["label"] = "Best effect"
-        options.append(best_effect_option)
-
-    return options
+            "effect_size": effect_size,
+        })
+    return batch
 
 
 def evaluate_difficulty(total: int, difficulty: int) -> dict:
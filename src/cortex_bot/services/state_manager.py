@@ -1,27 +1,72 @@
 """State management with action logging for undo support."""
 
+import functools
 import json
 
 from cortex_bot.models.database import Database
-from cortex_bot.models.dice import die_label, step_up, step_down
+from cortex_bot.models.dice import VALID_SIZES, die_label, step_up, step_down
+from cortex_bot.models.rows import Asset, Complication, Player, Stress
 
 # Allowlists for the undo system — only these identifiers may appear
 # in inverse_data used by execute_undo.  Anything else is rejected.
 UNDO_ALLOWED_TABLES = frozenset({
     "assets", "stress", "trauma", "complications", "players",
-    "hero_dice", "doom_pool_dice", "crisis_pool_dice",
+    "hero_dice", "doom_pool_dice", "crisis_pools", "crisis_pool_dice", "scenes",
 })
-UNDO_ALLOWED_FIELDS = frozenset({"die_size", "pp", "xp"})
+UNDO_ALLOWED_FIELDS = frozenset({"die_size", "pp", "xp", "is_active"})
 UNDO_ALLOWED_COLUMNS = frozenset({
-    "campaign_id", "player_id", "scene_id", "name", "die_size",
-    "duration", "stress_type_id", "scope",
+    "id", "campaign_id", "player_id", "scene_id", "name", "die_size",
+    "duration", "stress_type_id", "scope", "crisis_pool_id",
 })
 
+# One die step up / down as SQL expressions over die_size, so a mutation
+# can compute the new size in its own UPDATE. Guard the statement with
+# ``die_size IN _CAN_STEP_UP`` (or _CAN_STEP_DOWN): d12 has no step up and
+# d4 no step down, and the CASE yields NULL for them.
+STEP_UP_SQL = "CASE die_size {} END".format(
+    " ".join(f"WHEN {small} THEN {big}" for small, big in zip(VALID_SIZES, VALID_SIZES[1:]))
+)
+STEP_DOWN_SQL = "CASE die_size {} END".format(
+    " ".join(f"WHEN {big} THEN {small}" for small, big in zip(VALID_SIZES, VALID_SIZES[1:]))
+)
+_CAN_STEP_UP = str(VALID_SIZES[:-1])
+_CAN_STEP_DOWN = str(VALID_SIZES[1:])
+
+_ASSET_COLUMNS = ("id", "campaign_id", "player_id", "scene_id", "name", "die_size", "duration")
+_COMPLICATION_COLUMNS = ("id", "campaign_id", "player_id", "scene_id", "name", "die_size", "scope")
+_STRESS_COLUMNS = ("id", "campaign_id", "player_id", "stress_type_id", "die_size")
+
+
+def _restore(table: str, row: dict, columns: tuple[str, ...]) -> dict:
+    """Inverse step that re-inserts a deleted row under its original id."""
+    return {
+        "action": "insert", "table": table,
+        "data": {col: row[col] for col in columns},
+    }
+
+
+def _steps(inverse_data: dict) -> list[dict]:
+    if inverse_data["action"] == "composite":
+        return inverse_data["steps"]
+    return [inverse_data]
+
+
+def _in_lane(method):
+    """Run a mutating method inside its campaign's lane (first argument)."""
+
+    @functools.wraps(method)
+    async def wrapper(self, campaign_id: int, *args, **kwargs):
+        async with self.db.lane(campaign_id):
+            return await method(self, campaign_id, *args, **kwargs)
+
+    return wrapper
+
 
 class StateManager:
     def __init__(self, db: Database) -> None:
         self.db = db
 
+    @_in_lane
     async def add_asset(
         self,
         campaign_id: int,
@@ -32,414 +77,684 @@ class StateManager:
         scene_id: int | None = None,
         duration: str = "scene",
     ) -> dict:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
                 """INSERT INTO assets (campaign_id, player_id, scene_id, name, die_size, duration)
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (campaign_id, player_id, scene_id, name, die_size, duration),
             )
             asset_id = cursor.lastrowid
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "add_asset",
-            {"id": asset_id, "name": name, "die_size": die_size, "player_id": player_id, "duration": duration},
-            {"action": "delete", "table": "assets", "id": asset_id},
-        )
+            patch.put("assets", Asset(asset_id, campaign_id, player_id, scene_id, name, die_size, duration))
+            await self.db.log_action(
+                campaign_id, actor_id, "add_asset",
+                {"id": asset_id, "name": name, "die_size": die_size, "player_id": player_id, "duration": duration},
+                {"action": "delete", "table": "assets", "id": asset_id},
+                conn=conn,
+            )
         return {"id": asset_id, "name": name, "die_size": die_size, "duration": duration}
 
+    @_in_lane
     async def remove_asset(
         self, campaign_id: int, actor_id: str, asset_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE id = ? AND campaign_id = ?",
+                "DELETE FROM assets WHERE id = ? AND campaign_id = ? RETURNING *",
                 (asset_id, campaign_id),
             )
             asset = await cursor.fetchone()
             if not asset:
                 return None
             asset = dict(asset)
-            await conn.execute("DELETE FROM assets WHERE id = ?", (asset_id,))
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "remove_asset",
-            {"id": asset_id, "name": asset["name"]},
-            {
-                "action": "insert", "table": "assets",
-                "data": {
-                    "campaign_id": campaign_id, "player_id": asset["player_id"],
-                    "scene_id": asset["scene_id"], "name": asset["name"],
-                    "die_size": asset["die_size"], "duration": asset["duration"],
-                },
-            },
-        )
+            patch.drop("assets", asset_id)
+            await self.db.log_action(
+                campaign_id, actor_id, "remove_asset",
+                {"id": asset_id, "name": asset["name"]},
+                _restore("assets", asset, _ASSET_COLUMNS),
+                conn=conn,
+            )
         return asset
 
+    @_in_lane
     async def step_up_asset(
         self, campaign_id: int, actor_id: str, asset_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE id = ? AND campaign_id = ?",
+                f"""UPDATE assets SET die_size = {STEP_UP_SQL}
+                    WHERE id = ? AND campaign_id = ? AND die_size IN {_CAN_STEP_UP}
+                    RETURNING {Asset.columns()}""",
                 (asset_id, campaign_id),
             )
             asset = await cursor.fetchone()
             if not asset:
-                return None
-            asset = dict(asset)
-            new_size = step_up(asset["die_size"])
-            if new_size is None:
+                cursor = await conn.execute(
+                    "SELECT name, die_size FROM assets WHERE id = ? AND campaign_id = ?",
+                    (asset_id, campaign_id),
+                )
+                asset = await cursor.fetchone()
+                if not asset:
+                    return None
                 return {"error": "already_max", "name": asset["name"], "die_size": asset["die_size"]}
-            await conn.execute(
-                "UPDATE assets SET die_size = ? WHERE id = ?",
-                (new_size, asset_id),
+            asset = Asset.from_row(asset)
+            patch.put("assets", asset)
+            new_size = asset.die_size
+            old_size = step_down(new_size)
+            await self.db.log_action(
+                campaign_id, actor_id, "step_up_asset",
+                {"id": asset_id, "name": asset["name"], "from": old_size, "to": new_size},
+                {"action": "update", "table": "assets", "id": asset_id, "field": "die_size", "value": old_size},
+                conn=conn,
             )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "step_up_asset",
-            {"id": asset_id, "name": asset["name"], "from": asset["die_size"], "to": new_size},
-            {"action": "update", "table": "assets", "id": asset_id, "field": "die_size", "value": asset["die_size"]},
-        )
-        return {"name": asset["name"], "from": asset["die_size"], "to": new_size}
+        return {"name": asset["name"], "from": old_size, "to": new_size}
 
+    @_in_lane
     async def step_down_asset(
         self, campaign_id: int, actor_id: str, asset_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM assets WHERE id = ? AND campaign_id = ?",
+                f"""UPDATE assets SET die_size = {STEP_DOWN_SQL}
+                    WHERE id = ? AND campaign_id = ? AND die_size IN {_CAN_STEP_DOWN}
+                    RETURNING {Asset.columns()}""",
                 (asset_id, campaign_id),
             )
             asset = await cursor.fetchone()
             if not asset:
-                return None
-            asset = dict(asset)
-            new_size = step_down(asset["die_size"])
-            if new_size is None:
-                await conn.execute("DELETE FROM assets WHERE id = ?", (asset_id,))
-                await conn.commit()
+                cursor = await conn.execute(
+                    "DELETE FROM assets WHERE id = ? AND campaign_id = ? RETURNING *",
+                    (asset_id, campaign_id),
+                )
+                asset = await cursor.fetchone()
+                if not asset:
+                    return None
+                patch.drop("assets", asset_id)
                 await self.db.log_action(
                     campaign_id, actor_id, "step_down_asset_eliminated",
                     {"id": asset_id, "name": asset["name"], "was": asset["die_size"]},
-                    {
-                        "action": "insert", "table": "assets",
-                        "data": {
-                            "campaign_id": campaign_id, "player_id": asset["player_id"],
-                            "scene_id": asset["scene_id"], "name": asset["name"],
-                            "die_size": asset["die_size"], "duration": asset["duration"],
-                        },
-                    },
+                    _restore("assets", asset, _ASSET_COLUMNS),
+                    conn=conn,
                 )
                 return {"name": asset["name"], "eliminated": True, "was": asset["die_size"]}
-            await conn.execute(
-                "UPDATE assets SET die_size = ? WHERE id = ?",
-                (new_size, asset_id),
+            asset = Asset.from_row(asset)
+            patch.put("assets", asset)
+            new_size = asset.die_size
+            old_size = step_up(new_size)
+            await self.db.log_action(
+                campaign_id, actor_id, "step_down_asset",
+                {"id": asset_id, "name": asset["name"], "from": old_size, "to": new_size},
+                {"action": "update", "table": "assets", "id": asset_id, "field": "die_size", "value": old_size},
+                conn=conn,
             )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "step_down_asset",
-            {"id": asset_id, "name": asset["name"], "from": asset["die_size"], "to": new_size},
-            {"action": "update", "table": "assets", "id": asset_id, "field": "die_size", "value": asset["die_size"]},
-        )
-        return {"name": asset["name"], "from": asset["die_size"], "to": new_size}
+        return {"name": asset["name"], "from": old_size, "to": new_size}
 
+    @_in_lane
     async def add_stress(
         self, campaign_id: int, actor_id: str, player_id: int,
         stress_type_id: int, die_size: int, player_name: str = "", type_name: str = "",
     ) -> dict:
-        async with self.db.connect() as conn:
+        """Add stress, or step up / replace the die the player already has.
+
+        A single UPSERT covers the common cases: a new die is inserted, and
+        an existing die at least as large steps up (so the old size is one
+        step below the returned one). When it changes nothing, the existing
+        die is either smaller than ``die_size`` (replaced, which needs the
+        old size for undo) or already d12 (stressed out), and only then is
+        the row read.
+        """
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
-                (campaign_id, player_id, stress_type_id),
+                f"""INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (campaign_id, player_id, stress_type_id) DO UPDATE
+                    SET die_size = {STEP_UP_SQL}
+                    WHERE die_size >= excluded.die_size AND die_size IN {_CAN_STEP_UP}
+                    RETURNING {Stress.columns()}""",
+                (campaign_id, player_id, stress_type_id, die_size),
             )
-            existing = await cursor.fetchone()
-
-            if existing:
-                existing = dict(existing)
-                if die_size > existing["die_size"]:
-                    old_size = existing["die_size"]
-                    await conn.execute(
-                        "UPDATE stress SET die_size = ? WHERE id = ?",
-                        (die_size, existing["id"]),
-                    )
-                    await conn.commit()
-                    await self.db.log_action(
-                        campaign_id, actor_id, "replace_stress",
-                        {"id": existing["id"], "player": player_name, "type": type_name, "from": old_size, "to": die_size},
-                        {"action": "update", "table": "stress", "id": existing["id"], "field": "die_size", "value": old_size},
-                    )
-                    return {"player": player_name, "type": type_name, "action": "replaced", "from": old_size, "to": die_size}
-                else:
-                    new_size = step_up(existing["die_size"])
-                    if new_size is None:
-                        await conn.commit()
-                        return {
-                            "player": player_name, "type": type_name,
-                            "action": "stressed_out", "die_size": 12,
-                        }
-                    await conn.execute(
-                        "UPDATE stress SET die_size = ? WHERE id = ?",
-                        (new_size, existing["id"]),
-                    )
-                    await conn.commit()
+            row = await cursor.fetchone()
+            if row:
+                stress = Stress.from_row(row)
+                patch.put("stress", stress)
+                if stress.die_size == die_size:
                     await self.db.log_action(
-                        campaign_id, actor_id, "step_up_stress",
-                        {"id": existing["id"], "player": player_name, "type": type_name, "from": existing["die_size"], "to": new_size},
-                        {"action": "update", "table": "stress", "id": existing["id"], "field": "die_size", "value": existing["die_size"]},
+                        campaign_id, actor_id, "add_stress",
+                        {"id": stress.id, "player": player_name, "type": type_name, "die_size": die_size},
+                        {"action": "delete", "table": "stress", "id": stress.id},
+                        conn=conn,
                     )
-                    return {"player": player_name, "type": type_name, "action": "stepped_up", "from": existing["die_size"], "to": new_size}
-            else:
-                cursor = await conn.execute(
-                    "INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, ?)",
-                    (campaign_id, player_id, stress_type_id, die_size),
-                )
-                stress_id = cursor.lastrowid
-                await conn.commit()
+                    return {"player": player_name, "type": type_name, "action": "added", "die_size": die_size}
+                old_size = step_down(stress.die_size)
                 await self.db.log_action(
-                    campaign_id, actor_id, "add_stress",
-                    {"id": stress_id, "player": player_name, "type": type_name, "die_size": die_size},
-                    {"action": "delete", "table": "stress", "id": stress_id},
+                    campaign_id, actor_id, "step_up_stress",
+                    {"id": stress.id, "player": player_name, "type": type_name, "from": old_size, "to": stress.die_size},
+                    {"action": "update", "table": "stress", "id": stress.id, "field": "die_size", "value": old_size},
+                    conn=conn,
                 )
-                return {"player": player_name, "type": type_name, "action": "added", "die_size": die_size}
+                return {
+                    "player": player_name, "type": type_name, "action": "stepped_up",
+                    "from": old_size, "to": stress.die_size,
+                }
 
+            cursor = await conn.execute(
+                "SELECT id, die_size FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
+                (campaign_id, player_id, stress_type_id),
+            )
+            existing = await cursor.fetchone()
+            old_size = existing["die_size"]
+            if die_size <= old_size:
+                return {
+                    "player": player_name, "type": type_name,
+                    "action": "stressed_out", "die_size": 12,
+                }
+            cursor = await conn.execute(
+                f"UPDATE stress SET die_size = ? WHERE id = ? RETURNING {Stress.columns()}",
+                (die_size, existing["id"]),
+            )
+            patch.put("stress", Stress.from_row(await cursor.fetchone()))
+            await self.db.log_action(
+                campaign_id, actor_id, "replace_stress",
+                {"id": existing["id"], "player": player_name, "type": type_name, "from": old_size, "to": die_size},
+                {"action": "update", "table": "stress", "id": existing["id"], "field": "die_size", "value": old_size},
+                conn=conn,
+            )
+            return {"player": player_name, "type": type_name, "action": "replaced", "from": old_size, "to": die_size}
+
+    @_in_lane
     async def remove_stress(
         self, campaign_id: int, actor_id: str, player_id: int,
         stress_type_id: int, player_name: str = "", type_name: str = "",
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?",
+                """DELETE FROM stress WHERE campaign_id = ? AND player_id = ? AND stress_type_id = ?
+                   RETURNING *""",
                 (campaign_id, player_id, stress_type_id),
             )
             existing = await cursor.fetchone()
             if not existing:
                 return None
-            existing = dict(existing)
-            await conn.execute("DELETE FROM stress WHERE id = ?", (existing["id"],))
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "remove_stress",
-            {"id": existing["id"], "player": player_name, "type": type_name, "die_size": existing["die_size"]},
-            {
-                "action": "insert", "table": "stress",
-                "data": {
-                    "campaign_id": campaign_id, "player_id": player_id,
-                    "stress_type_id": stress_type_id, "die_size": existing["die_size"],
-                },
-            },
-        )
+            patch.drop("stress", existing["id"])
+            await self.db.log_action(
+                campaign_id, actor_id, "remove_stress",
+                {"id": existing["id"], "player": player_name, "type": type_name, "die_size": existing["die_size"]},
+                _restore("stress", existing, _STRESS_COLUMNS),
+                conn=conn,
+            )
         return {"player": player_name, "type": type_name, "die_size": existing["die_size"]}
 
+    @_in_lane
     async def add_complication(
         self, campaign_id: int, actor_id: str, name: str, die_size: int,
         player_id: int | None = None, scene_id: int | None = None,
         scope: str = "scene", player_name: str = "",
     ) -> dict:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
                 """INSERT INTO complications (campaign_id, player_id, scene_id, name, die_size, scope)
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (campaign_id, player_id, scene_id, name, die_size, scope),
             )
             comp_id = cursor.lastrowid
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "add_complication",
-            {"id": comp_id, "name": name, "die_size": die_size, "player": player_name},
-            {"action": "delete", "table": "complications", "id": comp_id},
-        )
+            patch.put("complications", Complication(comp_id, campaign_id, player_id, scene_id, name, die_size, scope))
+            await self.db.log_action(
+                campaign_id, actor_id, "add_complication",
+                {"id": comp_id, "name": name, "die_size": die_size, "player": player_name},
+                {"action": "delete", "table": "complications", "id": comp_id},
+                conn=conn,
+            )
         return {"id": comp_id, "name": name, "die_size": die_size, "player": player_name}
 
+    @_in_lane
     async def remove_complication(
         self, campaign_id: int, actor_id: str, comp_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE id = ? AND campaign_id = ?",
+                "DELETE FROM complications WHERE id = ? AND campaign_id = ? RETURNING *",
                 (comp_id, campaign_id),
             )
             comp = await cursor.fetchone()
             if not comp:
                 return None
             comp = dict(comp)
-            await conn.execute("DELETE FROM complications WHERE id = ?", (comp_id,))
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "remove_complication",
-            {"id": comp_id, "name": comp["name"]},
-            {
-                "action": "insert", "table": "complications",
-                "data": {
-                    "campaign_id": campaign_id, "player_id": comp["player_id"],
-                    "scene_id": comp["scene_id"], "name": comp["name"],
-                    "die_size": comp["die_size"], "scope": comp["scope"],
-                },
-            },
-        )
+            patch.drop("complications", comp_id)
+            await self.db.log_action(
+                campaign_id, actor_id, "remove_complication",
+                {"id": comp_id, "name": comp["name"]},
+                _restore("complications", comp, _COMPLICATION_COLUMNS),
+                conn=conn,
+            )
         return comp
 
+    @_in_lane
     async def step_up_complication(
         self, campaign_id: int, actor_id: str, comp_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE id = ? AND campaign_id = ?",
+                f"""UPDATE complications SET die_size = {STEP_UP_SQL}
+                    WHERE id = ? AND campaign_id = ? AND die_size IN {_CAN_STEP_UP}
+                    RETURNING {Complication.columns()}""",
                 (comp_id, campaign_id),
             )
             comp = await cursor.fetchone()
             if not comp:
-                return None
-            comp = dict(comp)
-            new_size = step_up(comp["die_size"])
-            if new_size is None:
+                cursor = await conn.execute(
+                    "SELECT name FROM complications WHERE id = ? AND campaign_id = ?",
+                    (comp_id, campaign_id),
+                )
+                comp = await cursor.fetchone()
+                if not comp:
+                    return None
                 return {"name": comp["name"], "taken_out": True, "die_size": 12}
-            await conn.execute(
-                "UPDATE complications SET die_size = ? WHERE id = ?",
-                (new_size, comp_id),
+            comp = Complication.from_row(comp)
+            patch.put("complications", comp)
+            new_size = comp.die_size
+            old_size = step_down(new_size)
+            await self.db.log_action(
+                campaign_id, actor_id, "step_up_complication",
+                {"id": comp_id, "name": comp["name"], "from": old_size, "to": new_size},
+                {"action": "update", "table": "complications", "id": comp_id, "field": "die_size", "value": old_size},
+                conn=conn,
             )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "step_up_complication",
-            {"id": comp_id, "name": comp["name"], "from": comp["die_size"], "to": new_size},
-            {"action": "update", "table": "complications", "id": comp_id, "field": "die_size", "value": comp["die_size"]},
-        )
-        return {"name": comp["name"], "from": comp["die_size"], "to": new_size}
+        return {"name": comp["name"], "from": old_size, "to": new_size}
 
+    @_in_lane
     async def step_down_complication(
         self, campaign_id: int, actor_id: str, comp_id: int
     ) -> dict | None:
-        async with self.db.connect() as conn:
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT * FROM complications WHERE id = ? AND campaign_id = ?",
+                f"""UPDATE complications SET die_size = {STEP_DOWN_SQL}
+                    WHERE id = ? AND campaign_id = ? AND die_size IN {_CAN_STEP_DOWN}
+                    RETURNING {Complication.columns()}""",
                 (comp_id, campaign_id),
             )
             comp = await cursor.fetchone()
             if not comp:
-                return None
-            comp = dict(comp)
-            new_size = step_down(comp["die_size"])
-            if new_size is None:
-                await conn.execute("DELETE FROM complications WHERE id = ?", (comp_id,))
-                await conn.commit()
+                cursor = await conn.execute(
+                    "DELETE FROM complications WHERE id = ? AND campaign_id = ? RETURNING *",
+                    (comp_id, campaign_id),
+                )
+                comp = await cursor.fetchone()
+                if not comp:
+                    return None
+                patch.drop("complications", comp_id)
                 await self.db.log_action(
                     campaign_id, actor_id, "step_down_complication_eliminated",
                     {"id": comp_id, "name": comp["name"], "was": comp["die_size"]},
-                    {
-                        "action": "insert", "table": "complications",
-                        "data": {
-                            "campaign_id": campaign_id, "player_id": comp["player_id"],
-                            "scene_id": comp["scene_id"], "name": comp["name"],
-                            "die_size": comp["die_size"], "scope": comp["scope"],
-                        },
-                    },
+                    _restore("complications", comp, _COMPLICATION_COLUMNS),
+                    conn=conn,
                 )
                 return {"name": comp["name"], "eliminated": True, "was": comp["die_size"]}
-            await conn.execute(
-                "UPDATE complications SET die_size = ? WHERE id = ?",
-                (new_size, comp_id),
+            comp = Complication.from_row(comp)
+            patch.put("complications", comp)
+            new_size = comp.die_size
+            old_size = step_up(new_size)
+            await self.db.log_action(
+                campaign_id, actor_id, "step_down_complication",
+                {"id": comp_id, "name": comp["name"], "from": old_size, "to": new_size},
+                {"action": "update", "table": "complications", "id": comp_id, "field": "die_size", "value": old_size},
+                conn=conn,
             )
-            await conn.commit()
-
-        await self.db.log_action(
-            campaign_id, actor_id, "step_down_complication",
-            {"id": comp_id, "name": comp["name"], "from": comp["die_size"], "to": new_size},
-            {"action": "update", "table": "complications", "id": comp_id, "field": "die_size", "value": comp["die_size"]},
-        )
-        return {"name": comp["name"], "from": comp["die_size"], "to": new_size}
+        return {"name": comp["name"], "from": old_size, "to": new_size}
 
+    @_in_lane
     async def update_pp(
         self, campaign_id: int, actor_id: str, player_id: int,
         amount: int, player_name: str = "",
     ) -> dict:
-        async with self.db.connect() as conn:
+        return await self._update_points(campaign_id, actor_id, player_id, "pp", amount, player_name)
+
+    @_in_lane
+    async def update_xp(
+        self, campaign_id: int, actor_id: str, player_id: int,
+        amount: int, player_name: str = "",
+    ) -> dict:
+        return await self._update_points(campaign_id, actor_id, player_id, "xp", amount, player_name)
+
+    async def _update_points(
+        self, campaign_id: int, actor_id: str, player_id: int,
+        field: str, amount: int, player_name: str,
+    ) -> dict:
+        """Add ``amount`` to the player's ``pp`` or ``xp`` unless it would go negative.
+
+        The guard lives in the UPDATE's WHERE clause; the balance is only
+        read when it refuses.
+        """
+        async with self.db.mutation(campaign_id) as (conn, patch):
             cursor = await conn.execute(
-                "SELECT pp FROM players WHERE id = ?", (player_id,)
+                f"""UPDATE players SET {field} = {field} + ? WHERE id = ? AND {field} + ? >= 0
+                    RETURNING {Player.columns()}""",
+                (amount, player_id, amount),
             )
             row = await cursor.fetchone()
-            old_pp = row["pp"]
-            new_pp = old_pp + amount
-            if new_pp < 0:
-                return {"error": "insufficient", "player": player_name, "current": old_pp, "requested": abs(amount)}
-            await conn.execute(
-                "UPDATE players SET pp = ? WHERE id = ?", (new_pp, player_id)
+            if not row:
+                cursor = await conn.execute(
+                    f"SELECT {field} FROM players WHERE id = ?", (player_id,)
+                )
+                row = await cursor.fetchone()
+                return {"error": "insufficient", "player": player_name, "current": row[0], "requested": abs(amount)}
+            player = Player.from_row(row)
+            patch.put("players", player)
+            new_value = getattr(player, field)
+            old_value = new_value - amount
+            action_type = f"add_{field}" if amount > 0 else f"remove_{field}"
+            await self.db.log_action(
+                campaign_id, actor_id, action_type,
+                {"player_id": player_id, "player": player_name, "amount": amount, "from": old_value, "to": new_value},
+                {"action": "update", "table": "players", "id": player_id, "field": field, "value": old_value},
+                conn=conn,
             )
-            await conn.commit()
+        return {"player": player_name, "from": old_value, "to": new_value}
 
-        action_type = "add_pp" if amount > 0 else "remove_pp"
-        await self.db.log_action(
-            campaign_id, actor_id, action_type,
-            {"player_id": player_id, "player": player_name, "amount": amount, "from": old_pp, "to": new_pp},
-            {"action": "update", "table": "players", "id": player_id, "field": "pp", "value": old_pp},
-        )
-        return {"player": player_name, "from": old_pp, "to": new_pp}
+    @_in_lane
+    async def start_scene(self, campaign_id: int, name: str | None = None) -> dict:
+        """Start a scene unless one is already active.
 
-    async def update_xp(
-        self, campaign_id: int, actor_id: str, player_id: int,
-        amount: int, player_name: str = "",
+        The check and the insert run in the campaign's lane, so two starts
+        at once cannot both create an active scene. Returns
+        ``{"scene": row}``, or ``{"error": "scene_active", "active": row}``.
+        """
+        async with self.db.transaction() as conn:
+            cursor = await conn.execute(
+                "SELECT * FROM scenes WHERE campaign_id = ? AND is_active = 1",
+                (campaign_id,),
+            )
+            active = await cursor.fetchone()
+            if active is not None:
+                return {"error": "scene_active", "active": dict(active)}
+            cursor = await conn.execute(
+                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1) RETURNING *",
+                (campaign_id, name),
+            )
+            scene = dict(await cursor.fetchone())
+        self.db.invalidate_campaign_state(campaign_id)
+        return {"scene": scene}
+
+    @_in_lane
+    async def end_scene(
+        self, campaign_id: int, actor_id: str, scene: dict, bridge: bool = False
     ) -> dict:
-        async with self.db.connect() as conn:
+        """End ``scene`` in one transaction and return what changed.
+
+        Removes scene-scoped assets, complications and crisis pools, and
+        with ``bridge`` steps every non-GM stress die down one size (d4s
+        are eliminated) with one set-based DELETE and UPDATE. The stress
+        left afterwards comes from the same pass. Everything is logged as a
+        single ``end_scene`` action that undoes as a unit.
+
+        Returns ``{"error": "no_active_scene"}`` if ``scene`` was already
+        ended, e.g. by a concurrent ``/scene end``.
+        """
+        scene_id = scene["id"]
+        async with self.db.transaction() as conn:
             cursor = await conn.execute(
-                "SELECT xp FROM players WHERE id = ?", (player_id,)
+                "UPDATE scenes SET is_active = 0 WHERE id = ? AND is_active = 1 RETURNING id",
+                (scene_id,),
             )
-            row = await cursor.fetchone()
-            old_xp = row["xp"]
-            new_xp = old_xp + amount
-            if new_xp < 0:
-                return {"error": "insufficient", "player": player_name, "current": old_xp, "requested": abs(amount)}
+            if await cursor.fetchone() is None:
+                return {"error": "no_active_scene"}
+
+            cursor = await conn.execute(
+                "SELECT id, name, is_gm FROM players WHERE campaign_id = ? ORDER BY name",
+                (campaign_id,),
+            )
+            players = [dict(r) for r in await cursor.fetchall()]
+            names = {p["id"]: p["name"] for p in players}
+
+            cursor = await conn.execute(
+                "DELETE FROM assets WHERE scene_id = ? AND duration = 'scene' RETURNING *",
+                (scene_id,),
+            )
+            removed_assets = [dict(r) for r in await cursor.fetchall()]
+            cursor = await conn.execute(
+                "DELETE FROM complications WHERE scene_id = ? AND scope = 'scene' RETURNING *",
+                (scene_id,),
+            )
+            removed_complications = [dict(r) for r in await cursor.fetchall()]
+            for row in removed_assets + removed_complications:
+                row["player_name"] = names.get(row["player_id"])
+            removed_assets.sort(key=lambda r: r["name"].lower())
+            removed_complications.sort(key=lambda r: r["name"].lower())
+
+            removed_crisis_pools = await self.db._fetch_crisis_pools(conn, scene_id)
             await conn.execute(
-                "UPDATE players SET xp = ? WHERE id = ?", (new_xp, player_id)
+                """DELETE FROM crisis_pool_dice WHERE crisis_pool_id IN
+                   (SELECT id FROM crisis_pools WHERE scene_id = ?)""",
+                (scene_id,),
             )
-            await conn.commit()
+            await conn.execute("DELETE FROM crisis_pools WHERE scene_id = ?", (scene_id,))
 
-        action_type = "add_xp" if amount > 0 else "remove_xp"
-        await self.db.log_action(
-            campaign_id, actor_id, action_type,
-            {"player_id": player_id, "player": player_name, "amount": amount, "from": old_xp, "to": new_xp},
-            {"action": "update", "table": "players", "id": player_id, "field": "xp", "value": old_xp},
-        )
-        return {"player": player_name, "from": old_xp, "to": new_xp}
+            cursor = await conn.execute(
+                """SELECT s.*, st.name AS stress_type_name
+                   FROM stress s JOIN stress_types st ON s.stress_type_id = st.id
+                   WHERE s.campaign_id = ?
+                   ORDER BY st.name""",
+                (campaign_id,),
+            )
+            stress_by_player: dict[int, list[dict]] = {}
+            for r in await cursor.fetchall():
+                stress_by_player.setdefault(r["player_id"], []).append(dict(r))
+
+            eliminated: set[int] = set()
+            stepped: dict[int, int] = {}
+            if bridge:
+                non_gm = "player_id IN (SELECT id FROM players WHERE campaign_id = ? AND is_gm = 0)"
+                cursor = await conn.execute(
+                    f"""DELETE FROM stress
+                        WHERE campaign_id = ? AND die_size <= {VALID_SIZES[0]} AND {non_gm}
+                        RETURNING id""",
+                    (campaign_id, campaign_id),
+                )
+                eliminated = {r["id"] for r in await cursor.fetchall()}
+                cursor = await conn.execute(
+                    f"""UPDATE stress SET die_size = {STEP_DOWN_SQL}
+                        WHERE campaign_id = ? AND die_size > {VALID_SIZES[0]} AND {non_gm}
+                        RETURNING id, die_size""",
+                    (campaign_id, campaign_id),
+                )
+                stepped = {r["id"]: r["die_size"] for r in await cursor.fetchall()}
+
+            stress_changes: list[dict] = []
+            remaining: dict[int, list[dict]] = {p["id"]: [] for p in players}
+            inverse_stress: list[dict] = []
+            for player in players:
+                for row in stress_by_player.get(player["id"], []):
+                    change = {"player": player["name"], "type": row["stress_type_name"]}
+                    if row["id"] in eliminated:
+                        stress_changes.append({**change, "eliminated": True, "from": row["die_size"]})
+                        inverse_stress.append(_restore("stress", row, _STRESS_COLUMNS))
+                        continue
+                    if row["id"] in stepped:
+                        stress_changes.append({**change, "from": row["die_size"], "to": stepped[row["id"]]})
+                        inverse_stress.append({
+                            "action": "update", "table": "stress", "id": row["id"],
+                            "field": "die_size", "value": row["die_size"],
+                        })
+                    remaining[player["id"]].append(
+                        {**row, "die_size": stepped.get(row["id"], row["die_size"])}
+                    )
 
-    async def execute_undo(self, inverse_data: dict) -> None:
-        """Execute an inverse action to undo a previous operation."""
+            cursor = await conn.execute(
+                "SELECT * FROM doom_pool_dice WHERE campaign_id = ? ORDER BY die_size",
+                (campaign_id,),
+            )
+            doom_pool = [dict(r) for r in await cursor.fetchall()]
+
+            steps = [{
+                "action": "update", "table": "scenes", "id": scene_id,
+                "field": "is_active", "value": 1,
+            }]
+            steps += [_restore("assets", a, _ASSET_COLUMNS) for a in removed_assets]
+            steps += [_restore("complications", c, _COMPLICATION_COLUMNS) for c in removed_complications]
+            for cp in removed_crisis_pools:
+                steps.append(_restore("crisis_pools", cp, ("id", "campaign_id", "scene_id", "name")))
+                steps += [
+                    _restore("crisis_pool_dice", d, ("id", "crisis_pool_id", "die_size"))
+                    for d in cp["dice"]
+                ]
+            steps += inverse_stress
+            await self.db.log_action(
+                campaign_id, actor_id, "end_scene",
+                {
+                    "scene": scene["name"] or "unnamed", "bridge": bridge,
+                    "assets": len(removed_assets),
+                    "complications": len(removed_complications),
+                    "crisis_pools": len(removed_crisis_pools),
+                    "stress": len(stress_changes),
+                },
+                {"action": "composite", "campaign_id": campaign_id, "steps": steps},
+                conn=conn,
+            )
+
+        return {
+            "removed_assets": removed_assets,
+            "removed_complications": removed_complications,
+            "removed_crisis_pools": removed_crisis_pools,
+            "stress_changes": stress_changes,
+            "remaining_stress": [(p["name"], remaining[p["id"]]) for p in players],
+            "doom_pool": doom_pool,
+        }
+
+    @_in_lane
+    async def undo(
+        self, campaign_id: int, count: int = 1, actor_discord_id: str | None = None
+    ) -> list[dict]:
+        """Undo the ``count`` newest actions (only the actor's own if given).
+
+        The actions are read with one query and reversed newest first in a
+        single transaction, which also marks them undone and stores what
+        ``redo`` needs. If any step is refused, or another undo got to one
+        of the actions first, the whole batch rolls back.
+        Returns the undone actions, newest first.
+        """
+        actions = await self.db.get_undo_actions(campaign_id, count, actor_discord_id)
+        if not actions:
+            return []
+        async with self.db.transaction() as conn:
+            updates = []
+            for action in actions:
+                redo_steps = await self._apply_steps(conn, _steps(action["inverse_data"]))
+                updates.append((json.dumps(redo_steps[::-1]), action["id"]))
+            cursor = await conn.executemany(
+                "UPDATE action_log SET undone = 1, redo_data = ? WHERE id = ? AND undone = 0",
+                updates,
+            )
+            if cursor.rowcount != len(actions):
+                raise ValueError("Undo blocked: those actions changed meanwhile. Try again.")
+        self.db.autocomplete.invalidate(campaign_id)
+        self.db.invalidate_campaign_state(campaign_id)
+        return actions
+
+    @_in_lane
+    async def redo(
+        self, campaign_id: int, count: int = 1, actor_discord_id: str | None = None
+    ) -> list[dict]:
+        """Re-apply the ``count`` most recently undone actions, oldest first."""
+        actions = await self.db.get_redo_actions(campaign_id, count, actor_discord_id)
+        if not actions:
+            return []
+        async with self.db.transaction() as conn:
+            for action in actions:
+                await self._apply_steps(conn, action["redo_data"])
+            cursor = await conn.executemany(
+                "UPDATE action_log SET undone = 0, redo_data = NULL WHERE id = ? AND undone = 1",
+                [(action["id"],) for action in actions],
+            )
+            if cursor.rowcount != len(actions):
+                raise ValueError("Redo blocked: those actions changed meanwhile. Try again.")
+        self.db.autocomplete.invalidate(campaign_id)
+        self.db.invalidate_campaign_state(campaign_id)
+        return actions
+
+    async def execute_undo(self, inverse_data: dict) -> list[dict]:
+        """Execute an inverse action to undo a previous operation.
+
+        A ``composite`` inverse applies each of its ``steps`` in order,
+        all in one transaction. Returns the steps that would redo it.
+        """
+        async with self.db.transaction() as conn:
+            redo_steps = await self._apply_steps(conn, _steps(inverse_data))
+        if inverse_data["action"] == "composite":
+            self.db.autocomplete.invalidate(inverse_data["campaign_id"])
+            self.db.invalidate_campaign_state(inverse_data["campaign_id"])
+        else:
+            self.db.autocomplete.invalidate(table=inverse_data["table"])
+            self.db.invalidate_campaign_state()
+        return redo_steps[::-1]
+
+    @classmethod
+    async def _apply_steps(cls, conn, steps: list[dict]) -> list[dict]:
+        redo_steps = []
+        for step in steps:
+            redo = await cls._apply_inverse(conn, step)
+            if redo is not None:
+                redo_steps.append(redo)
+        return redo_steps
+
+    @staticmethod
+    async def _apply_inverse(conn, inverse_data: dict) -> dict | None:
+        """Apply one inverse step and return the step that reverses it.
+
+        Returns None when the step had nothing to act on.
+        """
         action = inverse_data["action"]
         table = inverse_data["table"]
 
         if table not in UNDO_ALLOWED_TABLES:
             raise ValueError(f"Undo blocked: invalid table '{table}'")
 
-        async with self.db.connect() as conn:
-            if action == "delete":
-                await conn.execute(
-                    f"DELETE FROM {table} WHERE id = ?",
+        if action == "delete":
+            cursor = await conn.execute(
+                f"DELETE FROM {table} WHERE id = ? RETURNING *",
+                (inverse_data["id"],),
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            return {
+                "action": "insert", "table": table,
+                "data": {k: row[k] for k in row.keys() if k in UNDO_ALLOWED_COLUMNS},
+            }
+        elif action == "insert":
+            data = inverse_data["data"]
+            bad_cols = set(data.keys()) - UNDO_ALLOWED_COLUMNS
+            if bad_cols:
+                raise ValueError(f"Undo blocked: invalid columns {bad_cols}")
+            columns = ", ".join(data.keys())
+            placeholders = ", ".join("?" for _ in data)
+            cursor = await conn.execute(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                tuple(data.values()),
+            )
+            return {"action": "delete", "table": table, "id": cursor.lastrowid}
+        elif action == "update":
+            field = inverse_data["field"]
+            if field not in UNDO_ALLOWED_FIELDS:
+                raise ValueError(f"Undo blocked: invalid field '{field}'")
+            if table == "scenes" and field == "is_active" and inverse_data["value"]:
+                cursor = await conn.execute(
+                    """SELECT 1 FROM scenes WHERE is_active = 1 AND campaign_id =
+                       (SELECT campaign_id FROM scenes WHERE id = ?)""",
                     (inverse_data["id"],),
                 )
-            elif action == "insert":
-                data = inverse_data["data"]
-                bad_cols = set(data.keys()) - UNDO_ALLOWED_COLUMNS
-                if bad_cols:
-                    raise ValueError(f"Undo blocked: invalid columns {bad_cols}")
-                columns = ", ".join(data.keys())
-                placeholders = ", ".join("?" for _ in data)
-                await conn.execute(
-                    f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
-                    tuple(data.values()),
-                )
-            elif action == "update":
-                field = inverse_data["field"]
-                if field not in UNDO_ALLOWED_FIELDS:
-                    raise ValueError(f"Undo blocked: invalid field '{field}'")
-                await conn.execute(
-                    f"UPDATE {table} SET {field} = ? WHERE id = ?",
-                    (inverse_data["value"], inverse_data["id"]),
-                )
-            else:
-                raise ValueError(f"Undo blocked: invalid action '{action}'")
-            await conn.commit()
+                if await cursor.fetchone() is not None:
+                    raise ValueError("Undo blocked: another scene is active. End it first.")
+            cursor = await conn.execute(
+                f"SELECT {field} FROM {table} WHERE id = ?", (inverse_data["id"],)
+            )
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            await conn.execute(
+                f"UPDATE {table} SET {field} = ? WHERE id = ?",
+                (inverse_data["value"], inverse_data["id"]),
+            )
+            return {
+                "action": "update", "table": table, "id": inverse_data["id"],
+                "field": field, "value": row[0],
+            }
+        else:
+            raise ValueError(f"Undo blocked: invalid action '{action}'")
@@ -22,7 +22,11 @@ def register_persistent_views(bot) -> None:
         PPStartButton,
         XPStartButton,
     )
-    from cortex_bot.views.doom_views import DoomAddStartButton
+    from cortex_bot.views.doom_views import (
+        DoomAddStartButton,
+        DoomRemoveButton,
+        DoomRollButton,
+    )
 
     bot.add_dynamic_items(
         UndoButton,
@@ -38,4 +42,6 @@ def register_persistent_views(bot) -> None:
         PPStartButton,
         XPStartButton,
         DoomAddStartButton,
+        DoomRemoveButton,
+        DoomRollButton,
     )
@@ -6,18 +6,52 @@ from typing import Any
 
 import discord
 
+from cortex_bot.config import settings
+from cortex_bot.context import get_actor, get_context
+from cortex_bot.models.rows import Campaign, Player
 from cortex_bot.utils import has_gm_permission
+from cortex_bot.views.registry import EphemeralViewRegistry
 
 DIE_SIZES = [4, 6, 8, 10, 12]
 
+ephemeral_views = EphemeralViewRegistry(settings.view_max)
+
 
 class CortexView(discord.ui.View):
-    """Base view with timeout=None for persistent buttons."""
+    """Base view with timeout=None for persistent buttons.
+
+    Only DynamicItems belong here; anything else would keep the view in
+    the client's view store for the life of the process.
+    """
 
     def __init__(self) -> None:
         super().__init__(timeout=None)
 
 
+class EphemeralView(discord.ui.View):
+    """Base view for one-off pickers and builders.
+
+    Expires after ``settings.view_ttl`` seconds without an interaction and
+    is tracked in ``ephemeral_views``, which stops the least recently used
+    view once ``settings.view_max`` are alive.
+    """
+
+    def __init__(self, timeout: float | None = None) -> None:
+        super().__init__(timeout=settings.view_ttl if timeout is None else timeout)
+        ephemeral_views.add(self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        ephemeral_views.touch(self)
+        return True
+
+    async def on_timeout(self) -> None:
+        ephemeral_views.discard(self, expired=True)
+
+    def stop(self) -> None:
+        ephemeral_views.discard(self)
+        super().stop()
+
+
 def parse_custom_id(custom_id: str) -> tuple[str, list[str]]:
     """Parse a cortex custom_id into action and params.
 
@@ -46,14 +80,13 @@ def make_custom_id(action: str, *params: str | int) -> str:
 
 async def check_gm_permission(
     interaction: discord.Interaction, campaign_id: int
-) -> dict | None:
+) -> Player | None:
     """Check if the interacting user has GM permission.
 
-    Returns the player dict if authorized, None otherwise.
+    Returns the player if authorized, None otherwise.
     Sends an ephemeral error response if permission denied.
     """
-    db = interaction.client.db
-    player = await db.get_player(campaign_id, str(interaction.user.id))
+    player = await get_actor(interaction, campaign_id)
     if player is None or not has_gm_permission(player):
         await interaction.response.send_message(
             "Only the GM or delegates can use this command.",
@@ -65,15 +98,12 @@ async def check_gm_permission(
 
 async def get_campaign_from_channel(
     interaction: discord.Interaction,
-) -> dict | None:
+) -> Campaign | None:
     """Get the campaign for the current channel.
 
-    Returns the campaign dict, or None with ephemeral error.
+    Returns the campaign, or None with ephemeral error.
     """
-    db = interaction.client.db
-    server_id = str(interaction.guild_id)
-    channel_id = str(interaction.channel_id)
-    campaign = await db.get_campaign_by_channel(server_id, channel_id)
+    campaign = (await get_context(interaction)).campaign
     if campaign is None:
         await interaction.response.send_message(
             "No active campaign in this channel. Use /campaign setup to create one.",
@@ -84,7 +114,7 @@ async def get_campaign_from_channel(
 
 async def validate_campaign_channel(
     interaction: discord.Interaction, campaign_id: int
-) -> dict | None:
+) -> Campaign | None:
     """Validate that a campaign belongs to the current channel.
 
     Persistent buttons embed campaign_id in their custom_id.  Without
@@ -92,11 +122,13 @@ async def validate_campaign_channel(
     (via message links, shared channels, or crafted webhooks) could read
     or mutate state from another server/channel.
 
-    Returns the campaign dict on success, or None after sending an
+    Returns the campaign on success, or None after sending an
     ephemeral error to the interaction.
     """
-    db = interaction.client.db
-    campaign = await db.get_campaign_by_id(campaign_id)
+    ctx = await get_context(interaction)
+    if ctx.campaign_id == campaign_id:
+        return ctx.campaign
+    campaign = await interaction.client.db.get_campaign_by_id(campaign_id)
     if campaign is None:
         await interaction.response.send_message(
             "Campaign not found.", ephemeral=True
@@ -4,6 +4,7 @@ import re
 
 import discord
 
+from cortex_bot.context import get_actor
 from cortex_bot.views.base import (
     CortexView,
     make_custom_id,
@@ -46,32 +47,30 @@ class UndoButton(
 
         db = interaction.client.db
         user_id = str(interaction.user.id)
-        player = await db.get_player(self.campaign_id, user_id)
+        player = await get_actor(interaction, self.campaign_id)
 
         can_undo_all = player is not None and has_gm_permission(player)
+        actor = None if can_undo_all else user_id
 
-        if can_undo_all:
-            action = await db.get_last_undoable_action(self.campaign_id)
-        else:
-            action = await db.get_last_undoable_action(
-                self.campaign_id, actor_discord_id=user_id
-            )
+        state_manager = StateManager(db)
+        try:
+            actions = await state_manager.undo(self.campaign_id, 1, actor)
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc), ephemeral=True)
+            return
 
-        if action is None:
+        if not actions:
             await interaction.response.send_message(
                 "Nothing to undo.", ephemeral=True
             )
             return
 
-        state_manager = StateManager(db)
-        await state_manager.execute_undo(action["inverse_data"])
-        await db.mark_action_undone(action["id"])
-
-        from cortex_bot.cogs.undo import _format_undo_message
+        from cortex_bot.cogs.undo import format_undo_result
 
-        msg = _format_undo_message(action["action_type"], action["action_data"])
         view = PostUndoView(self.campaign_id)
-        await interaction.response.send_message(f"Undone: {msg}", view=view)
+        await interaction.response.send_message(
+            format_undo_result("Undone", actions), view=view
+        )
 
 
 class CampaignInfoButton(
@@ -108,48 +107,23 @@ class CampaignInfoButton(
 
         from cortex_bot.services.formatter import format_campaign_info
 
-        config = campaign["config"]
-        players = await db.get_players(self.campaign_id)
-        scene = await db.get_active_scene(self.campaign_id)
-
-        player_states: dict[int, dict] = {}
-        for p in players:
-            pid = p["id"]
-            state: dict = {}
-            state["stress"] = await db.get_player_stress(self.campaign_id, pid)
-            state["assets"] = await db.get_player_assets(self.campaign_id, pid)
-            state["complications"] = await db.get_player_complications(
-                self.campaign_id, pid
+        async def render() -> tuple[str, bool]:
+            snapshot = await db.get_campaign_snapshot(self.campaign_id, campaign["config"])
+            scene = snapshot["scene"]
+            text = format_campaign_info(
+                campaign=campaign,
+                players=snapshot["players"],
+                player_states=snapshot["player_states"],
+                scene=scene,
+                doom_pool=snapshot["doom_pool"],
+                scene_assets=snapshot["scene_assets"],
+                scene_complications=snapshot["scene_complications"],
+                crisis_pools=snapshot["crisis_pools"],
             )
-            if config.get("trauma"):
-                state["trauma"] = await db.get_player_trauma(self.campaign_id, pid)
-            if config.get("hero_dice"):
-                state["hero_dice"] = await db.get_hero_dice(self.campaign_id, pid)
-            player_states[pid] = state
-
-        doom_pool = None
-        if config.get("doom_pool"):
-            doom_pool = await db.get_doom_pool(self.campaign_id)
-
-        scene_assets = None
-        scene_complications = None
-        crisis_pools = None
-        if scene is not None:
-            scene_assets = await db.get_scene_assets(scene["id"])
-            scene_complications = await db.get_scene_complications(scene["id"])
-            crisis_pools = await db.get_crisis_pools(scene["id"])
-
-        text = format_campaign_info(
-            campaign=campaign,
-            players=players,
-            player_states=player_states,
-            scene=scene,
-            doom_pool=doom_pool,
-            scene_assets=scene_assets,
-            scene_complications=scene_complications,
-            crisis_pools=crisis_pools,
-        )
-        view = PostInfoView(self.campaign_id, has_active_scene=scene is not None)
+            return text, scene is not None
+
+        text, has_scene = await db.render(self.campaign_id, "info_button", render)
+        view = PostInfoView(self.campaign_id, has_active_scene=has_scene)
         await interaction.response.send_message(text, view=view)
 
 
@@ -5,9 +5,8 @@ import uuid
 
 import discord
 
-from cortex_bot.views.base import CortexView, make_custom_id, check_gm_permission, validate_campaign_channel, add_die_buttons
-from cortex_bot.models.dice import die_label, parse_single_die
-from cortex_bot.services.roller import roll_pool, calculate_best_options
+from cortex_bot.views.base import CortexView, EphemeralView, make_custom_id, check_gm_permission, validate_campaign_channel, add_die_buttons
+from cortex_bot.models.dice import MAX_POOL_DICE, DicePool, die_label, parse_single_die
 
 
 class DoomAddStartButton(
@@ -58,7 +57,7 @@ class DoomAddStartButton(
         )
 
 
-class DoomDieSelectView(CortexView):
+class DoomDieSelectView(EphemeralView):
     """Select die to add to doom pool."""
 
     def __init__(self, campaign_id: int, actor_id: str) -> None:
@@ -71,21 +70,27 @@ class DoomDieSelectView(CortexView):
     ) -> None:
         db = interaction.client.db
 
-        async with db.connect() as conn:
-            cursor = await conn.execute(
-                "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
-                (self.campaign_id, die_size),
+        async with db.transaction(self.campaign_id) as conn:
+            full = await db.doom_pool_space(conn, self.campaign_id) < 1
+            if not full:
+                cursor = await conn.execute(
+                    "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
+                    (self.campaign_id, die_size),
+                )
+                doom_die_id = cursor.lastrowid
+                await db.log_action(
+                    self.campaign_id,
+                    self.actor_id,
+                    "doom_add",
+                    {"die_size": die_size},
+                    {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
+                    conn=conn,
+                )
+        if full:
+            await interaction.response.send_message(
+                f"The Doom Pool can have at most {MAX_POOL_DICE} dice.", ephemeral=True
             )
-            doom_die_id = cursor.lastrowid
-            await conn.commit()
-
-        await db.log_action(
-            self.campaign_id,
-            self.actor_id,
-            "doom_add",
-            {"die_size": die_size},
-            {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
-        )
+            return
 
         pool = await db.get_doom_pool(self.campaign_id)
         labels = [die_label(d["die_size"]) for d in pool]
@@ -97,17 +102,26 @@ class DoomDieSelectView(CortexView):
         await interaction.followup.send(msg, view=view)
 
 
-class DoomRemoveButton(discord.ui.Button):
-    """Non-persistent button for doom remove (in post-action view)."""
+class DoomRemoveButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cortex:doom_remove_btn:(?P<campaign_id>\d+)",
+):
+    """Persistent Doom Remove button in the post-action view."""
 
     def __init__(self, campaign_id: int) -> None:
         self.campaign_id = campaign_id
         super().__init__(
-            label="Doom Remove",
-            style=discord.ButtonStyle.secondary,
-            custom_id=make_custom_id("doom_remove_btn", campaign_id),
+            discord.ui.Button(
+                label="Doom Remove",
+                style=discord.ButtonStyle.secondary,
+                custom_id=make_custom_id("doom_remove_btn", campaign_id),
+            )
         )
 
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["campaign_id"]))
+
     async def callback(self, interaction: discord.Interaction) -> None:
         gm = await check_gm_permission(interaction, self.campaign_id)
         if gm is None:
@@ -156,7 +170,7 @@ class DoomRemoveButton(discord.ui.Button):
         )
 
 
-class DoomRemoveSelectView(CortexView):
+class DoomRemoveSelectView(EphemeralView):
     """Handles die removal from doom pool."""
 
     def __init__(self, campaign_id: int, actor_id: str) -> None:
@@ -168,13 +182,26 @@ class DoomRemoveSelectView(CortexView):
         self, interaction: discord.Interaction, size: int
     ) -> None:
         db = interaction.client.db
-        pool = await db.get_doom_pool(self.campaign_id)
-
-        target = None
-        for d in pool:
-            if d["die_size"] == size:
-                target = d
-                break
+        async with db.lane(self.campaign_id):
+            pool = await db.get_doom_pool(self.campaign_id)
+            target = next((d for d in pool if d.die_size == size), None)
+            if target is not None:
+                async with db.transaction() as conn:
+                    await conn.execute(
+                        "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
+                    )
+                    await db.log_action(
+                        self.campaign_id,
+                        self.actor_id,
+                        "doom_remove",
+                        {"die_size": size},
+                        {
+                            "action": "insert",
+                            "table": "doom_pool_dice",
+                            "data": {"id": target["id"], "campaign_id": self.campaign_id, "die_size": size},
+                        },
+                        conn=conn,
+                    )
 
         if target is None:
             await interaction.response.edit_message(
@@ -182,24 +209,6 @@ class DoomRemoveSelectView(CortexView):
             )
             return
 
-        async with db.connect() as conn:
-            await conn.execute(
-                "DELETE FROM doom_pool_dice WHERE id = ?", (target["id"],)
-            )
-            await conn.commit()
-
-        await db.log_action(
-            self.campaign_id,
-            self.actor_id,
-            "doom_remove",
-            {"die_size": size},
-            {
-                "action": "insert",
-                "table": "doom_pool_dice",
-                "data": {"campaign_id": self.campaign_id, "die_size": size},
-            },
-        )
-
         pool = await db.get_doom_pool(self.campaign_id)
         labels = [die_label(d["die_size"]) for d in pool]
         pool_str = ", ".join(labels) if labels else "empty"
@@ -210,17 +219,26 @@ class DoomRemoveSelectView(CortexView):
         await interaction.followup.send(msg, view=view)
 
 
-class DoomRollButton(discord.ui.Button):
-    """Non-persistent button for doom roll."""
+class DoomRollButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"cortex:doom_roll_btn:(?P<campaign_id>\d+)",
+):
+    """Persistent Doom Roll button."""
 
     def __init__(self, campaign_id: int) -> None:
         self.campaign_id = campaign_id
         super().__init__(
-            label="Doom Roll",
-            style=discord.ButtonStyle.primary,
-            custom_id=make_custom_id("doom_roll_btn", campaign_id),
+            discord.ui.Button(
+                label="Doom Roll",
+                style=discord.ButtonStyle.primary,
+                custom_id=make_custom_id("doom_roll_btn", campaign_id),
+            )
         )
 
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["campaign_id"]))
+
     async def callback(self, interaction: discord.Interaction) -> None:
         gm = await check_gm_permission(interaction, self.campaign_id)
         if gm is None:
@@ -234,8 +252,13 @@ class DoomRollButton(discord.ui.Button):
             )
             return
 
-        roll_sizes = [d["die_size"] for d in pool]
-        results = roll_pool(roll_sizes)
+        try:
+            dice_pool = DicePool.from_sizes([d["die_size"] for d in pool])
+        except ValueError as exc:
+            await interaction.response.send_message(str(exc), ephemeral=True)
+            return
+        rolled = dice_pool.roll()
+        results = rolled.results()
 
         lines: list[str] = []
         lines.append(f"Doom Pool rolled: {len(results)} dice.")
@@ -245,7 +268,7 @@ class DoomRollButton(discord.ui.Button):
             dice_parts.append(f"{die_label(size)}: {value}")
         lines.append(", ".join(dice_parts) + ".")
 
-        best_options = calculate_best_options(results)
+        best_options = rolled.best_options()
         if best_options:
             for opt in best_options:
                 lines.append(
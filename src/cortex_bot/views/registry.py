@@ -0,0 +1,86 @@
+"""Bounded registry of live ephemeral views.
+
+Persistent buttons are DynamicItems: discord.py matches them by custom_id
+template and never keeps the view around. Pickers and builders are
+different, their uuid-suffixed components only exist inside the view
+object, which the client's view store holds until it stops. Ephemeral
+views therefore expire after an idle TTL, and this registry caps how many
+can be alive at once: past ``max_views`` the least recently used view is
+stopped, which also removes it from discord.py's store.
+
+The registry only holds weak references, so views that were built but
+never sent drop out on their own.
+"""
+
+import logging
+import sys
+import weakref
+from collections import OrderedDict
+
+import discord
+
+log = logging.getLogger(__name__)
+
+
+def approx_view_size(view: discord.ui.View) -> int:
+    """Rough retained size in bytes of a view, its attributes and its items."""
+    size = sys.getsizeof(view) + sys.getsizeof(vars(view))
+    for value in vars(view).values():
+        if isinstance(value, (list, dict, set, tuple, str)):
+            size += sys.getsizeof(value)
+    for item in view.walk_children():
+        size += sys.getsizeof(item) + sys.getsizeof(vars(item))
+    return size
+
+
+class EphemeralViewRegistry:
+    """LRU set of live ephemeral views with eviction and expiry counters."""
+
+    def __init__(self, max_views: int) -> None:
+        self.max_views = max(max_views, 1)
+        self._views: OrderedDict[int, weakref.ref[discord.ui.View]] = OrderedDict()
+        self.registered = 0
+        self.evicted = 0
+        self.expired = 0
+        self.peak = 0
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    def add(self, view: discord.ui.View) -> None:
+        key = id(view)
+        self._views[key] = weakref.ref(view, lambda _, key=key: self._views.pop(key, None))
+        self.registered += 1
+        while len(self._views) > self.max_views:
+            _, ref = self._views.popitem(last=False)
+            oldest = ref()
+            if oldest is not None:
+                self.evicted += 1
+                log.debug("Evicting ephemeral view %s (%d live)", type(oldest).__name__, len(self._views))
+                oldest.stop()
+        self.peak = max(self.peak, len(self._views))
+
+    def touch(self, view: discord.ui.View) -> None:
+        """Mark ``view`` as most recently used."""
+        if id(view) in self._views:
+            self._views.move_to_end(id(view))
+
+    def discard(self, view: discord.ui.View, expired: bool = False) -> None:
+        if self._views.pop(id(view), None) is not None and expired:
+            self.expired += 1
+
+    def views(self) -> list[discord.ui.View]:
+        return [view for ref in self._views.values() if (view := ref()) is not None]
+
+    def stats(self) -> dict:
+        """Gauge of live views and their approximate memory, plus lifetime counters."""
+        live = self.views()
+        return {
+            "live": len(live),
+            "approx_bytes": sum(approx_view_size(view) for view in live),
+            "peak": self.peak,
+            "max_views": self.max_views,
+            "registered": self.registered,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
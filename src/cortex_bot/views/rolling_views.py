@@ -6,8 +6,10 @@ from collections import Counter
 
 import discord
 
+from cortex_bot.context import get_actor
 from cortex_bot.views.base import (
     CortexView,
+    EphemeralView,
     make_custom_id,
     check_gm_permission,
     validate_campaign_channel,
@@ -15,15 +17,10 @@ from cortex_bot.views.base import (
     add_player_options,
     DIE_SIZES,
 )
-from cortex_bot.models.dice import die_label, VALID_SIZES
+from cortex_bot.models.dice import MAX_POOL_DICE, DicePool, die_label, VALID_SIZES
 from cortex_bot.utils import has_gm_permission
-from cortex_bot.services.roller import (
-    roll_pool,
-    find_hitches,
-    is_botch,
-    calculate_best_options,
-)
 from cortex_bot.services.formatter import format_roll_result
+from cortex_bot.services.probability import IncrementalPool
 
 
 async def execute_player_roll(
@@ -44,13 +41,14 @@ async def execute_player_roll(
     campaign = await db.get_campaign_by_id(campaign_id)
     config = campaign["config"] if campaign else {}
 
-    results = roll_pool(pool)
-    hitches = find_hitches(results)
-    botch = is_botch(results)
+    rolled = DicePool.from_sizes(pool).roll()
+    results = rolled.results()
+    hitches = rolled.hitches()
+    botch = rolled.is_botch()
 
     best_options: list[dict] | None = None
     if config.get("best_mode") and not botch:
-        best_options = calculate_best_options(results)
+        best_options = rolled.best_options()
 
     opposition_elements: list[str] | None = None
     if not is_gm_roll:
@@ -151,7 +149,7 @@ class RollStartButton(
             return
 
         db = interaction.client.db
-        player = await db.get_player(self.campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, self.campaign_id)
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Use /campaign join to register.", ephemeral=True
@@ -183,7 +181,7 @@ class RollStartButton(
         )
 
 
-class PoolBuilderView(CortexView):
+class PoolBuilderView(EphemeralView):
     """Interactive pool builder with buttons for dice and toggles (assets, stress, complications)."""
 
     def __init__(
@@ -203,6 +201,7 @@ class PoolBuilderView(CortexView):
         self.pool: list[int] = []
         self.included_toggles: set[str] = set()
         self.history: list[tuple[str, str | int]] = []  # ("die", size) or ("toggle_on/off", str_id)
+        self.odds = IncrementalPool()
         self._uid = uuid.uuid4().hex[:8]
         self._build_components()
 
@@ -214,6 +213,15 @@ class PoolBuilderView(CortexView):
             counts = Counter(self.pool)
             parts = [f"{count}x {die_label(size)}" for size, count in sorted(counts.items())]
             lines.append(f"Pool: {', '.join(parts)}.")
+            self.odds.sync(self.pool)
+            odds = self.odds.odds()
+            chances = ", ".join(
+                f"{difficulty} {p * 100:.0f}%" for difficulty, p in odds["success"].items()
+            )
+            effect = min(VALID_SIZES, key=lambda size: abs(size - odds["expected_effect"]))
+            lines.append(
+                f"Chance to beat {chances}. Expected effect die: {die_label(effect)}."
+            )
         if len(self.toggle_items) > 15:
             lines.append(f"Showing 15 of {len(self.toggle_items)} available items.")
         return "\n".join(lines)
@@ -291,8 +299,19 @@ class PoolBuilderView(CortexView):
             undo_btn.callback = self._on_remove_last
             self.add_item(undo_btn)
 
+    async def _reject_if_full(self, interaction: discord.Interaction) -> bool:
+        """Tell the user and return True if another die would pass ``MAX_POOL_DICE``."""
+        if len(self.pool) < MAX_POOL_DICE:
+            return False
+        await interaction.response.send_message(
+            f"A pool can have at most {MAX_POOL_DICE} dice.", ephemeral=True
+        )
+        return True
+
     def _make_die_callback(self, die_size: int):
         async def callback(interaction: discord.Interaction) -> None:
+            if await self._reject_if_full(interaction):
+                return
             self.pool.append(die_size)
             self.history.append(("die", die_size))
             await self._rebuild(interaction)
@@ -307,6 +326,8 @@ class PoolBuilderView(CortexView):
                 self.pool.remove(item["die_size"])
                 self.history.append(("toggle_off", tid))
             else:
+                if await self._reject_if_full(interaction):
+                    return
                 self.included_toggles.add(tid)
                 self.pool.append(item["die_size"])
                 self.history.append(("toggle_on", tid))
@@ -352,7 +373,11 @@ class PoolBuilderView(CortexView):
             await self._rebuild(interaction)
             return
 
-        action_type, value = self.history.pop()
+        action_type, value = self.history[-1]
+        # Undoing a toggle-off puts its die back, which can overflow the pool.
+        if action_type == "toggle_off" and await self._reject_if_full(interaction):
+            return
+        self.history.pop()
         if action_type == "die":
             self.pool.remove(value)
         elif action_type == "toggle_on":
@@ -437,7 +462,7 @@ class HitchComplicationButton(
         )
 
 
-class HitchPlayerSelectView(CortexView):
+class HitchPlayerSelectView(EphemeralView):
     """Select player to receive hitch complication."""
 
     def __init__(self, campaign_id: int, actor_id: str, hitch_count: int = 1) -> None:
@@ -497,83 +522,84 @@ class ComplicationNameModal(discord.ui.Modal, title="Complication name"):
 
         state_mgr = StateManager(db)
 
-        # Check for existing complication with same name on this player
-        existing_comps = await db.get_player_complications(
-            self.campaign_id, self.player_id
-        )
-        existing = next(
-            (c for c in existing_comps if c["name"].lower() == comp_name.lower()),
-            None,
-        )
+        async with db.lane(self.campaign_id):
+            # Check for existing complication with same name on this player
+            existing_comps = await db.get_player_complications(
+                self.campaign_id, self.player_id
+            )
+            existing = next(
+                (c for c in existing_comps if c["name"].lower() == comp_name.lower()),
+                None,
+            )
 
-        if existing:
-            # Step up existing complication by hitch_count steps (RAW p.17)
-            current_idx = VALID_SIZES.index(existing["die_size"])
-            target_idx = current_idx + self.hitch_count
-            taken_out = target_idx >= len(VALID_SIZES)
-            new_size = VALID_SIZES[min(target_idx, len(VALID_SIZES) - 1)]
-
-            if new_size != existing["die_size"]:
-                async with db.connect() as conn:
-                    await conn.execute(
-                        "UPDATE complications SET die_size = ? WHERE id = ?",
-                        (new_size, existing["id"]),
+            if existing:
+                # Step up existing complication by hitch_count steps (RAW p.17)
+                current_idx = VALID_SIZES.index(existing["die_size"])
+                target_idx = current_idx + self.hitch_count
+                taken_out = target_idx >= len(VALID_SIZES)
+                new_size = VALID_SIZES[min(target_idx, len(VALID_SIZES) - 1)]
+
+                if new_size != existing["die_size"]:
+                    async with db.transaction() as conn:
+                        await conn.execute(
+                            "UPDATE complications SET die_size = ? WHERE id = ?",
+                            (new_size, existing["id"]),
+                        )
+                        await db.log_action(
+                            self.campaign_id, self.actor_id, "step_up_complication",
+                            {"id": existing["id"], "name": comp_name,
+                             "from": existing["die_size"], "to": new_size},
+                            {"action": "update", "table": "complications",
+                             "id": existing["id"], "field": "die_size",
+                             "value": existing["die_size"]},
+                            conn=conn,
+                        )
+
+                if taken_out:
+                    comp_msg = (
+                        f"Complication {comp_name} on {player_name}: "
+                        f"{die_label(existing['die_size'])} exceeded d12. Taken out."
                     )
-                    await conn.commit()
-                await db.log_action(
-                    self.campaign_id, self.actor_id, "step_up_complication",
-                    {"id": existing["id"], "name": comp_name,
-                     "from": existing["die_size"], "to": new_size},
-                    {"action": "update", "table": "complications",
-                     "id": existing["id"], "field": "die_size",
-                     "value": existing["die_size"]},
-                )
-
-            if taken_out:
-                comp_msg = (
-                    f"Complication {comp_name} on {player_name}: "
-                    f"{die_label(existing['die_size'])} exceeded d12. Taken out."
-                )
+                else:
+                    comp_msg = (
+                        f"Complication {comp_name} on {player_name}: "
+                        f"{die_label(existing['die_size'])} to {die_label(new_size)}"
+                    )
+                    if self.hitch_count > 1:
+                        comp_msg += f" ({self.hitch_count} hitches)."
+                    else:
+                        comp_msg += "."
             else:
-                comp_msg = (
-                    f"Complication {comp_name} on {player_name}: "
-                    f"{die_label(existing['die_size'])} to {die_label(new_size)}"
+                # New complication: d6 stepped up by (hitch_count - 1) additional hitches
+                final_index = min(self.hitch_count, len(VALID_SIZES) - 1)
+                die_size = VALID_SIZES[final_index]
+                taken_out = self.hitch_count >= len(VALID_SIZES)
+
+                await state_mgr.add_complication(
+                    self.campaign_id,
+                    self.actor_id,
+                    comp_name,
+                    die_size,
+                    player_id=self.player_id,
+                    scene_id=scene_id,
+                    player_name=player_name,
                 )
-                if self.hitch_count > 1:
-                    comp_msg += f" ({self.hitch_count} hitches)."
-                else:
-                    comp_msg += "."
-        else:
-            # New complication: d6 stepped up by (hitch_count - 1) additional hitches
-            final_index = min(self.hitch_count, len(VALID_SIZES) - 1)
-            die_size = VALID_SIZES[final_index]
-            taken_out = self.hitch_count >= len(VALID_SIZES)
-
-            await state_mgr.add_complication(
-                self.campaign_id,
-                self.actor_id,
-                comp_name,
-                die_size,
-                player_id=self.player_id,
-                scene_id=scene_id,
-                player_name=player_name,
-            )
 
-            comp_msg = (
-                f"Complication {comp_name} {die_label(die_size)} created on {player_name}."
-            )
-            if taken_out:
-                comp_msg += " Exceeded d12, taken out."
-            elif self.hitch_count > 1:
                 comp_msg = (
-                    f"Complication {comp_name} {die_label(die_size)} created on {player_name} "
-                    f"({self.hitch_count} hitches, d6 + {self.hitch_count - 1} step ups)."
+                    f"Complication {comp_name} {die_label(die_size)} created on {player_name}."
                 )
+                if taken_out:
+                    comp_msg += " Exceeded d12, taken out."
+                elif self.hitch_count > 1:
+                    comp_msg = (
+                        f"Complication {comp_name} {die_label(die_size)} created on {player_name} "
+                        f"({self.hitch_count} hitches, d6 + {self.hitch_count - 1} step ups)."
+                    )
 
-        # Give 1 PP to the target player (only 1 regardless of hitch count, RAW p.17)
-        pp_result = await state_mgr.update_pp(
-            self.campaign_id, self.actor_id, self.player_id, 1, player_name
-        )
+            # Give 1 PP to the target player (only 1 regardless of hitch count, RAW p.17)
+            pp_result = await state_mgr.update_pp(
+                self.campaign_id, self.actor_id, self.player_id, 1, player_name
+            )
         pp_msg = f"{player_name} received 1 PP (now {pp_result['to']})."
 
         view = PostRollView(self.campaign_id)
@@ -617,23 +643,28 @@ class HitchDoomButton(
         actor_id = str(interaction.user.id)
 
         doom_die_ids = []
-        async with db.connect() as conn:
-            for _ in range(self.hitch_count):
+        async with db.transaction(self.campaign_id) as conn:
+            full = await db.doom_pool_space(conn, self.campaign_id) < self.hitch_count
+            for _ in range(0 if full else self.hitch_count):
                 cursor = await conn.execute(
                     "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
                     (self.campaign_id, 6),
                 )
                 doom_die_ids.append(cursor.lastrowid)
-            await conn.commit()
-
-        for doom_die_id in doom_die_ids:
-            await db.log_action(
-                self.campaign_id,
-                actor_id,
-                "doom_add",
-                {"die_size": 6},
-                {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
+            for doom_die_id in doom_die_ids:
+                await db.log_action(
+                    self.campaign_id,
+                    actor_id,
+                    "doom_add",
+                    {"die_size": 6},
+                    {"action": "delete", "table": "doom_pool_dice", "id": doom_die_id},
+                    conn=conn,
+                )
+        if full:
+            await interaction.response.send_message(
+                f"The Doom Pool can have at most {MAX_POOL_DICE} dice.", ephemeral=True
             )
+            return
 
         pool = await db.get_doom_pool(self.campaign_id)
         labels = [die_label(d["die_size"]) for d in pool]
@@ -4,6 +4,7 @@ import re
 
 import discord
 
+from cortex_bot.services.state_manager import StateManager
 from cortex_bot.views.base import CortexView, make_custom_id, check_gm_permission, validate_campaign_channel
 
 
@@ -41,22 +42,15 @@ class SceneStartButton(
             return
 
         db = interaction.client.db
-        active = await db.get_active_scene(self.campaign_id)
-        if active is not None:
-            label = active["name"] or "unnamed"
+        started = await StateManager(db).start_scene(self.campaign_id)
+        if "error" in started:
+            label = started["active"]["name"] or "unnamed"
             await interaction.response.send_message(
                 f"There is already an active scene: {label}. End it before starting another.",
                 ephemeral=True,
             )
             return
 
-        async with db.connect() as conn:
-            await conn.execute(
-                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1)",
-                (self.campaign_id, None),
-            )
-            await conn.commit()
-
         campaign = await db.get_campaign_by_id(self.campaign_id)
         doom_enabled = campaign["config"].get("doom_pool", False) if campaign else False
 
@@ -5,8 +5,10 @@ import uuid
 
 import discord
 
+from cortex_bot.context import get_actor
 from cortex_bot.views.base import (
     CortexView,
+    EphemeralView,
     make_custom_id,
     check_gm_permission,
     validate_campaign_channel,
@@ -75,7 +77,7 @@ class StressAddStartButton(
         )
 
 
-class StressPlayerSelectView(CortexView):
+class StressPlayerSelectView(EphemeralView):
     """Select player for stress add."""
 
     def __init__(self, campaign_id: int, actor_id: str) -> None:
@@ -122,7 +124,7 @@ class StressPlayerSelectView(CortexView):
         )
 
 
-class StressTypeSelectView(CortexView):
+class StressTypeSelectView(EphemeralView):
     """Select stress type via dynamic buttons."""
 
     def __init__(self, campaign_id: int, actor_id: str, player_id: int) -> None:
@@ -147,7 +149,7 @@ class StressTypeSelectView(CortexView):
         )
 
 
-class StressDieSelectView(CortexView):
+class StressDieSelectView(EphemeralView):
     """Select die for stress add, then execute."""
 
     def __init__(
@@ -164,13 +166,9 @@ class StressDieSelectView(CortexView):
     ) -> None:
         db = interaction.client.db
 
-        async with db.connect() as conn:
-            cursor = await conn.execute(
-                "SELECT name FROM players WHERE id = ?", (self.player_id,)
-            )
-            row = await cursor.fetchone()
-            player_name = row["name"] if row else "Player"
-
+        player = await db.get_player_by_id(self.player_id)
+        player_name = player.name if player else "Player"
+        async with db.read() as conn:
             cursor = await conn.execute(
                 "SELECT name FROM stress_types WHERE id = ?", (self.stress_type_id,)
             )
@@ -247,7 +245,7 @@ class AssetAddStartButton(
             return
 
         db = interaction.client.db
-        player = await db.get_player(self.campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, self.campaign_id)
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Use /campaign join to register.", ephemeral=True
@@ -274,7 +272,7 @@ class AssetAddStartButton(
         )
 
 
-class AssetOwnerSelectView(CortexView):
+class AssetOwnerSelectView(EphemeralView):
     """Select owner for asset add."""
 
     def __init__(self, campaign_id: int, actor_id: str, actor: dict) -> None:
@@ -316,7 +314,7 @@ class AssetOwnerSelectView(CortexView):
         )
 
 
-class AssetNameSelectView(CortexView):
+class AssetNameSelectView(EphemeralView):
     """Select asset name."""
 
     def __init__(
@@ -356,7 +354,7 @@ class AssetNameSelectView(CortexView):
         )
 
 
-class AssetDieSelectView(CortexView):
+class AssetDieSelectView(EphemeralView):
     """Select die for asset, then execute."""
 
     def __init__(
@@ -447,7 +445,7 @@ class ComplicationAddStartButton(
             return
 
         db = interaction.client.db
-        player = await db.get_player(self.campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, self.campaign_id)
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Use /campaign join to register.", ephemeral=True
@@ -474,7 +472,7 @@ class ComplicationAddStartButton(
         )
 
 
-class CompTargetSelectView(CortexView):
+class CompTargetSelectView(EphemeralView):
     """Select target for complication add."""
 
     def __init__(self, campaign_id: int, actor_id: str, actor: dict) -> None:
@@ -516,7 +514,7 @@ class CompTargetSelectView(CortexView):
         )
 
 
-class CompNameSelectView(CortexView):
+class CompNameSelectView(EphemeralView):
     """Select complication name."""
 
     def __init__(
@@ -556,7 +554,7 @@ class CompNameSelectView(CortexView):
         )
 
 
-class CompDieSelectView(CortexView):
+class CompDieSelectView(EphemeralView):
     """Select die for complication, then execute."""
 
     def __init__(
@@ -586,12 +584,8 @@ class CompDieSelectView(CortexView):
         scope = "scene" if self.is_scene else "session"
         player_name = None
         if self.player_id:
-            async with db.connect() as conn:
-                cursor = await conn.execute(
-                    "SELECT name FROM players WHERE id = ?", (self.player_id,)
-                )
-                row = await cursor.fetchone()
-                player_name = row["name"] if row else None
+            player = await db.get_player_by_id(self.player_id)
+            player_name = player.name if player else None
 
         result = await sm.add_complication(
             self.campaign_id,
@@ -650,7 +644,7 @@ class PPStartButton(
             return
 
         db = interaction.client.db
-        player = await db.get_player(self.campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, self.campaign_id)
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Use /campaign join to register.", ephemeral=True
@@ -690,7 +684,7 @@ class PPStartButton(
             )
 
 
-class PPPlayerSelectView(CortexView):
+class PPPlayerSelectView(EphemeralView):
     """Select player for PP adjust."""
 
     def __init__(self, campaign_id: int, actor_id: str) -> None:
@@ -702,12 +696,8 @@ class PPPlayerSelectView(CortexView):
         self, interaction: discord.Interaction, player_id: int
     ) -> None:
         db = interaction.client.db
-        async with db.connect() as conn:
-            cursor = await conn.execute(
-                "SELECT name FROM players WHERE id = ?", (player_id,)
-            )
-            row = await cursor.fetchone()
-            player_name = row["name"] if row else "Player"
+        player = await db.get_player_by_id(player_id)
+        player_name = player.name if player else "Player"
 
         view = PPAdjustView(
             self.campaign_id, self.actor_id, player_id, player_name
@@ -717,7 +707,7 @@ class PPPlayerSelectView(CortexView):
         )
 
 
-class PPAdjustView(CortexView):
+class PPAdjustView(EphemeralView):
     """PP +1 / -1 buttons. Keeps active after each action."""
 
     def __init__(
@@ -812,7 +802,7 @@ class XPStartButton(
             return
 
         db = interaction.client.db
-        player = await db.get_player(self.campaign_id, str(interaction.user.id))
+        player = await get_actor(interaction, self.campaign_id)
         if player is None:
             await interaction.response.send_message(
                 "You are not registered in this campaign. Use /campaign join to register.", ephemeral=True
@@ -848,7 +838,7 @@ class XPStartButton(
             await interaction.response.send_modal(modal)
 
 
-class XPPlayerSelectView(CortexView):
+class XPPlayerSelectView(EphemeralView):
     """Select player for XP add."""
 
     def __init__(self, campaign_id: int, actor_id: str) -> None:
@@ -860,12 +850,8 @@ class XPPlayerSelectView(CortexView):
         self, interaction: discord.Interaction, player_id: int
     ) -> None:
         db = interaction.client.db
-        async with db.connect() as conn:
-            cursor = await conn.execute(
-                "SELECT name FROM players WHERE id = ?", (player_id,)
-            )
-            row = await cursor.fetchone()
-            player_name = row["name"] if row else "Player"
+        player = await db.get_player_by_id(player_id)
+        player_name = player.name if player else "Player"
 
         modal = XPAmountModal(
             self.campaign_id, self.actor_id, player_id, player_name
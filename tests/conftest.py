@@ -0,0 +1,40 @@
+"""Shared fixtures."""
+
+from collections.abc import Awaitable
+from typing import TypeVar
+
+import pytest
+
+T = TypeVar("T")
+
+
+class SQLTrace:
+    """Statements run on the writer connection since the test started."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def run(self, awaitable: Awaitable[T]) -> tuple[list[str], T]:
+        """Await ``awaitable``; return the statements it ran and its result."""
+        before = len(self.statements)
+        result = await awaitable
+        return self.statements[before:], result
+
+    async def __call__(self, awaitable: Awaitable) -> list[str]:
+        """The statements ``awaitable`` ran."""
+        statements, _ = await self.run(awaitable)
+        return statements
+
+
+@pytest.fixture
+async def traced(db):
+    """SQL trace on the writer connection of the module's ``db`` fixture.
+
+    Reads only show up when ``db`` was built with ``pool_size=0``.
+    """
+    trace = SQLTrace()
+    async with db.connect() as conn:
+        await conn.set_trace_callback(trace.statements.append)
+    yield trace
+    async with db.connect() as conn:
+        await conn.set_trace_callback(None)
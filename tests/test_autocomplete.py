@@ -0,0 +1,192 @@
+"""Tests for the autocomplete candidate cache."""
+
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cortex_bot.cogs.rolling import RollingCog
+from cortex_bot.cogs.state import _autocomplete_asset, _autocomplete_player
+from cortex_bot.models.autocomplete import AutocompleteCache
+from cortex_bot.models.database import Database
+from cortex_bot.services.state_manager import StateManager
+
+ROWS = [{"name": "Sword"}, {"name": "Swift Boots"}, {"name": "Shield"}]
+
+
+_interaction_ids = itertools.count(1)
+
+
+def make_interaction(db, user_id="user1"):
+    return SimpleNamespace(
+        id=next(_interaction_ids),
+        guild_id="srv1",
+        channel_id="ch1",
+        user=SimpleNamespace(id=user_id),
+        client=SimpleNamespace(db=db),
+    )
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "autocomplete.db"), pool_size=0)
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+@pytest.fixture
+async def campaign(db):
+    async with db.connect() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES (?, ?, ?, ?)",
+            ("srv1", "ch1", "Test Campaign", json.dumps({})),
+        )
+        campaign_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, ?)",
+            (campaign_id, "gm1", "GameMaster", 1),
+        )
+        cursor = await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, ?)",
+            (campaign_id, "user1", "Alice", 0),
+        )
+        await conn.execute(
+            "INSERT INTO assets (campaign_id, player_id, name, die_size, duration) VALUES (?, ?, ?, ?, ?)",
+            (campaign_id, cursor.lastrowid, "Sword", 8, "session"),
+        )
+        await conn.commit()
+    return campaign_id
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAutocompleteCache:
+    async def test_loader_runs_once_per_key(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return ROWS
+
+        cache = AutocompleteCache()
+        for search in ["", "s", "sw", "swo"]:
+            await cache.search(1, "u", "assets", search, loader)
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 3
+        assert cache.stats()["misses"] == 1
+
+    async def test_case_insensitive_substring(self):
+        async def loader():
+            return ROWS
+
+        cache = AutocompleteCache()
+        assert await cache.search(1, "u", "assets", "SW", loader) == ROWS[:2]
+        assert await cache.search(1, "u", "assets", "boot", loader) == [ROWS[1]]
+        assert await cache.search(1, "u", "assets", "", loader) == ROWS
+
+    async def test_narrowing_only_rescans_previous_matches(self):
+        async def loader():
+            return ROWS
+
+        cache = AutocompleteCache()
+        await cache.search(1, "u", "assets", "sw", loader)
+        entry = cache._entries[(1, "u", "assets")]
+        assert entry.last_matches == [0, 1]
+        assert await cache.search(1, "u", "assets", "swo", loader) == [ROWS[0]]
+        assert entry.last_matches == [0]
+        # Backspacing widens the search again.
+        assert await cache.search(1, "u", "assets", "s", loader) == ROWS
+
+    async def test_ttl_backstop(self):
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return ROWS
+
+        clock = FakeClock()
+        cache = AutocompleteCache(ttl=30.0, clock=clock)
+        await cache.search(1, "u", "assets", "", loader)
+        clock.now = 29.0
+        await cache.search(1, "u", "assets", "", loader)
+        clock.now = 30.0
+        await cache.search(1, "u", "assets", "", loader)
+        assert len(calls) == 2
+
+    async def test_expired_idle_keys_are_swept(self):
+        async def loader():
+            return ROWS
+
+        clock = FakeClock()
+        cache = AutocompleteCache(ttl=30.0, clock=clock)
+        for campaign_id in range(1, 6):
+            await cache.search(campaign_id, "u", "assets", "", loader)
+        clock.now = 45.0
+        await cache.search(9, "u", "assets", "", loader)
+        assert set(cache._entries) == {(9, "u", "assets")}
+
+    async def test_invalidate_by_campaign_and_table(self):
+        async def loader():
+            return ROWS
+
+        cache = AutocompleteCache()
+        for key in [(1, "u", "assets"), (1, "", "players"), (2, "u", "assets")]:
+            await cache.search(*key, "", loader)
+        cache.invalidate(1, "assets")
+        assert set(cache._entries) == {(1, "", "players"), (2, "u", "assets")}
+        cache.invalidate(table="assets")
+        assert set(cache._entries) == {(1, "", "players")}
+        cache.invalidate(1)
+        assert cache.stats()["entries"] == 0
+
+
+class TestAutocompleteCallbacks:
+    async def test_keystrokes_after_the_first_skip_the_database(self, db, campaign, traced):
+        await _autocomplete_asset(make_interaction(db), "s")
+        statements = []
+        for current in ["sw", "swo", "swor"]:
+            statements += await traced(_autocomplete_asset(make_interaction(db), current))
+        assert statements == []
+
+    async def test_mutation_invalidates_the_users_assets(self, db, campaign):
+        choices = await _autocomplete_asset(make_interaction(db), "")
+        assert [c.value for c in choices] == ["Sword"]
+        alice = await db.get_player(campaign, "user1")
+        await StateManager(db).add_asset(campaign, "user1", "Spear", 6, player_id=alice["id"])
+        choices = await _autocomplete_asset(make_interaction(db), "")
+        assert [c.value for c in choices] == ["Spear", "Sword"]
+
+    async def test_undo_invalidates(self, db, campaign):
+        alice = await db.get_player(campaign, "user1")
+        sm = StateManager(db)
+        await sm.add_asset(campaign, "user1", "Spear", 6, player_id=alice["id"])
+        assert len(await _autocomplete_asset(make_interaction(db), "")) == 2
+        action = await db.get_last_undoable_action(campaign)
+        await sm.execute_undo(action["inverse_data"])
+        assert len(await _autocomplete_asset(make_interaction(db), "")) == 1
+
+    async def test_players_are_shared_between_users(self, db, campaign, traced):
+        await _autocomplete_player(make_interaction(db, user_id="user1"), "")
+        statements = await traced(
+            _autocomplete_player(make_interaction(db, user_id="gm1"), "ali")
+        )
+        assert statements == []
+
+    async def test_include_reuses_the_asset_list(self, db, campaign, traced):
+        cog = RollingCog(SimpleNamespace(db=db))
+        await _autocomplete_asset(make_interaction(db), "")
+        choices = []
+
+        async def run():
+            choices.extend(await cog._include_autocomplete(make_interaction(db), "Sw"))
+
+        assert await traced(run()) == []
+        assert [c.value for c in choices] == ["Sword"]
@@ -0,0 +1,76 @@
+"""Tests for bot.py — command tree hashing and conditional sync."""
+
+import pytest
+
+from cortex_bot.bot import COGS, CortexBot
+from cortex_bot.models.database import Database
+
+
+@pytest.fixture
+async def bot(tmp_path):
+    db = Database(path=str(tmp_path / "test.db"))
+    bot = CortexBot(db)
+    for cog in COGS:
+        await bot.load_extension(cog)
+    sync_calls = []
+
+    async def fake_sync():
+        sync_calls.append(1)
+        return []
+
+    bot.tree.sync = fake_sync
+    bot.sync_calls = sync_calls
+    yield bot
+    await db.close()
+
+
+class TestCommandTreeHash:
+    async def test_hash_is_stable(self, bot):
+        assert bot.command_tree_hash() == bot.command_tree_hash()
+
+    async def test_hash_changes_with_tree(self, bot):
+        before = bot.command_tree_hash()
+        bot.tree.remove_command("odds")
+        assert bot.command_tree_hash() != before
+
+    async def test_hash_stored_next_to_database(self, bot, tmp_path):
+        assert bot.command_hash_path == tmp_path / "test.db.commands.sha256"
+
+
+class TestSyncCommands:
+    async def test_first_boot_syncs_and_stores_hash(self, bot):
+        assert await bot.sync_commands() is True
+        assert bot.sync_calls == [1]
+        assert bot.command_hash_path.read_text().strip() == bot.command_tree_hash()
+
+    async def test_unchanged_tree_skips_sync(self, bot):
+        await bot.sync_commands()
+        assert await bot.sync_commands() is False
+        assert bot.sync_calls == [1]
+
+    async def test_changed_tree_syncs_again(self, bot):
+        await bot.sync_commands()
+        bot.tree.remove_command("odds")
+        assert await bot.sync_commands() is True
+        assert len(bot.sync_calls) == 2
+
+    async def test_force_sync_overrides(self, bot):
+        await bot.sync_commands()
+        bot.force_sync = True
+        assert await bot.sync_commands() is True
+        assert len(bot.sync_calls) == 2
+
+
+class TestStatsLog:
+    async def test_logs_one_line_per_component(self, bot, caplog):
+        await bot.db.initialize()
+        with caplog.at_level("INFO", logger="cortex_bot"):
+            bot.log_stats()
+        components = {
+            record.getMessage().split(":", 1)[0].removeprefix("Stats ")
+            for record in caplog.records
+        }
+        assert components >= {
+            "writer", "campaign_cache", "autocomplete", "renders",
+            "lanes", "action_log", "views",
+        }
@@ -0,0 +1,184 @@
+"""Tests for the in-memory campaign state (models/campaign_state.py)."""
+
+import asyncio
+
+import pytest
+
+from cortex_bot.models.campaign_state import CampaignStateStore, build_state
+from cortex_bot.models.database import Database
+from cortex_bot.services.state_manager import StateManager
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "state.db"), campaign_state=True)
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+@pytest.fixture
+async def campaign(db):
+    async with db.connect() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES ('srv1', 'ch1', 'Camp', '{}')"
+        )
+        campaign_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, is_gm, pp) VALUES (?, 'gm1', 'GM', 1, 5)",
+            (campaign_id,),
+        )
+        await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, pp) VALUES (?, 'user1', 'Alice', 3)",
+            (campaign_id,),
+        )
+        await conn.execute(
+            "INSERT INTO stress_types (campaign_id, name) VALUES (?, 'Physical')", (campaign_id,)
+        )
+        await conn.execute(
+            "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, 'Docks', 1)", (campaign_id,)
+        )
+        await conn.commit()
+    return campaign_id
+
+
+@pytest.fixture
+async def alice(db, campaign):
+    return await db.get_player(campaign, "user1")
+
+
+@pytest.fixture
+def sm(db):
+    return StateManager(db)
+
+
+class TestReads:
+    async def test_reads_after_first_are_served_from_memory(self, db, campaign, alice):
+        await db.get_players(campaign)
+        await db.get_player_assets(campaign, alice.id)
+        await db.get_doom_pool(campaign)
+        await db.get_campaign_snapshot(campaign)
+        stats = db.states.stats()
+        assert (stats["misses"], stats["hits"]) == (1, 4)
+
+    async def test_memory_snapshot_matches_sqlite(self, db, campaign, alice, sm, tmp_path):
+        scene = await db.get_active_scene(campaign)
+        await sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice.id)
+        await sm.add_asset(campaign, "gm1", "Fog", 8, scene_id=scene["id"])
+        await sm.add_complication(campaign, "gm1", "Broken Arm", 6, player_id=alice.id, scene_id=scene["id"])
+        types = await db.get_stress_types(campaign)
+        await sm.add_stress(campaign, "gm1", alice.id, types[0]["id"], 8)
+
+        plain = Database(path=db.path, campaign_state=False)
+        try:
+            assert await db.get_campaign_snapshot(campaign) == await plain.get_campaign_snapshot(campaign)
+            assert await db.get_scene_assets(scene["id"]) == await plain.get_scene_assets(scene["id"])
+            assert await db.get_user_complications(campaign, "user1") == await plain.get_user_complications(
+                campaign, "user1"
+            )
+        finally:
+            await plain.close()
+
+    async def test_returned_rows_are_copies(self, db, campaign, alice):
+        player = await db.get_player(campaign, "user1")
+        player.pp = 99
+        assert (await db.get_player(campaign, "user1")).pp == 3
+
+
+class TestWrites:
+    async def test_state_manager_mutations_patch_memory(self, db, campaign, alice, sm):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice.id)
+        await sm.step_up_asset(campaign, "user1", asset["id"])
+        await sm.update_pp(campaign, "user1", alice.id, 2)
+        types = await db.get_stress_types(campaign)
+        await sm.add_stress(campaign, "gm1", alice.id, types[0]["id"], 6)
+
+        assert [(a.name, a.die_size) for a in await db.get_player_assets(campaign, alice.id)] == [("Rope", 8)]
+        assert (await db.get_player(campaign, "user1")).pp == 5
+        stress = await db.get_player_stress(campaign, alice.id)
+        assert (stress[0].stress_type_name, stress[0].die_size) == ("Physical", 6)
+        assert db.states.stats()["rebuilt"] == 0
+        assert await db.check_campaign_states() == {}
+
+    async def test_unpatched_logged_write_rebuilds(self, db, campaign, alice):
+        await db.get_doom_pool(campaign)
+        async with db.transaction(campaign) as conn:
+            cursor = await conn.execute(
+                "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, 6)", (campaign,)
+            )
+            await db.log_action(
+                campaign, "gm1", "doom_add", {}, {"action": "delete", "table": "doom_pool_dice", "id": cursor.lastrowid},
+                conn=conn,
+            )
+        assert [d.die_size for d in await db.get_doom_pool(campaign)] == [6]
+        assert db.states.stats()["rebuilt"] == 1
+
+    async def test_mutation_inside_outer_transaction_is_not_patched(self, db, campaign, alice, sm):
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await sm.update_pp(campaign, "user1", alice.id, 4)
+                raise RuntimeError("abort")
+        assert (await db.get_player(campaign, "user1")).pp == 3
+
+        async with db.transaction():
+            await sm.update_pp(campaign, "user1", alice.id, 4)
+        assert (await db.get_player(campaign, "user1")).pp == 7
+
+    async def test_undo_refreshes_memory(self, db, campaign, alice, sm):
+        await sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice.id)
+        await sm.undo(campaign)
+        assert await db.get_player_assets(campaign, alice.id) == []
+
+    async def test_invalidate_after_raw_write(self, db, campaign, alice):
+        async with db.connect() as conn:
+            await conn.execute("UPDATE players SET is_delegate = 1 WHERE id = ?", (alice.id,))
+            await conn.commit()
+        db.invalidate_campaign_state(campaign)
+        assert (await db.get_player(campaign, "user1")).is_delegate == 1
+
+    async def test_write_during_load_is_not_cached(self, db, campaign, alice, sm):
+        db.invalidate_campaign_state(campaign)
+        load = asyncio.create_task(db.get_players(campaign))
+        await asyncio.sleep(0)
+        await sm.update_pp(campaign, "user1", alice.id, 1)
+        await load
+        assert (await db.get_player(campaign, "user1")).pp == 4
+
+
+class TestConsistencyChecker:
+    async def test_reports_and_repairs_divergence(self, db, campaign, alice):
+        await db.get_players(campaign)
+        async with db.connect() as conn:
+            await conn.execute("UPDATE players SET pp = 9 WHERE id = ?", (alice.id,))
+            await conn.commit()
+        report = await db.check_campaign_states()
+        assert list(report) == [campaign]
+        assert report[campaign][0].startswith(f"players {alice.id}:")
+        assert (await db.get_player(campaign, "user1")).pp == 9
+        assert await db.check_campaign_states() == {}
+
+    async def test_disabled_store_has_nothing_to_check(self, tmp_path):
+        plain = Database(path=str(tmp_path / "plain.db"), campaign_state=False)
+        assert plain.states is None
+        assert await plain.check_campaign_states() == {}
+
+
+class TestIdleEviction:
+    async def test_idle_campaigns_are_dropped_and_reloaded(self):
+        now = [0.0]
+        loads = []
+
+        async def loader(campaign_id):
+            loads.append(campaign_id)
+            return build_state(campaign_id, [], [], [], [], [], [], [], [], None, [])
+
+        store = CampaignStateStore(loader, idle=60, clock=lambda: now[0])
+        await store.get(1)
+        now[0] = 30
+        await store.get(2)
+        now[0] = 70
+        await store.get(2)
+        assert store.campaigns() == [2]
+        await store.get(1)
+        assert loads == [1, 2, 1]
+        assert store.stats()["evicted"] == 1
@@ -0,0 +1,173 @@
+"""Tests for the per-interaction context and per-command SQL budgets."""
+
+import itertools
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from cortex_bot.cogs.menu import MenuCog
+from cortex_bot.cogs.rolling import RollingCog
+from cortex_bot.cogs.state import _autocomplete_asset, _get_campaign, _get_player
+from cortex_bot.cogs.undo import UndoCog
+from cortex_bot.context import get_actor, get_context
+from cortex_bot.models.database import Database
+from cortex_bot.views.base import check_gm_permission, validate_campaign_channel
+
+_interaction_ids = itertools.count(1)
+
+
+class FakeResponse:
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    async def send_message(self, content=None, **kwargs) -> None:
+        self.messages.append(content)
+
+    def is_done(self) -> bool:
+        return bool(self.messages)
+
+
+def make_interaction(db, user_id="user1", channel_id="ch1"):
+    """Just enough of discord.Interaction for the resolution helpers."""
+    return SimpleNamespace(
+        id=next(_interaction_ids),
+        guild_id="srv1",
+        channel_id=channel_id,
+        user=SimpleNamespace(id=user_id),
+        client=SimpleNamespace(db=db),
+        response=FakeResponse(),
+    )
+
+
+@pytest.fixture
+async def db(tmp_path):
+    # pool_size=0 routes every query through the writer, so one trace sees them all.
+    database = Database(path=str(tmp_path / "context.db"), pool_size=0)
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+@pytest.fixture
+async def campaign(db):
+    async with db.connect() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES (?, ?, ?, ?)",
+            ("srv1", "ch1", "Test Campaign", json.dumps({"doom_pool": True, "best_mode": True})),
+        )
+        campaign_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, ?)",
+            (campaign_id, "gm1", "GameMaster", 1),
+        )
+        cursor = await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, is_gm) VALUES (?, ?, ?, ?)",
+            (campaign_id, "user1", "Alice", 0),
+        )
+        await conn.execute(
+            "INSERT INTO assets (campaign_id, player_id, name, die_size, duration) VALUES (?, ?, ?, ?, ?)",
+            (campaign_id, cursor.lastrowid, "Sword", 8, "session"),
+        )
+        await conn.commit()
+    return campaign_id
+
+
+class TestGetContext:
+    async def test_resolves_campaign_and_actor(self, db, campaign):
+        ctx = await get_context(make_interaction(db, user_id="gm1"))
+        assert ctx.campaign_id == campaign
+        assert ctx.config["doom_pool"] is True
+        assert ctx.actor["name"] == "GameMaster"
+        assert ctx.is_gm and ctx.has_gm_permission
+        assert not ctx.is_delegate
+
+    async def test_unregistered_user(self, db, campaign):
+        ctx = await get_context(make_interaction(db, user_id="stranger"))
+        assert ctx.campaign_id == campaign
+        assert ctx.actor is None
+        assert not ctx.has_gm_permission
+
+    async def test_no_campaign_in_channel(self, db, campaign):
+        ctx = await get_context(make_interaction(db, channel_id="elsewhere"))
+        assert ctx.campaign is None
+        assert ctx.campaign_id is None
+        assert ctx.config == {}
+
+    async def test_memoized_per_interaction(self, db, campaign, traced):
+        interaction = make_interaction(db)
+        first = await get_context(interaction)
+        statements = await traced(get_context(interaction))
+        assert statements == []
+        assert await get_context(interaction) is first
+
+    async def test_new_interaction_gets_new_context(self, db, campaign):
+        first = await get_context(make_interaction(db, user_id="gm1"))
+        second = await get_context(make_interaction(db, user_id="user1"))
+        assert first is not second
+        assert second.actor["name"] == "Alice"
+
+    async def test_nested_helpers_share_one_lookup(self, db, campaign, traced):
+        interaction = make_interaction(db)
+
+        async def resolve():
+            await _get_campaign(interaction)
+            await _get_player(interaction, campaign)
+            await get_actor(interaction, campaign)
+            await validate_campaign_channel(interaction, campaign)
+
+        statements = await traced(resolve())
+        # Channel lookup plus player lookup; everything after is memoized.
+        assert len(statements) <= 2, statements
+
+    async def test_foreign_campaign_id_is_not_served_from_context(self, db, campaign):
+        interaction = make_interaction(db, user_id="gm1")
+        assert await validate_campaign_channel(interaction, campaign + 100) is None
+        assert interaction.response.messages == ["Campaign not found."]
+
+
+class TestCommandQueryBudget:
+    """Upper bounds on SQL statements per command, so regressions show up here."""
+
+    async def test_autocomplete_asset(self, db, campaign, traced):
+        interaction = make_interaction(db)
+        choices = []
+
+        async def run():
+            choices.extend(await _autocomplete_asset(interaction, "sw"))
+
+        statements = await traced(run())
+        assert [c.value for c in choices] == ["Sword"]
+        assert len(statements) <= 3, statements
+
+    async def test_check_gm_permission(self, db, campaign, traced):
+        interaction = make_interaction(db, user_id="user1")
+        statements = await traced(check_gm_permission(interaction, campaign))
+        assert interaction.response.messages
+        assert len(statements) <= 2, statements
+
+    async def test_undo_nothing_to_undo(self, db, campaign, traced):
+        cog = UndoCog(SimpleNamespace(db=db))
+        interaction = make_interaction(db)
+        statements = await traced(cog.undo.callback(cog, interaction))
+        assert interaction.response.messages == ["Nothing to undo."]
+        assert len(statements) <= 3, statements
+
+    async def test_menu(self, db, campaign, traced):
+        cog = MenuCog(SimpleNamespace(db=db))
+        interaction = make_interaction(db)
+        statements = await traced(cog.menu.callback(cog, interaction))
+        assert interaction.response.messages
+        assert len(statements) <= 3, statements
+
+    async def test_roll(self, db, campaign, traced):
+        cog = RollingCog(SimpleNamespace(db=db))
+        interaction = make_interaction(db)
+        statements = await traced(cog.roll.callback(cog, interaction, dice="d8 d6"))
+        assert interaction.response.messages
+        assert len(statements) <= 5, statements
+
+    async def test_cached_campaign_costs_one_player_lookup(self, db, campaign, traced):
+        await get_context(make_interaction(db))
+        statements = await traced(get_context(make_interaction(db)))
+        assert len(statements) == 1, statements
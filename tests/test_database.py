@@ -1,8 +1,19 @@
 """Tests for models/database.py — query functions tested directly."""
 
-import pytest
+from contextlib import asynccontextmanager
 
+import aiosqlite
+import pytest
+from pydantic import ValidationError
+
+from cortex_bot.cogs.state import (
+    _find_asset_by_name,
+    _find_complication_by_name,
+    _find_stress_type_by_name,
+)
+from cortex_bot.config import DB_PROFILES, Settings
 from cortex_bot.models.database import Database
+from cortex_bot.models.migrations import SCHEMA
 
 
 @pytest.fixture
@@ -10,7 +21,8 @@ async def db(tmp_path):
     db_path = str(tmp_path / "test.db")
     database = Database(path=db_path)
     await database.initialize()
-    return database
+    yield database
+    await database.close()
 
 
 @pytest.fixture
@@ -57,6 +69,58 @@ class TestGetCampaignByChannel:
         result = await db.get_campaign_by_channel("srv1", "ch_nonexistent")
         assert result is None
 
+    async def test_repeat_lookup_is_cached(self, seeded_db):
+        db, _ = seeded_db
+        await db.get_campaign_by_channel("srv1", "ch1")
+        await db.get_campaign_by_channel("srv1", "ch1")
+        stats = db.campaign_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    async def test_miss_is_cached_until_invalidated(self, seeded_db):
+        db, _ = seeded_db
+        assert await db.get_campaign_by_channel("srv1", "ch2") is None
+        async with db.connect() as conn:
+            await conn.execute(
+                "INSERT INTO campaigns (server_id, channel_id, name) VALUES (?, ?, ?)",
+                ("srv1", "ch2", "Second"),
+            )
+            await conn.commit()
+        assert await db.get_campaign_by_channel("srv1", "ch2") is None
+        db.invalidate_campaign_cache("srv1", "ch2")
+        result = await db.get_campaign_by_channel("srv1", "ch2")
+        assert result["name"] == "Second"
+
+    async def test_returned_dict_is_a_copy(self, seeded_db):
+        db, _ = seeded_db
+        first = await db.get_campaign_by_channel("srv1", "ch1")
+        first["config"]["doom_pool"] = False
+        second = await db.get_campaign_by_channel("srv1", "ch1")
+        assert second["config"]["doom_pool"] is True
+
+    async def test_config_update_invalidates(self, seeded_db):
+        db, campaign_id = seeded_db
+        await db.get_campaign_by_channel("srv1", "ch1")
+        await db.update_campaign_config(campaign_id, {"doom_pool": False})
+        result = await db.get_campaign_by_channel("srv1", "ch1")
+        assert result["config"] == {"doom_pool": False}
+
+    async def test_invalidation_during_lookup_is_not_overwritten(self, seeded_db, monkeypatch):
+        db, _ = seeded_db
+        read = db.read
+
+        @asynccontextmanager
+        async def racing_read():
+            async with read() as conn:
+                # The campaign is created and its entry dropped while the
+                # lookup is still waiting on the reader.
+                db.invalidate_campaign_cache("srv1", "ch2")
+                yield conn
+
+        monkeypatch.setattr(db, "read", racing_read)
+        assert await db.get_campaign_by_channel("srv1", "ch2") is None
+        assert ("srv1", "ch2") not in db._campaign_cache
+
 
 class TestGetActiveScene:
     async def test_no_active_scene(self, seeded_db):
@@ -208,3 +272,386 @@ class TestGetPlayers:
         assert len(result) == 2
         names = [p["name"] for p in result]
         assert names == ["Alice", "GameMaster"]
+
+
+class TestConnectionPool:
+    async def test_writer_is_reused(self, db):
+        async with db.connect() as first:
+            pass
+        async with db.connect() as second:
+            pass
+        assert first is second
+
+    async def test_readers_are_reused(self, db):
+        async with db.read() as first:
+            pass
+        async with db.read() as second:
+            pass
+        assert first is second
+
+    async def test_writer_reentrant_in_same_task(self, db):
+        async with db.connect() as outer:
+            async with db.connect() as inner:
+                assert inner is outer
+
+    async def test_readers_capped_at_pool_size(self, tmp_path):
+        database = Database(path=str(tmp_path / "capped.db"), pool_size=2)
+        await database.initialize()
+        async with database.read() as a, database.read() as b:
+            assert a is not b
+        async with database.read():
+            pass
+        assert len(database.pool._reader_conns) == 2
+        await database.close()
+
+    async def test_uncommitted_write_rolled_back_on_release(self, seeded_db):
+        db, campaign_id = seeded_db
+        async with db.connect() as conn:
+            await conn.execute(
+                "UPDATE players SET pp = 99 WHERE campaign_id = ?", (campaign_id,)
+            )
+        player = await db.get_player(campaign_id, "user1")
+        assert player["pp"] == 3
+
+    async def test_foreign_keys_enabled(self, db):
+        async with db.read() as conn:
+            cursor = await conn.execute("PRAGMA foreign_keys")
+            row = await cursor.fetchone()
+        assert row[0] == 1
+
+    async def test_reader_sees_committed_writes(self, seeded_db):
+        db, campaign_id = seeded_db
+        await db.get_player(campaign_id, "user1")
+        async with db.connect() as conn:
+            await conn.execute(
+                "UPDATE players SET pp = 7 WHERE discord_user_id = 'user1'"
+            )
+            await conn.commit()
+        player = await db.get_player(campaign_id, "user1")
+        assert player["pp"] == 7
+
+
+class TestSQLiteProfile:
+    # PRAGMA synchronous reports 0=OFF, 1=NORMAL, 2=FULL, 3=EXTRA.
+    SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+
+    def test_default_keeps_full_synchronous(self, monkeypatch):
+        monkeypatch.delenv("CORTEX_BOT_DB_PROFILE", raising=False)
+        monkeypatch.delenv("CORTEX_BOT_DB_SYNCHRONOUS", raising=False)
+        settings = Settings(_env_file=None)
+        assert settings.db_profile == "durable"
+        assert settings.sqlite_profile().synchronous == "FULL"
+
+    def test_overrides_apply_on_top_of_preset(self, monkeypatch):
+        monkeypatch.setenv("CORTEX_BOT_DB_PROFILE", "durable")
+        monkeypatch.setenv("CORTEX_BOT_DB_CACHE_SIZE", "-8000")
+        profile = Settings(_env_file=None).sqlite_profile()
+        assert profile.synchronous == "FULL"
+        assert profile.cache_size == -8000
+        assert DB_PROFILES["durable"].cache_size == -2000
+
+    @pytest.mark.parametrize("name, value", [
+        ("CORTEX_BOT_DB_PROFILE", "reckless"),
+        ("CORTEX_BOT_DB_SYNCHRONOUS", "SOMETIMES"),
+        ("CORTEX_BOT_DB_BUSY_TIMEOUT", "-1"),
+    ])
+    def test_invalid_values_are_rejected(self, monkeypatch, name, value):
+        monkeypatch.setenv(name, value)
+        with pytest.raises(ValidationError):
+            Settings(_env_file=None)
+
+    @pytest.mark.parametrize("preset", sorted(DB_PROFILES))
+    async def test_every_connection_gets_the_profile(self, tmp_path, preset):
+        profile = DB_PROFILES[preset]
+        database = Database(path=str(tmp_path / f"{preset}.db"), profile=profile)
+        await database.initialize()
+        try:
+            async with database.connect() as writer, database.read() as reader:
+                for conn in (writer, reader):
+                    values = {}
+                    for name in profile.model_dump():
+                        cursor = await conn.execute(f"PRAGMA {name}")
+                        values[name] = (await cursor.fetchone())[0]
+                    assert values["synchronous"] == self.SYNCHRONOUS[profile.synchronous]
+                    assert values["cache_size"] == profile.cache_size
+                    assert values["busy_timeout"] == profile.busy_timeout
+                    assert values["wal_autocheckpoint"] == profile.wal_autocheckpoint
+                    assert values["temp_store"] == ["DEFAULT", "FILE", "MEMORY"].index(profile.temp_store)
+        finally:
+            await database.close()
+
+
+class TestGetCampaignSnapshot:
+    async def _populate(self, db, campaign_id, extra_players=0):
+        async with db.connect() as conn:
+            for i in range(extra_players):
+                await conn.execute(
+                    "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (?, ?, ?)",
+                    (campaign_id, f"extra{i}", f"Extra {i}"),
+                )
+            cursor = await conn.execute(
+                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1)",
+                (campaign_id, "Bridge"),
+            )
+            scene_id = cursor.lastrowid
+            cursor = await conn.execute(
+                "SELECT id, name FROM players WHERE campaign_id = ?", (campaign_id,)
+            )
+            players = await cursor.fetchall()
+            cursor = await conn.execute(
+                "SELECT id FROM stress_types WHERE campaign_id = ?", (campaign_id,)
+            )
+            type_ids = [r["id"] for r in await cursor.fetchall()]
+            for p in players:
+                for st in type_ids:
+                    await conn.execute(
+                        "INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, ?)",
+                        (campaign_id, p["id"], st, 8),
+                    )
+                await conn.execute(
+                    "INSERT INTO trauma (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, ?)",
+                    (campaign_id, p["id"], type_ids[0], 6),
+                )
+                for name in ("Zeal", "Armor"):
+                    await conn.execute(
+                        "INSERT INTO assets (campaign_id, player_id, scene_id, name, die_size) VALUES (?, ?, ?, ?, ?)",
+                        (campaign_id, p["id"], scene_id, name, 6),
+                    )
+                await conn.execute(
+                    "INSERT INTO complications (campaign_id, player_id, scene_id, name, die_size) VALUES (?, ?, ?, ?, ?)",
+                    (campaign_id, p["id"], scene_id, "Dazed", 6),
+                )
+                await conn.execute(
+                    "INSERT INTO hero_dice (campaign_id, player_id, die_size) VALUES (?, ?, ?)",
+                    (campaign_id, p["id"], 8),
+                )
+            await conn.execute(
+                "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)",
+                (campaign_id, 6),
+            )
+            cursor = await conn.execute(
+                "INSERT INTO crisis_pools (campaign_id, scene_id, name) VALUES (?, ?, ?)",
+                (campaign_id, scene_id, "Fire"),
+            )
+            pool_id = cursor.lastrowid
+            for size in (10, 6):
+                await conn.execute(
+                    "INSERT INTO crisis_pool_dice (crisis_pool_id, die_size) VALUES (?, ?)",
+                    (pool_id, size),
+                )
+            await conn.commit()
+        return scene_id
+
+    async def test_matches_per_player_getters(self, seeded_db):
+        db, campaign_id = seeded_db
+        scene_id = await self._populate(db, campaign_id)
+        snapshot = await db.get_campaign_snapshot(campaign_id)
+
+        assert snapshot["players"] == await db.get_players(campaign_id)
+        for p in snapshot["players"]:
+            state = snapshot["player_states"][p["id"]]
+            assert state["stress"] == await db.get_player_stress(campaign_id, p["id"])
+            assert state["assets"] == await db.get_player_assets(campaign_id, p["id"])
+            assert state["complications"] == await db.get_player_complications(campaign_id, p["id"])
+            assert state["trauma"] == await db.get_player_trauma(campaign_id, p["id"])
+            assert state["hero_dice"] == await db.get_hero_dice(campaign_id, p["id"])
+        assert snapshot["scene"]["id"] == scene_id
+        assert snapshot["doom_pool"] == await db.get_doom_pool(campaign_id)
+        assert snapshot["scene_assets"] == await db.get_scene_assets(scene_id)
+        assert snapshot["scene_complications"] == await db.get_scene_complications(scene_id)
+        assert snapshot["crisis_pools"][0]["name"] == "Fire"
+        assert [d["die_size"] for d in snapshot["crisis_pools"][0]["dice"]] == [6, 10]
+
+    async def test_disabled_modules_not_loaded(self, seeded_db):
+        db, campaign_id = seeded_db
+        await self._populate(db, campaign_id)
+        snapshot = await db.get_campaign_snapshot(
+            campaign_id, {"trauma": False, "hero_dice": False, "doom_pool": False}
+        )
+        assert snapshot["doom_pool"] is None
+        for state in snapshot["player_states"].values():
+            assert "trauma" not in state
+            assert "hero_dice" not in state
+
+    async def test_no_scene(self, seeded_db):
+        db, campaign_id = seeded_db
+        snapshot = await db.get_campaign_snapshot(campaign_id)
+        assert snapshot["scene"] is None
+        assert snapshot["scene_assets"] is None
+        assert snapshot["crisis_pools"] is None
+
+    async def test_query_count_independent_of_players(self, tmp_path):
+        database = Database(path=str(tmp_path / "count.db"), pool_size=1)
+        await database.initialize()
+        async with database.connect() as conn:
+            cursor = await conn.execute(
+                "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('s', 'c', 'Big')"
+            )
+            campaign_id = cursor.lastrowid
+            await conn.execute(
+                "INSERT INTO stress_types (campaign_id, name) VALUES (?, 'Physical')",
+                (campaign_id,),
+            )
+            await conn.commit()
+        await self._populate(database, campaign_id, extra_players=12)
+
+        statements: list[str] = []
+        try:
+            async with database.read() as conn:
+                await conn.set_trace_callback(statements.append)
+            await database.get_campaign_snapshot(campaign_id)
+            async with database.read() as conn:
+                await conn.set_trace_callback(None)
+        finally:
+            await database.close()
+        assert len(statements) <= 11, statements
+
+
+class TestStateVersion:
+    async def test_logged_write_bumps_only_its_campaign(self, seeded_db):
+        db, campaign_id = seeded_db
+        before = db.state_version(campaign_id)
+        await db.log_action(campaign_id, "user1", "add_pp", {}, {"action": "update", "table": "players"})
+        assert db.state_version(campaign_id) == before + 1
+        assert db.state_version(campaign_id + 1) == 0
+
+    async def test_invalidating_every_campaign_bumps_them_all(self, seeded_db):
+        db, campaign_id = seeded_db
+        before = db.state_version(campaign_id)
+        db.invalidate_campaign_state()
+        assert db.state_version(campaign_id) > before
+        assert db.state_version(campaign_id + 1) > 0
+
+    async def test_render_is_memoized_until_the_next_write(self, seeded_db):
+        db, campaign_id = seeded_db
+        builds = []
+
+        async def build():
+            builds.append(len(builds))
+            return f"render {len(builds)}"
+
+        assert await db.render(campaign_id, "info", build) == "render 1"
+        assert await db.render(campaign_id, "info", build) == "render 1"
+        assert await db.render(campaign_id, "other", build) == "render 2"
+        await db.log_action(campaign_id, "user1", "add_pp", {}, {"action": "update", "table": "players"})
+        assert await db.render(campaign_id, "info", build) == "render 3"
+        stats = db.renders.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+        assert stats["hit_ratio"] == 0.25
+
+    async def test_slow_render_does_not_replace_a_newer_one(self, seeded_db):
+        db, campaign_id = seeded_db
+
+        async def slow():
+            await db.log_action(campaign_id, "user1", "add_pp", {}, {"action": "update", "table": "players"})
+            await db.render(campaign_id, "info", fast)
+            return "old"
+
+        async def fast():
+            return "new"
+
+        assert await db.render(campaign_id, "info", slow) == "old"
+        assert await db.render(campaign_id, "info", fast) == "new"
+        assert db.renders.stats()["hits"] == 1
+
+
+class TestNameLookups:
+    """Case-insensitive name lookups must seek an index, not scan the campaign."""
+
+    @pytest.fixture
+    async def db(self, tmp_path):
+        # pool_size=0 routes reads through the writer, so one trace sees them.
+        database = Database(path=str(tmp_path / "lookups.db"), pool_size=0)
+        await database.initialize()
+        yield database
+        await database.close()
+
+    async def _seed(self, db, campaign_id):
+        player = await db.get_player(campaign_id, "user1")
+        async with db.connect() as conn:
+            for i in range(50):
+                await conn.execute(
+                    "INSERT INTO assets (campaign_id, player_id, name, die_size, duration) VALUES (?, ?, ?, 6, 'session')",
+                    (campaign_id, player["id"], f"Asset {i}"),
+                )
+                await conn.execute(
+                    "INSERT INTO complications (campaign_id, player_id, name, die_size, scope) VALUES (?, NULL, ?, 6, 'scene')",
+                    (campaign_id, f"Complication {i}"),
+                )
+            await conn.execute("ANALYZE")
+            await conn.commit()
+        return player
+
+    async def _plan(self, db, lookup) -> tuple[object, str]:
+        """Run ``lookup`` and return its result plus the query plan of its SELECT."""
+        statements: list[str] = []
+        async with db.connect() as conn:
+            await conn.set_trace_callback(statements.append)
+        try:
+            result = await lookup
+        finally:
+            async with db.connect() as conn:
+                await conn.set_trace_callback(None)
+        (select,) = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        async with db.read() as conn:
+            cursor = await conn.execute("EXPLAIN QUERY PLAN " + select)
+            plan = " | ".join(row["detail"] for row in await cursor.fetchall())
+        return result, plan
+
+    async def test_asset_lookup_seeks_index(self, seeded_db):
+        db, campaign_id = seeded_db
+        player = await self._seed(db, campaign_id)
+        asset, plan = await self._plan(
+            db, _find_asset_by_name(db, campaign_id, player["id"], "ASSET 7")
+        )
+        assert asset["name"] == "Asset 7"
+        assert "INDEX idx_assets_owner_name" in plan
+        assert "SCAN" not in plan
+
+    async def test_scene_complication_lookup_seeks_index(self, seeded_db):
+        db, campaign_id = seeded_db
+        await self._seed(db, campaign_id)
+        comp, plan = await self._plan(
+            db, _find_complication_by_name(db, campaign_id, None, "complication 3")
+        )
+        assert comp["name"] == "Complication 3"
+        assert "INDEX idx_complications_owner_name" in plan
+        assert "SCAN" not in plan
+
+    async def test_stress_type_lookup_seeks_index(self, seeded_db):
+        db, campaign_id = seeded_db
+        stress_type, plan = await self._plan(
+            db, _find_stress_type_by_name(db, campaign_id, "physical")
+        )
+        assert stress_type["name"] == "Physical"
+        # New databases seek the NOCASE unique index; legacy ones use
+        # idx_stress_types_name (see test_existing_database_gets_indexes).
+        assert "INDEX" in plan and "name=?" in plan
+        assert "SCAN" not in plan
+
+    async def test_existing_database_gets_indexes(self, tmp_path):
+        """A database created before the NOCASE columns still gets index seeks."""
+        path = str(tmp_path / "legacy.db")
+        legacy_schema = SCHEMA.replace(
+            "name TEXT NOT NULL COLLATE NOCASE", "name TEXT NOT NULL"
+        )
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(legacy_schema)
+            await conn.execute(
+                "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('s', 'c', 'Old')"
+            )
+            await conn.execute(
+                "INSERT INTO stress_types (campaign_id, name) VALUES (1, 'Physical')"
+            )
+            await conn.commit()
+
+        database = Database(path=path, pool_size=0)
+        await database.initialize()
+        try:
+            stress_type, plan = await self._plan(
+                database, _find_stress_type_by_name(database, 1, "PHYSICAL")
+            )
+        finally:
+            await database.close()
+        assert stress_type["name"] == "Physical"
+        assert "INDEX idx_stress_types_name" in plan
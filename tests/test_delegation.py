@@ -6,8 +6,8 @@ from unittest.mock import patch
 import pytest
 
 from cortex_bot.models.database import Database
-from cortex_bot.models.dice import die_label, step_down
-from cortex_bot.services.roller import roll_pool, find_hitches, is_botch, calculate_best_options
+from cortex_bot.models.dice import RolledPool, die_label, step_down
+from cortex_bot.models.rows import Campaign, Player
 from cortex_bot.services.formatter import format_roll_result, format_campaign_info
 from cortex_bot.services.state_manager import StateManager
 from cortex_bot.utils import has_gm_permission
@@ -17,7 +17,8 @@ from cortex_bot.utils import has_gm_permission
 async def db(tmp_path):
     database = Database(path=str(tmp_path / "delegation.db"))
     await database.initialize()
-    return database
+    yield database
+    await database.close()
 
 
 @pytest.fixture
@@ -169,7 +170,7 @@ class TestGmRoll:
 
     def test_roll_with_best_mode(self):
         results = [(8, 5), (10, 7), (6, 3)]
-        best_options = calculate_best_options(results)
+        best_options = RolledPool.from_results(results).best_options()
         output = format_roll_result(
             player_name="GM",
             results=results,
@@ -180,7 +181,7 @@ class TestGmRoll:
 
     def test_roll_with_difficulty(self):
         results = [(8, 5), (10, 7), (6, 3)]
-        best_options = calculate_best_options(results)
+        best_options = RolledPool.from_results(results).best_options()
         output = format_roll_result(
             player_name="GM",
             results=results,
@@ -212,10 +213,16 @@ class TestGmRoll:
 
 class TestFormatterDelegate:
     def _make_player(self, pid=1, name="Alice", is_gm=0, is_delegate=0, pp=3, xp=0):
-        return {"id": pid, "name": name, "is_gm": is_gm, "is_delegate": is_delegate, "pp": pp, "xp": xp}
+        return Player(
+            id=pid, campaign_id=1, discord_user_id=f"u{pid}", name=name,
+            is_gm=is_gm, pp=pp, xp=xp, is_delegate=is_delegate,
+        )
+
+    def _make_campaign(self):
+        return Campaign(id=1, server_id="s", channel_id="c", name="Test")
 
     def test_delegate_label_shown(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(is_delegate=1)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -223,7 +230,7 @@ class TestFormatterDelegate:
         assert "ALICE (delegate)" in output
 
     def test_gm_label_not_delegate(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(is_gm=1)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -232,7 +239,7 @@ class TestFormatterDelegate:
         assert "(delegate)" not in output
 
     def test_normal_player_no_label(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -242,7 +249,7 @@ class TestFormatterDelegate:
         assert "(GM)" not in output
 
     def test_multiple_players_mixed(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [
             self._make_player(pid=1, name="Carlos", is_gm=1),
             self._make_player(pid=2, name="Alice", is_delegate=1),
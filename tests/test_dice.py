@@ -1,6 +1,12 @@
+import random
+from itertools import combinations
+
 import pytest
 
 from cortex_bot.models.dice import (
+    MAX_POOL_DICE,
+    DicePool,
+    RolledPool,
     is_valid_die,
     step_up,
     step_down,
@@ -68,8 +74,7 @@ class TestParseDiceNotation:
         assert parse_dice_notation("3d6") == [6, 6, 6]
 
     def test_mixed(self):
-        result = parse_dice_notation("1d8 2d6 1d10")
-        assert sorted(result) == [6, 6, 8, 10]
+        assert parse_dice_notation("1d8 2d6 1d10") == [8, 6, 6, 10]
 
     def test_no_count_prefix(self):
         assert parse_dice_notation("d8") == [8]
@@ -113,3 +118,136 @@ class TestParseSingleDie:
     def test_invalid(self):
         with pytest.raises(ValueError, match="d20 nao e um dado Cortex valido"):
             parse_single_die("d20")
+
+
+class TestDicePool:
+    def test_parse_counts(self):
+        pool = DicePool.parse("1d8 2d6 1d10")
+        assert pool.counts == [0, 2, 1, 1, 0]
+        assert len(pool) == 4
+        assert pool.sizes() == [10, 8, 6, 6]
+
+    def test_huge_count_rejected_without_expanding(self):
+        with pytest.raises(ValueError, match="no maximo"):
+            DicePool.parse("999999999d12")
+
+    def test_max_enforced_across_terms(self):
+        DicePool.parse(f"{MAX_POOL_DICE}d6")
+        with pytest.raises(ValueError, match="no maximo"):
+            DicePool.parse(f"{MAX_POOL_DICE}d6 1d4")
+
+    def test_add_and_extend(self):
+        pool = DicePool.from_sizes([8, 8])
+        pool.add(12)
+        pool.extend(DicePool.parse("2d4"))
+        assert pool.counts == [2, 0, 2, 0, 1]
+        with pytest.raises(ValueError):
+            pool.add(4, MAX_POOL_DICE)
+
+    def test_slots(self):
+        with pytest.raises(AttributeError):
+            DicePool().extra = 1
+
+    def test_roll_keeps_sizes(self):
+        pool = DicePool.parse("3d8 2d4")
+        rolled = pool.roll(random.Random(3))
+        results = rolled.results()
+        assert len(results) == 5
+        assert sorted(size for size, _ in results) == [4, 4, 8, 8, 8]
+        assert all(1 <= value <= size for size, value in results)
+
+
+def reference_best(results):
+    """Best total and best (effect size, total) over every pair, by value only."""
+    non_hitch = [(s, v) for s, v in results if v != 1]
+    best_total = 0
+    best_effect = (0, 0)
+    for i, j in combinations(range(len(non_hitch)), 2):
+        total = non_hitch[i][1] + non_hitch[j][1]
+        rest = [non_hitch[k][0] for k in range(len(non_hitch)) if k not in (i, j)]
+        effect = max(rest, default=4)
+        best_total = max(best_total, total)
+        best_effect = max(best_effect, (effect, total))
+    return best_total, best_effect
+
+
+def random_results(rng, count):
+    results = []
+    for _ in range(count):
+        size = rng.choice([4, 6, 8, 10, 12])
+        results.append((size, rng.randint(1, size)))
+    return results
+
+
+def assert_matches_reference(results):
+    """``best_options()`` agrees with the pairwise scan and uses dice the pool has."""
+    options = RolledPool.from_results(results).best_options()
+    best_total, best_effect = reference_best(results)
+    if best_total == 0:
+        assert options == [], results
+        return
+    assert options[0]["total"] == best_total, results
+    last = options[-1]
+    assert (last["effect_size"], last["total"]) == best_effect, results
+    for option in options:
+        first, second = option["dice"]
+        assert option["total"] == first[1] + second[1]
+        rest = [die for die in results if die[1] != 1]
+        rest.remove(first)
+        rest.remove(second)
+        assert option["effect_size"] == max((size for size, _ in rest), default=4), results
+
+
+class TestRolledPool:
+    def test_hitches_and_botch(self):
+        rolled = RolledPool.from_results([(8, 1), (6, 1)])
+        assert rolled.hitch_count() == 2
+        assert rolled.hitches() == [(8, 1), (6, 1)]
+        assert rolled.is_botch()
+        assert rolled.best_options() == []
+
+    def test_best_options_exclude_hitches(self):
+        options = RolledPool.from_results([(10, 7), (8, 1), (6, 4), (6, 3)]).best_options()
+        assert options[0]["total"] == 11
+        assert all(value != 1 for option in options for _, value in option["dice"])
+
+    def test_single_non_hitch_has_no_options(self):
+        assert RolledPool.from_results([(8, 1), (6, 1), (10, 5)]).best_options() == []
+
+    def test_two_dice(self):
+        options = RolledPool.from_results([(8, 5), (6, 3)]).best_options()
+        assert [(o["label"], o["total"], o["effect_size"]) for o in options] == [("Best total", 8, 4)]
+
+    def test_best_total_keeps_big_die_for_effect(self):
+        # Both 5s tie; the d6 goes into the total so the d12 stays as effect.
+        rolled = RolledPool.from_results([(12, 5), (6, 5), (8, 7), (4, 2)])
+        options = rolled.best_options()
+        assert len(options) == 1
+        assert options[0]["total"] == 12
+        assert options[0]["effect_size"] == 12
+
+    def test_best_effect_option(self):
+        rolled = RolledPool.from_results([(12, 7), (10, 6), (8, 5), (4, 4)])
+        totals = {o["label"]: o for o in rolled.best_options()}
+        assert totals["Best total"]["total"] == 13
+        assert totals["Best total"]["effect_size"] == 8
+        assert totals["Best effect"]["total"] == 11
+        assert totals["Best effect"]["effect_size"] == 12
+
+    def test_matches_pairwise_optimum(self):
+        rng = random.Random(11)
+        for _ in range(2000):
+            assert_matches_reference(random_results(rng, rng.randint(2, 9)))
+
+    def test_matches_pairwise_optimum_on_large_pools(self):
+        rng = random.Random(20240611)
+        for _ in range(150):
+            assert_matches_reference(random_results(rng, rng.randint(10, 40)))
+        assert_matches_reference(random_results(rng, MAX_POOL_DICE))
+
+    def test_matches_pairwise_optimum_with_heavy_ties(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            size = rng.randint(2, 30)
+            results = [(rng.choice([6, 8]), rng.choice([1, 2, 3])) for _ in range(size)]
+            assert_matches_reference(results)
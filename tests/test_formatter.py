@@ -1,10 +1,24 @@
-"""Tests for services/formatter.py — all 4 public functions."""
+"""Tests for services/formatter.py — all 6 public functions."""
 
 from cortex_bot.services.formatter import (
     format_roll_result,
     format_campaign_info,
     format_scene_end,
     format_action_confirm,
+    format_odds,
+    format_batch_roll_result,
+)
+from cortex_bot.models.rows import (
+    Asset,
+    Campaign,
+    Complication,
+    CrisisDie,
+    CrisisPool,
+    DoomDie,
+    HeroDie,
+    Player,
+    Stress,
+    Trauma,
 )
 
 
@@ -196,8 +210,8 @@ class TestFormatRollResult:
     def test_available_assets(self):
         results = [(8, 5), (6, 3), (10, 7)]
         available = [
-            {"name": "Big Wrench", "die_size": 6},
-            {"name": "Shield", "die_size": 8},
+            Asset(id=1, campaign_id=1, player_id=1, scene_id=None, name="Big Wrench", die_size=6),
+            Asset(id=2, campaign_id=1, player_id=1, scene_id=None, name="Shield", die_size=8),
         ]
         output = format_roll_result("Alice", results, available_assets=available)
         assert "Available assets: Big Wrench d6, Shield d8." in output
@@ -212,11 +226,17 @@ class TestFormatRollResult:
 
 
 class TestFormatCampaignInfo:
-    def _make_player(self, pid=1, name="Alice", is_gm=0, pp=3, xp=0):
-        return {"id": pid, "name": name, "is_gm": is_gm, "pp": pp, "xp": xp}
+    def _make_player(self, pid=1, name="Alice", is_gm=0, pp=3, xp=0, is_delegate=0):
+        return Player(
+            id=pid, campaign_id=1, discord_user_id=f"u{pid}", name=name,
+            is_gm=is_gm, pp=pp, xp=xp, is_delegate=is_delegate,
+        )
+
+    def _make_campaign(self, name="Test"):
+        return Campaign(id=1, server_id="s", channel_id="c", name=name)
 
     def test_no_scene(self):
-        campaign = {"name": "Dark Fantasy"}
+        campaign = self._make_campaign("Dark Fantasy")
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -225,7 +245,7 @@ class TestFormatCampaignInfo:
         assert "Active scene: none" in output
 
     def test_with_active_scene(self):
-        campaign = {"name": "Dark Fantasy"}
+        campaign = self._make_campaign("Dark Fantasy")
         players = [self._make_player()]
         scene = {"name": "Tavern Fight"}
         output = format_campaign_info(
@@ -234,7 +254,7 @@ class TestFormatCampaignInfo:
         assert "Active scene: Tavern Fight" in output
 
     def test_gm_label(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(pid=1, name="Carlos", is_gm=1)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -242,19 +262,19 @@ class TestFormatCampaignInfo:
         assert "CARLOS (GM)" in output
 
     def test_delegate_label(self):
-        campaign = {"name": "Test"}
-        players = [{"id": 1, "name": "Bob", "is_gm": 0, "is_delegate": 1, "pp": 3, "xp": 0}]
+        campaign = self._make_campaign()
+        players = [self._make_player(name="Bob", is_delegate=1)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
         )
         assert "BOB (delegate)" in output
 
     def test_player_with_stress(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         states = {
             1: {
-                "stress": [{"stress_type_name": "Physical", "die_size": 8}],
+                "stress": [Stress(id=1, campaign_id=1, player_id=1, stress_type_id=1, die_size=8, stress_type_name="Physical")],
             },
         }
         output = format_campaign_info(
@@ -263,7 +283,7 @@ class TestFormatCampaignInfo:
         assert "Stress: Physical d8" in output
 
     def test_player_no_stress(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={1: {}}, scene=None, doom_pool=None
@@ -271,12 +291,12 @@ class TestFormatCampaignInfo:
         assert "Stress: none" in output
 
     def test_player_with_trauma(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         states = {
             1: {
                 "stress": [],
-                "trauma": [{"stress_type_name": "Mental", "die_size": 6}],
+                "trauma": [Trauma(id=1, campaign_id=1, player_id=1, stress_type_id=2, die_size=6, stress_type_name="Mental")],
             },
         }
         output = format_campaign_info(
@@ -285,12 +305,12 @@ class TestFormatCampaignInfo:
         assert "Trauma: Mental d6" in output
 
     def test_player_with_assets(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         states = {
             1: {
                 "stress": [],
-                "assets": [{"name": "Sword", "die_size": 8, "duration": "scene"}],
+                "assets": [Asset(id=1, campaign_id=1, player_id=1, scene_id=None, name="Sword", die_size=8)],
             },
         }
         output = format_campaign_info(
@@ -299,7 +319,7 @@ class TestFormatCampaignInfo:
         assert "Assets: Sword d8 (scene)" in output
 
     def test_player_no_assets(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={1: {}}, scene=None, doom_pool=None
@@ -307,12 +327,12 @@ class TestFormatCampaignInfo:
         assert "Assets: none" in output
 
     def test_player_with_complications(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         states = {
             1: {
                 "stress": [],
-                "complications": [{"name": "Broken Arm", "die_size": 6}],
+                "complications": [Complication(id=1, campaign_id=1, player_id=1, scene_id=None, name="Broken Arm", die_size=6)],
             },
         }
         output = format_campaign_info(
@@ -321,7 +341,7 @@ class TestFormatCampaignInfo:
         assert "Complications: Broken Arm d6" in output
 
     def test_player_no_complications(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={1: {}}, scene=None, doom_pool=None
@@ -329,12 +349,12 @@ class TestFormatCampaignInfo:
         assert "Complications: none" in output
 
     def test_player_with_hero_dice(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         states = {
             1: {
                 "stress": [],
-                "hero_dice": [{"die_size": 8}, {"die_size": 10}],
+                "hero_dice": [HeroDie(id=1, campaign_id=1, player_id=1, die_size=8), HeroDie(id=2, campaign_id=1, player_id=1, die_size=10)],
             },
         }
         output = format_campaign_info(
@@ -343,7 +363,7 @@ class TestFormatCampaignInfo:
         assert "Hero dice: d8, d10" in output
 
     def test_pp_xp_shown(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(pp=5, xp=2)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -351,7 +371,7 @@ class TestFormatCampaignInfo:
         assert "PP 5, XP 2" in output
 
     def test_gm_no_pp_xp(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(name="Carlos", is_gm=1, pp=5, xp=2)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -361,7 +381,7 @@ class TestFormatCampaignInfo:
         assert "XP" not in output
 
     def test_blank_line_between_players(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [
             self._make_player(pid=1, name="Alice"),
             self._make_player(pid=2, name="Bob"),
@@ -379,7 +399,7 @@ class TestFormatCampaignInfo:
         assert any(lines[j] == "" for j in range(alice_idx + 1, bob_idx))
 
     def test_no_separator_single_player(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -387,7 +407,7 @@ class TestFormatCampaignInfo:
         assert "---" not in output
 
     def test_doom_pool_empty(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=[]
@@ -396,9 +416,9 @@ class TestFormatCampaignInfo:
         assert "empty" in output
 
     def test_doom_pool_with_dice(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
-        doom = [{"die_size": 6}, {"die_size": 8}]
+        doom = [DoomDie(id=1, campaign_id=1, die_size=6), DoomDie(id=2, campaign_id=1, die_size=8)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=doom
         )
@@ -406,7 +426,7 @@ class TestFormatCampaignInfo:
         assert "d6, d8" in output
 
     def test_doom_pool_none_hidden(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -414,9 +434,9 @@ class TestFormatCampaignInfo:
         assert "DOOM POOL" not in output
 
     def test_scene_assets(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
-        scene_assets = [{"name": "Cover", "die_size": 8}]
+        scene_assets = [Asset(id=1, campaign_id=1, player_id=None, scene_id=1, name="Cover", die_size=8)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None,
             doom_pool=None, scene_assets=scene_assets,
@@ -425,9 +445,9 @@ class TestFormatCampaignInfo:
         assert "Scene assets: Cover d8" in output
 
     def test_scene_complications(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
-        scene_comps = [{"name": "Fire", "die_size": 6}]
+        scene_comps = [Complication(id=1, campaign_id=1, player_id=None, scene_id=1, name="Fire", die_size=6)]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None,
             doom_pool=None, scene_complications=scene_comps,
@@ -436,13 +456,13 @@ class TestFormatCampaignInfo:
         assert "Scene complications: Fire d6" in output
 
     def test_crisis_pools(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         crisis = [
-            {
-                "name": "Flood",
-                "dice": [{"die_size": 6}, {"die_size": 8}],
-            }
+            CrisisPool(
+                id=1, campaign_id=1, scene_id=1, name="Flood",
+                dice=[CrisisDie(id=1, crisis_pool_id=1, die_size=6), CrisisDie(id=2, crisis_pool_id=1, die_size=8)],
+            )
         ]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None,
@@ -451,7 +471,7 @@ class TestFormatCampaignInfo:
         assert "Crisis Pool 'Flood': d6, d8" in output
 
     def test_modules_all_active(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         config = {"doom_pool": True, "hero_dice": True, "trauma": True, "best_mode": True}
         output = format_campaign_info(
@@ -465,7 +485,7 @@ class TestFormatCampaignInfo:
         assert "best_mode: active" in output
 
     def test_modules_mixed(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         config = {"doom_pool": True, "hero_dice": False, "trauma": False, "best_mode": True}
         output = format_campaign_info(
@@ -478,7 +498,7 @@ class TestFormatCampaignInfo:
         assert "best_mode: active" in output
 
     def test_modules_none_omitted(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player()]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None,
@@ -487,7 +507,7 @@ class TestFormatCampaignInfo:
         assert "MODULES" not in output
 
     def test_player_name_uppercase(self):
-        campaign = {"name": "Test"}
+        campaign = self._make_campaign()
         players = [self._make_player(name="alice")]
         output = format_campaign_info(
             campaign, players, player_states={}, scene=None, doom_pool=None
@@ -566,3 +586,36 @@ class TestFormatActionConfirm:
             "Asset created", "Big Wrench d6", player_state="PP 3, XP 0."
         )
         assert output == "Asset created. Big Wrench d6 PP 3, XP 0."
+
+
+class TestFormatOdds:
+    def test_lists_pool_and_percentages(self):
+        odds = {
+            "difficulty": 11, "success": 0.46875, "heroic": 0.0854,
+            "expected_margin": 0.05, "effect": {4: 0.5, 6: 0.5},
+            "expected_hitches": 0.39, "botch": 0.002,
+        }
+        output = format_odds([6, 10, 8], odds)
+        assert output.startswith("Odds for d10, d8, d6 against difficulty 11.")
+        assert "Success: 46.9%." in output
+        assert "Heroic success: 8.5%." in output
+        assert "Expected margin: +0.1." in output
+        assert "Effect die: d4 50.0%, d6 50.0%." in output
+
+
+class TestFormatBatchRollResult:
+    def test_condensed_summary(self):
+        rolls = [
+            {"results": [], "hitches": 0, "botch": False, "total": 12, "effect_size": 8},
+            {"results": [], "hitches": 1, "botch": False, "total": 17, "effect_size": 4},
+            {"results": [], "hitches": 2, "botch": True, "total": 0, "effect_size": 0},
+        ]
+        output = format_batch_roll_result("Goon", [8, 10, 8], rolls, difficulty=11)
+        lines = output.split("\n")
+        assert lines[0] == "Goon x3 rolled d10 d8 d8 each."
+        assert "Difficulty 11: 2 of 3 succeed, 1 heroic." in lines[1]
+        assert "Botches: 1." in lines[1]
+        assert "Hitches: 1 across 1 rolls." in lines[1]
+        assert lines[2] == "#1: 12, effect d8, success."
+        assert lines[3] == "#2: 17, effect d4, success, 1 hitch."
+        assert lines[4] == "#3: botch."
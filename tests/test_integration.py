@@ -4,9 +4,8 @@ import json
 import pytest
 
 from cortex_bot.models.database import Database
-from cortex_bot.models.dice import step_down
+from cortex_bot.models.dice import DicePool, step_down
 from cortex_bot.services.state_manager import StateManager
-from cortex_bot.services.roller import roll_pool, find_hitches, is_botch, calculate_best_options
 from cortex_bot.services.formatter import format_roll_result, format_campaign_info, format_scene_end
 
 
@@ -14,7 +13,8 @@ from cortex_bot.services.formatter import format_roll_result, format_campaign_in
 async def db(tmp_path):
     database = Database(path=str(tmp_path / "integration.db"))
     await database.initialize()
-    return database
+    yield database
+    await database.close()
 
 
 async def test_full_game_flow(db):
@@ -113,12 +113,13 @@ async def test_full_game_flow(db):
     assert len(alice_assets) == 1
     dice.append(alice_assets[0]["die_size"])  # Include torch d6
 
-    results = roll_pool(dice)
+    rolled = DicePool.from_sizes(dice).roll()
+    results = rolled.results()
     assert len(results) == 4
 
-    hitches = find_hitches(results)
-    botch = is_botch(results)
-    best_options = calculate_best_options(results)
+    hitches = rolled.hitches()
+    botch = rolled.is_botch()
+    best_options = rolled.best_options()
 
     # Format accessible output
     output = format_roll_result(
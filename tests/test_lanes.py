@@ -0,0 +1,129 @@
+"""Tests for models/lanes.py — per-campaign mutation lanes."""
+
+import asyncio
+
+import pytest
+
+from cortex_bot.models.database import Database
+from cortex_bot.models.lanes import CampaignLanes
+from cortex_bot.services.state_manager import StateManager
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "lanes.db"))
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+async def add_campaign(db, channel: str) -> tuple[int, int]:
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('s', ?, 'Camp')",
+            (channel,),
+        )
+        campaign_id = cursor.lastrowid
+        cursor = await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name, pp) VALUES (?, 'u1', 'Alice', 0)",
+            (campaign_id,),
+        )
+        return campaign_id, cursor.lastrowid
+
+
+class TestCampaignLanes:
+    async def test_serializes_one_campaign(self):
+        lanes = CampaignLanes()
+        order = []
+
+        async def hold(tag: str) -> None:
+            async with lanes.lane(1):
+                order.append(f"{tag} in")
+                await asyncio.sleep(0.01)
+                order.append(f"{tag} out")
+
+        await asyncio.gather(hold("a"), hold("b"))
+        assert order == ["a in", "a out", "b in", "b out"]
+        assert lanes.stats()["contended"] == 1
+
+    async def test_campaigns_do_not_block_each_other(self):
+        lanes = CampaignLanes()
+        async with lanes.lane(1):
+            await asyncio.wait_for(self._enter(lanes, 2), timeout=1)
+
+    async def _enter(self, lanes: CampaignLanes, campaign_id: int) -> None:
+        async with lanes.lane(campaign_id):
+            pass
+
+    async def test_reentrant_within_a_task(self):
+        lanes = CampaignLanes()
+        async with lanes.lane(1):
+            async with lanes.lane(1):
+                assert len(lanes) == 1
+        assert len(lanes) == 0
+
+    async def test_idle_lanes_are_dropped(self):
+        lanes = CampaignLanes()
+        await asyncio.gather(*(self._enter(lanes, cid) for cid in range(50)))
+        assert len(lanes) == 0
+        assert lanes.stats()["created"] == 50
+
+    async def test_cancelled_waiter_releases_its_slot(self):
+        lanes = CampaignLanes()
+        async with lanes.lane(1):
+            waiter = asyncio.create_task(self._enter(lanes, 1))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+        assert len(lanes) == 0
+
+
+class TestLaneStress:
+    async def test_no_lost_updates_across_campaigns(self, db):
+        campaigns = [await add_campaign(db, f"c{i}") for i in range(4)]
+        per_campaign = 25
+
+        async def read_then_write(campaign_id: int, player_id: int) -> None:
+            # Read outside the transaction, as cogs that resolve a row first do.
+            async with db.lane(campaign_id):
+                player = await db.get_player_by_id(player_id)
+                await asyncio.sleep(0)
+                async with db.transaction() as conn:
+                    await conn.execute(
+                        "UPDATE players SET xp = ? WHERE id = ?", (player.xp + 1, player_id)
+                    )
+
+        sm = StateManager(db)
+        await asyncio.gather(*(
+            job
+            for campaign_id, player_id in campaigns
+            for _ in range(per_campaign)
+            for job in (
+                read_then_write(campaign_id, player_id),
+                sm.update_pp(campaign_id, "u1", player_id, 1),
+            )
+        ))
+
+        for campaign_id, player_id in campaigns:
+            player = await db.get_player_by_id(player_id)
+            assert (player.xp, player.pp) == (per_campaign, per_campaign)
+        assert len(db.lanes) == 0
+
+    async def test_other_campaigns_proceed_while_one_is_busy(self, db):
+        (busy, _), (free, free_player) = await add_campaign(db, "c1"), await add_campaign(db, "c2")
+        sm = StateManager(db)
+        released = asyncio.Event()
+
+        async def hog() -> None:
+            async with db.lane(busy):
+                await released.wait()
+
+        hog_task = asyncio.create_task(hog())
+        await asyncio.sleep(0)
+        try:
+            result = await asyncio.wait_for(sm.update_pp(free, "u1", free_player, 2), timeout=2)
+            assert result["to"] == 2
+        finally:
+            released.set()
+            await hog_task
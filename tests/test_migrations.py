@@ -0,0 +1,126 @@
+"""Tests for models/migrations.py — the user_version migration runner."""
+
+import aiosqlite
+import pytest
+
+from cortex_bot.models.database import Database
+from cortex_bot.models.migrations import (
+    LATEST_VERSION,
+    MIGRATIONS,
+    Migration,
+    get_version,
+    migrate,
+    split_statements,
+)
+
+# players as it was before is_delegate existed, with no user_version set.
+LEGACY_SCHEMA = """
+CREATE TABLE campaigns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    server_id TEXT NOT NULL,
+    channel_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    config TEXT NOT NULL DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(server_id, channel_id)
+);
+CREATE TABLE players (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    discord_user_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_gm INTEGER NOT NULL DEFAULT 0,
+    pp INTEGER NOT NULL DEFAULT 1,
+    xp INTEGER NOT NULL DEFAULT 0,
+    UNIQUE(campaign_id, discord_user_id)
+);
+"""
+
+
+async def _columns(conn, table: str) -> set[str]:
+    cursor = await conn.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in await cursor.fetchall()}
+
+
+class TestSplitStatements:
+    def test_splits_on_complete_statements(self):
+        script = "CREATE TABLE a (x TEXT DEFAULT ';');\n-- comment\nCREATE INDEX i ON a(x);\n"
+        assert split_statements(script) == [
+            "CREATE TABLE a (x TEXT DEFAULT ';');",
+            "-- comment\nCREATE INDEX i ON a(x);",
+        ]
+
+    def test_rejects_incomplete_statement(self):
+        with pytest.raises(ValueError):
+            split_statements("CREATE TABLE a (x TEXT")
+
+
+class TestMigrate:
+    def test_versions_are_increasing(self):
+        versions = [m.version for m in MIGRATIONS]
+        assert versions == sorted(set(versions))
+        assert LATEST_VERSION == versions[-1]
+
+    async def test_fresh_database_reaches_latest(self, tmp_path):
+        async with aiosqlite.connect(str(tmp_path / "fresh.db")) as conn:
+            assert await migrate(conn) == LATEST_VERSION
+            assert await get_version(conn) == LATEST_VERSION
+            assert "is_delegate" in await _columns(conn, "players")
+            cursor = await conn.execute("PRAGMA auto_vacuum")
+            assert (await cursor.fetchone())[0] == 2  # INCREMENTAL
+
+    async def test_unversioned_database_is_upgraded(self, tmp_path):
+        path = str(tmp_path / "legacy.db")
+        async with aiosqlite.connect(path) as conn:
+            await conn.executescript(LEGACY_SCHEMA)
+            await conn.execute(
+                "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('s', 'c', 'Old')"
+            )
+            await conn.execute(
+                "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (1, 'u', 'Alice')"
+            )
+            await conn.commit()
+
+        database = Database(path=path)
+        await database.initialize()
+        try:
+            player = await database.get_player(1, "u")
+            async with database.read() as conn:
+                version = await get_version(conn)
+        finally:
+            await database.close()
+        assert player["is_delegate"] == 0
+        assert version == LATEST_VERSION
+
+    async def test_current_database_does_no_work(self, tmp_path):
+        path = str(tmp_path / "current.db")
+        async with aiosqlite.connect(path) as conn:
+            await migrate(conn)
+        async with aiosqlite.connect(path) as conn:
+            statements: list[str] = []
+            await conn.set_trace_callback(statements.append)
+            await migrate(conn)
+        assert statements == ["PRAGMA user_version"]
+
+    async def test_failed_step_rolls_back_and_keeps_version(self, tmp_path):
+        async def broken(conn):
+            await conn.execute("CREATE TABLE half_done (x INTEGER)")
+            raise RuntimeError("step failed")
+
+        steps = MIGRATIONS + [Migration(LATEST_VERSION + 1, "broken", broken)]
+        async with aiosqlite.connect(str(tmp_path / "broken.db")) as conn:
+            with pytest.raises(RuntimeError):
+                await migrate(conn, steps)
+            assert await get_version(conn) == LATEST_VERSION
+            cursor = await conn.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'half_done'"
+            )
+            assert await cursor.fetchone() is None
+
+    async def test_each_step_logs_its_duration(self, tmp_path, caplog):
+        caplog.set_level("INFO", logger="cortex_bot.models.migrations")
+        async with aiosqlite.connect(str(tmp_path / "log.db")) as conn:
+            await migrate(conn)
+        applied = [r.getMessage() for r in caplog.records if "applied in" in r.getMessage()]
+        assert len(applied) == len(MIGRATIONS)
+        assert applied[0].startswith("Migration 1 (baseline schema) applied in ")
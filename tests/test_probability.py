@@ -0,0 +1,132 @@
+import time
+from itertools import product
+
+import pytest
+
+from cortex_bot.services.probability import (
+    DIFFICULTY_LADDER,
+    IncrementalPool,
+    _outcomes,
+    calculate_odds,
+    pool_distribution,
+)
+from cortex_bot.services.roller import evaluate_difficulty
+
+
+def enumerate_outcomes(dice):
+    """Every face combination, scored the way a player picks dice."""
+    outcomes = {}
+    weight = 1.0
+    for size in dice:
+        weight /= size
+    for faces in product(*(range(1, s + 1) for s in dice)):
+        non_hitch = sorted(
+            ((s, v) for s, v in zip(dice, faces) if v != 1),
+            key=lambda d: (-d[1], d[0]),
+        )
+        total = sum(v for _, v in non_hitch[:2])
+        effect = max((s for s, _ in non_hitch[2:]), default=4)
+        outcomes[(total, effect)] = outcomes.get((total, effect), 0.0) + weight
+    return outcomes
+
+
+class TestPoolDistribution:
+    @pytest.mark.parametrize("dice", [
+        [8], [8, 6], [10, 8, 6], [12, 12, 4], [6, 6, 6, 6], [4, 8, 8, 10], [12, 4, 4, 6, 8],
+    ])
+    def test_matches_enumeration(self, dice):
+        expected = enumerate_outcomes(dice)
+        outcomes = pool_distribution(dice)["outcomes"]
+        assert outcomes.keys() == expected.keys()
+        for key, p in expected.items():
+            assert outcomes[key] == pytest.approx(p)
+
+    def test_probabilities_sum_to_one(self):
+        dist = pool_distribution([12, 10, 8, 8, 6, 4])
+        assert sum(dist["outcomes"].values()) == pytest.approx(1.0)
+        assert sum(dist["hitches"].values()) == pytest.approx(1.0)
+
+    def test_botch_is_every_die_rolling_one(self):
+        dist = pool_distribution([4, 6])
+        assert dist["botch"] == pytest.approx(1 / 24)
+        assert dist["outcomes"][(0, 4)] == pytest.approx(1 / 24)
+
+    def test_order_of_dice_does_not_matter(self):
+        _outcomes.cache_clear()
+        first = pool_distribution([6, 10, 8])
+        second = pool_distribution([8, 6, 10])
+        assert first == second
+        assert _outcomes.cache_info().hits == 1
+
+
+class TestCalculateOdds:
+    def test_matches_evaluate_difficulty(self):
+        dice = [10, 8, 6]
+        difficulty = 11
+        success = heroic = 0.0
+        for (total, _), p in enumerate_outcomes(dice).items():
+            result = evaluate_difficulty(total, difficulty)
+            success += p * result["success"]
+            heroic += p * result["heroic"]
+        odds = calculate_odds(dice, difficulty)
+        assert odds["success"] == pytest.approx(success)
+        assert odds["heroic"] == pytest.approx(heroic)
+
+    def test_expected_margin(self):
+        # Two d4s: total is the sum of non-hitch faces.
+        expected = sum(
+            ((a if a != 1 else 0) + (b if b != 1 else 0) - 3) / 16
+            for a in range(1, 5) for b in range(1, 5)
+        )
+        assert calculate_odds([4, 4], 3)["expected_margin"] == pytest.approx(expected)
+
+    def test_unbeatable_difficulty(self):
+        odds = calculate_odds([4, 4], 8)
+        assert odds["success"] == 0.0
+        assert odds["heroic"] == 0.0
+
+    def test_expected_hitches(self):
+        assert calculate_odds([4, 8], 5)["expected_hitches"] == pytest.approx(0.25 + 0.125)
+
+    def test_fifteen_dice_is_fast(self):
+        _outcomes.cache_clear()
+        dice = [12, 10, 10, 8, 8, 8, 6, 6, 6, 6, 4, 4, 4, 12, 10]
+        start = time.perf_counter()
+        calculate_odds(dice, 15)
+        assert time.perf_counter() - start < 1.0
+
+
+class TestIncrementalPool:
+    def test_add_matches_full_computation(self):
+        pool = IncrementalPool()
+        for size in [6, 12, 4, 8, 8]:
+            pool.add(size)
+        expected = pool_distribution([6, 12, 4, 8, 8])["outcomes"]
+        outcomes = pool.outcomes()
+        assert outcomes.keys() == expected.keys()
+        for key, p in expected.items():
+            assert outcomes[key] == pytest.approx(p)
+
+    def test_remove_older_die(self):
+        pool = IncrementalPool([10, 6, 8])
+        pool.remove(10)
+        expected = pool_distribution([6, 8])["outcomes"]
+        assert pool.dice == [6, 8]
+        for key, p in expected.items():
+            assert pool.outcomes()[key] == pytest.approx(p)
+
+    def test_sync_applies_only_the_difference(self):
+        pool = IncrementalPool([8, 6])
+        states = pool._states[:]
+        pool.sync([8, 6, 10])
+        assert pool._states[:3] == states
+        assert sorted(pool.dice) == [6, 8, 10]
+        pool.sync([])
+        assert pool.dice == []
+        assert pool.outcomes() == {(0, 4): 1.0}
+
+    def test_odds_ladder(self):
+        odds = IncrementalPool([4, 4]).odds()
+        assert list(odds["success"]) == list(DIFFICULTY_LADDER)
+        assert odds["success"][15] == 0.0
+        assert odds["expected_effect"] == 4
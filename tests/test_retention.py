@@ -0,0 +1,145 @@
+"""Tests for models/retention.py — action_log archival and vacuum."""
+
+import json
+
+import aiosqlite
+import pytest
+
+from cortex_bot.models.database import Database
+from cortex_bot.models.retention import ActionLogCompactor, RetentionPolicy, campaign_policy
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "retention.db"))
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+async def add_campaign(db, channel: str, config: dict | None = None) -> int:
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES ('s', ?, 'Camp', ?)",
+            (channel, json.dumps(config or {})),
+        )
+        return cursor.lastrowid
+
+
+async def add_actions(db, campaign_id: int, count: int, age_days: float = 0, blob: str = "") -> None:
+    async with db.transaction() as conn:
+        await conn.executemany(
+            """INSERT INTO action_log
+               (campaign_id, actor_discord_id, action_type, action_data, inverse_data, created_at)
+               VALUES (?, 'u', 'update_pp', ?, '{}', datetime('now', ?))""",
+            [(campaign_id, json.dumps({"n": i, "pad": blob}), f"-{age_days} days") for i in range(count)],
+        )
+
+
+async def log_ids(db, table: str, campaign_id: int) -> list[int]:
+    async with db.read() as conn:
+        cursor = await conn.execute(
+            f"SELECT id FROM {table} WHERE campaign_id = ? ORDER BY id", (campaign_id,)
+        )
+        return [row["id"] for row in await cursor.fetchall()]
+
+
+class TestCampaignPolicy:
+    def test_config_overrides_default(self):
+        default = RetentionPolicy(500, None)
+        assert campaign_policy({}, default) == default
+        assert campaign_policy({"undo_keep": 20, "undo_days": 7}, default) == RetentionPolicy(20, 7)
+
+
+class TestCompactor:
+    async def test_keeps_newest_rows_and_archives_the_rest(self, db):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 30)
+        before = await log_ids(db, "action_log", campaign)
+
+        compactor = ActionLogCompactor(db, RetentionPolicy(keep=10), batch_size=7)
+        result = await compactor.compact()
+
+        assert result["archived"] == 20
+        assert await log_ids(db, "action_log", campaign) == before[-10:]
+        assert await log_ids(db, "action_log_archive", campaign) == before[:-10]
+        # 20 rows in batches of 7, plus the vacuum.
+        assert db.writer_stats()["transactions"] >= 4
+
+    async def test_days_keeps_recent_rows_past_keep(self, db):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 5, age_days=30)
+        await add_actions(db, campaign, 5, age_days=1)
+        recent = (await log_ids(db, "action_log", campaign))[5:]
+
+        compactor = ActionLogCompactor(db, RetentionPolicy(keep=2, days=7))
+        assert (await compactor.compact())["archived"] == 5
+        assert await log_ids(db, "action_log", campaign) == recent
+
+    async def test_policy_is_per_campaign(self, db):
+        small = await add_campaign(db, "c1", {"undo_keep": 3})
+        large = await add_campaign(db, "c2")
+        await add_actions(db, small, 10)
+        await add_actions(db, large, 10)
+
+        await ActionLogCompactor(db, RetentionPolicy(keep=100)).compact()
+        assert len(await log_ids(db, "action_log", small)) == 3
+        assert len(await log_ids(db, "action_log", large)) == 10
+
+    async def test_undo_still_sees_the_tail(self, db):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 10)
+        newest = (await log_ids(db, "action_log", campaign))[-1]
+        await ActionLogCompactor(db, RetentionPolicy(keep=1)).compact()
+        assert (await db.get_last_undoable_action(campaign))["id"] == newest
+
+    async def test_archive_file_shrinks_main_database(self, db, tmp_path):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 200, blob="x" * 2000)
+        before = await log_ids(db, "action_log", campaign)
+        archive_path = str(tmp_path / "archive.db")
+
+        compactor = ActionLogCompactor(
+            db, RetentionPolicy(keep=10), batch_size=50, archive_path=archive_path
+        )
+        try:
+            result = await compactor.compact()
+        finally:
+            await compactor.close()
+
+        assert result["archived"] == 190
+        assert result["bytes_reclaimed"] > 190 * 2000
+        assert compactor.stats()["bytes_reclaimed"] == result["bytes_reclaimed"]
+        assert await log_ids(db, "action_log", campaign) == before[-10:]
+        async with aiosqlite.connect(archive_path) as archive:
+            cursor = await archive.execute("SELECT id FROM action_log_archive ORDER BY id")
+            assert [row[0] for row in await cursor.fetchall()] == before[:-10]
+
+    async def test_close_without_task_closes_archive(self, db, tmp_path):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 20)
+        compactor = ActionLogCompactor(
+            db,
+            RetentionPolicy(keep=10),
+            interval=0,
+            archive_path=str(tmp_path / "archive.db"),
+        )
+        await compactor.compact()
+        assert compactor._archive is not None
+
+        await compactor.close()
+        assert compactor._archive is None
+
+    async def test_nothing_to_do_is_cheap(self, db):
+        campaign = await add_campaign(db, "c1")
+        await add_actions(db, campaign, 5)
+        result = await ActionLogCompactor(db, RetentionPolicy(keep=10)).compact()
+        assert result["archived"] == 0
+        assert len(await log_ids(db, "action_log", campaign)) == 5
+
+    async def test_background_task_stops_on_close(self, db):
+        compactor = ActionLogCompactor(db, RetentionPolicy(keep=10), interval=60)
+        compactor.start()
+        task = compactor._task
+        await compactor.close()
+        assert task.done()
@@ -0,0 +1,151 @@
+"""Tests for models/rows.py — slotted row models and the getters that build them."""
+
+import sys
+import tracemalloc
+
+import pytest
+
+from cortex_bot.models.database import Database
+from cortex_bot.models.rows import Asset, Campaign, CrisisPool, Player, Stress
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "rows.db"))
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+@pytest.fixture
+async def seeded(db):
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name, config) VALUES ('s', 'c', 'Camp', '{\"trauma\": true}')"
+        )
+        campaign_id = cursor.lastrowid
+        cursor = await conn.execute(
+            "INSERT INTO players (campaign_id, discord_user_id, name) VALUES (?, 'u1', 'Alice')",
+            (campaign_id,),
+        )
+        player_id = cursor.lastrowid
+        cursor = await conn.execute(
+            "INSERT INTO stress_types (campaign_id, name) VALUES (?, 'Physical')", (campaign_id,)
+        )
+        await conn.execute(
+            "INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size) VALUES (?, ?, ?, 8)",
+            (campaign_id, player_id, cursor.lastrowid),
+        )
+        cursor = await conn.execute(
+            "INSERT INTO scenes (campaign_id, name) VALUES (?, 'Docks')", (campaign_id,)
+        )
+        scene_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO assets (campaign_id, player_id, scene_id, name, die_size) VALUES (?, ?, ?, 'Rope', 6)",
+            (campaign_id, player_id, scene_id),
+        )
+        cursor = await conn.execute(
+            "INSERT INTO crisis_pools (campaign_id, scene_id, name) VALUES (?, ?, 'Flood')",
+            (campaign_id, scene_id),
+        )
+        await conn.executemany(
+            "INSERT INTO crisis_pool_dice (crisis_pool_id, die_size) VALUES (?, ?)",
+            [(cursor.lastrowid, 8), (cursor.lastrowid, 6)],
+        )
+    return db, campaign_id, player_id, scene_id
+
+
+def make_asset(**overrides) -> Asset:
+    values = dict(id=1, campaign_id=1, player_id=2, scene_id=None, name="Rope", die_size=6)
+    return Asset(**{**values, **overrides})
+
+
+class TestRowModel:
+    def test_mapping_access(self):
+        asset = make_asset()
+        assert asset["name"] == "Rope"
+        assert asset.get("player_name") is None
+        assert asset.get("missing", "x") == "x"
+        assert "die_size" in asset
+        assert "missing" not in asset
+        with pytest.raises(KeyError):
+            asset["missing"]
+
+    def test_dict_conversion(self):
+        assert dict(make_asset()) == {
+            "id": 1, "campaign_id": 1, "player_id": 2, "scene_id": None,
+            "name": "Rope", "die_size": 6, "duration": "scene", "player_name": None,
+        }
+
+    def test_columns(self):
+        assert Player.columns() == "id, campaign_id, discord_user_id, name, is_gm, pp, xp, is_delegate"
+        assert Stress.columns("s").startswith("s.id, s.campaign_id")
+
+    def test_slotted_instance_is_smaller_than_dict(self):
+        asset = make_asset()
+        assert not hasattr(asset, "__dict__")
+        assert sys.getsizeof(asset) < sys.getsizeof(dict(asset))
+
+    def test_rows_allocate_less_than_dicts(self):
+        rows = [(i, 1, 2, None, f"Asset {i}", 6, "scene") for i in range(2000)]
+        keys = Asset.COLUMNS
+
+        def measure(build):
+            tracemalloc.start()
+            built = build()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            assert len(built) == len(rows)
+            return size
+
+        as_dicts = measure(lambda: [dict(zip(keys, r)) for r in rows])
+        as_models = measure(lambda: [Asset.from_row(r) for r in rows])
+        assert as_models < as_dicts * 0.75
+
+
+class TestGettersReturnModels:
+    async def test_campaign_and_players(self, seeded):
+        db, campaign_id, player_id, _ = seeded
+        campaign = await db.get_campaign_by_channel("s", "c")
+        assert isinstance(campaign, Campaign)
+        assert campaign.config == {"trauma": True}
+        assert await db.get_campaign_by_id(campaign_id) == campaign
+        player = await db.get_player(campaign_id, "u1")
+        assert isinstance(player, Player)
+        assert (player.id, player.name, player.pp) == (player_id, "Alice", 1)
+        assert await db.get_players(campaign_id) == [player]
+
+    async def test_cached_campaign_is_copied(self, seeded):
+        db, *_ = seeded
+        first = await db.get_campaign_by_channel("s", "c")
+        first.config["trauma"] = False
+        first.name = "Changed"
+        second = await db.get_campaign_by_channel("s", "c")
+        assert second.config == {"trauma": True}
+        assert second.name == "Camp"
+
+    async def test_joined_columns(self, seeded):
+        db, campaign_id, player_id, scene_id = seeded
+        [stress] = await db.get_player_stress(campaign_id, player_id)
+        assert (stress.stress_type_name, stress.die_size) == ("Physical", 8)
+        [asset] = await db.get_scene_assets(scene_id)
+        assert (asset.name, asset.player_name) == ("Rope", "Alice")
+        [owned] = await db.get_player_assets(campaign_id, player_id)
+        assert owned.player_name is None
+
+    async def test_crisis_pools(self, seeded):
+        db, _, _, scene_id = seeded
+        [pool] = await db.get_crisis_pools(scene_id)
+        assert isinstance(pool, CrisisPool)
+        assert pool.name == "Flood"
+        assert [d.die_size for d in pool.dice] == [6, 8]
+        assert all(d.crisis_pool_id == pool.id for d in pool.dice)
+
+    async def test_snapshot(self, seeded):
+        db, campaign_id, player_id, _ = seeded
+        snapshot = await db.get_campaign_snapshot(campaign_id)
+        assert [p.name for p in snapshot["players"]] == ["Alice"]
+        state = snapshot["player_states"][player_id]
+        assert [s.stress_type_name for s in state["stress"]] == ["Physical"]
+        assert [a.name for a in state["assets"]] == ["Rope"]
+        assert [a.player_name for a in snapshot["scene_assets"]] == ["Alice"]
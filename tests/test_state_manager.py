@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pytest
 
@@ -10,7 +11,8 @@ async def db(tmp_path):
     db_path = str(tmp_path / "test.db")
     database = Database(path=db_path)
     await database.initialize()
-    return database
+    yield database
+    await database.close()
 
 
 @pytest.fixture
@@ -400,3 +402,402 @@ class TestUndo:
         await db.mark_action_undone(action["id"])
         player = await db.get_player(campaign, "user1")
         assert player["xp"] == 0
+
+
+class TestUnitOfWork:
+    async def test_mutation_and_log_share_one_commit(self, sm, db, campaign, alice, traced):
+        statements = await traced(sm.add_asset(campaign, "user1", "Sword", 8, player_id=alice["id"]))
+        assert sum(1 for s in statements if s.strip().upper() == "COMMIT") == 1
+        action = await db.get_last_undoable_action(campaign, "user1")
+        assert action["action_type"] == "add_asset"
+
+    async def test_failed_log_rolls_back_mutation(self, sm, db, campaign, alice, monkeypatch):
+        async def broken_log_action(*args, **kwargs):
+            raise RuntimeError("log failed")
+
+        monkeypatch.setattr(db, "log_action", broken_log_action)
+        with pytest.raises(RuntimeError):
+            await sm.add_asset(campaign, "user1", "Sword", 8, player_id=alice["id"])
+        monkeypatch.undo()
+        assert await db.get_player_assets(campaign, alice["id"]) == []
+        assert await db.get_last_undoable_action(campaign, "user1") is None
+
+    async def test_nested_transaction_joins_outer(self, sm, db, campaign, alice):
+        with pytest.raises(RuntimeError):
+            async with db.transaction() as conn:
+                await sm.update_pp(campaign, "user1", alice["id"], 1, "Alice")
+                await conn.execute("UPDATE players SET xp = 9 WHERE id = ?", (alice["id"],))
+                raise RuntimeError("abort")
+        player = await db.get_player(campaign, "user1")
+        assert player["pp"] == 3
+        assert player["xp"] == 0
+        assert await db.get_last_undoable_action(campaign, "user1") is None
+
+
+_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+async def count_statements(traced, mutation) -> tuple[list[str], object]:
+    """Statements ``mutation`` ran, minus transaction control and action_log rows."""
+    statements, result = await traced.run(mutation)
+    return [
+        s for s in (s.strip() for s in statements)
+        if not s.upper().startswith(_CONTROL) and "action_log" not in s
+    ], result
+
+
+class TestSingleStatementMutations:
+    async def _stress_type(self, db, campaign):
+        types = await db.get_stress_types(campaign)
+        return next(t["id"] for t in types if t["name"] == "Physical")
+
+    async def test_add_asset(self, sm, campaign, alice, traced):
+        sql, _ = await count_statements(traced, sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice["id"]))
+        assert len(sql) == 1
+
+    async def test_remove_asset(self, sm, campaign, alice, traced):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice["id"])
+        sql, removed = await count_statements(traced, sm.remove_asset(campaign, "user1", asset["id"]))
+        assert len(sql) == 1
+        assert sql[0].startswith("DELETE")
+        assert removed["name"] == "Rope"
+
+    async def test_step_up_asset(self, sm, campaign, alice, traced):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 6, player_id=alice["id"])
+        sql, step = await count_statements(traced, sm.step_up_asset(campaign, "user1", asset["id"]))
+        assert len(sql) == 1
+        assert (step["from"], step["to"]) == (6, 8)
+
+    async def test_step_up_asset_at_max_only_reads(self, sm, campaign, alice, traced):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 12, player_id=alice["id"])
+        sql, step = await count_statements(traced, sm.step_up_asset(campaign, "user1", asset["id"]))
+        assert len(sql) == 2
+        assert sql[1].startswith("SELECT")
+        assert step["error"] == "already_max"
+
+    async def test_step_down_asset(self, sm, campaign, alice, traced):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 8, player_id=alice["id"])
+        sql, step = await count_statements(traced, sm.step_down_asset(campaign, "user1", asset["id"]))
+        assert len(sql) == 1
+        assert (step["from"], step["to"]) == (8, 6)
+
+    async def test_step_down_asset_eliminated(self, sm, campaign, alice, traced):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 4, player_id=alice["id"])
+        sql, step = await count_statements(traced, sm.step_down_asset(campaign, "user1", asset["id"]))
+        assert len(sql) == 2
+        assert step["eliminated"] is True
+
+    async def test_missing_asset_returns_none(self, sm, campaign):
+        for method in (sm.remove_asset, sm.step_up_asset, sm.step_down_asset):
+            assert await method(campaign, "user1", 9999) is None
+
+    async def test_add_stress_new_and_step_up(self, sm, db, campaign, alice, traced):
+        st_id = await self._stress_type(db, campaign)
+        sql, added = await count_statements(
+            traced, sm.add_stress(campaign, "gm1", alice["id"], st_id, 8, "Alice", "Physical")
+        )
+        assert len(sql) == 1
+        assert added["action"] == "added"
+        sql, stepped = await count_statements(
+            traced, sm.add_stress(campaign, "gm1", alice["id"], st_id, 6, "Alice", "Physical")
+        )
+        assert len(sql) == 1
+        assert (stepped["action"], stepped["from"], stepped["to"]) == ("stepped_up", 8, 10)
+
+    async def test_add_stress_replace_reads_old_size(self, sm, db, campaign, alice, traced):
+        st_id = await self._stress_type(db, campaign)
+        await sm.add_stress(campaign, "gm1", alice["id"], st_id, 6, "Alice", "Physical")
+        sql, result = await count_statements(
+            traced, sm.add_stress(campaign, "gm1", alice["id"], st_id, 10, "Alice", "Physical")
+        )
+        assert len(sql) == 3
+        assert (result["action"], result["from"], result["to"]) == ("replaced", 6, 10)
+
+    async def test_add_stress_stressed_out_writes_nothing(self, sm, db, campaign, alice, traced):
+        st_id = await self._stress_type(db, campaign)
+        await sm.add_stress(campaign, "gm1", alice["id"], st_id, 12, "Alice", "Physical")
+        sql, result = await count_statements(
+            traced, sm.add_stress(campaign, "gm1", alice["id"], st_id, 8, "Alice", "Physical")
+        )
+        assert len(sql) == 2
+        assert result["action"] == "stressed_out"
+        assert (await db.get_player_stress(campaign, alice["id"]))[0]["die_size"] == 12
+
+    async def test_remove_stress(self, sm, db, campaign, alice, traced):
+        st_id = await self._stress_type(db, campaign)
+        await sm.add_stress(campaign, "gm1", alice["id"], st_id, 8, "Alice", "Physical")
+        sql, result = await count_statements(
+            traced, sm.remove_stress(campaign, "gm1", alice["id"], st_id, "Alice", "Physical")
+        )
+        assert len(sql) == 1
+        assert result["die_size"] == 8
+
+    async def test_add_complication(self, sm, campaign, traced):
+        sql, _ = await count_statements(traced, sm.add_complication(campaign, "gm1", "Fog", 6))
+        assert len(sql) == 1
+
+    async def test_remove_complication(self, sm, campaign, traced):
+        comp = await sm.add_complication(campaign, "gm1", "Fog", 6)
+        sql, removed = await count_statements(traced, sm.remove_complication(campaign, "gm1", comp["id"]))
+        assert len(sql) == 1
+        assert removed["name"] == "Fog"
+
+    async def test_step_up_complication(self, sm, campaign, traced):
+        comp = await sm.add_complication(campaign, "gm1", "Fog", 6)
+        sql, step = await count_statements(traced, sm.step_up_complication(campaign, "gm1", comp["id"]))
+        assert len(sql) == 1
+        assert (step["from"], step["to"]) == (6, 8)
+
+    async def test_step_down_complication(self, sm, campaign, traced):
+        comp = await sm.add_complication(campaign, "gm1", "Fog", 10)
+        sql, step = await count_statements(traced, sm.step_down_complication(campaign, "gm1", comp["id"]))
+        assert len(sql) == 1
+        assert (step["from"], step["to"]) == (10, 8)
+
+    async def test_update_pp(self, sm, campaign, alice, traced):
+        sql, result = await count_statements(traced, sm.update_pp(campaign, "user1", alice["id"], -2, "Alice"))
+        assert len(sql) == 1
+        assert (result["from"], result["to"]) == (3, 1)
+
+    async def test_update_pp_refused_by_guard(self, sm, db, campaign, alice, traced):
+        sql, result = await count_statements(traced, sm.update_pp(campaign, "user1", alice["id"], -4, "Alice"))
+        assert len(sql) == 2
+        assert result["current"] == 3
+        assert (await db.get_player(campaign, "user1"))["pp"] == 3
+
+    async def test_update_xp(self, sm, campaign, alice, traced):
+        sql, result = await count_statements(traced, sm.update_xp(campaign, "user1", alice["id"], 4, "Alice"))
+        assert len(sql) == 1
+        assert (result["from"], result["to"]) == (0, 4)
+
+    async def test_stepped_die_undoes_to_old_size(self, sm, db, campaign, alice):
+        asset = await sm.add_asset(campaign, "user1", "Rope", 10, player_id=alice["id"])
+        await sm.step_down_asset(campaign, "user1", asset["id"])
+        assert await sm.undo(campaign)
+        assets = await db.get_player_assets(campaign, alice["id"])
+        assert assets[0]["die_size"] == 10
+
+
+@pytest.fixture
+async def scene(db, campaign, alice):
+    gm = await db.get_player(campaign, "gm1")
+    async with db.connect() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1)",
+            (campaign, "Docks"),
+        )
+        scene_id = cursor.lastrowid
+        await conn.execute(
+            "INSERT INTO assets (campaign_id, player_id, scene_id, name, die_size, duration) VALUES (?, ?, ?, ?, ?, ?)",
+            (campaign, alice["id"], scene_id, "Crowbar", 6, "scene"),
+        )
+        await conn.execute(
+            "INSERT INTO assets (campaign_id, player_id, scene_id, name, die_size, duration) VALUES (?, ?, ?, ?, ?, ?)",
+            (campaign, alice["id"], None, "Sword", 8, "session"),
+        )
+        await conn.execute(
+            "INSERT INTO complications (campaign_id, scene_id, name, die_size, scope) VALUES (?, ?, ?, ?, ?)",
+            (campaign, scene_id, "Fog", 8, "scene"),
+        )
+        cursor = await conn.execute(
+            "INSERT INTO crisis_pools (campaign_id, scene_id, name) VALUES (?, ?, ?)",
+            (campaign, scene_id, "Fire"),
+        )
+        await conn.execute(
+            "INSERT INTO crisis_pool_dice (crisis_pool_id, die_size) VALUES (?, ?), (?, ?)",
+            (cursor.lastrowid, 6, cursor.lastrowid, 10),
+        )
+        for player_id, type_name, size in [
+            (alice["id"], "Physical", 4), (alice["id"], "Mental", 10), (gm["id"], "Physical", 6),
+        ]:
+            await conn.execute(
+                """INSERT INTO stress (campaign_id, player_id, stress_type_id, die_size)
+                   SELECT ?, ?, id, ? FROM stress_types WHERE campaign_id = ? AND name = ?""",
+                (campaign, player_id, size, campaign, type_name),
+            )
+        await conn.execute(
+            "INSERT INTO doom_pool_dice (campaign_id, die_size) VALUES (?, ?)", (campaign, 6)
+        )
+        await conn.commit()
+    return await db.get_active_scene(campaign)
+
+
+async def stress_sizes(db, campaign) -> dict[tuple[str, str], int]:
+    async with db.read() as conn:
+        cursor = await conn.execute(
+            """SELECT p.name AS player, st.name AS type, s.die_size
+               FROM stress s JOIN players p ON s.player_id = p.id
+               JOIN stress_types st ON s.stress_type_id = st.id
+               WHERE s.campaign_id = ?""",
+            (campaign,),
+        )
+        return {(r["player"], r["type"]): r["die_size"] for r in await cursor.fetchall()}
+
+
+class TestStartScene:
+    async def test_concurrent_starts_create_one_scene(self, sm, db, campaign):
+        results = await asyncio.gather(sm.start_scene(campaign, "A"), sm.start_scene(campaign, "B"))
+        assert sorted("error" in r for r in results) == [False, True]
+        async with db.read() as conn:
+            cursor = await conn.execute(
+                "SELECT COUNT(*) FROM scenes WHERE campaign_id = ? AND is_active = 1", (campaign,)
+            )
+            assert (await cursor.fetchone())[0] == 1
+
+
+class TestEndScene:
+    async def test_bridge_steps_down_non_gm_stress(self, sm, db, campaign, scene):
+        ended = await sm.end_scene(campaign, "gm1", scene, bridge=True)
+        assert ended["stress_changes"] == [
+            {"player": "Alice", "type": "Mental", "from": 10, "to": 8},
+            {"player": "Alice", "type": "Physical", "eliminated": True, "from": 4},
+        ]
+        assert await stress_sizes(db, campaign) == {
+            ("Alice", "Mental"): 8, ("GameMaster", "Physical"): 6,
+        }
+        remaining = dict(ended["remaining_stress"])
+        assert [(s["stress_type_name"], s["die_size"]) for s in remaining["Alice"]] == [("Mental", 8)]
+        assert [(s["stress_type_name"], s["die_size"]) for s in remaining["GameMaster"]] == [("Physical", 6)]
+        assert [d["die_size"] for d in ended["doom_pool"]] == [6]
+
+    async def test_removes_scene_elements(self, sm, db, campaign, alice, scene):
+        ended = await sm.end_scene(campaign, "gm1", scene)
+        assert [(a["name"], a["player_name"]) for a in ended["removed_assets"]] == [("Crowbar", "Alice")]
+        assert [(c["name"], c["player_name"]) for c in ended["removed_complications"]] == [("Fog", None)]
+        assert [sorted(d["die_size"] for d in cp["dice"]) for cp in ended["removed_crisis_pools"]] == [[6, 10]]
+        assert ended["stress_changes"] == []
+        assert await db.get_active_scene(campaign) is None
+        assert [a["name"] for a in await db.get_player_assets(campaign, alice["id"])] == ["Sword"]
+        async with db.read() as conn:
+            cursor = await conn.execute("SELECT COUNT(*) FROM crisis_pool_dice")
+            assert (await cursor.fetchone())[0] == 0
+
+    async def test_concurrent_ends_bridge_once(self, sm, db, campaign, scene):
+        first, second = await asyncio.gather(
+            sm.end_scene(campaign, "gm1", scene, bridge=True),
+            sm.end_scene(campaign, "gm1", scene, bridge=True),
+        )
+        assert [first.get("error"), second.get("error")].count("no_active_scene") == 1
+        assert (await stress_sizes(db, campaign))[("Alice", "Mental")] == 8
+        async with db.read() as conn:
+            cursor = await conn.execute(
+                "SELECT COUNT(*) FROM action_log WHERE action_type = 'end_scene'"
+            )
+            assert (await cursor.fetchone())[0] == 1
+
+    async def test_runs_in_a_single_commit(self, sm, db, campaign, scene, traced):
+        statements = await traced(sm.end_scene(campaign, "gm1", scene, bridge=True))
+        assert sum(1 for s in statements if s.strip().upper() == "COMMIT") == 1
+        stress_writes = [s for s in statements if s.lstrip().startswith(("UPDATE stress", "DELETE FROM stress"))]
+        assert len(stress_writes) == 2
+
+    async def test_undo_restores_the_scene(self, sm, db, campaign, alice, scene):
+        before = await stress_sizes(db, campaign)
+        await sm.end_scene(campaign, "gm1", scene, bridge=True)
+        action = await db.get_last_undoable_action(campaign)
+        assert action["action_type"] == "end_scene"
+        await sm.execute_undo(action["inverse_data"])
+
+        assert (await db.get_active_scene(campaign))["id"] == scene["id"]
+        assert await stress_sizes(db, campaign) == before
+        assert [a["name"] for a in await db.get_scene_assets(scene["id"])] == ["Crowbar"]
+        assert [c["name"] for c in await db.get_scene_complications(scene["id"])] == ["Fog"]
+        pools = await db.get_crisis_pools(scene["id"])
+        assert [sorted(d["die_size"] for d in cp["dice"]) for cp in pools] == [[6, 10]]
+
+    async def test_undo_blocked_while_another_scene_is_active(self, sm, db, campaign, scene):
+        await sm.end_scene(campaign, "gm1", scene, bridge=True)
+        async with db.connect() as conn:
+            await conn.execute(
+                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, ?, 1)",
+                (campaign, "Next"),
+            )
+            await conn.commit()
+        before = await stress_sizes(db, campaign)
+        action = await db.get_last_undoable_action(campaign)
+        with pytest.raises(ValueError, match="another scene is active"):
+            await sm.execute_undo(action["inverse_data"])
+        assert await stress_sizes(db, campaign) == before
+
+
+class TestMultiUndo:
+    async def test_undoes_n_actions_in_one_commit(self, sm, db, campaign, alice, monkeypatch, traced):
+        await sm.add_asset(campaign, "user1", "Sword", 8, player_id=alice["id"])
+        await sm.update_pp(campaign, "user1", alice["id"], 2, "Alice")
+        await sm.update_xp(campaign, "user1", alice["id"], 5, "Alice")
+        fetches = []
+        fetch_actions = db._fetch_actions
+
+        async def counting_fetch(*args):
+            fetches.append(args[0])
+            return await fetch_actions(*args)
+
+        monkeypatch.setattr(db, "_fetch_actions", counting_fetch)
+        statements, undone = await traced.run(sm.undo(campaign, 3))
+
+        assert [a["action_type"] for a in undone] == ["add_xp", "add_pp", "add_asset"]
+        assert sum(1 for s in statements if s.strip().upper() == "COMMIT") == 1
+        assert len(fetches) == 1
+        player = await db.get_player(campaign, "user1")
+        assert (player["pp"], player["xp"]) == (3, 0)
+        assert await db.get_player_assets(campaign, alice["id"]) == []
+        assert await db.get_last_undoable_action(campaign) is None
+
+    async def test_remove_then_add_undo_together(self, sm, db, campaign, alice):
+        asset = await sm.add_asset(campaign, "user1", "Sword", 8, player_id=alice["id"])
+        await sm.remove_asset(campaign, "user1", asset["id"])
+        await sm.undo(campaign, 2)
+        assert await db.get_player_assets(campaign, alice["id"]) == []
+
+    async def test_redo_reapplies_in_order(self, sm, db, campaign, alice):
+        asset = await sm.add_asset(campaign, "user1", "Sword", 6, player_id=alice["id"])
+        await sm.step_up_asset(campaign, "user1", asset["id"])
+        await sm.undo(campaign, 2)
+
+        redone = await sm.redo(campaign, 5)
+        assert [a["action_type"] for a in redone] == ["add_asset", "step_up_asset"]
+        assets = await db.get_player_assets(campaign, alice["id"])
+        assert [(a["id"], a["die_size"]) for a in assets] == [(asset["id"], 8)]
+        assert await sm.redo(campaign) == []
+        # Redone actions can be undone again.
+        assert [a["action_type"] for a in await sm.undo(campaign)] == ["step_up_asset"]
+
+    async def test_new_action_clears_redo(self, sm, db, campaign, alice):
+        await sm.update_pp(campaign, "user1", alice["id"], 1, "Alice")
+        await sm.undo(campaign)
+        assert len(await db.get_redo_actions(campaign, 5)) == 1
+        await sm.update_xp(campaign, "user1", alice["id"], 1, "Alice")
+        assert await db.get_redo_actions(campaign, 5) == []
+
+    async def test_actor_only_undoes_own_actions(self, sm, db, campaign, alice):
+        gm = await db.get_player(campaign, "gm1")
+        await sm.update_pp(campaign, "user1", alice["id"], 1, "Alice")
+        await sm.update_pp(campaign, "gm1", gm["id"], 1, "GameMaster")
+        undone = await sm.undo(campaign, 5, actor_discord_id="user1")
+        assert [a["actor_discord_id"] for a in undone] == ["user1"]
+        assert (await db.get_player(campaign, "gm1"))["pp"] == 6
+
+    async def test_cursor_pages_through_history(self, sm, db, campaign, alice):
+        for _ in range(5):
+            await sm.update_xp(campaign, "user1", alice["id"], 1, "Alice")
+        first = await db.get_undo_actions(campaign, 2)
+        second = await db.get_undo_actions(campaign, 2, before_id=first[-1]["id"])
+        ids = [a["id"] for a in first + second]
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == 4
+
+    async def test_refused_step_rolls_back_the_batch(self, sm, db, campaign, alice):
+        async with db.connect() as conn:
+            cursor = await conn.execute(
+                "INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, 'One', 1)", (campaign,)
+            )
+            await conn.commit()
+        await sm.end_scene(campaign, "gm1", {"id": cursor.lastrowid, "name": "One"})
+        async with db.connect() as conn:
+            await conn.execute("INSERT INTO scenes (campaign_id, name, is_active) VALUES (?, 'Two', 1)", (campaign,))
+            await conn.commit()
+        await sm.update_pp(campaign, "user1", alice["id"], 1, "Alice")
+
+        with pytest.raises(ValueError):
+            await sm.undo(campaign, 2)
+        assert (await db.get_player(campaign, "user1"))["pp"] == 4
+        assert len(await db.get_undo_actions(campaign, 5)) == 2
@@ -1,6 +1,6 @@
 """Tests for undo feedback formatting."""
 
-from cortex_bot.cogs.undo import _format_undo_message
+from cortex_bot.cogs.undo import _format_undo_message, format_undo_result
 
 
 class TestFormatUndoMessage:
@@ -65,3 +65,18 @@ class TestFormatUndoMessage:
         # Missing required keys should fall back to technical format
         msg = _format_undo_message("add_asset", {"id": 1})
         assert "add_asset" in msg
+
+
+class TestFormatUndoResult:
+    def test_single_action(self):
+        actions = [{"action_type": "doom_add", "action_data": {"die_size": 8}}]
+        assert format_undo_result("Undone", actions) == "Undone: Doom Pool: d8 added"
+
+    def test_several_actions(self):
+        actions = [
+            {"action_type": "doom_add", "action_data": {"die_size": 8}},
+            {"action_type": "doom_remove", "action_data": {"die_size": 6}},
+        ]
+        assert format_undo_result("Redone", actions) == (
+            "Redone 2 actions:\n- Doom Pool: d8 added\n- Doom Pool: d6 removed"
+        )
@@ -5,10 +5,12 @@ import re
 import discord
 import pytest
 
+from cortex_bot.config import settings
 from cortex_bot.views.base import (
     parse_custom_id,
     make_custom_id,
     CortexView,
+    EphemeralView,
     add_die_buttons,
     add_player_options,
 )
@@ -271,6 +273,93 @@ class TestCortexView:
         view = CortexView()
         assert view.timeout is None
 
+    async def test_post_action_views_hold_only_dynamic_items(self):
+        from cortex_bot.cogs.menu import MenuView
+        from cortex_bot.views.common import MenuOnlyView, PostInfoView, PostUndoView
+        from cortex_bot.views.doom_views import PostCrisisActionView, PostDoomActionView
+        from cortex_bot.views.rolling_views import PostRollView
+        from cortex_bot.views.scene_views import PostSceneEndView, PostSceneStartView, PostSetupView
+        from cortex_bot.views.state_views import PostStressView
+
+        views = [
+            MenuView(1, has_active_scene=True, doom_enabled=True),
+            MenuOnlyView(1), PostInfoView(1, True), PostUndoView(1),
+            PostCrisisActionView(1), PostDoomActionView(1),
+            PostRollView(1, hitch_count=2, doom_enabled=True),
+            PostSceneEndView(1), PostSceneStartView(1, True), PostSetupView(1),
+            PostStressView(1),
+        ]
+        for view in views:
+            static = [
+                item for item in view.walk_children()
+                if item.is_dispatchable() and not isinstance(item, discord.ui.DynamicItem)
+            ]
+            assert static == [], type(view).__name__
+
+
+class TestEphemeralView:
+    async def test_expires_after_ttl(self):
+        view = EphemeralView()
+        assert view.timeout == settings.view_ttl
+        assert EphemeralView(timeout=5).timeout == 5
+
+    async def test_registered_until_stopped(self):
+        from cortex_bot.views.base import ephemeral_views
+
+        view = EphemeralView()
+        assert view in ephemeral_views.views()
+        view.stop()
+        assert view not in ephemeral_views.views()
+
+    async def test_timeout_counts_as_expired(self):
+        from cortex_bot.views.base import ephemeral_views
+
+        view = EphemeralView()
+        expired = ephemeral_views.expired
+        await view.on_timeout()
+        assert ephemeral_views.expired == expired + 1
+        assert view not in ephemeral_views.views()
+
+
+class TestEphemeralViewRegistry:
+    async def test_evicts_least_recently_used(self):
+        from cortex_bot.views.registry import EphemeralViewRegistry
+
+        registry = EphemeralViewRegistry(max_views=2)
+        first, second, third = (discord.ui.View(timeout=60) for _ in range(3))
+        registry.add(first)
+        registry.add(second)
+        registry.touch(first)
+        registry.add(third)
+
+        assert registry.views() == [first, third]
+        assert second.is_finished()
+        assert not first.is_finished()
+        assert registry.stats()["evicted"] == 1
+
+    async def test_drops_collected_views(self):
+        import gc
+
+        from cortex_bot.views.registry import EphemeralViewRegistry
+
+        registry = EphemeralViewRegistry(max_views=10)
+        registry.add(discord.ui.View(timeout=60))
+        gc.collect()
+        assert len(registry) == 0
+
+    async def test_stats_gauge(self):
+        from cortex_bot.views.registry import EphemeralViewRegistry
+
+        registry = EphemeralViewRegistry(max_views=10)
+        views = [discord.ui.View(timeout=60) for _ in range(3)]
+        for view in views:
+            add_die_buttons(view, lambda interaction, size: None)
+            registry.add(view)
+        stats = registry.stats()
+        assert stats["live"] == 3
+        assert stats["peak"] == 3
+        assert stats["approx_bytes"] > 3 * 5 * 48
+
 
 class TestViewComposition:
     """Test that views compose the correct buttons based on context."""
@@ -431,6 +520,21 @@ class TestPoolBuilderView:
         assert "2x d8" in view.build_status_text()
         assert "1x d6" in view.build_status_text()
 
+    async def test_status_shows_odds_and_effect(self):
+        from cortex_bot.views.rolling_views import PoolBuilderView
+
+        view = PoolBuilderView(
+            campaign_id=1, player_id=1, player_name="Alice", toggle_items=[]
+        )
+        view.pool.extend([8, 8, 6])
+        text = view.build_status_text()
+        assert "Chance to beat 3 " in text
+        assert ", 15 " in text
+        assert "Expected effect die: d" in text
+        view.pool.remove(6)
+        view.build_status_text()
+        assert sorted(view.odds.dice) == [8, 8]
+
     async def test_toggle_on(self):
         from cortex_bot.views.rolling_views import PoolBuilderView
 
@@ -472,6 +576,34 @@ class TestPoolBuilderView:
         view.pool.remove(value)
         assert view.pool == [8]
 
+    async def test_toggles_respect_the_pool_cap(self):
+        from types import SimpleNamespace
+
+        from cortex_bot.models.dice import MAX_POOL_DICE
+        from cortex_bot.views.rolling_views import PoolBuilderView
+
+        sent = []
+
+        async def send_message(content, **kwargs):
+            sent.append(content)
+
+        interaction = SimpleNamespace(response=SimpleNamespace(send_message=send_message))
+        toggles = [{"id": "asset:10", "label": "Sword d8", "die_size": 8}]
+        view = PoolBuilderView(
+            campaign_id=1, player_id=1, player_name="Alice", toggle_items=toggles
+        )
+        view.pool.extend([6] * MAX_POOL_DICE)
+        await view._make_toggle_callback(toggles[0])(interaction)
+        assert len(view.pool) == MAX_POOL_DICE
+
+        view.pool.pop()
+        view.history.append(("toggle_off", "asset:10"))
+        view.pool.append(6)
+        await view._on_remove_last(interaction)
+        assert len(view.pool) == MAX_POOL_DICE
+        assert view.history == [("toggle_off", "asset:10")]
+        assert len(sent) == 2
+
     async def test_clear_resets_everything(self):
         from cortex_bot.views.rolling_views import PoolBuilderView
 
@@ -916,7 +1048,8 @@ async def db(tmp_path):
     db_path = str(tmp_path / "test.db")
     database = Database(path=db_path)
     await database.initialize()
-    return database
+    yield database
+    await database.close()
 
 
 @pytest.fixture
@@ -1166,11 +1299,12 @@ class TestPPStartButton:
         btn = PPStartButton(42)
         assert btn.item.custom_id == "cortex:pp_start:42"
 
-    async def test_pp_player_select_view_is_cortex_view(self):
+    async def test_pp_player_select_view_is_ephemeral(self):
         from cortex_bot.views.state_views import PPPlayerSelectView
 
         view = PPPlayerSelectView(campaign_id=1, actor_id="gm1")
-        assert view.timeout is None
+        assert isinstance(view, EphemeralView)
+        assert view.timeout == settings.view_ttl
 
     async def test_pp_player_select_with_few_players(self):
         from cortex_bot.views.state_views import PPPlayerSelectView
@@ -1288,11 +1422,12 @@ class TestXPStartButton:
         btn = XPStartButton(42)
         assert btn.item.custom_id == "cortex:xp_start:42"
 
-    async def test_xp_player_select_view_is_cortex_view(self):
+    async def test_xp_player_select_view_is_ephemeral(self):
         from cortex_bot.views.state_views import XPPlayerSelectView
 
         view = XPPlayerSelectView(campaign_id=1, actor_id="gm1")
-        assert view.timeout is None
+        assert isinstance(view, EphemeralView)
+        assert view.timeout == settings.view_ttl
 
     async def test_xp_player_select_with_few_players(self):
         from cortex_bot.views.state_views import XPPlayerSelectView
@@ -0,0 +1,131 @@
+"""Tests for models/writer.py — group commit through Database.transaction()."""
+
+import asyncio
+
+import pytest
+
+from cortex_bot.models.database import Database
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(path=str(tmp_path / "writer.db"))
+    await database.initialize()
+    async with database.connect() as conn:
+        await conn.execute(
+            "INSERT INTO campaigns (server_id, channel_id, name) VALUES ('s', 'c', 'Camp')"
+        )
+        await conn.commit()
+    yield database
+    await database.close()
+
+
+async def insert_scene(db, name: str) -> int:
+    async with db.transaction() as conn:
+        cursor = await conn.execute(
+            "INSERT INTO scenes (campaign_id, name) VALUES (1, ?)", (name,)
+        )
+        return cursor.lastrowid
+
+
+async def scene_names(db) -> set[str]:
+    async with db.read() as conn:
+        cursor = await conn.execute("SELECT name FROM scenes")
+        return {row["name"] for row in await cursor.fetchall()}
+
+
+class TestGroupCommit:
+    async def test_concurrent_transactions_share_commits(self, db):
+        statements: list[str] = []
+        async with db.connect() as conn:
+            await conn.set_trace_callback(statements.append)
+        try:
+            ids = await asyncio.gather(*(insert_scene(db, f"s{i}") for i in range(20)))
+        finally:
+            async with db.connect() as conn:
+                await conn.set_trace_callback(None)
+
+        assert len(set(ids)) == 20
+        assert await scene_names(db) == {f"s{i}" for i in range(20)}
+        commits = sum(1 for s in statements if s.strip().upper() == "COMMIT")
+        assert 1 <= commits < 20
+        stats = db.writer_stats()
+        assert stats["transactions"] == 20
+        assert stats["max_batch_size"] > 1
+        assert stats["max_queue_depth"] > 1
+        assert stats["queue_depth"] == 0
+
+    async def test_failed_caller_only_rolls_back_its_own_work(self, db):
+        async def failing():
+            async with db.transaction() as conn:
+                await conn.execute("INSERT INTO scenes (campaign_id, name) VALUES (1, 'bad')")
+                raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            insert_scene(db, "a"), failing(), insert_scene(db, "b"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], RuntimeError)
+        assert await scene_names(db) == {"a", "b"}
+
+    async def test_write_returns_result_after_commit(self, db):
+        async def add(conn):
+            cursor = await conn.execute(
+                "INSERT INTO scenes (campaign_id, name) VALUES (1, 'w')"
+            )
+            return cursor.lastrowid
+
+        scene_id = await db.write(add)
+        # Readers only see committed data.
+        async with db.read() as conn:
+            cursor = await conn.execute("SELECT name FROM scenes WHERE id = ?", (scene_id,))
+            assert (await cursor.fetchone())["name"] == "w"
+
+    async def test_nested_transaction_joins_the_turn(self, db):
+        async with db.transaction():
+            await insert_scene(db, "inner")
+            async with db.connect() as conn:
+                assert conn.in_transaction
+        assert await scene_names(db) == {"inner"}
+        assert db.writer_stats()["transactions"] == 1
+
+    async def test_transaction_right_after_a_failed_one_gets_its_own_turn(self, db):
+        with pytest.raises(RuntimeError):
+            async with db.transaction():
+                await insert_scene(db, "rolled back")
+                raise RuntimeError("abort")
+        async with db.transaction():
+            await insert_scene(db, "kept")
+        assert await scene_names(db) == {"kept"}
+
+    async def test_commit_inside_a_turn_fails_the_batch(self, db):
+        with pytest.raises(RuntimeError, match="ended the batch transaction"):
+            async with db.transaction() as conn:
+                await conn.execute("INSERT INTO scenes (campaign_id, name) VALUES (1, 'manual')")
+                await conn.commit()
+        # The writer recovers and later turns commit normally.
+        await insert_scene(db, "after")
+        assert "after" in await scene_names(db)
+
+    async def test_sequential_transactions_commit_one_by_one(self, db):
+        for i in range(5):
+            await insert_scene(db, f"x{i}")
+        stats = db.writer_stats()
+        assert stats["batches"] == 5
+        assert stats["max_batch_size"] == 1
+
+    async def test_commit_latency_is_recorded(self, db):
+        await insert_scene(db, "a")
+        stats = db.writer_stats()
+        assert stats["batches"] == 1
+        assert stats["last_commit_ms"] >= 0
+        assert stats["mean_commit_ms"] == pytest.approx(stats["last_commit_ms"])
+
+    async def test_close_stops_the_writer_task(self, tmp_path):
+        database = Database(path=str(tmp_path / "close.db"))
+        await database.initialize()
+        async with database.transaction() as conn:
+            await conn.execute("CREATE TABLE t (x INTEGER)")
+        task = database.writer._task
+        await database.close()
+        assert task.done()